@@ -0,0 +1 @@
+"""Offline benchmarks of the framework overhead (see `benchmarks/run.py`)."""
@@ -0,0 +1,230 @@
+"""
+Fake OpenAI Responses API
+=========================
+
+A tiny, dependency-free HTTP server that speaks enough of the OpenAI
+Responses API (``POST .../responses``) for the OpenAI Agents SDK to drive
+a full agent run against it.
+
+Each conversation replays a *script*: a list of turns, where every turn is
+either a batch of tool calls or the final structured output. The current
+turn is derived from the number of ``function_call_output`` items already in
+the request input, so the server is stateless and safe for concurrent flows.
+
+    {"turns": [
+        {"tool_calls": [{"name": "browser_navigate", "arguments": {"url": "https://example.com"}}]},
+        {"tool_calls": [{"name": "browser_snapshot", "arguments": {}}]},
+        {"final": "auto"}
+    ]}
+
+``"final": "auto"`` fills the requested JSON schema with plausible values,
+so the same script works for `RunResult` and any custom subclass. A script
+may instead hold ``"variants"``: turn lists picked by a ``"match"`` substring
+of the first user message (the last variant is the fallback).
+
+"""
+
+from __future__ import annotations
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+
+DEFAULT_SCRIPT: dict[str, Any] = {
+    "turns": [
+        {"tool_calls": [{"name": "browser_navigate", "arguments": {"url": "https://example.com/login"}}]},
+        {"tool_calls": [{"name": "browser_snapshot", "arguments": {}}]},
+        {"tool_calls": [
+            {"name": "browser_type", "arguments": {"element": "Username", "ref": "e3", "text": "tomsmith"}},
+            {"name": "browser_type", "arguments": {"element": "Password", "ref": "e4", "text": "secret"}},
+        ]},
+        {"tool_calls": [{"name": "browser_click", "arguments": {"element": "Login", "ref": "e5"}}]},
+        {"final": "auto"},
+    ]
+}
+
+
+def fill_schema(schema: dict[str, Any], defs: dict[str, Any] | None = None) -> Any:
+    """Produce a value that validates against a (strict) JSON schema."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return fill_schema(defs[schema["$ref"].split("/")[-1]], defs)
+    if "anyOf" in schema:
+        options = [s for s in schema["anyOf"] if s.get("type") != "null"] or schema["anyOf"]
+        return fill_schema(options[0], defs)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {name: fill_schema(sub, defs) for name, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [fill_schema(schema.get("items", {}), defs)]
+    if kind == "boolean":
+        return True
+    if kind in ("integer", "number"):
+        return 1
+    if kind == "null":
+        return None
+    return "ok"
+
+
+def _count_outputs(items: list[dict[str, Any]]) -> int:
+    return sum(1 for item in items if isinstance(item, dict) and item.get("type") == "function_call_output")
+
+
+def _current_turn(script: dict[str, Any], outputs_seen: int) -> dict[str, Any]:
+    consumed = 0
+    for turn in script["turns"]:
+        if consumed >= outputs_seen:
+            return turn
+        consumed += len(turn.get("tool_calls", []))
+    return script["turns"][-1] if "final" in script["turns"][-1] else {"final": "auto"}
+
+
+def _select_script(script: dict[str, Any], items: list[Any]) -> dict[str, Any]:
+    """Pick the script variant whose `match` substring occurs in the first user message."""
+    if "variants" not in script:
+        return script
+    first = json.dumps(items[0]) if items else ""
+    for variant in script["variants"]:
+        if variant.get("match", "") in first:
+            return variant
+    return script["variants"][-1]
+
+
+def build_response(script: dict[str, Any], body: dict[str, Any], usage: dict[str, int]) -> dict[str, Any]:
+    """Build a Responses API payload for the next scripted turn."""
+    items = body.get("input") or []
+    if isinstance(items, str):
+        items = [{"role": "user", "content": items}]
+    turn = _current_turn(_select_script(script, items), _count_outputs(items))
+
+    output: list[dict[str, Any]] = []
+    if "tool_calls" in turn:
+        for call in turn["tool_calls"]:
+            output.append({
+                "type": "function_call",
+                "id": f"fc_{uuid.uuid4().hex[:12]}",
+                "call_id": f"call_{uuid.uuid4().hex[:12]}",
+                "name": call["name"],
+                "arguments": json.dumps(call.get("arguments", {})),
+                "status": "completed",
+            })
+    else:
+        final = turn["final"]
+        if final == "auto":
+            fmt = (body.get("text") or {}).get("format") or {}
+            final = fill_schema(fmt["schema"]) if "schema" in fmt else "done"
+        text = final if isinstance(final, str) else json.dumps(final)
+        output.append({
+            "type": "message",
+            "id": f"msg_{uuid.uuid4().hex[:12]}",
+            "role": "assistant",
+            "status": "completed",
+            "content": [{"type": "output_text", "text": text, "annotations": []}],
+        })
+
+    return {
+        "id": f"resp_{uuid.uuid4().hex[:16]}",
+        "object": "response",
+        "created_at": int(time.time()),
+        "status": "completed",
+        "model": body.get("model", "fake-model"),
+        "output": output,
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+        "usage": {
+            "input_tokens": usage["input_tokens"],
+            "input_tokens_details": {"cached_tokens": usage.get("cached_tokens", 0)},
+            "output_tokens": usage["output_tokens"],
+            "output_tokens_details": {"reasoning_tokens": usage.get("reasoning_tokens", 0)},
+            "total_tokens": usage["input_tokens"] + usage["output_tokens"],
+        },
+    }
+
+
+class FakeLLMServer:
+    """
+    Threaded fake Responses API server.
+
+    Args:
+        script: Turn script replayed for every conversation
+        latency_ms: Artificial per-request latency (simulates model time)
+        usage: Token counts reported for every response
+
+    Example:
+        with FakeLLMServer(DEFAULT_SCRIPT) as server:
+            print(server.endpoint)  # use as AZURE_OPENAI_ENDPOINT
+    """
+
+    def __init__(
+        self,
+        script: dict[str, Any] | None = None,
+        latency_ms: float = 0.0,
+        usage: dict[str, int] | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.script = script or DEFAULT_SCRIPT
+        self.latency_ms = latency_ms
+        self.usage = usage or {"input_tokens": 1200, "output_tokens": 80, "cached_tokens": 0, "reasoning_tokens": 20}
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:  # noqa: N802
+                length = int(self.headers.get("content-length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}")
+                if not self.path.split("?")[0].endswith("/responses"):
+                    self.send_error(404)
+                    return
+                with server._lock:
+                    server.requests += 1
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+                payload = json.dumps(build_response(server.script, body, server.usage)).encode()
+                try:
+                    self.send_response(200)
+                    self.send_header("content-type", "application/json")
+                    self.send_header("content-length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client gave up (e.g. flow deadline expired)
+
+        return Handler
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
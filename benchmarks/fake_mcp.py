@@ -0,0 +1,209 @@
+"""
+Fake Playwright MCP Server
+==========================
+
+A lightweight stdio MCP server that mimics the tool names, argument shapes
+and response payloads of `@playwright/mcp`, without a browser.
+
+It speaks newline-delimited JSON-RPC directly (no MCP SDK dependency), keeps
+a tiny in-memory page model (URL, typed values) and pads page snapshots to a
+configurable size so payload-dependent costs stay realistic.
+
+Run standalone:
+
+    python benchmarks/fake_mcp.py --snapshot-bytes 20000 --output-dir .bench-output
+
+"""
+
+from __future__ import annotations
+import argparse
+import base64
+import json
+import sys
+import time
+import zlib
+from pathlib import Path
+from typing import Any
+
+
+PAGE_TREE = """- generic [ref=e1]:
+  - heading "Login Page" [level=2] [ref=e2]
+  - textbox "Username" [ref=e3]
+  - textbox "Password" [ref=e4]
+  - button "Login" [ref=e5]
+  - link "Elemental Selenium" [ref=e6]:
+    - /url: http://elementalselenium.com/"""
+
+_ELEMENTS = {"e3": "Username", "e4": "Password", "e5": "Login", "e6": "Elemental Selenium"}
+
+
+def _schema(properties: dict[str, Any], required: list[str] | None = None) -> dict[str, Any]:
+    return {"type": "object", "properties": properties, "required": required or []}
+
+
+_STR = {"type": "string"}
+
+TOOLS: list[dict[str, Any]] = [
+    {"name": "browser_navigate", "description": "Navigate to a URL", "inputSchema": _schema({"url": _STR}, ["url"])},
+    {"name": "browser_snapshot", "description": "Capture accessibility snapshot of the current page", "inputSchema": _schema({})},
+    {"name": "browser_click", "description": "Perform click on a web page",
+     "inputSchema": _schema({"element": _STR, "ref": _STR}, ["element", "ref"])},
+    {"name": "browser_type", "description": "Type text into editable element",
+     "inputSchema": _schema({"element": _STR, "ref": _STR, "text": _STR, "submit": {"type": "boolean"}},
+                            ["element", "ref", "text"])},
+    {"name": "browser_fill_form", "description": "Fill multiple form fields",
+     "inputSchema": _schema({"fields": {"type": "array", "items": {"type": "object"}}}, ["fields"])},
+    {"name": "browser_press_key", "description": "Press a key on the keyboard", "inputSchema": _schema({"key": _STR}, ["key"])},
+    {"name": "browser_wait_for", "description": "Wait for text to appear or disappear or a specified time to pass",
+     "inputSchema": _schema({"text": _STR, "textGone": _STR, "time": {"type": "number"}})},
+    {"name": "browser_evaluate", "description": "Evaluate JavaScript expression on page or element",
+     "inputSchema": _schema({"function": _STR, "element": _STR, "ref": _STR}, ["function"])},
+    {"name": "browser_take_screenshot", "description": "Take a screenshot of the current page",
+     "inputSchema": _schema({"filename": _STR, "fullPage": {"type": "boolean"}, "type": _STR})},
+    {"name": "browser_close", "description": "Close the page", "inputSchema": _schema({})},
+]
+
+
+def _png(width: int = 4, height: int = 4) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return len(data).to_bytes(4, "big") + body + zlib.crc32(body).to_bytes(4, "big")
+
+    raw = b"".join(b"\x00" + b"\xff\x00\x00" * width for _ in range(height))
+    header = width.to_bytes(4, "big") + height.to_bytes(4, "big") + bytes([8, 2, 0, 0, 0])
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(raw, 1)) + chunk(b"IEND", b"")
+
+
+class FakeBrowser:
+    """In-memory page model backing the fake tools."""
+
+    def __init__(self, snapshot_bytes: int, output_dir: Path | None, action_ms: float):
+        self.url = "about:blank"
+        self.values: dict[str, str] = {}
+        self.snapshot_bytes = snapshot_bytes
+        self.output_dir = output_dir
+        self.action_ms = action_ms
+
+    def _page_state(self) -> str:
+        tree = PAGE_TREE
+        padding = max(0, self.snapshot_bytes - len(tree))
+        filler = "\n".join(
+            f'  - generic "filler {i}" [ref=f{i}]' for i in range(padding // 32 + 1)
+        )[:padding]
+        return (
+            "### Page state\n"
+            f"- Page URL: {self.url}\n"
+            "- Page Title: The Internet\n"
+            "- Page Snapshot:\n```yaml\n" + tree + ("\n" + filler if filler else "") + "\n```"
+        )
+
+    @staticmethod
+    def _code(line: str) -> str:
+        return f"### Ran Playwright code\n```js\n{line}\n```\n\n"
+
+    def call(self, name: str, args: dict[str, Any]) -> tuple[list[dict[str, Any]], bool]:
+        if self.action_ms:
+            time.sleep(self.action_ms / 1000)
+        text = lambda s: [{"type": "text", "text": s}]  # noqa: E731
+        if name == "browser_navigate":
+            self.url = args["url"]
+            return text(self._code(f"await page.goto('{self.url}');") + self._page_state()), False
+        if name == "browser_snapshot":
+            return text(self._page_state()), False
+        if name == "browser_click":
+            label = _ELEMENTS.get(args.get("ref", ""))
+            if label is None:
+                return text(f"### Result\nError: Ref {args.get('ref')} not found in the current page snapshot."), True
+            return text(self._code(f"await page.getByRole('button', {{ name: '{label}' }}).click();")
+                        + self._page_state()), False
+        if name == "browser_type":
+            label = _ELEMENTS.get(args.get("ref", ""))
+            if label is None:
+                return text(f"### Result\nError: Ref {args.get('ref')} not found in the current page snapshot."), True
+            self.values[label] = args["text"]
+            code = f"await page.getByRole('textbox', {{ name: '{label}' }}).fill('{args['text']}');"
+            if args.get("submit"):
+                code += "\nawait page.getByRole('textbox', { name: '%s' }).press('Enter');" % label
+            return text(self._code(code)), False
+        if name == "browser_fill_form":
+            lines = []
+            for field in args.get("fields", []):
+                label = _ELEMENTS.get(field.get("ref", ""), field.get("name", "field"))
+                self.values[label] = str(field.get("value", ""))
+                lines.append(f"await page.getByRole('textbox', {{ name: '{label}' }}).fill('{field.get('value', '')}');")
+            return text(self._code("\n".join(lines))), False
+        if name == "browser_press_key":
+            return text(self._code(f"await page.keyboard.press('{args['key']}');")), False
+        if name == "browser_wait_for":
+            if args.get("text"):
+                return text(self._code(f"await page.getByText('{args['text']}').first().waitFor({{ state: 'visible' }});")
+                            + f"### Result\nWaited for {args['text']}"), False
+            return text(f"### Result\nWaited for {args.get('time', 0)}"), False
+        if name == "browser_evaluate":
+            fn = args.get("function", "")
+            if "localStorage" in fn or "cookie" in fn:
+                value: Any = {"url": self.url, "origin": self.url.split("/", 3)[:3] and "/".join(self.url.split("/", 3)[:3]),
+                              "cookies": "session=abc", "localStorage": {"token": "t"}, "sessionStorage": {}}
+            elif "location" in fn:
+                value = self.url
+            else:
+                value = None
+            return text("### Result\n" + json.dumps(value)), False
+        if name == "browser_take_screenshot":
+            filename = args.get("filename") or f"page-{int(time.time() * 1000)}.png"
+            target = (self.output_dir / filename) if self.output_dir else Path(filename)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(_png())
+            return [
+                {"type": "text", "text": f"### Result\nTook the full page screenshot and saved it as {target}"},
+                {"type": "image", "data": base64.b64encode(_png()).decode(), "mimeType": "image/png"},
+            ], False
+        if name == "browser_close":
+            self.url = "about:blank"
+            return text("### Result\nNo open tabs. Use the \"browser_navigate\" tool to navigate to a page first."), False
+        return text(f"Tool \"{name}\" not found"), True
+
+
+def serve(browser: FakeBrowser) -> None:
+    """Serve MCP JSON-RPC over stdin/stdout until EOF."""
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        message = json.loads(line)
+        method = message.get("method")
+        if "id" not in message:
+            continue  # notification
+        if method == "initialize":
+            result: Any = {
+                "protocolVersion": message["params"].get("protocolVersion", "2025-06-18"),
+                "capabilities": {"tools": {"listChanged": False}},
+                "serverInfo": {"name": "fake-playwright", "version": "0.0.0"},
+            }
+        elif method == "tools/list":
+            result = {"tools": TOOLS}
+        elif method == "tools/call":
+            content, is_error = browser.call(message["params"]["name"], message["params"].get("arguments") or {})
+            result = {"content": content, "isError": is_error}
+        elif method == "ping":
+            result = {}
+        else:
+            reply = {"jsonrpc": "2.0", "id": message["id"], "error": {"code": -32601, "message": f"Unknown method {method}"}}
+            sys.stdout.write(json.dumps(reply) + "\n")
+            sys.stdout.flush()
+            continue
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\n")
+        sys.stdout.flush()
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="Fake Playwright MCP server (stdio).")
+    parser.add_argument("--snapshot-bytes", type=int, default=4000)
+    parser.add_argument("--output-dir", type=Path, default=None)
+    parser.add_argument("--action-ms", type=float, default=0.0)
+    args, _ = parser.parse_known_args(argv)
+    serve(FakeBrowser(args.snapshot_bytes, args.output_dir, args.action_ms))
+
+
+if __name__ == "__main__":
+    main()
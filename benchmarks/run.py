@@ -0,0 +1,295 @@
+"""
+Framework Overhead Benchmarks
+=============================
+
+Measures what the framework itself costs, fully offline: the model is the
+scripted fake Responses API (`fake_llm.py`) and the browser is the fake
+Playwright MCP server (`fake_mcp.py`), so the numbers contain no Azure or
+website latency unless you add it on purpose (`--model-latency-ms`,
+`--action-ms`).
+
+Measurements
+------------
+- `cold_start`: importing `playwright_agent` in a fresh interpreter, and the
+  first flow of a process (MCP server start included). An import slower
+  than `--import-budget` (default `IMPORT_BUDGET_SECONDS`) makes the run
+  exit with status 1 after writing the report.
+- `per_turn`: wall time per model turn of a warm flow, and the framework's
+  share of it (from the run's span breakdown, see `runtime.spans`)
+- `concurrency`: for 1/4/16/64 flows started at once, throughput, latency
+  percentiles and resident memory per flow (this process only; the fake
+  MCP server subprocesses are not counted)
+
+Usage
+-----
+From the repository root:
+
+    python -m benchmarks.run -o bench.json
+    python -m benchmarks.run --concurrency 1 4 --snapshot-bytes 20000
+    python -m benchmarks.run --compare baseline.json bench.json
+
+The JSON output holds the environment (Python, SDK version, git commit)
+and the parameters next to the results, so two files can be compared with
+`--compare` (relative change per metric).
+
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import Any
+
+from benchmarks.fake_llm import DEFAULT_SCRIPT, FakeLLMServer
+
+ROOT = Path(__file__).resolve().parents[1]
+FAKE_MCP = Path(__file__).resolve().with_name("fake_mcp.py")
+STEPS = "1. Open https://example.com/login\n2. Log in as tomsmith\n3. Verify the secure area is shown"
+CONCURRENCY = [1, 4, 16, 64]
+# What collecting a test module may cost for the package import alone
+IMPORT_BUDGET_SECONDS = 1.0
+
+try:
+    import playwright_agent  # noqa: F401
+except ImportError:
+    sys.path.insert(0, str(ROOT / "src"))
+
+
+def _environment(endpoint: str) -> None:
+    """Point the framework at the fake model; no tracing, no report sinks."""
+    os.environ.update(
+        AZURE_OPENAI_DEPLOYMENT="fake-model",
+        AZURE_OPENAI_ENDPOINT=endpoint,
+        AZURE_OPENAI_API_KEY="benchmark",
+        TRACING="off",
+    )
+    for name in ("HISTORY_DB", "REPORT_DIR", "SPAN_FILE", "PERSIST_RUNS", "STEP_RETRIES", "FLOW_TIMEOUT_SECONDS"):
+        os.environ.pop(name, None)
+
+
+def _rss_bytes() -> int:
+    """Current resident set size of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # No procfs: peak RSS is the best available approximation
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(q * (len(ordered) - 1)))]
+
+
+def _flow_runner(snapshot_bytes: int, action_ms: float) -> Any:
+    from agents.mcp import MCPServerStdio  # type: ignore[import-not-found]
+    from playwright_agent import BaseFlowRunner
+    from playwright_agent.integrations.mcp_servers import MCPServerManager
+
+    class FakeServerManager(MCPServerManager):
+        async def get_browser_server(self, storage_state: str | None = None) -> MCPServerStdio:
+            return MCPServerStdio(
+                name="playwright",
+                params={"command": sys.executable, "args": [
+                    str(FAKE_MCP), f"--snapshot-bytes={snapshot_bytes}", f"--action-ms={action_ms}",
+                    f"--output-dir={self.output_dir()}",
+                ]},
+                client_session_timeout_seconds=self.settings.mcp_client_timeout_seconds,
+            )
+
+    runner = BaseFlowRunner()
+    runner.server_manager = FakeServerManager(runner.settings)
+    return runner
+
+
+async def _run_flow(runner: Any) -> Any:
+    from playwright_agent import RunResult
+
+    result = await runner.run(STEPS, RunResult, trace_name="benchmark")
+    if result.status != "PASS":
+        raise RuntimeError(f"Benchmark flow did not pass: {result.exception}")
+    return result
+
+
+def measure_import(repeat: int = 5) -> dict[str, float]:
+    """Seconds to import `playwright_agent` in a fresh interpreter (median of `repeat`)."""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([str(ROOT / "src"), os.environ.get("PYTHONPATH", "")])}
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import playwright_agent"], check=True, env=env)
+        times.append(time.perf_counter() - started)
+    # The interpreter alone, to subtract
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    interpreter = time.perf_counter() - started
+    return {"import_seconds": round(statistics.median(times) - interpreter, 4), "interpreter_seconds": round(interpreter, 4)}
+
+
+async def measure_first_flow(runner: Any) -> dict[str, float]:
+    started = time.perf_counter()
+    result = await _run_flow(runner)
+    return {
+        "first_flow_seconds": round(time.perf_counter() - started, 4),
+        "first_flow_mcp_startup_seconds": result.timings.mcp_startup_seconds,
+    }
+
+
+async def measure_per_turn(runner: Any, repeat: int) -> dict[str, float]:
+    """Wall time and framework time per model turn over `repeat` warm flows."""
+    turns, elapsed, framework, startup = 0, 0.0, 0.0, 0.0
+    for _ in range(repeat):
+        result = await _run_flow(runner)
+        turns += result.usage.requests
+        elapsed += result.usage.elapsed_seconds
+        framework += result.timings.framework_seconds
+        startup += result.timings.mcp_startup_seconds
+    return {
+        "flows": repeat,
+        "turns_per_flow": turns / repeat,
+        "turn_ms": round((elapsed - startup) / turns * 1000, 3),
+        "framework_ms_per_turn": round(framework / turns * 1000, 3),
+        "mcp_startup_ms": round(startup / repeat * 1000, 3),
+    }
+
+
+async def measure_concurrency(runner: Any, flows: int) -> dict[str, float]:
+    """Start `flows` flows at once; throughput, latency and memory per flow."""
+    baseline, peak = _rss_bytes(), 0
+    done = asyncio.Event()
+
+    async def sample() -> None:
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, _rss_bytes())
+            await asyncio.sleep(0.02)
+
+    async def timed() -> float:
+        started = time.perf_counter()
+        await _run_flow(runner)
+        return time.perf_counter() - started
+
+    sampler = asyncio.create_task(sample())
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(timed() for _ in range(flows)))
+    wall = time.perf_counter() - started
+    done.set()
+    await sampler
+    return {
+        "flows": flows,
+        "wall_seconds": round(wall, 4),
+        "flows_per_second": round(flows / wall, 3),
+        "latency_p50_seconds": round(_percentile(latencies, 0.5), 4),
+        "latency_p95_seconds": round(_percentile(latencies, 0.95), 4),
+        "rss_mb_per_flow": round(max(peak - baseline, 0) / flows / 2**20, 3),
+    }
+
+
+def _meta(args: argparse.Namespace) -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    try:
+        sdk = metadata.version("openai-agents")
+    except metadata.PackageNotFoundError:
+        sdk = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "openai_agents": sdk,
+        "parameters": {
+            "concurrency": args.concurrency, "repeat": args.repeat, "model_latency_ms": args.model_latency_ms,
+            "action_ms": args.action_ms, "snapshot_bytes": args.snapshot_bytes,
+            "turns": len(DEFAULT_SCRIPT["turns"]),
+        },
+    }
+
+
+async def run_benchmarks(args: argparse.Namespace) -> dict[str, Any]:
+    """Run every measurement and return the report."""
+    report: dict[str, Any] = {"meta": _meta(args), "cold_start": measure_import(args.import_repeat)}
+    with FakeLLMServer(DEFAULT_SCRIPT, latency_ms=args.model_latency_ms) as llm, tempfile.TemporaryDirectory() as work:
+        _environment(llm.endpoint)
+        os.chdir(work)  # settings' output folders, and no stray .env file
+        runner = _flow_runner(args.snapshot_bytes, args.action_ms)
+        report["cold_start"].update(await measure_first_flow(runner))
+        report["per_turn"] = await measure_per_turn(runner, args.repeat)
+        report["concurrency"] = [await measure_concurrency(runner, flows) for flows in args.concurrency]
+        report["model_requests"] = llm.requests
+        os.chdir(ROOT)
+    return report
+
+
+def _metrics(report: dict[str, Any]) -> dict[str, float]:
+    """Flatten a report into comparable metric names."""
+    values = {f"cold_start.{k}": v for k, v in report.get("cold_start", {}).items()}
+    values.update({f"per_turn.{k}": v for k, v in report.get("per_turn", {}).items()})
+    for level in report.get("concurrency", []):
+        values.update({f"concurrency[{level['flows']}].{k}": v for k, v in level.items() if k != "flows"})
+    return {k: v for k, v in values.items() if isinstance(v, (int, float))}
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any]) -> list[dict[str, Any]]:
+    """Relative change of every metric present in both reports."""
+    before, after = _metrics(baseline), _metrics(current)
+    return [
+        {"metric": name, "baseline": before[name], "current": after[name],
+         "change": round((after[name] - before[name]) / before[name], 4) if before[name] else None}
+        for name in before if name in after
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline framework overhead benchmarks.")
+    parser.add_argument("-o", "--output", type=Path, help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=CONCURRENCY, help="Concurrent flow counts")
+    parser.add_argument("--repeat", type=int, default=5, help="Warm flows for the per-turn measurement")
+    parser.add_argument("--import-repeat", type=int, default=5, help="Fresh interpreters for the import time")
+    parser.add_argument(
+        "--import-budget", type=float, default=IMPORT_BUDGET_SECONDS, help="Fail if the import takes longer (seconds)",
+    )
+    parser.add_argument("--model-latency-ms", type=float, default=0.0, help="Simulated model latency per request")
+    parser.add_argument("--action-ms", type=float, default=0.0, help="Simulated browser action time per tool call")
+    parser.add_argument("--snapshot-bytes", type=int, default=4000, help="Size of fake page snapshots")
+    parser.add_argument("--compare", nargs=2, type=Path, metavar=("BASELINE", "CURRENT"), help="Compare two reports")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        baseline, current = (json.loads(path.read_text()) for path in args.compare)
+        for row in compare(baseline, current):
+            change = "n/a" if row["change"] is None else f"{row['change']:+.1%}"
+            print(f"{row['metric']:<45} {row['baseline']:>12} {row['current']:>12} {change:>9}")
+        return 0
+
+    report = asyncio.run(run_benchmarks(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+    seconds = report["cold_start"]["import_seconds"]
+    if seconds > args.import_budget:
+        print(f"cold_start.import_seconds {seconds}s is over the {args.import_budget}s budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
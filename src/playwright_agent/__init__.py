@@ -43,6 +43,7 @@ Key Classes
 - `BaseFlowRunner`: Main entry point for running web automation flows
 - `RunResult`: Pydantic model for test results with step-by-step details
 - `StepResult`: Individual step result with pass/fail status
+- `RetryPolicy`: Step-level retries that resume from the last passed step
 
 Exceptions
 ----------
@@ -52,14 +53,37 @@ Exceptions
 - `MCPToolError`: MCP tool call failed (timeout, connection, etc.)
 - `MCPServerError`: MCP server failed to start
 
+Importing the package is cheap: the classes above are imported on first
+access (the Agents SDK and the OpenAI client only with `BaseFlowRunner`
+and the runtime errors), and nothing is read or configured at import.
+
 For more details, see the README.md or individual module docstrings.
 """
 
-from playwright_agent.settings import ConfigurationError
-from playwright_agent.runtime.base import BaseFlowRunner, FlowExecutionError
-from playwright_agent.runtime.runner import AgentExecutionError, MCPToolError
-from playwright_agent.integrations.mcp_servers import MCPServerError
-from playwright_agent.schemas.results import RunResult, StepResult
+from __future__ import annotations
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from playwright_agent.settings import ConfigurationError
+    from playwright_agent.runtime.base import BaseFlowRunner, FlowExecutionError
+    from playwright_agent.runtime.runner import AgentExecutionError, MCPToolError
+    from playwright_agent.runtime.checkpoints import RetryPolicy
+    from playwright_agent.integrations.mcp_servers import MCPServerError
+    from playwright_agent.schemas.results import RunResult, StepResult
+
+# Public name -> module that defines it (imported on first access)
+_LAZY = {
+    "ConfigurationError": "playwright_agent.settings",
+    "BaseFlowRunner": "playwright_agent.runtime.base",
+    "FlowExecutionError": "playwright_agent.runtime.base",
+    "AgentExecutionError": "playwright_agent.runtime.runner",
+    "MCPToolError": "playwright_agent.runtime.runner",
+    "RetryPolicy": "playwright_agent.runtime.checkpoints",
+    "MCPServerError": "playwright_agent.integrations.mcp_servers",
+    "RunResult": "playwright_agent.schemas.results",
+    "StepResult": "playwright_agent.schemas.results",
+}
 
 __all__ = [
     "__version__",
@@ -67,6 +91,7 @@ __all__ = [
     "BaseFlowRunner",
     "RunResult",
     "StepResult",
+    "RetryPolicy",
     # Exceptions
     "ConfigurationError",
     "FlowExecutionError",
@@ -75,4 +100,17 @@ __all__ = [
     "MCPServerError",
 ]
 
-__version__ = "0.1.0"
\ No newline at end of file
+__version__ = "0.1.0"
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
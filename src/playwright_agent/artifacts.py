@@ -0,0 +1,398 @@
+"""
+Artifact Store
+==============
+
+Every run leaves full-page screenshots in the browser's output folder;
+nightly suites pile up gigabytes of mostly identical images. The artifact
+store takes these files over after a run, keeps one copy per distinct
+content and deletes old ones by a retention policy.
+
+Enable it by pointing `ARTIFACT_DIR` at a directory (created on first use):
+
+    ARTIFACT_DIR=reports/artifacts
+
+After every run the final screenshot (`proof_of_pass`) is moved into the
+store and `proof_of_pass` is rewritten to the stored file. That path is
+stable: it is derived from the file's content hash and never changes or
+gets overwritten.
+
+Layout
+------
+- `objects/<ab>/<sha256>.<ext>`: one file per distinct content
+- `index.sqlite3`: objects (size, first and last use, whether a failed
+  run referenced it) and references (test id, run, original file name,
+  run status)
+
+The index runs in WAL mode with a busy timeout, so parallel pytest
+workers can share a store.
+
+Recompression
+-------------
+With `ARTIFACT_RECOMPRESS=true` (default) new PNG objects are re-deflated
+at the highest zlib level in a background thread pool. This is lossless
+(the pixels are unchanged, only the compressed stream is re-encoded), the
+run does not wait for it, and the object keeps its path.
+
+Retention
+---------
+`prune()` deletes objects not used within `ARTIFACT_MAX_AGE_DAYS`
+(default 14), or `ARTIFACT_FAILURE_MAX_AGE_DAYS` (default 90) for objects
+referenced by a failed run. With `ARTIFACT_MAX_BYTES` set it then deletes
+the least recently used objects (passing runs' first) until the store
+fits. Retention runs in the background once per process when the store
+is first used, or from the command line:
+
+    python -m playwright_agent.artifacts stats
+    python -m playwright_agent.artifacts prune --max-age-days 7
+
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import hashlib
+import logging
+import os
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Iterator
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger("playwright_agent.artifacts")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    original_size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    failed INTEGER NOT NULL DEFAULT 0,
+    recompressed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS refs (
+    id INTEGER PRIMARY KEY,
+    hash TEXT NOT NULL REFERENCES objects(hash) ON DELETE CASCADE,
+    test_id TEXT,
+    run_key TEXT,
+    name TEXT NOT NULL,
+    status TEXT,
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_used ON objects(failed, last_used);
+CREATE INDEX IF NOT EXISTS refs_hash ON refs(hash);
+CREATE INDEX IF NOT EXISTS refs_test ON refs(test_id, added_at);
+"""
+
+BUSY_TIMEOUT_MS = 10_000
+RECOMPRESS_WORKERS = 2
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+DAY_SECONDS = 86_400
+
+
+class RetentionPolicy(BaseModel):
+    """
+    How long stored artifacts are kept.
+
+    Attributes:
+        max_age_days: Objects not used for this long are deleted
+        failure_max_age_days: Same for objects referenced by a failed run
+        max_bytes: Total size above which least recently used objects are
+            deleted (None = no limit)
+    """
+    max_age_days: float = Field(14, gt=0)
+    failure_max_age_days: float = Field(90, gt=0)
+    max_bytes: int | None = Field(None, gt=0)
+
+
+def _chunks(data: bytes) -> Iterator[tuple[bytes, bytes]]:
+    position = len(PNG_SIGNATURE)
+    while position + 8 <= len(data):
+        (length,) = struct.unpack(">I", data[position:position + 4])
+        kind = data[position + 4:position + 8]
+        yield kind, data[position + 8:position + 8 + length]
+        position += 12 + length
+
+
+def _chunk(kind: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def recompress_png(data: bytes, level: int = 9) -> bytes | None:
+    """
+    Re-deflate a PNG's image data at `level` (lossless).
+
+    Returns:
+        The smaller PNG, or None if `data` is no PNG or would not shrink
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return None
+    try:
+        chunks = list(_chunks(data))
+        image = b"".join(body for kind, body in chunks if kind == b"IDAT")
+        packed = zlib.compress(zlib.decompress(image), level)
+    except (struct.error, zlib.error):
+        return None
+    if not image or len(packed) >= len(image):
+        return None
+    out, written = [PNG_SIGNATURE], False
+    for kind, body in chunks:
+        if kind != b"IDAT":
+            out.append(_chunk(kind, body))
+        elif not written:
+            out.append(_chunk(b"IDAT", packed))
+            written = True
+    return b"".join(out)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    temporary = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    temporary.write_bytes(data)
+    os.replace(temporary, path)
+
+
+class ArtifactStore:
+    """
+    Content-addressed store of run artifacts.
+
+    Attributes:
+        root: Store directory
+        policy: Retention policy used by `prune`
+        recompress: Re-deflate new PNG objects in the background
+    """
+
+    def __init__(self, root: str | Path, policy: RetentionPolicy | None = None, recompress: bool = True):
+        self.root = Path(root)
+        self.policy = policy or RetentionPolicy()
+        self.recompress = recompress
+        (self.root / "objects").mkdir(parents=True, exist_ok=True)
+        self._executor = ThreadPoolExecutor(RECOMPRESS_WORKERS, thread_name_prefix="artifact-store")
+        self._pending: set[Future] = set()
+        self._lock = threading.Lock()
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self, immediate: bool = False) -> Iterator[sqlite3.Connection]:
+        """
+        A connection that commits on success and is always closed.
+
+        `immediate` takes the write lock up front, so that reads and the
+        file operations that depend on them cannot interleave with another
+        writer (`ingest` vs `prune`).
+        """
+        db = sqlite3.connect(self.root / "index.sqlite3", timeout=BUSY_TIMEOUT_MS / 1000)
+        try:
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            db.execute("PRAGMA foreign_keys=ON")
+            with db:
+                if immediate:
+                    db.execute("BEGIN IMMEDIATE")
+                yield db
+        finally:
+            db.close()
+
+    def ingest(
+        self,
+        source: str | Path,
+        test_id: str | None = None,
+        run_key: str | None = None,
+        status: str | None = None,
+        move: bool = True,
+    ) -> Path:
+        """
+        Add a file to the store.
+
+        Args:
+            source: File to add
+            test_id: Test that produced it
+            run_key: Run that produced it
+            status: Run status; anything but PASS keeps the object for
+                `failure_max_age_days`
+            move: Delete `source` once it is stored
+
+        Returns:
+            Stable path of the stored object
+        """
+        source = Path(source)
+        data = source.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.root / "objects" / digest[:2] / f"{digest}{source.suffix.lower()}"
+        failed = int(status not in (None, "PASS"))
+        now = time.time()
+        with self._connect(immediate=True) as db:
+            known = db.execute("SELECT path FROM objects WHERE hash = ?", (digest,)).fetchone()
+            if known is None or not Path(known["path"]).exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                _write_atomic(path, data)
+                db.execute(
+                    "INSERT INTO objects (hash, path, size, original_size, created_at, last_used, failed)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(hash) DO UPDATE SET path = excluded.path,"
+                    " size = excluded.size, last_used = excluded.last_used, failed = MAX(failed, excluded.failed),"
+                    " recompressed = 0",
+                    (digest, str(path), len(data), len(data), now, now, failed),
+                )
+                created = True
+            else:
+                path = Path(known["path"])
+                db.execute(
+                    "UPDATE objects SET last_used = ?, failed = MAX(failed, ?) WHERE hash = ?", (now, failed, digest),
+                )
+                created = False
+            db.execute(
+                "INSERT INTO refs (hash, test_id, run_key, name, status, added_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, test_id, run_key, source.name, status, now),
+            )
+        if move and source.resolve() != path.resolve():
+            source.unlink(missing_ok=True)
+        if created and self.recompress and data.startswith(PNG_SIGNATURE):
+            self._submit(self._recompress, digest, path)
+        return path
+
+    def _submit(self, fn: Any, *args: Any) -> None:
+        future = self._executor.submit(fn, *args)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+        if future.exception() is not None:
+            logger.warning(f"Artifact store background task failed: {future.exception()}")
+
+    def _recompress(self, digest: str, path: Path) -> None:
+        smaller = recompress_png(path.read_bytes())
+        if smaller is None:
+            return
+        _write_atomic(path, smaller)
+        with self._connect() as db:
+            db.execute("UPDATE objects SET size = ?, recompressed = 1 WHERE hash = ?", (len(smaller), digest))
+
+    def prune(self, now: float | None = None) -> dict[str, int]:
+        """
+        Apply the retention policy.
+
+        Returns:
+            {"removed": objects deleted, "freed_bytes": bytes freed}
+        """
+        now = time.time() if now is None else now
+        policy = self.policy
+        removed = []
+        with self._connect(immediate=True) as db:
+            expired = db.execute(
+                "SELECT hash, path, size, last_used FROM objects WHERE (failed = 0 AND last_used < ?) OR (failed = 1 AND last_used < ?)",
+                (now - policy.max_age_days * DAY_SECONDS, now - policy.failure_max_age_days * DAY_SECONDS),
+            ).fetchall()
+            doomed = {row["hash"]: row for row in expired}
+            if policy.max_bytes is not None:
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+                total -= sum(row["size"] for row in expired)
+                for row in db.execute("SELECT hash, path, size, last_used FROM objects ORDER BY failed, last_used"):
+                    if total <= policy.max_bytes:
+                        break
+                    if row["hash"] not in doomed:
+                        doomed[row["hash"]] = row
+                        total -= row["size"]
+            # Files go while the write lock is held: an `ingest` of the same content waits and then rewrites them
+            for row in doomed.values():
+                deleted = db.execute(
+                    "DELETE FROM objects WHERE hash = ? AND last_used = ?", (row["hash"], row["last_used"])
+                ).rowcount
+                if deleted:
+                    Path(row["path"]).unlink(missing_ok=True)
+                    removed.append(row)
+        freed = sum(row["size"] for row in removed)
+        if removed:
+            logger.info(f"Artifact retention removed {len(removed)} objects ({freed} bytes)")
+        return {"removed": len(removed), "freed_bytes": freed}
+
+    def prune_in_background(self) -> None:
+        """Run `prune` in the store's thread pool."""
+        self._submit(self.prune)
+
+    def stats(self) -> dict[str, Any]:
+        """Object and reference counts, stored bytes and bytes saved by deduplication and recompression."""
+        with self._connect() as db:
+            objects = db.execute(
+                "SELECT COUNT(*) AS objects, COALESCE(SUM(size), 0) AS stored_bytes,"
+                " COALESCE(SUM(original_size), 0) AS original_bytes, COALESCE(SUM(failed), 0) AS failed_objects"
+                " FROM objects"
+            ).fetchone()
+            refs = db.execute(
+                "SELECT COUNT(*) AS refs, COALESCE(SUM(o.original_size), 0) AS ingested_bytes"
+                " FROM refs r JOIN objects o ON o.hash = r.hash"
+            ).fetchone()
+        report = {**dict(objects), **dict(refs)}
+        report["saved_bytes"] = report["ingested_bytes"] - report["stored_bytes"]
+        return report
+
+    def wait(self) -> None:
+        """Block until background recompression and pruning are done."""
+        while True:
+            with self._lock:
+                pending = list(self._pending)
+            if not pending:
+                return
+            for future in pending:
+                with contextlib.suppress(Exception):
+                    future.result()
+
+
+_stores: dict[Path, ArtifactStore] = {}
+
+
+def get_artifact_store(root: str | Path, policy: RetentionPolicy | None = None, recompress: bool = True) -> ArtifactStore:
+    """The process-wide store for `root`; retention runs in the background when it is first opened."""
+    key = Path(root).resolve()
+    if key not in _stores:
+        store = ArtifactStore(root, policy, recompress)
+        store.prune_in_background()
+        _stores[key] = store
+    return _stores[key]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or prune the run artifact store.")
+    parser.add_argument("--root", help="Store directory (default: ARTIFACT_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Objects, references and bytes saved")
+    prune = commands.add_parser("prune", help="Apply the retention policy")
+    prune.add_argument("--max-age-days", type=float, help="Override ARTIFACT_MAX_AGE_DAYS")
+    prune.add_argument("--failure-max-age-days", type=float, help="Override ARTIFACT_FAILURE_MAX_AGE_DAYS")
+    prune.add_argument("--max-bytes", type=int, help="Override ARTIFACT_MAX_BYTES")
+    args = parser.parse_args(argv)
+
+    from playwright_agent.settings import get_settings
+
+    settings = get_settings()
+    root = args.root or settings.artifact_dir
+    if not root or not Path(root).exists():
+        print("No artifact store; set ARTIFACT_DIR or pass --root", file=sys.stderr)
+        return 1
+    policy = settings.artifact_retention()
+    if args.command == "prune":
+        overrides = {
+            "max_age_days": args.max_age_days, "failure_max_age_days": args.failure_max_age_days,
+            "max_bytes": args.max_bytes,
+        }
+        policy = policy.model_copy(update={k: v for k, v in overrides.items() if v is not None})
+        print(ArtifactStore(root, policy, recompress=False).prune())
+    else:
+        print(ArtifactStore(root, policy, recompress=False).stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
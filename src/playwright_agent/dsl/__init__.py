@@ -0,0 +1,55 @@
+"""
+DSL Module - Structured Flows
+=============================
+
+Structured alternative to natural-language steps. Fully specified steps
+run directly against the Playwright MCP server; the agent only takes over
+for steps that are ambiguous or fail.
+
+    from playwright_agent.dsl import flow, open_url, type_text, click, wait_for
+
+    result = await runner.run(
+        flow(open_url("https://example.com/login"), type_text("Email", "a@b.c"), click("Login")),
+        RunResult,
+    )
+
+See `playwright_agent.dsl.steps` for the JSON format and execution model,
+and `playwright_agent.dsl.markdown` for compiling markdown flow files.
+"""
+
+from playwright_agent.dsl.markdown import CompiledFlow, FlowDefinitionError, FlowStep, compile_file
+from playwright_agent.dsl.steps import (
+    Flow,
+    Selector,
+    Step,
+    click,
+    compile_instruction,
+    flow,
+    instruct,
+    open_url,
+    press,
+    screenshot,
+    settle,
+    type_text,
+    wait_for,
+)
+
+__all__ = [
+    "Flow",
+    "Step",
+    "Selector",
+    "flow",
+    "open_url",
+    "click",
+    "type_text",
+    "press",
+    "wait_for",
+    "settle",
+    "screenshot",
+    "instruct",
+    "compile_instruction",
+    "CompiledFlow",
+    "FlowStep",
+    "FlowDefinitionError",
+    "compile_file",
+]
@@ -0,0 +1,341 @@
+"""
+Markdown Flow Parser
+====================
+
+Flows in `tests/data/flows/*.md` are markdown test cases: a title, a few
+notes and a steps table (Step No / Test Step / Test Data / Expected
+Result). This module parses them into typed `FlowStep`s once, so the model
+receives a compact, normalized step list instead of re-parsing table
+markup (padding, separators, `<br>` tags) on every run.
+
+    | Step No | Test Step          | Test Data   | Expected Result      |
+    |---------|--------------------|-------------|----------------------|
+    | 1       | Launch the app     | `{url}`     | Login page is shown  |
+    | 2       | Enter Username     | `{username}`| Username is accepted |
+
+Usage
+-----
+    from playwright_agent.dsl.markdown import compile_file
+
+    compiled = compile_file("tests/data/flows/ICJ.md")
+    print(compiled.placeholders)                     # ["password", "url", "username"]
+    rendered = compiled.render(url=url, username=user, password=pwd)
+    prompt = rendered.to_prompt()                    # compact step list for the agent
+    flow = rendered.to_flow()                        # structured Flow (see dsl.steps)
+
+`BaseFlowRunner.run_from_file(path, RunResult, variables={...})` does all
+of this and fails before any browser is started if a placeholder has no
+value.
+
+Placeholders
+------------
+Placeholders use `str.format` syntax (`{name}`), and `{{` / `}}` are
+literal braces (e.g. JSON payloads), exactly like the `.format()` calls
+the tests used before.
+
+Caching
+-------
+Compiled flows are cached per process, keyed by the SHA-256 of the file
+content, so parametrized tests and retries parse each file once and an
+edited file is picked up immediately. Every call returns its own deep copy,
+so callers may modify the flow freely. See `cache_info()`.
+
+"""
+
+from __future__ import annotations
+import hashlib
+import logging
+import re
+import string
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from playwright_agent.dsl.steps import Flow, Step, click, compile_instruction, open_url, settle, type_text
+
+logger = logging.getLogger("playwright_agent.dsl")
+
+CACHE_SIZE = 256
+
+_EMPTY_CELLS = {"", "-", "n/a", "na", "none"}
+_SEPARATOR = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+_BR = re.compile(r"\s*<br\s*/?>\s*", re.IGNORECASE)
+_LITERAL = re.compile(r"^[`\"'“”*]+([^`\"'“”*]+)[`\"'“”*]+$")
+_URL = re.compile(r"^https?://\S+$")
+_OPEN_WORDS = re.compile(r"^(?:open|launch|navigate to|go to)\b", re.IGNORECASE)
+_ENTER_FIELD = re.compile(r"^(?:enter|type|input|fill(?: in)?)\s+(?:the\s+)?([A-Za-z][\w ]{0,40}?)(?:\s+(?:field|textbox|input))?$", re.IGNORECASE)
+_CLICK_ROLE = re.compile(r"^click\s+(?:on\s+)?(?:the\s+)?([A-Za-z][\w ]{0,40}?)\s+(button|link|tab|checkbox)$", re.IGNORECASE)
+_TITLE_PREFIX = re.compile(r"^\s*(?:jira\s+)?test(?:\s+case)?\s*:\s*", re.IGNORECASE)
+_WAIT_FORM = re.compile(r"^wait\s+for\s+the\s+[\w\s-]+?\s+(?:form|page|dialog)$", re.IGNORECASE)
+
+
+class FlowDefinitionError(ValueError):
+    """Raised when a flow file cannot be parsed or its placeholders cannot be filled."""
+
+    def __init__(self, message: str, missing: list[str] | None = None):
+        super().__init__(message)
+        self.missing = missing or []
+
+
+class FlowStep(BaseModel):
+    """
+    One row of a markdown steps table.
+
+    Attributes:
+        id: Value of the step number column
+        action: The step instruction
+        data: Test data for the step (None for "-", "N/A" or empty cells)
+        expected: Expected result (None if the column is missing or empty)
+        placeholders: `{name}` placeholders used in this step
+    """
+    id: str
+    action: str
+    data: str | None = None
+    expected: str | None = None
+    placeholders: list[str] = Field(default_factory=list)
+
+    def to_step(self) -> Step:
+        """The structured DSL step for this row (an `instruct` step if not deterministic)."""
+        literal = _literal(self.data)
+        action = self.action.strip().rstrip(".")
+        if literal is not None:
+            if _OPEN_WORDS.match(action) and _URL.match(literal):
+                return open_url(literal, expected=self.expected)
+            if match := _ENTER_FIELD.match(action):
+                return type_text(match.group(1).strip(), literal, expected=self.expected)
+        if self.data is None:
+            if match := _CLICK_ROLE.match(action):
+                return click(match.group(1).strip(), role=match.group(2).lower(), expected=self.expected)
+            if _WAIT_FORM.match(action):
+                return settle(action, expected=self.expected)
+            return compile_instruction(action, expected=self.expected)
+        return compile_instruction(f"{action} ({self.data})", expected=self.expected)
+
+
+class CompiledFlow(BaseModel):
+    """
+    A parsed markdown flow.
+
+    Attributes:
+        title: First heading of the file (without markup)
+        notes: Non-table lines (notes, instructions) in document order
+        steps: Table rows in order
+        placeholders: Sorted names of all `{name}` placeholders
+        source_hash: SHA-256 of the file content the flow was compiled from
+    """
+    title: str | None = None
+    notes: list[str] = Field(default_factory=list)
+    steps: list[FlowStep] = Field(default_factory=list)
+    placeholders: list[str] = Field(default_factory=list)
+    source_hash: str = ""
+
+    def missing(self, variables: dict[str, Any]) -> list[str]:
+        """Placeholders that have no value in `variables`."""
+        return [name for name in self.placeholders if name not in variables]
+
+    def render(self, variables: dict[str, Any] | None = None, **values: Any) -> "CompiledFlow":
+        """
+        Fill placeholders and unescape literal braces.
+
+        Raises:
+            FlowDefinitionError: If a placeholder has no value
+        """
+        variables = {**(variables or {}), **values}
+        missing = self.missing(variables)
+        if missing:
+            raise FlowDefinitionError(f"Missing values for flow placeholders: {', '.join(missing)}", missing)
+
+        def fill(text: str | None) -> str | None:
+            return None if text is None else text.format_map(variables)
+
+        return CompiledFlow(
+            title=fill(self.title),
+            notes=[fill(note) for note in self.notes],
+            steps=[
+                step.model_copy(update={
+                    "action": fill(step.action), "data": fill(step.data),
+                    "expected": fill(step.expected), "placeholders": [],
+                })
+                for step in self.steps
+            ],
+            placeholders=[],
+            source_hash=self.source_hash,
+        )
+
+    def to_prompt(self) -> str:
+        """Compact, normalized step list for the agent."""
+        lines = []
+        if self.title:
+            lines.append(f"Test: {self.title}")
+        lines.extend(f"Note: {note}" for note in self.notes)
+        lines.append("Steps:")
+        for step in self.steps:
+            line = f"{step.id}. {step.action}"
+            if step.data:
+                line += f" | Data: {step.data}"
+            if step.expected:
+                line += f" | Expected: {step.expected}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def to_flow(self) -> Flow:
+        """Structured `Flow`; rows that do not compile become `instruct` steps."""
+        steps = []
+        for row in self.steps:
+            step = row.to_step()
+            step.id = row.id
+            steps.append(step)
+        return Flow(steps=steps, name=self.title)
+
+
+def _cells(line: str) -> list[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split("|")]
+
+
+def _clean(cell: str) -> str | None:
+    text = " ".join(_BR.sub("; ", cell).split())
+    return None if text.strip("*_ ").lower() in _EMPTY_CELLS else text
+
+
+def _literal(cell: str | None) -> str | None:
+    """The literal value of a data cell that holds exactly one quoted value."""
+    if cell is None:
+        return None
+    match = _LITERAL.match(cell.strip())
+    return match.group(1).strip() if match else None
+
+
+def _header_key(cell: str) -> str:
+    return " ".join(cell.replace("*", "").replace("#", " no ").lower().split())
+
+
+def _columns(header: list[str]) -> dict[str, int]:
+    """Map header cells to step id / action / data / expected columns."""
+    columns: dict[str, int] = {}
+    for index, cell in enumerate(header):
+        key = _header_key(cell)
+        if "expected" in key:
+            columns.setdefault("expected", index)
+        elif "data" in key:
+            columns.setdefault("data", index)
+        elif key.startswith("step") and ("no" in key.split() or key in ("step", "step id")) and "id" not in columns:
+            columns["id"] = index
+        elif key in ("test step", "action", "step", "description", "test steps", "steps"):
+            columns.setdefault("action", index)
+    if "action" not in columns:
+        raise FlowDefinitionError(f"Steps table has no action column: {header}")
+    return columns
+
+
+def _placeholders(text: str) -> set[str]:
+    names = set()
+    try:
+        for _, field, _, _ in string.Formatter().parse(text):
+            if field is None:
+                continue
+            name = re.split(r"[.\[!:]", field, maxsplit=1)[0]
+            if not name or name.isdigit():
+                raise FlowDefinitionError(f"Positional placeholder '{{{field}}}' is not supported; use {{name}}")
+            names.add(name)
+    except ValueError as e:
+        if isinstance(e, FlowDefinitionError):
+            raise
+        raise FlowDefinitionError(f"Invalid placeholder syntax: {e}") from e
+    return names
+
+
+def parse_markdown(text: str) -> CompiledFlow:
+    """
+    Parse a markdown flow (title, notes and the first steps table).
+
+    Raises:
+        FlowDefinitionError: If there is no steps table or it has no action column
+    """
+    lines = text.splitlines()
+    title, notes, steps = None, [], []
+    columns: dict[str, int] | None = None
+    in_table = table_done = False
+
+    for index, line in enumerate(lines):
+        stripped = line.strip()
+        is_row = stripped.startswith("|")
+        if not table_done and not in_table and is_row and index + 1 < len(lines) and _SEPARATOR.match(lines[index + 1].strip()):
+            columns = _columns(_cells(stripped))
+            in_table = True
+            continue
+        if in_table:
+            if _SEPARATOR.match(stripped):
+                continue
+            if is_row:
+                cells = _cells(stripped)
+                cell = lambda key: _clean(cells[columns[key]]) if key in columns and columns[key] < len(cells) else None  # noqa: E731
+                action = cell("action")
+                if action is None:
+                    continue
+                step_id = cell("id") or str(len(steps) + 1)
+                steps.append(FlowStep(id=step_id.strip("*"), action=action, data=cell("data"), expected=cell("expected")))
+                continue
+            in_table, table_done = False, True
+        if not stripped or set(stripped) <= {"-", "*", "_"}:
+            continue
+        if stripped.startswith("#"):
+            # The first heading is the title; later ones only label sections ("Steps")
+            if title is None:
+                title = _TITLE_PREFIX.sub("", stripped.lstrip("#").replace("**", "")).strip() or None
+            continue
+        notes.append(" ".join(stripped.replace("**", "").split()))
+
+    if columns is None:
+        raise FlowDefinitionError("No steps table found")
+
+    for step in steps:
+        step.placeholders = sorted(
+            _placeholders(step.action) | _placeholders(step.data or "") | _placeholders(step.expected or "")
+        )
+    names = set().union(*(step.placeholders for step in steps)) if steps else set()
+    for text_part in [title or "", *notes]:
+        names |= _placeholders(text_part)
+    return CompiledFlow(title=title, notes=notes, steps=steps, placeholders=sorted(names))
+
+
+_cache: OrderedDict[str, CompiledFlow] = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+
+def compile_text(text: str) -> CompiledFlow:
+    """Parse markdown flow text, reusing the cached result for identical content (returns a copy)."""
+    digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+    compiled = _cache.get(digest)
+    if compiled is not None:
+        _cache.move_to_end(digest)
+        _stats["hits"] += 1
+        return compiled.model_copy(deep=True)
+    _stats["misses"] += 1
+    compiled = parse_markdown(text)
+    compiled.source_hash = digest
+    _cache[digest] = compiled
+    if len(_cache) > CACHE_SIZE:
+        _cache.popitem(last=False)
+    return compiled.model_copy(deep=True)
+
+
+def compile_file(path: str | Path) -> CompiledFlow:
+    """Parse a markdown flow file (cached by content hash)."""
+    return compile_text(Path(path).read_text(encoding="utf-8"))
+
+
+def cache_info() -> dict[str, int]:
+    """Cache statistics: hits, misses and current size."""
+    return {**_stats, "size": len(_cache)}
+
+
+def clear_cache() -> None:
+    _cache.clear()
+    _stats.update(hits=0, misses=0)
@@ -1,50 +1,544 @@
 """
-Steps DSL Module (Future Enhancement)
-=====================================
+Steps DSL - Deterministic Flows Without LLM Turns
+=================================================
 
-This module is a placeholder for a future structured steps DSL (Domain-Specific Language).
+Natural-language steps make the model re-read the flow and decide every
+browser action, even when the step leaves nothing to decide ("Open
+https://..." or "Type `tomsmith` into the Username field"). This module
+provides a structured flow format whose fully specified steps are executed
+straight against the Playwright MCP server; only steps that are ambiguous
+or fail are handed to the agent, together with the current page state.
 
-Currently, the framework uses natural language strings for test steps:
+Python API
+----------
+    from playwright_agent.dsl import flow, open_url, type_text, click, wait_for
 
-    steps = '''
-    Open https://example.com
-    Click the Login button
-    Enter "user@test.com" in Email field
-    '''
-
-Future Enhancement
-------------------
-A structured JSON/Python DSL would enable:
-- Programmatic step generation
-- Better IDE support and validation
-- Step reuse and composition
-- Import/export from test management tools
-
-Example JSON format (planned):
+    login = flow(
+        open_url("https://the-internet.herokuapp.com/login"),
+        type_text("Username", "tomsmith"),
+        type_text("Password", "SuperSecretPassword!"),
+        click("Login", role="button"),
+        wait_for("You logged into a secure area!"),
+    )
+    result = await runner.run(login, RunResult)
 
+JSON Format
+-----------
     {
         "steps": [
             {"action": "open", "url": "https://example.com"},
             {"action": "type", "selector": {"role": "textbox", "name": "Search"}, "text": "query"},
             {"action": "press", "key": "Enter"},
             {"action": "wait_for", "text": "Results"},
-            {"action": "click", "selector": {"role": "link", "nth": 0}},
-            {"action": "screenshot", "full_page": true}
+            {"action": "settle", "text": "Wait for the results list to load"},
+            {"action": "click", "selector": {"role": "link", "name": "Docs", "nth": 0}},
+            {"action": "screenshot", "full_page": true},
+            {"action": "instruct", "text": "Verify the first result mentions Playwright"}
         ]
     }
 
-Example Python API (planned):
+    flow = Flow.from_json(path.read_text())
+
+Natural-language lines with an obvious shape can be compiled too
+(`compile_instruction("Click the Login button")`); anything else becomes
+an `instruct` step for the agent.
+
+Execution Model
+---------------
+- `open`, `press`, `wait_for`, `screenshot` map 1:1 to MCP tools.
+- `settle` ("Wait for the login form to appear") only refreshes the page
+  snapshot; it passes together with the step after it, and is handed to
+  the agent along with that step if it does not.
+- `click` / `type` resolve their selector against the latest ARIA snapshot
+  by exact accessible name (and role, if given). Zero or several matches
+  (without `nth`) make the step ambiguous.
+- Steps run in order until the first step that is not deterministic,
+  ambiguous or fails; that step and everything after it go to the agent.
+- A deterministic step passes when its browser action succeeds and, if it
+  has an `expected` result, that result is verified on the page. Only
+  expectations that name one literal text to be shown (`"Saved" is shown`,
+  `Message "Welcome" appears`) are verified directly, with
+  `browser_wait_for`; a step with any other expectation needs judgement and
+  goes to the agent. If a verified expectation is not met, the step goes to
+  the agent (told not to repeat the action) instead of passing.
+
+"""
+
+from __future__ import annotations
+import json
+import logging
+import re
+import time
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+from playwright_agent.integrations.playwright_mcp import (
+    SnapshotNode,
+    has_snapshot,
+    is_error,
+    page_url,
+    parse_snapshot,
+    ran_code,
+    section,
+    tool_text,
+)
+from playwright_agent.schemas.results import StepResult
+
+logger = logging.getLogger("playwright_agent.dsl")
+
+Action = Literal["open", "click", "type", "press", "wait_for", "settle", "screenshot", "instruct"]
+
+# Roles a name-only selector may resolve to, per action
+_CLICKABLE_ROLES = {
+    "button", "link", "checkbox", "radio", "tab", "menuitem", "menuitemcheckbox",
+    "menuitemradio", "option", "switch", "treeitem", "combobox", "textbox",
+}
+_EDITABLE_ROLES = {"textbox", "searchbox", "combobox", "spinbutton"}
+
+# Words in natural-language steps that name a role ("the Login button")
+_ROLE_WORDS = {
+    "button": "button", "link": "link", "tab": "tab", "checkbox": "checkbox",
+    "field": None, "textbox": "textbox", "input": None, "box": None, "menu item": "menuitem",
+}
+
+
+class Selector(BaseModel):
+    """
+    Element selector resolved against the page's ARIA snapshot.
+
+    Attributes:
+        name: Exact accessible name (label text, button text, ...)
+        role: ARIA role (e.g. "button", "textbox"); any suitable role if None
+        nth: 0-based index to pick among several matches
+    """
+    name: str
+    role: str | None = None
+    nth: int | None = None
+
+    def describe(self) -> str:
+        role = f" {self.role}" if self.role else ""
+        nth = f" (match #{self.nth + 1})" if self.nth is not None else ""
+        return f'"{self.name}"{role}{nth}'
+
+
+class Step(BaseModel):
+    """
+    One step of a structured flow.
+
+    Attributes:
+        action: What to do (see module docstring)
+        id: Step identifier reported in `StepResult.step_id` (defaults to position)
+        url: Target URL for `open`
+        selector: Target element for `click` / `type`
+        text: Text to type, text to wait for, or the instruction for `instruct`
+        key: Key for `press` (e.g. "Enter")
+        submit: Press Enter after typing
+        full_page: Full-page screenshot
+        expected: Expected result; verified directly if it names a text to be
+            shown (see `expected_text`), else the step goes to the agent
+    """
+    action: Action
+    id: str | None = None
+    url: str | None = None
+    selector: Selector | None = None
+    text: str | None = None
+    key: str | None = None
+    submit: bool = False
+    full_page: bool = True
+    expected: str | None = None
+
+    @property
+    def expected_text(self) -> str | None:
+        """The literal text an expectation like `"Saved" is shown` waits for, if it is one."""
+        match = _EXPECT_SHOWN.match(self.expected.strip().rstrip(".")) if self.expected else None
+        return match.group(1) if match else None
+
+    @property
+    def deterministic(self) -> bool:
+        """True if the step (and its expected result) is fully specified and can run without the agent."""
+        if self.expected and self.expected_text is None:
+            return False
+        if self.action == "open":
+            return bool(self.url)
+        if self.action == "click":
+            return self.selector is not None
+        if self.action == "type":
+            return self.selector is not None and self.text is not None
+        if self.action == "press":
+            return bool(self.key)
+        if self.action == "wait_for":
+            return bool(self.text)
+        return self.action in ("settle", "screenshot")
+
+    def describe(self) -> str:
+        """Natural-language form of the step (as sent to the agent)."""
+        target = self.selector.describe() if self.selector else ""
+        if self.action == "open":
+            return f"Open {self.url}"
+        if self.action == "click":
+            return f"Click {target}"
+        if self.action == "type":
+            return f'Type "{self.text}" into {target}' + (" and press Enter" if self.submit else "")
+        if self.action == "press":
+            return f"Press {self.key}"
+        if self.action == "wait_for":
+            return f'Wait for the text "{self.text}" to appear'
+        if self.action == "settle":
+            return self.text or "Wait for the page to be ready"
+        if self.action == "screenshot":
+            return "Take a full-page screenshot" if self.full_page else "Take a screenshot"
+        return self.text or ""
+
+
+class Flow(BaseModel):
+    """
+    An ordered list of structured steps, accepted by `BaseFlowRunner.run`.
+
+    Attributes:
+        steps: Steps in execution order
+        name: Optional flow name (e.g. test case id)
+    """
+    steps: list[Step] = Field(default_factory=list)
+    name: str | None = None
+
+    def model_post_init(self, __context: Any) -> None:
+        for index, step in enumerate(self.steps, start=1):
+            if step.id is None:
+                step.id = str(index)
+
+    @classmethod
+    def from_json(cls, data: str | dict[str, Any] | list[Any]) -> "Flow":
+        """Build a flow from the JSON format (a string, dict or bare step list)."""
+        if isinstance(data, str):
+            data = json.loads(data)
+        if isinstance(data, list):
+            data = {"steps": data}
+        return cls.model_validate(data)
+
+    def to_prompt(self, start: int = 0) -> str:
+        """Numbered natural-language steps from index `start` on."""
+        lines = []
+        for step in self.steps[start:]:
+            line = f"{step.id}. {step.describe()}"
+            if step.expected:
+                line += f" -> Expected: {step.expected}"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Python API
+# ---------------------------------------------------------------------------
+
+def open_url(url: str, expected: str | None = None) -> Step:
+    return Step(action="open", url=url, expected=expected)
+
+
+def click(name: str, role: str | None = None, nth: int | None = None, expected: str | None = None) -> Step:
+    return Step(action="click", selector=Selector(name=name, role=role, nth=nth), expected=expected)
+
+
+def type_text(
+    name: str, text: str, role: str | None = None, submit: bool = False, expected: str | None = None,
+) -> Step:
+    return Step(action="type", selector=Selector(name=name, role=role), text=text, submit=submit, expected=expected)
+
+
+def press(key: str, expected: str | None = None) -> Step:
+    return Step(action="press", key=key, expected=expected)
+
+
+def wait_for(text: str, expected: str | None = None) -> Step:
+    return Step(action="wait_for", text=text, expected=expected)
+
+
+def settle(text: str = "Wait for the page to be ready", expected: str | None = None) -> Step:
+    """A wait without a literal condition, verified by the step that follows it."""
+    return Step(action="settle", text=text, expected=expected)
 
-    from playwright_agent.dsl import steps, open_url, click, type_text
-    
-    flow = steps(
-        open_url("https://example.com"),
-        type_text("Email", "user@test.com"),
-        click("Login"),
-        wait_for("Dashboard")
-    )
-    
-    result = await runner.run(flow, RunResult)
 
-Status: Not yet implemented - using natural language steps for now.
+def screenshot(full_page: bool = True) -> Step:
+    return Step(action="screenshot", full_page=full_page)
+
+
+def instruct(text: str, expected: str | None = None) -> Step:
+    """A natural-language step that is always executed by the agent."""
+    return Step(action="instruct", text=text, expected=expected)
+
+
+def flow(*items: Step, name: str | None = None) -> Flow:
+    """Build a `Flow` from steps (ids are assigned by position)."""
+    return Flow(steps=list(items), name=name)
+
+
+# ---------------------------------------------------------------------------
+# Compiling natural-language instructions
+# ---------------------------------------------------------------------------
+
+_QUOTED = r"[`\"'“”*]+([^`\"“”*]+?)[`\"'“”*]+"
+_OPEN = re.compile(r"^(?:open|navigate to|go to)\s+(?:the\s+)?(?:url\s+|page\s+)?[`\"']?(https?://[^\s`\"']+)[`\"']?\s*$", re.I)
+_TYPE = re.compile(
+    rf"^(?:type|enter|input|fill(?: in)?)\s+{_QUOTED}\s+(?:in|into)\s+(?:the\s+)?{_QUOTED}\s*(field|box|textbox|input)?\s*$",
+    re.I,
+)
+_CLICK = re.compile(rf"^click\s+(?:on\s+)?(?:the\s+)?{_QUOTED}\s*(button|link|tab|checkbox|menu item)?\s*$", re.I)
+_PRESS = re.compile(r"^press\s+(?:the\s+)?[`\"']?(\w+)[`\"']?(?:\s+key)?\s*$", re.I)
+_WAIT = re.compile(rf"^wait\s+for\s+(?:the\s+)?(?:message|text)?\s*{_QUOTED}(?:\s+to\s+appear)?\s*$", re.I)
+_EXPECT_SHOWN = re.compile(
+    rf"^(?:the\s+)?(?:(?:message|text)\s+)?{_QUOTED}\s*(?:(?:is|are)\s+(?:shown|visible|displayed)|appears?)?$", re.I,
+)
+_SETTLE = re.compile(r"^wait\s+(?:for|until)\s+the\s+[\w\s-]+?\s+(?:to\s+)?(?:appear|load|be\s+visible|is\s+visible|loads|appears)$", re.I)
+
+
+def compile_instruction(text: str, expected: str | None = None) -> Step:
+    """
+    Compile one natural-language instruction into a step.
+
+    Only unambiguous shapes with literal values are compiled (quoted text,
+    bold or backticked names, explicit URLs); everything else becomes an
+    `instruct` step for the agent.
+
+    Example:
+        compile_instruction('Enter `tomsmith` in the **Username** field')
+        # -> Step(action="type", selector=Selector(name="Username"), text="tomsmith")
+    """
+    line = text.strip().rstrip(".")
+    if match := _OPEN.match(line):
+        return open_url(match.group(1), expected=expected)
+    if match := _TYPE.match(line):
+        return type_text(match.group(2), match.group(1), expected=expected)
+    if match := _CLICK.match(line):
+        return click(match.group(1), role=_ROLE_WORDS.get((match.group(2) or "").lower()), expected=expected)
+    if match := _PRESS.match(line):
+        return press(match.group(1), expected=expected)
+    if match := _WAIT.match(line):
+        return wait_for(match.group(1), expected=expected)
+    if _SETTLE.match(line):
+        return settle(text.strip(), expected=expected)
+    return instruct(text.strip(), expected=expected)
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+class StepAmbiguousError(Exception):
+    """Raised when a selector matches no element or several elements."""
+
+    def __init__(self, selector: Selector, matches: list[SnapshotNode]):
+        found = "no element" if not matches else f"{len(matches)} elements"
+        super().__init__(f"Selector {selector.describe()} matched {found}")
+        self.selector = selector
+        self.matches = matches
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def resolve(nodes: list[SnapshotNode], selector: Selector, roles: set[str]) -> SnapshotNode:
+    """
+    Resolve a selector to exactly one snapshot node.
+
+    Args:
+        nodes: Parsed snapshot nodes
+        selector: Selector to resolve (exact, case-insensitive name match)
+        roles: Acceptable roles when the selector has none
+
+    Raises:
+        StepAmbiguousError: If zero or several nodes match (and no `nth` is given)
+    """
+    name = _normalize(selector.name)
+    matches = [
+        node for node in nodes
+        if _normalize(node.name) == name and (node.role == selector.role if selector.role else node.role in roles)
+    ]
+    if selector.nth is not None and 0 <= selector.nth < len(matches):
+        return matches[selector.nth]
+    if len(matches) != 1:
+        raise StepAmbiguousError(selector, matches)
+    return matches[0]
+
+
+class FlowOutcome(BaseModel):
+    """
+    What the engine managed to do on its own.
+
+    Attributes:
+        results: Step results of the deterministically executed steps
+        next_index: Index of the first step the agent has to take over
+            (== len(flow.steps) if every step ran)
+        reason: Why the engine stopped early, if it did
+        page_state: Latest page state text (URL + snapshot) for the agent
+        proof: Screenshot path taken by a `screenshot` step, if any
+    """
+    results: list[StepResult] = Field(default_factory=list)
+    next_index: int = 0
+    reason: str | None = None
+    page_state: str | None = None
+    proof: str | None = None
+
+    def complete(self, flow: Flow) -> bool:
+        return self.next_index >= len(flow.steps)
+
+
+class FlowEngine:
+    """
+    Executes the deterministic prefix of a `Flow` directly via MCP tools.
+
+    Attributes:
+        browser: Connected Playwright MCP server
+        screenshot_dir: Directory the browser server saves screenshots in
+        on_step_passed: Optional async callable(step_id, summary), e.g. a
+            checkpoint recorder's `capture`
+    """
+
+    def __init__(self, browser: Any, screenshot_dir: Any = None, on_step_passed: Any = None):
+        self.browser = browser
+        self.screenshot_dir = screenshot_dir
+        self.on_step_passed = on_step_passed
+        self._state: str | None = None
+
+    def invalidate(self) -> None:
+        """Forget the cached page snapshot (e.g. after the agent acted on the page)."""
+        self._state = None
+
+    async def _call(self, tool: str, args: dict[str, Any]) -> str:
+        result = await self.browser.call_tool(tool, args)
+        text = tool_text(result)
+        if is_error(result):
+            raise RuntimeError(section(text, "Result") or text or f"{tool} failed")
+        if has_snapshot(text):
+            self._state = section(text, "Page state") or text
+        return text
+
+    async def _nodes(self, refresh: bool = False) -> list[SnapshotNode]:
+        if refresh or self._state is None:
+            await self._call("browser_snapshot", {})
+        return parse_snapshot(self._state or "")
+
+    async def _target(self, selector: Selector, roles: set[str]) -> SnapshotNode:
+        try:
+            return resolve(await self._nodes(), selector, roles)
+        except StepAmbiguousError:
+            # The cached snapshot may be stale (page changed since the last action)
+            return resolve(await self._nodes(refresh=True), selector, roles)
+
+    async def _perform(self, step: Step) -> tuple[str, list[str], str | None]:
+        """Run one step; returns (actual result, locators, screenshot path)."""
+        if step.action == "open":
+            text = await self._call("browser_navigate", {"url": step.url})
+            return f"Opened {page_url(text) or step.url}", ran_code(text), None
+        if step.action == "click":
+            node = await self._target(step.selector, _CLICKABLE_ROLES)
+            text = await self._call("browser_click", {"element": f"{node.role} {node.name}", "ref": node.ref})
+            return f'Clicked {node.role} "{node.name}"', ran_code(text), None
+        if step.action == "type":
+            node = await self._target(step.selector, _EDITABLE_ROLES)
+            args = {"element": f"{node.role} {node.name}", "ref": node.ref, "text": step.text, "submit": step.submit}
+            text = await self._call("browser_type", args)
+            return f'Typed into {node.role} "{node.name}"', ran_code(text), None
+        if step.action == "press":
+            text = await self._call("browser_press_key", {"key": step.key})
+            self._state = None
+            return f"Pressed {step.key}", ran_code(text), None
+        if step.action == "wait_for":
+            text = await self._call("browser_wait_for", {"text": step.text})
+            self._state = None
+            return f'Text "{step.text}" is visible', ran_code(text), None
+        if step.action == "settle":
+            await self._nodes(refresh=True)
+            return "Page snapshot refreshed; verified by the next step", [], None
+        filename = f"step_{step.id}_{time.strftime('%Y%m%d-%H%M%S')}.png"
+        await self._call("browser_take_screenshot", {"filename": filename, "fullPage": step.full_page})
+        path = str(self.screenshot_dir / filename) if self.screenshot_dir is not None else filename
+        return f"Screenshot saved as {path}", [], path
+
+    async def execute(self, flow: Flow) -> FlowOutcome:
+        """
+        Run steps in order until one needs the agent.
+
+        Never raises for step failures: a failing or ambiguous step ends the
+        deterministic prefix and is reported in `FlowOutcome.reason`.
+        """
+        outcome = FlowOutcome()
+        previous = "FIRST STEP"
+        for index, step in enumerate(flow.steps):
+            outcome.next_index = index
+            if not step.deterministic:
+                outcome.reason = f"Step {step.id} needs interpretation"
+                break
+            try:
+                actual, locators, proof = await self._perform(step)
+            except StepAmbiguousError as e:
+                outcome.reason = f"Step {step.id} is ambiguous: {e}"
+                break
+            except Exception as e:
+                outcome.reason = f"Step {step.id} failed when executed directly: {e}"
+                break
+            if step.expected_text is not None:
+                try:
+                    text = await self._call("browser_wait_for", {"text": step.expected_text})
+                except Exception as e:
+                    outcome.reason = (
+                        f"Step {step.id} was performed ({actual}) but its expected result was not met ({e}); "
+                        "check the expected result on the current page without repeating the action"
+                    )
+                    break
+                self._state = None
+                actual += f'; text "{step.expected_text}" is visible'
+                locators += ran_code(text)
+            if proof:
+                outcome.proof = proof
+            outcome.results.append(StepResult(
+                step_id=step.id,
+                description=step.describe(),
+                previous_step=previous,
+                expected_result=step.expected or step.describe(),
+                actual_result=actual,
+                status="PASS",
+                exception=None,
+                locator=locators,
+                next_step="Executed directly via Playwright MCP without a model turn",
+            ))
+            previous = f"Step {step.id}: {step.describe()}"
+            if self.on_step_passed is not None:
+                await self.on_step_passed(step.id, actual)
+        else:
+            outcome.next_index = len(flow.steps)
+
+        if outcome.reason and outcome.results and flow.steps[outcome.next_index - 1].action == "settle":
+            # A settle step only passes together with the step after it
+            outcome.results.pop()
+            outcome.next_index -= 1
+        if outcome.reason:
+            logger.info(f"Handing over to the agent at step {flow.steps[outcome.next_index].id}: {outcome.reason}")
+        outcome.page_state = self._state
+        return outcome
+
+
+DELEGATION_PROMPT = """\
+The steps up to step {last_done} were already executed directly and PASSED; do NOT repeat them:
+{done}
+
+{reason}
+{page}
+Continue from the current page with these steps:
+{remaining}
+
+Report ALL steps of the flow in `steps`, including the ones listed above as already passed.
 """
+
+
+def delegation_prompt(flow: Flow, outcome: FlowOutcome) -> str:
+    """Prompt for the agent to take over a flow the engine could not finish."""
+    if not outcome.results:
+        return flow.to_prompt()
+    done = "\n".join(f"- Step {r.step_id}: {r.description} -> {r.actual_result}" for r in outcome.results)
+    page = f"Current page state:\n{outcome.page_state}\n" if outcome.page_state else ""
+    remaining = flow.to_prompt(outcome.next_index) or "(none - only produce the final report)"
+    reason = f"Handing over because: {outcome.reason}\n" if outcome.reason else ""
+    return DELEGATION_PROMPT.format(
+        last_done=outcome.results[-1].step_id, done=done, reason=reason, page=page, remaining=remaining,
+    )
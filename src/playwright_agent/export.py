@@ -0,0 +1,378 @@
+"""
+Export Passing Runs as Playwright Tests
+=======================================
+
+A flow that passes reliably does not need a model in the loop any more.
+This module turns a passing run into a standalone Playwright test, in
+Python (pytest-playwright) or TypeScript (`@playwright/test`, like
+`seed.spec.ts`), built from:
+
+1. the Playwright code the MCP server ran for every browser tool call of
+   the agent (`RunResult.actions`, see `runtime.recording`), grouped by
+   the step it was checkpointed under, and
+2. for steps without recorded actions (e.g. steps that ran directly from a
+   structured flow), the Playwright code in `StepResult.locator`.
+
+Usage
+-----
+    from playwright_agent.export import export_script, write_script
+
+    result = await runner.run(steps, RunResult, trace_name="login")
+    if result.status == "PASS":
+        write_script(result, "tests/generated/test_login.py", name="login")
+        write_script(result, "tests/generated/login.spec.ts", name="login")   # language from suffix
+
+Persisted runs (`persist=True`) can be exported later from the command line:
+
+    python -m playwright_agent.export <run_id> -o tests/generated/test_login.py
+
+Notes
+-----
+- Failed tool calls are left out (the agent retried them), as are
+  screenshots and snapshots.
+- The TypeScript output uses the recorded code as is; the Python output is
+  translated from it. A call the translator does not understand becomes a
+  `pytest.fail("not translated: ...")` statement, so the script runs up
+  to it and then fails instead of passing without it.
+- Only the last attempt of a run without checkpoints is recorded, so the
+  export of a retried run may miss actions; such steps are marked in the
+  script.
+
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import Any, Literal
+
+from playwright_agent.runtime.recording import RecordedAction, actions_from_items
+
+logger = logging.getLogger("playwright_agent.export")
+
+Language = Literal["python", "typescript"]
+
+# Tools whose code is environment specific or has no effect on the page
+SKIPPED_TOOLS = {
+    "browser_take_screenshot",
+    "browser_snapshot",
+    "browser_close",
+    "browser_install",
+    "browser_console_messages",
+    "browser_network_requests",
+}
+
+_CODE_START = ("await page.", "await expect(", "page.", "expect(")
+_SLEEP = re.compile(
+    r"^(?:await\s+)?new Promise\(\s*\w+\s*=>\s*setTimeout\(\s*\w+\s*,\s*(\d+(?:\.\d+)?)\s*(\*\s*1000)?\s*\)\s*\);?$"
+)
+# Locator methods that are properties in the Python API
+_PROPERTIES = {"first", "last"}
+
+
+class ScriptExportError(ValueError):
+    """Raised when a run cannot be exported as a Playwright test."""
+
+
+# ---------------------------------------------------------------------------
+# JavaScript -> Python translation of recorded Playwright calls
+# ---------------------------------------------------------------------------
+
+_TOKEN = re.compile(
+    r"\s*(?:"
+    r"(?P<str>'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`(?:[^`\\$]|\\.)*`)"
+    r"|(?P<num>-?\d+(?:\.\d+)?)"
+    r"|(?P<name>[A-Za-z_$][\w$]*)"
+    r"|(?P<punct>[.()\[\]{},:;])"
+    r")"
+)
+_REGEX = re.compile(r"\s*/((?:[^/\\\n]|\\.)+)/([gimsuy]*)")
+_REGEX_FLAGS = {"i": "re.IGNORECASE", "m": "re.MULTILINE", "s": "re.DOTALL"}
+
+
+def _snake(name: str) -> str:
+    return re.sub(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])", "_", name).lower()
+
+
+def _unquote(token: str) -> str:
+    quote, body = token[0], token[1:-1]
+    if quote == "'":
+        body = body.replace("\\'", "'").replace('"', '\\"')
+    elif quote == "`":
+        body = body.replace("\\`", "`").replace('"', '\\"')
+    return json.loads(f'"{body}"')
+
+
+class _Parser:
+    """Recursive-descent parser for the expression subset the MCP server emits."""
+
+    def __init__(self, code: str):
+        self.code = code
+        self.pos = 0
+        self.uses_re = False
+
+    def _peek(self) -> tuple[str, str] | None:
+        match = _TOKEN.match(self.code, self.pos)
+        if not match or match.end() == match.start() or match.lastgroup is None:
+            return None
+        return match.lastgroup, match.group(match.lastgroup)
+
+    def _next(self) -> tuple[str, str]:
+        match = _TOKEN.match(self.code, self.pos)
+        if not match or match.lastgroup is None:
+            raise ValueError(f"Unexpected input at {self.pos}")
+        self.pos = match.end()
+        return match.lastgroup, match.group(match.lastgroup)
+
+    def _expect(self, value: str) -> None:
+        kind, token = self._next()
+        if token != value:
+            raise ValueError(f"Expected '{value}', got '{token}'")
+
+    def _accept(self, value: str) -> bool:
+        peeked = self._peek()
+        if peeked is not None and peeked[1] == value:
+            self._next()
+            return True
+        return False
+
+    def statement(self) -> str:
+        self._accept("await")
+        expression = self.expression()
+        self._accept(";")
+        if self.code[self.pos:].strip():
+            raise ValueError("Trailing input")
+        return expression
+
+    def expression(self) -> str:
+        regex = _REGEX.match(self.code, self.pos)
+        if regex:
+            self.pos = regex.end()
+            self.uses_re = True
+            flags = " | ".join(_REGEX_FLAGS[f] for f in regex.group(2) if f in _REGEX_FLAGS)
+            return f"re.compile(r{json.dumps(regex.group(1))}{', ' + flags if flags else ''})"
+        kind, token = self._next()
+        if kind == "str":
+            value = json.dumps(_unquote(token), ensure_ascii=False)
+        elif kind == "num":
+            value = token
+        elif kind == "name":
+            value = {"true": "True", "false": "False", "null": "None", "undefined": "None"}.get(token, token)
+        elif token == "[":
+            items = self._items("]")
+            value = f"[{', '.join(items)}]"
+        elif token == "{":
+            value = "{" + ", ".join(f"{json.dumps(k)}: {v}" for k, v in self._object()) + "}"
+        else:
+            raise ValueError(f"Unexpected '{token}'")
+        while True:
+            if self._accept("."):
+                kind, name = self._next()
+                if kind != "name":
+                    raise ValueError(f"Expected a property name, got '{name}'")
+                value += f".{_snake(name)}"
+                if name in _PROPERTIES and self.code[self.pos:].lstrip().startswith("()"):
+                    self._expect("(")
+                    self._expect(")")
+            elif self._accept("("):
+                value += f"({', '.join(self._arguments())})"
+            else:
+                return value
+
+    def _items(self, closing: str) -> list[str]:
+        items = []
+        while not self._accept(closing):
+            items.append(self.expression())
+            if not self._accept(","):
+                self._expect(closing)
+                break
+        return items
+
+    def _object(self) -> list[tuple[str, str]]:
+        pairs = []
+        while not self._accept("}"):
+            kind, key = self._next()
+            if kind not in ("name", "str"):
+                raise ValueError(f"Unexpected object key '{key}'")
+            self._expect(":")
+            pairs.append((_unquote(key) if kind == "str" else key, self.expression()))
+            if not self._accept(","):
+                self._expect("}")
+                break
+        return pairs
+
+    def _arguments(self) -> list[str]:
+        """Call arguments; a trailing options object becomes keyword arguments."""
+        arguments = []
+        while not self._accept(")"):
+            if self._peek() == ("punct", "{"):
+                self._next()
+                arguments.extend(f"{_snake(k)}={v}" for k, v in self._object())
+            else:
+                arguments.append(self.expression())
+            if not self._accept(","):
+                self._expect(")")
+                break
+        return arguments
+
+
+def to_python(line: str) -> tuple[str, bool]:
+    """
+    Translate one line of recorded Playwright JavaScript into sync Python.
+
+    Returns:
+        (Python line, whether it uses the `re` module); lines that cannot be
+        translated come back as a `pytest.fail(...)` call
+    """
+    line = line.strip()
+    if line.startswith("//"):
+        return f"# {line[2:].strip()}", False
+    sleep = _SLEEP.match(line)
+    if sleep:
+        milliseconds = float(sleep.group(1)) * (1000 if sleep.group(2) else 1)
+        return f"page.wait_for_timeout({milliseconds:g})", False
+    parser = _Parser(line)
+    try:
+        return parser.statement(), parser.uses_re
+    except (ValueError, KeyError) as e:
+        logger.debug(f"Could not translate '{line}': {e}")
+        return f"pytest.fail({'not translated: ' + line!r})", False
+
+
+# ---------------------------------------------------------------------------
+# Script generation
+# ---------------------------------------------------------------------------
+
+def _is_code(line: str) -> bool:
+    return line.strip().startswith(_CODE_START)
+
+
+def _step_blocks(result: Any, actions: list[RecordedAction]) -> list[tuple[str, list[str]]]:
+    """(comment, JavaScript lines) per step, followed by unattributed actions."""
+    usable = [a for a in actions if a.ok and a.tool not in SKIPPED_TOOLS and a.code]
+    by_step: dict[str, list[str]] = {}
+    for action in usable:
+        if action.step_id is not None:
+            by_step.setdefault(action.step_id, []).extend(action.code)
+
+    blocks = []
+    for step in getattr(result, "steps", None) or []:
+        code = by_step.pop(step.step_id, None) or [line for line in step.locator if _is_code(line)]
+        comment = f"Step {step.step_id}: {' '.join(step.description.split())}"
+        if not code:
+            comment += " (no browser actions recorded)"
+        blocks.append((comment, code))
+    leftover = [line for a in usable if a.step_id is None or a.step_id in by_step for line in a.code]
+    if leftover:
+        blocks.append(("Actions not attributed to a step", leftover))
+    return blocks
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"\W+", "_", name).strip("_").lower() or "flow"
+
+
+def export_script(
+    result: Any,
+    name: str = "flow",
+    language: Language = "python",
+    actions: list[RecordedAction] | None = None,
+) -> str:
+    """
+    Render a passing run as a standalone Playwright test.
+
+    Args:
+        result: Result of a passing run (`RunResult` or a subclass)
+        name: Test name
+        language: "python" (pytest-playwright) or "typescript" (@playwright/test)
+        actions: Recorded actions; defaults to `result.actions`
+
+    Returns:
+        Source code of the test file
+
+    Raises:
+        ScriptExportError: If the run did not pass or no Playwright code was recorded
+    """
+    if getattr(result, "status", None) != "PASS":
+        raise ScriptExportError(f"Only passing runs can be exported (status: {getattr(result, 'status', None)})")
+    actions = getattr(result, "actions", []) if actions is None else actions
+    blocks = _step_blocks(result, actions)
+    if not any(code for _, code in blocks):
+        raise ScriptExportError("The run recorded no Playwright code to export")
+
+    if language == "typescript":
+        body = []
+        for comment, code in blocks:
+            body.append(f"  // {comment}")
+            body.extend(f"  {line}" for line in code)
+        return (
+            "import { test, expect } from '@playwright/test';\n\n"
+            f"test({json.dumps(name)}, async ({{ page }}) => {{\n"
+            + "\n".join(body)
+            + "\n});\n"
+        )
+
+    body, uses_re, uses_pytest = [], False, False
+    for comment, code in blocks:
+        body.append(f"    # {comment}")
+        for line in code:
+            python, needs_re = to_python(line)
+            uses_re |= needs_re
+            uses_pytest |= python.startswith("pytest.fail(")
+            body.append(f"    {python}")
+    imports = "".join(module for module, used in (("import re\n", uses_re), ("import pytest\n", uses_pytest)) if used)
+    imports += "from playwright.sync_api import Page, expect\n"
+    return f"{imports}\n\ndef test_{_slug(name)}(page: Page) -> None:\n" + "\n".join(body) + "\n"
+
+
+def write_script(result: Any, path: str | Path, name: str | None = None, language: Language | None = None) -> Path:
+    """
+    Export a passing run to `path`.
+
+    The language defaults to TypeScript for `.ts`/`.js` files and Python
+    otherwise; the test name defaults to the file name.
+    """
+    path = Path(path)
+    if language is None:
+        language = "typescript" if path.suffix in (".ts", ".js") else "python"
+    name = name or path.name.split(".")[0].removeprefix("test_")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(export_script(result, name, language), encoding="utf-8")
+    logger.info(f"Exported run as Playwright test: {path}")
+    return path
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Export a persisted run: `python -m playwright_agent.export <run_id> -o <file>`."""
+    from playwright_agent.runtime.run_store import RunStore
+    from playwright_agent.schemas.results import RunResult
+    from playwright_agent.settings import get_settings
+
+    parser = argparse.ArgumentParser(description="Export a persisted passing run as a Playwright test.")
+    parser.add_argument("run_id", help="Id of a run started with persist=True")
+    parser.add_argument("-o", "--output", required=True, help="Test file to write (.py, .ts or .js)")
+    parser.add_argument("--name", help="Test name (default: from the file name)")
+    parser.add_argument("--runs-dir", help="Run directory root (default: RUNS_DIR)")
+    args = parser.parse_args(argv)
+
+    store = RunStore(Path(args.runs_dir) if args.runs_dir else get_settings().runs_dir)
+    stored = store.load_result(args.run_id)
+    if stored is None:
+        print(f"Run {args.run_id} has no stored result", file=sys.stderr)
+        return 1
+    result = RunResult.model_validate(json.loads(stored))
+    result._actions = actions_from_items(store.load_items(args.run_id))
+    try:
+        path = write_script(result, args.output, args.name)
+    except ScriptExportError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    print(path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
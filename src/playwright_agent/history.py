@@ -0,0 +1,329 @@
+"""
+Run History Store
+=================
+
+An opt-in result sink that writes every flow result (run status, every
+step, timings and model usage) into a local SQLite database, so questions
+like "which step of which flow failed most often in the last 200 runs"
+are one query instead of a log-scraping session.
+
+Enable it by pointing `HISTORY_DB` at a database file (created on first
+use):
+
+    HISTORY_DB=.history/runs.sqlite3
+
+Every `BaseFlowRunner.run()`/`resume()` then records its outcome, including
+runs that raised (status "ERROR"). Inside pytest the test id is the
+current test's node id; outside it is the trace name.
+
+The database runs in WAL mode with a busy timeout, so parallel pytest
+workers (pytest-xdist) can write to the same file.
+
+Tables
+------
+- `runs`: one row per run (test id, trace name, status, start time,
+  duration, model time, tokens, output mode, exception, summary)
+- `steps`: one row per step result (run, position, step id, status,
+  actual result, exception)
+
+Both are indexed on test id, step id, status and timestamp.
+
+Queries
+-------
+    from playwright_agent.history import RunHistory
+
+    history = RunHistory(".history/runs.sqlite3")
+    history.flaky_tests(last=200)        # fail rate and pass/fail flips per test
+    history.failing_steps(last=200)      # steps that failed most often
+    history.durations("tests/e2e/test_login.py::test_login", last=50)
+
+Or from the command line:
+
+    python -m playwright_agent.history flaky --last 200
+    python -m playwright_agent.history steps --last 200 --test test_login
+    python -m playwright_agent.history durations tests/e2e/test_login.py::test_login
+
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import logging
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+logger = logging.getLogger("playwright_agent.history")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    test_id TEXT NOT NULL,
+    trace_name TEXT,
+    run_id TEXT,
+    status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration_seconds REAL,
+    model_seconds REAL,
+    requests INTEGER,
+    input_tokens INTEGER,
+    output_tokens INTEGER,
+    output_mode TEXT,
+    timed_out INTEGER NOT NULL DEFAULT 0,
+    failed_step_id TEXT,
+    exception TEXT,
+    summary TEXT
+);
+CREATE TABLE IF NOT EXISTS steps (
+    run INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    test_id TEXT NOT NULL,
+    step_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    description TEXT,
+    actual_result TEXT,
+    exception TEXT,
+    PRIMARY KEY (run, position)
+);
+CREATE INDEX IF NOT EXISTS runs_test ON runs(test_id, started_at);
+CREATE INDEX IF NOT EXISTS runs_status ON runs(status, started_at);
+CREATE INDEX IF NOT EXISTS runs_started ON runs(started_at);
+CREATE INDEX IF NOT EXISTS steps_test_step ON steps(test_id, step_id);
+CREATE INDEX IF NOT EXISTS steps_status ON steps(status, started_at);
+CREATE INDEX IF NOT EXISTS steps_started ON steps(started_at);
+"""
+
+BUSY_TIMEOUT_MS = 10_000
+
+# Node ids of pytest tests that started a flow and were not yet reported (see `pytest_plugin`)
+_flow_tests: set[str] = set()
+
+
+def current_test_id(default: str) -> str:
+    """The node id of the running pytest test, or `default` outside pytest."""
+    current = os.environ.get("PYTEST_CURRENT_TEST")
+    return current.rsplit(" (", 1)[0] if current else default
+
+
+def mark_flow_test() -> None:
+    """Remember that the running pytest test started a flow (no-op outside pytest)."""
+    if os.environ.get("PYTEST_CURRENT_TEST"):
+        _flow_tests.add(current_test_id(""))
+
+
+def ran_flow(nodeid: str) -> bool:
+    """Whether test `nodeid` started a flow since it was last asked about."""
+    if nodeid in _flow_tests:
+        _flow_tests.discard(nodeid)
+        return True
+    return False
+
+
+class RunHistory:
+    """
+    SQLite store of flow results.
+
+    Attributes:
+        path: Database file
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """A connection that commits on success and is always closed."""
+        db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000)
+        try:
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            db.execute("PRAGMA foreign_keys=ON")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def record(
+        self,
+        test_id: str,
+        result: Any = None,
+        trace_name: str | None = None,
+        started_at: float | None = None,
+        duration: float | None = None,
+        error: BaseException | None = None,
+    ) -> int:
+        """
+        Write one run and its steps.
+
+        Args:
+            test_id: Identifier of the test (pytest node id)
+            result: The run's result (`RunResult` or subclass); None if the run raised
+            trace_name: Trace name of the run
+            started_at: Unix start time (default: now)
+            duration: Wall-clock duration in seconds
+            error: The exception the run raised, if any
+
+        Returns:
+            Row id of the run
+        """
+        started_at = time.time() if started_at is None else started_at
+        usage = getattr(result, "usage", None)
+        if result is None:
+            status = "ERROR"
+        else:
+            status = "TIMEOUT" if getattr(result, "timed_out", False) else str(getattr(result, "status", "UNKNOWN"))
+        exception = f"{type(error).__name__}: {error}" if error is not None else getattr(result, "exception", None)
+        with self._connect() as db:
+            cursor = db.execute(
+                "INSERT INTO runs (test_id, trace_name, run_id, status, started_at, duration_seconds, model_seconds,"
+                " requests, input_tokens, output_tokens, output_mode, timed_out, failed_step_id, exception, summary)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    test_id, trace_name, getattr(result, "run_id", None), status, started_at, duration,
+                    getattr(usage, "model_seconds", None), getattr(usage, "requests", None),
+                    getattr(usage, "input_tokens", None), getattr(usage, "output_tokens", None),
+                    getattr(usage, "output_mode", None), int(bool(getattr(result, "timed_out", False))),
+                    getattr(result, "failed_step_id", None), exception, getattr(result, "summary", None),
+                ),
+            )
+            run = cursor.lastrowid
+            db.executemany(
+                "INSERT INTO steps (run, position, test_id, step_id, status, started_at, description, actual_result, exception)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run, position, test_id, step.step_id, step.status, started_at,
+                     step.description, step.actual_result, step.exception)
+                    for position, step in enumerate(getattr(result, "steps", None) or [])
+                ],
+            )
+        return run
+
+    def _query(self, sql: str, params: tuple = ()) -> list[dict[str, Any]]:
+        with self._connect() as db:
+            return [dict(row) for row in db.execute(sql, params)]
+
+    def flaky_tests(self, last: int = 200, min_runs: int = 2) -> list[dict[str, Any]]:
+        """
+        Fail rate and pass/fail flips per test over the last `last` runs.
+
+        A flip is a status change between consecutive runs of a test; many
+        flips with a moderate fail rate is the signature of a flaky flow.
+        Sorted by flips, then fail rate.
+        """
+        rows = self._query(
+            "SELECT test_id, status, duration_seconds FROM"
+            " (SELECT * FROM runs ORDER BY started_at DESC, id DESC LIMIT ?) ORDER BY started_at, id",
+            (last,),
+        )
+        stats: dict[str, dict[str, Any]] = {}
+        for row in rows:
+            entry = stats.setdefault(row["test_id"], {
+                "test_id": row["test_id"], "runs": 0, "failures": 0, "flips": 0, "_last": None, "_durations": [],
+            })
+            failed = row["status"] != "PASS"
+            entry["runs"] += 1
+            entry["failures"] += failed
+            if entry["_last"] is not None and entry["_last"] != failed:
+                entry["flips"] += 1
+            entry["_last"] = failed
+            if row["duration_seconds"] is not None:
+                entry["_durations"].append(row["duration_seconds"])
+        report = []
+        for entry in stats.values():
+            if entry["runs"] < min_runs:
+                continue
+            durations = entry.pop("_durations")
+            entry.pop("_last")
+            entry["fail_rate"] = round(entry["failures"] / entry["runs"], 3)
+            entry["mean_duration"] = round(sum(durations) / len(durations), 2) if durations else None
+            report.append(entry)
+        return sorted(report, key=lambda e: (-e["flips"], -e["fail_rate"], e["test_id"]))
+
+    def failing_steps(self, last: int = 200, test_id: str | None = None, limit: int = 20) -> list[dict[str, Any]]:
+        """Steps that failed most often within the last `last` runs (optionally of one test)."""
+        where, params = ("WHERE test_id = ?", (test_id,)) if test_id else ("", ())
+        return self._query(
+            "SELECT s.test_id, s.step_id, COUNT(*) AS runs, SUM(s.status = 'FAIL') AS failures,"
+            " ROUND(AVG(s.status = 'FAIL'), 3) AS fail_rate,"
+            # Exception of the step's most recent failure (the window always ends at the latest run)
+            " (SELECT f.exception FROM steps f JOIN runs fr ON f.run = fr.id"
+            "  WHERE f.test_id = s.test_id AND f.step_id = s.step_id AND f.status = 'FAIL'"
+            "  ORDER BY fr.started_at DESC, fr.id DESC LIMIT 1) AS last_exception"
+            f" FROM steps s JOIN (SELECT id FROM runs {where} ORDER BY started_at DESC, id DESC LIMIT ?) r ON s.run = r.id"
+            " GROUP BY s.test_id, s.step_id HAVING failures > 0"
+            " ORDER BY failures DESC, fail_rate DESC, s.test_id, s.step_id LIMIT ?",
+            (*params, last, limit),
+        )
+
+    def durations(self, test_id: str, last: int = 50) -> list[dict[str, Any]]:
+        """Duration, model time and output tokens of the last `last` runs of a test, oldest first."""
+        return self._query(
+            "SELECT * FROM (SELECT started_at, status, duration_seconds, model_seconds, output_tokens, output_mode"
+            " FROM runs WHERE test_id = ? ORDER BY started_at DESC, id DESC LIMIT ?) ORDER BY started_at",
+            (test_id, last),
+        )
+
+
+def _print_table(rows: list[dict[str, Any]]) -> None:
+    if not rows:
+        print("(no data)")
+        return
+    columns = list(rows[0])
+    cells = [[_format(row[c]) for c in columns] for row in rows]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for row in cells:
+        print("  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def _format(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float) and value > 1e9:
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(value))
+    if isinstance(value, str):
+        return " ".join(value.split())[:80]
+    return str(value)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Query the local flow run history.")
+    parser.add_argument("--db", help="History database (default: HISTORY_DB)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    flaky = commands.add_parser("flaky", help="Fail rate and pass/fail flips per test")
+    flaky.add_argument("--last", type=int, default=200, help="Number of most recent runs to consider")
+    steps = commands.add_parser("steps", help="Steps that failed most often")
+    steps.add_argument("--last", type=int, default=200, help="Number of most recent runs to consider")
+    steps.add_argument("--test", help="Only this test id")
+    durations = commands.add_parser("durations", help="Duration trend of one test")
+    durations.add_argument("test", help="Test id (pytest node id)")
+    durations.add_argument("--last", type=int, default=50, help="Number of most recent runs")
+    args = parser.parse_args(argv)
+
+    path = args.db or os.environ.get("HISTORY_DB")
+    if not path:
+        from playwright_agent.settings import get_settings
+        path = get_settings().history_db
+    if not path or not Path(path).exists():
+        print("No history database; set HISTORY_DB or pass --db", file=sys.stderr)
+        return 1
+    history = RunHistory(path)
+    if args.command == "flaky":
+        _print_table(history.flaky_tests(args.last))
+    elif args.command == "steps":
+        _print_table(history.failing_steps(args.last, args.test))
+    else:
+        _print_table(history.durations(args.test, args.last))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
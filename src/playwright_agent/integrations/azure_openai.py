@@ -8,15 +8,19 @@ configured with the application settings.
 The client is used by the AgentRunner to communicate with Azure OpenAI
 for AI-powered test execution.
 
+The client configuration comes from the shared, memoized settings
+(`get_settings()`) unless a runner passes its own instance. Clients are
+cached, one per settings instance and event loop: runs on the same loop
+share the client's connection pool, while a client is never used from a
+loop it was not created on (its HTTP connections belong to that loop).
+`settings.reload()` drops the cache; the client is not closed by its users.
+
 Usage
 -----
     from playwright_agent.integrations.azure_openai import make_async_client
-    from playwright_agent.settings import get_settings
     
-    settings = get_settings()
-    async with make_async_client(settings) as client:
-        # Use client for OpenAI API calls
-        response = await client.chat.completions.create(...)
+    client = make_async_client()
+    response = await client.chat.completions.create(...)
 
 Configuration
 -------------
@@ -28,26 +32,65 @@ The client requires these settings (from .env file):
 """
 
 from __future__ import annotations
+import asyncio
+import threading
+import weakref
+
 from openai import AsyncAzureOpenAI
-from playwright_agent.settings import Settings
+from playwright_agent.settings import Settings, get_settings
+
+# event loop -> {id(settings): (settings, client)}; the settings are kept so their id is not reused
+_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[int, tuple[Settings, AsyncAzureOpenAI]]] = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = threading.Lock()
+
+
+def client_config(settings: Settings | None = None) -> dict[str, str | None]:
+    """
+    Azure OpenAI client arguments from `settings` (default: the shared `get_settings()` instance).
+    """
+    settings = settings if settings is not None else get_settings()
+    return {
+        "api_version": settings.azure_openai_api_version,
+        "azure_endpoint": settings.azure_openai_endpoint,
+        "api_key": settings.azure_openai_api_key,
+    }
 
 
-def make_async_client(settings: Settings) -> AsyncAzureOpenAI:
+def make_async_client(settings: Settings | None = None) -> AsyncAzureOpenAI:
     """
-    Create an async Azure OpenAI client from settings.
+    The async Azure OpenAI client for settings and the running event loop.
+
+    The client is created on first use and shared afterwards; callers must
+    not close it. Outside a running event loop a new, uncached client is
+    returned.
     
     Args:
         settings: Application settings with Azure OpenAI configuration
+            (default: the shared `get_settings()` instance)
         
     Returns:
         AsyncAzureOpenAI client configured for the specified endpoint
         
     Example:
-        async with make_async_client(settings) as client:
-            agent = Agent(model=OpenAIResponsesModel(openai_client=client, ...))
+        client = make_async_client(settings)
+        agent = Agent(model=OpenAIResponsesModel(openai_client=client, ...))
     """
-    return AsyncAzureOpenAI(
-        api_version=settings.azure_openai_api_version,
-        azure_endpoint=settings.azure_openai_endpoint,
-        api_key=settings.azure_openai_api_key,
-    )
+    settings = settings if settings is not None else get_settings()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return AsyncAzureOpenAI(**client_config(settings))
+    with _clients_lock:
+        clients = _clients.setdefault(loop, {})
+        cached = clients.get(id(settings))
+        if cached is None:
+            cached = clients[id(settings)] = (settings, AsyncAzureOpenAI(**client_config(settings)))
+        return cached[1]
+
+
+def reset_clients() -> None:
+    """Forget the cached clients (called by `settings.reload()`)."""
+    with _clients_lock:
+        _clients.clear()
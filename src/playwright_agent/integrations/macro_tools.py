@@ -0,0 +1,259 @@
+"""
+Macro Tools
+===========
+
+Form-heavy steps ("Enter Topic, First Name and Last Name") cost one model
+turn per browser action: a snapshot, then one `browser_type` per field,
+each a full LLM round trip. Macro tools run such sequences inside a
+single tool call, directly against the run's Playwright MCP server, and
+return one compact result instead of a page snapshot per action.
+
+Enable them for every run with:
+
+    MACRO_TOOLS=true
+
+Tools
+-----
+- `fill_form(fields, submit="")`: resolve every field by its accessible
+  name (label) in one page snapshot, fill them all with one
+  `browser_fill_form` call (text boxes, comboboxes, checkboxes, radios,
+  sliders) and optionally click the `submit` button
+- `click_and_wait(element, text, role="")`: click an element by its
+  accessible name and wait until `text` is visible
+- `dismiss_popups()`: click the first known dismiss button (`POPUP_BUTTONS`,
+  e.g. "Close", "Not now", "Got it") of every open dialog, until no known
+  popup is left
+
+Elements are resolved like the structured flow steps (see
+`playwright_agent.dsl`): exact, case-insensitive accessible name against
+the ARIA snapshot, retried once on a fresh snapshot. A field that matches
+no element or several elements fails the call without touching the page.
+
+Every result carries the Playwright code that ran (`### Ran Playwright
+code`), so the actions are recorded, exported and mined for locators like
+the agent's own browser calls (see `runtime.recording`).
+
+Usage
+-----
+    macros = MacroTools(browser, settings.popup_buttons)
+    runner = AgentRunner(..., tools=macros.as_tools())
+
+"""
+
+from __future__ import annotations
+import logging
+import re
+from typing import Any, Iterable
+
+from pydantic import BaseModel, Field
+
+from playwright_agent.dsl.steps import FlowEngine, Selector, StepAmbiguousError, click, flow, resolve, wait_for
+from playwright_agent.integrations.playwright_mcp import (
+    SnapshotNode,
+    is_error,
+    page_url,
+    parse_snapshot,
+    ran_code,
+    section,
+    tool_text,
+)
+
+# OpenAI Agents SDK decorator for creating tools
+from agents import function_tool  # type: ignore[import-not-found]
+
+logger = logging.getLogger("playwright_agent.macro_tools")
+
+MACRO_TOOLS = ("fill_form", "click_and_wait", "dismiss_popups")
+MAX_POPUP_ROUNDS = 3
+
+# Snapshot role -> `browser_fill_form` field type
+_FIELD_TYPES = {
+    "textbox": "textbox", "searchbox": "textbox", "spinbutton": "textbox",
+    "combobox": "combobox", "checkbox": "checkbox", "switch": "checkbox", "radio": "radio", "slider": "slider",
+}
+_DIALOG = re.compile(r"^\s*-\s+(?:dialog|alertdialog)\b")
+
+MACRO_INSTRUCTIONS = """
+**Macro Tools**
+- To fill several fields of one form, call `fill_form` once with all field labels and values
+  (and the submit button, if the step saves the form) instead of one browser call per field.
+- To click something and wait for a result text, call `click_and_wait`.
+- If a dialog or banner blocks the page, call `dismiss_popups` first.
+- If a macro reports an error, take a snapshot and continue with the regular browser tools.
+"""
+
+
+class FormField(BaseModel):
+    """
+    One form field to fill.
+
+    Attributes:
+        name: Accessible name of the field (its label)
+        value: Value to enter ("true"/"false" for checkboxes, the option text for comboboxes)
+    """
+    name: str = Field(description="Label of the field, as shown on the page")
+    value: str = Field(description='Value to enter ("true"/"false" for checkboxes)')
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+def dialog_buttons(state: str, names: Iterable[str]) -> list[SnapshotNode]:
+    """
+    The first button of every open dialog whose name is one of `names`.
+
+    Args:
+        state: Page state text with an ARIA snapshot
+        names: Known dismiss button names, in order of preference
+    """
+    preference = {_normalize(name): rank for rank, name in enumerate(names)}
+    found: list[SnapshotNode] = []
+    dialog: list[SnapshotNode] | None = None
+    indent = -1
+
+    def close() -> None:
+        if dialog:
+            found.append(min(dialog, key=lambda node: preference[_normalize(node.name)]))
+
+    for line in state.splitlines():
+        depth = len(line) - len(line.lstrip())
+        if dialog is not None and depth <= indent:
+            close()
+            dialog = None
+        if dialog is None and _DIALOG.match(line):
+            dialog, indent = [], depth
+            continue
+        if dialog is not None:
+            dialog.extend(
+                node for node in parse_snapshot(line) if node.role == "button" and _normalize(node.name) in preference
+            )
+    close()
+    return found
+
+
+def _report(summary: str, code: list[str], url: str | None = None) -> str:
+    """Compact tool result in the Playwright MCP response format."""
+    text = f"### Result\n{summary}\n"
+    if url:
+        text += f"- Page URL: {url}\n"
+    if code:
+        text += "\n### Ran Playwright code\n```js\n" + "\n".join(code) + "\n```\n"
+    return text
+
+
+class MacroTools:
+    """
+    Composite browser tools bound to one run's Playwright MCP server.
+
+    Attributes:
+        browser: Connected Playwright MCP server
+        popup_buttons: Names of buttons that dismiss known popups
+    """
+
+    def __init__(self, browser: Any, popup_buttons: Iterable[str] = ()):
+        self.browser = browser
+        self.popup_buttons = list(popup_buttons)
+
+    async def _call(self, tool: str, args: dict[str, Any]) -> str:
+        result = await self.browser.call_tool(tool, args)
+        text = tool_text(result)
+        if is_error(result):
+            raise RuntimeError(section(text, "Result") or text or f"{tool} failed")
+        return text
+
+    async def _state(self) -> str:
+        text = await self._call("browser_snapshot", {})
+        return section(text, "Page state") or text
+
+    async def fill_form(self, fields: list[FormField], submit: str = "") -> str:
+        """Fill `fields` with one `browser_fill_form` call and optionally click `submit`."""
+        roles = set(_FIELD_TYPES)
+        nodes = parse_snapshot(await self._state())
+        try:
+            try:
+                targets = [resolve(nodes, Selector(name=field.name), roles) for field in fields]
+            except StepAmbiguousError:
+                nodes = parse_snapshot(await self._state())
+                targets = [resolve(nodes, Selector(name=field.name), roles) for field in fields]
+        except StepAmbiguousError as e:
+            return _report(f"Error: {e}; no field was filled", [])
+        form = [
+            {"name": node.name, "type": _FIELD_TYPES[node.role], "ref": node.ref, "value": field.value}
+            for field, node in zip(fields, targets)
+        ]
+        try:
+            text = await self._call("browser_fill_form", {"fields": form})
+        except RuntimeError as e:
+            return _report(f"Error: {e}", [])
+        code = ran_code(text)
+        summary = f"Filled {len(form)} fields: " + ", ".join(node.name for node in targets)
+        if not submit:
+            return _report(summary, code, page_url(text))
+        outcome = await FlowEngine(self.browser).execute(flow(click(submit, role="button")))
+        code += [line for result in outcome.results for line in result.locator]
+        if outcome.reason:
+            return _report(f"{summary}; Error: {outcome.reason}", code)
+        return _report(f"{summary}; {outcome.results[0].actual_result}", code, page_url(outcome.page_state or ""))
+
+    async def click_and_wait(self, element: str, text: str, role: str = "") -> str:
+        """Click `element` and wait until `text` is visible."""
+        outcome = await FlowEngine(self.browser).execute(flow(click(element, role=role or None), wait_for(text)))
+        code = [line for result in outcome.results for line in result.locator]
+        summary = "; ".join(result.actual_result for result in outcome.results)
+        if outcome.reason:
+            return _report(f"{summary + '; ' if summary else ''}Error: {outcome.reason}", code)
+        return _report(summary, code, page_url(outcome.page_state or ""))
+
+    async def dismiss_popups(self) -> str:
+        """Click the known dismiss button of every open dialog until none is left."""
+        dismissed, code = [], []
+        for _ in range(MAX_POPUP_ROUNDS):
+            buttons = dialog_buttons(await self._state(), self.popup_buttons)
+            if not buttons:
+                break
+            for button in buttons:
+                try:
+                    text = await self._call("browser_click", {"element": f"button {button.name}", "ref": button.ref})
+                except RuntimeError as e:
+                    logger.debug(f"Could not dismiss popup with {button.name!r}: {e}")
+                    continue
+                dismissed.append(button.name)
+                code += ran_code(text)
+        if not dismissed:
+            return _report("No known popup is open", [])
+        return _report(f"Dismissed {len(dismissed)} popups ({', '.join(dismissed)})", code)
+
+    def as_tools(self) -> list:
+        """Return the macro function tools bound to this browser."""
+        macros = self
+
+        @function_tool
+        async def fill_form(fields: list[FormField], submit: str = "") -> str:
+            """
+            Fill several fields of the current form in one call, instead of one browser call per field.
+
+            Args:
+                fields: Fields to fill, by their label as shown on the page
+                submit: Label of a button to click after filling (e.g. "Save"), or empty
+            """
+            return await macros.fill_form(fields, submit)
+
+        @function_tool
+        async def click_and_wait(element: str, text: str, role: str = "") -> str:
+            """
+            Click an element and wait until a text is visible on the page.
+
+            Args:
+                element: Accessible name of the element to click (e.g. the button text)
+                text: Text that shows the click took effect
+                role: ARIA role of the element (e.g. "button", "link"), or empty for any clickable element
+            """
+            return await macros.click_and_wait(element, text, role)
+
+        @function_tool
+        async def dismiss_popups() -> str:
+            """Close every open dialog that has a known dismiss button (e.g. "Close", "Not now")."""
+            return await macros.dismiss_popups()
+
+        return [fill_form, click_and_wait, dismiss_popups]
@@ -19,6 +19,9 @@ Supported MCP Servers
 3. **Knowledge Graph Memory** (`@modelcontextprotocol/server-memory`)
    - Persistent memory for locator hints and test data
    - Helps with self-healing tests
+   - For locator hints prefer the in-process locator memory
+     (`LOCATOR_DB`, see `playwright_agent.locators`), which needs no
+     subprocess and no extra tool calls to load
 
 Usage
 -----
@@ -35,18 +38,27 @@ Configuration
 -------------
 Server behavior is controlled via Settings:
 - `mcp_client_timeout_seconds`: Timeout for MCP tool calls
-- `mcp_isolated_dir`: Directory for browser isolation
+- `mcp_isolated_dir`: Directory for browser isolation (each run writes to
+  its own directory below it, see `runtime.run_dirs`)
 - `mcp_output_dir`: Directory for server outputs
 - `viewport`: Browser viewport size ("width,height")
 - `timeout_seconds`: Default action timeout
+- `recording`, `video_size`: Playwright trace/video recording (see
+  `runtime.browser_recording`)
+
+Servers are named ("playwright", "filesystem", "memory"); tool-call spans
+(see `runtime.spans`) report the name of the server that ran the tool.
 
 """
 
 from __future__ import annotations
 import logging
+from pathlib import Path
 from typing import Any
 
 from playwright_agent.settings import Settings
+from playwright_agent.runtime.browser_recording import browser_args
+from playwright_agent.runtime.run_dirs import current_run_dir
 
 # MCP SDK imports for server management
 from agents.mcp import MCPServerStdio, create_static_tool_filter  # type: ignore[import-not-found]
@@ -97,10 +109,14 @@ class MCPServerManager:
         """Initialize the server manager with application settings."""
         self.settings = settings
 
-    async def get_browser_server(self) -> MCPServerStdio:
+    async def get_browser_server(self, storage_state: str | None = None) -> MCPServerStdio:
         """
         Create and return a Playwright MCP browser server.
         
+        Args:
+            storage_state: Optional Playwright storage-state file to preload
+                (cookies/localStorage), e.g. when resuming from a checkpoint
+        
         Returns:
             MCPServerStdio instance for browser automation
             
@@ -114,13 +130,17 @@ class MCPServerManager:
                     "@playwright/mcp@v0.0.42",
                     "--isolated",
                     f"--viewport-size={self.settings.viewport}",
-                    f"--output-dir={str(self.settings.mcp_isolated_dir)}",
+                    f"--output-dir={str(self.output_dir())}",
                     f"--timeout-action={self.settings.timeout_seconds}",
                     "--caps=vision,testing",
                 ],
             }
+            if storage_state:
+                params["args"].append(f"--storage-state={storage_state}")
+            params["args"].extend(browser_args(self.settings.recording, self.settings.video_size))
             logger.debug(f"Creating browser MCP server with params: {params}")
             return MCPServerStdio(
+                name="playwright",
                 params=params,
                 client_session_timeout_seconds=self.settings.mcp_client_timeout_seconds,
                 tool_filter=create_static_tool_filter(blocked_tool_names=["browser_run_code"]),
@@ -129,10 +149,19 @@ class MCPServerManager:
             logger.error(f"Failed to create browser MCP server: {e}")
             raise MCPServerError("browser", str(e), cause=e) from e
 
-    async def get_file_server(self) -> MCPServerStdio:
+    def output_dir(self) -> Path:
+        """Output directory of the current run (see `runtime.run_dirs`), or the shared `mcp_isolated_dir`."""
+        return current_run_dir() or self.settings.mcp_isolated_dir
+
+    async def get_file_server(self, directory: str | Path | None = None) -> MCPServerStdio:
         """
         Create and return a filesystem MCP server.
         
+        Args:
+            directory: Directory the server may access. Defaults to the
+                current run's output directory; outside a run, to the
+                shared isolated and output directories.
+        
         Returns:
             MCPServerStdio instance for file operations
             
@@ -145,12 +174,12 @@ class MCPServerManager:
                 "args": [
                     "-y",
                     "@modelcontextprotocol/server-filesystem",
-                    str(self.settings.mcp_isolated_dir),
-                    str(self.settings.mcp_output_dir),
+                    *self._file_roots(directory),
                 ],
             }
             logger.debug(f"Creating filesystem MCP server with params: {params}")
             return MCPServerStdio(
+                name="filesystem",
                 params=params,
                 client_session_timeout_seconds=self.settings.mcp_client_timeout_seconds,
             )
@@ -158,9 +187,20 @@ class MCPServerManager:
             logger.error(f"Failed to create filesystem MCP server: {e}")
             raise MCPServerError("filesystem", str(e), cause=e) from e
 
+    def _file_roots(self, directory: str | Path | None) -> list[str]:
+        if directory is not None:
+            return [str(directory)]
+        run_dir = current_run_dir()
+        if run_dir is not None:
+            return [str(run_dir)]
+        return [str(self.settings.mcp_isolated_dir), str(self.settings.mcp_output_dir)]
+
     async def get_knowledge_graph_based_memory(self, kg_path: str) -> MCPServerStdio:
         """
         Create and return a knowledge graph memory MCP server.
+
+        For locator hints, `LOCATOR_DB` (see `playwright_agent.locators`)
+        replaces this server.
         
         Args:
             kg_path: Path to the knowledge graph file
@@ -181,6 +221,7 @@ class MCPServerManager:
             }
             logger.debug(f"Creating knowledge graph MCP server with path: {kg_path}")
             return MCPServerStdio(
+                name="memory",
                 params=params,
                 client_session_timeout_seconds=self.settings.mcp_client_timeout_seconds,
             )
@@ -0,0 +1,158 @@
+"""
+Playwright MCP Helpers
+======================
+
+Small helpers for talking to the Playwright MCP browser server directly,
+outside of an agent turn. The framework uses these to read page state
+(URL, storage) without spending an LLM round trip.
+
+Playwright MCP answers every tool call with markdown-style sections:
+
+    ### Result
+    "https://example.com/dashboard"
+
+    ### Ran Playwright code
+    ```js
+    await page.evaluate('() => location.href');
+    ```
+
+Page state (after navigation, clicks, or `browser_snapshot`) comes as an
+ARIA snapshot whose interactive nodes carry refs used by the action tools:
+
+    ### Page state
+    - Page URL: https://the-internet.herokuapp.com/login
+    - Page Snapshot:
+    ```yaml
+    - textbox "Username" [ref=e3]
+    - button "Login" [ref=e5]
+    ```
+
+Usage
+-----
+    from playwright_agent.integrations.playwright_mcp import evaluate, parse_snapshot
+
+    url = await evaluate(browser_ctx, "() => location.href")
+    nodes = parse_snapshot(tool_text(await browser_ctx.call_tool("browser_snapshot", {})))
+
+"""
+
+from __future__ import annotations
+import json
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any
+
+logger = logging.getLogger("playwright_agent.playwright_mcp")
+
+# `- button "Login" [cursor=pointer] [ref=e5]` -> role, name, ref
+_SNAPSHOT_NODE = re.compile(r'^\s*-\s+([a-z]+)(?:\s+"((?:[^"\\]|\\.)*)")?[^\n]*?\[ref=([^\]\s]+)\]', re.MULTILINE)
+_PAGE_URL = re.compile(r"^- Page URL:\s*(\S+)", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class SnapshotNode:
+    """An element of an ARIA page snapshot that can be targeted by ref."""
+    role: str
+    name: str
+    ref: str
+
+
+def tool_text(result: Any) -> str:
+    """Join the text content items of an MCP `CallToolResult`."""
+    parts = []
+    for item in getattr(result, "content", None) or []:
+        text = getattr(item, "text", None)
+        if text:
+            parts.append(text)
+    return "\n".join(parts)
+
+
+def section(text: str, title: str) -> str | None:
+    """
+    Return the body of a `### <title>` section from a Playwright MCP response.
+
+    Args:
+        text: Full tool response text
+        title: Section title without the leading hashes (e.g. "Result")
+
+    Returns:
+        Section body with surrounding whitespace stripped, or None if absent
+    """
+    marker = f"### {title}"
+    start = text.find(marker)
+    if start == -1:
+        return None
+    body = text[start + len(marker):]
+    end = body.find("\n### ")
+    if end != -1:
+        body = body[:end]
+    return body.strip()
+
+
+async def evaluate(server: Any, function: str) -> Any:
+    """
+    Evaluate a JavaScript function on the current page via `browser_evaluate`.
+
+    Args:
+        server: Connected Playwright MCP server
+        function: JavaScript function source, e.g. "() => location.href"
+
+    Returns:
+        The JSON-decoded return value, or the raw text if it is not JSON
+
+    Raises:
+        RuntimeError: If the tool reports an error
+    """
+    result = await server.call_tool("browser_evaluate", {"function": function})
+    text = tool_text(result)
+    if getattr(result, "isError", False):
+        raise RuntimeError(f"browser_evaluate failed: {text}")
+    body = section(text, "Result")
+    if body is None:
+        body = text
+    try:
+        return json.loads(body)
+    except ValueError:
+        return body
+
+
+def parse_snapshot(text: str) -> list[SnapshotNode]:
+    """
+    Extract the ref-carrying elements from a Playwright MCP page snapshot.
+
+    Args:
+        text: Tool response text containing a `Page Snapshot` YAML block
+
+    Returns:
+        Elements in document order (role, accessible name, ref)
+    """
+    return [
+        SnapshotNode(role=role, name=name.replace('\\"', '"'), ref=ref)
+        for role, name, ref in _SNAPSHOT_NODE.findall(text)
+    ]
+
+
+def page_url(text: str) -> str | None:
+    """Return the `Page URL` reported in a tool response, if any."""
+    match = _PAGE_URL.search(text)
+    return match.group(1) if match else None
+
+
+def has_snapshot(text: str) -> bool:
+    """True if the tool response carries a page snapshot."""
+    return "Page Snapshot" in text
+
+
+def is_error(result: Any) -> bool:
+    """True if a tool call failed (flagged by MCP or reported in the Result section)."""
+    if getattr(result, "isError", False):
+        return True
+    body = section(tool_text(result), "Result") or ""
+    return body.startswith("Error")
+
+
+def ran_code(text: str) -> list[str]:
+    """Playwright code lines from the `Ran Playwright code` section of a tool response."""
+    body = section(text, "Ran Playwright code") or ""
+    return [line.strip() for line in body.splitlines() if line.strip() and not line.startswith("```")]
@@ -0,0 +1,488 @@
+"""
+Locator Memory
+==============
+
+Self-healing locators used to live in `@modelcontextprotocol/server-memory`:
+an npx subprocess per test, one JSON file rewritten in full on every
+update, and several agent tool calls to read the hints back. This module
+keeps them in a local SQLite database instead.
+
+Enable it by pointing `LOCATOR_DB` at a database file (created on first
+use):
+
+    LOCATOR_DB=.locators/locators.sqlite3
+    LOCATOR_APP=d365
+
+Modes
+-----
+- `prefetch` (default): before the run the framework looks up the hints
+  for all steps in one query and adds a compact table (step id ->
+  locators) to the agent's instructions (`hint_table()`). After the run
+  it writes back what the steps used (`used_locators()`): locators not
+  hinted are added and the hints' counters are updated. The agent makes
+  no memory tool calls at all.
+- `tools`: the agent gets the tools below (bound to `LOCATOR_APP`) and a
+  short instruction on how to use them, for flows whose pages are only
+  known while they run.
+
+Keys
+----
+A locator is stored per app, page and step intent:
+
+- app: the application under test (`LOCATOR_APP`, default "default")
+- page: a URL pattern. `page_pattern()` drops the scheme and fragment,
+  sorts the query and replaces id-like path segments and query values
+  (GUIDs, numbers, long hex strings) with `*`, so every lead record
+  shares `org.crm.dynamics.com/main.aspx?etn=lead&id=*&pagetype=entityrecord`.
+  Lookups match stored patterns with `fnmatch`, so hand-written patterns
+  work too.
+- intent: the step text, lower-cased, without its step number and with
+  whitespace collapsed (`intent_key()`)
+
+Each locator keeps success and failure counters and its last use; lookups
+return the most reliable locators first.
+
+Tools
+-----
+With `LOCATOR_MODE=tools`:
+
+- `find_locators(intent, page_url="")`: stored locators for a step
+- `record_locator(intent, page_url, locator, worked=True)`: count a
+  locator that worked (or failed), adding it if it is new
+
+Eviction
+--------
+`evict()` deletes locators unused for `LOCATOR_MAX_AGE_DAYS` (default 30)
+and locators that failed at least `STALE_FAILURES` times more often than
+they worked, then the least recently used ones above `LOCATOR_MAX_ENTRIES`.
+It runs once per process when the store is first opened, or from the
+command line:
+
+    python -m playwright_agent.locators stats
+    python -m playwright_agent.locators evict --max-age-days 7
+    python -m playwright_agent.locators find "click the save button" --app d365
+
+The database runs in WAL mode with a busy timeout, so parallel pytest
+workers can share it.
+
+"""
+
+from __future__ import annotations
+import argparse
+import asyncio
+import contextlib
+import fnmatch
+import logging
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+from urllib.parse import parse_qsl, urlsplit
+
+from pydantic import BaseModel
+
+# OpenAI Agents SDK decorator for creating tools
+from agents import function_tool  # type: ignore[import-not-found]
+
+logger = logging.getLogger("playwright_agent.locators")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS locators (
+    app TEXT NOT NULL,
+    page TEXT NOT NULL,
+    intent TEXT NOT NULL,
+    locator TEXT NOT NULL,
+    successes INTEGER NOT NULL DEFAULT 0,
+    failures INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (app, intent, page, locator)
+);
+CREATE INDEX IF NOT EXISTS locators_used ON locators(last_used);
+"""
+
+BUSY_TIMEOUT_MS = 10_000
+DAY_SECONDS = 86_400
+STALE_FAILURES = 3
+DEFAULT_LIMIT = 3
+ANY_PAGE = "*"
+
+_ID_LIKE = re.compile(
+    r"^(\{?[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\}?|\d+|[0-9a-f]{16,})$", re.IGNORECASE,
+)
+_STEP_NUMBER = re.compile(r"^\s*(step\s*)?\d+[.):]?\s+", re.IGNORECASE)
+_ACTION = re.compile(
+    r"^\s*(?:await\s+)?page\.(?P<locator>.+?)\."
+    r"(?:click|dblclick|fill|type|press|pressSequentially|check|uncheck|selectOption|hover|setInputFiles|clear)\("
+)
+_REF = re.compile(r"^(ref\s*=\s*)?e\d+$")
+
+LOCATOR_INSTRUCTIONS = """
+**Locator Memory**
+- Before acting on an element, call `find_locators` with the step text and the current page URL
+  and try the returned locators first (most reliable first).
+- If none works, discover the element as usual.
+- After a step, call `record_locator` for the locator you used: `worked=true` if it worked,
+  `worked=false` if a returned locator failed. Never record guesses that were not tried.
+"""
+
+HINTS_HEADER = """
+**Locator Hints**
+Locators that worked for these steps in earlier runs, most reliable first. Try them first; if one
+fails, discover the element as usual. Locators are stored by the framework after the run.
+| Step | Locators |
+|---|---|
+"""
+
+
+class StoredLocator(BaseModel):
+    """
+    A locator remembered for a step.
+
+    Attributes:
+        page: URL pattern the locator was recorded on
+        locator: The locator (e.g. `getByRole('button', { name: 'Save' })`)
+        successes: Times it worked
+        failures: Times it failed
+        last_used: Unix time of its last use
+    """
+    page: str
+    locator: str
+    successes: int = 0
+    failures: int = 0
+    last_used: float = 0.0
+
+    def describe(self) -> str:
+        return f"{self.locator} (worked {self.successes}x, failed {self.failures}x)"
+
+
+def page_pattern(url: str) -> str:
+    """URL pattern of a page: host, path and sorted query with id-like parts replaced by `*`."""
+    if not url:
+        return ANY_PAGE
+    parts = urlsplit(url if "://" in url else f"//{url}")
+    segments = ["*" if _ID_LIKE.match(segment) else segment for segment in parts.path.split("/")]
+    query = sorted(
+        (key, "*" if _ID_LIKE.match(value) else value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+    )
+    pattern = parts.netloc.lower() + "/".join(segments)
+    if query:
+        pattern += "?" + "&".join(f"{key}={value}" for key, value in query)
+    return pattern
+
+
+def intent_key(text: str) -> str:
+    """Normalized step intent: lower-cased, without step number, whitespace collapsed."""
+    return " ".join(_STEP_NUMBER.sub("", text).lower().split()).rstrip(".")
+
+
+def locator_from_code(code: str) -> str | None:
+    """The locator of a Playwright action line (`await page.getByRole(...).click();` -> `getByRole(...)`)."""
+    match = _ACTION.match(code)
+    return match.group("locator").strip() if match else None
+
+
+def used_locators(result: Any) -> dict[str, dict[str, bool]]:
+    """
+    Locators each step of a finished run used, and whether they worked.
+
+    Locators come from the Playwright code of the run's recorded browser
+    actions (`RunResult.actions`); steps without attributed actions fall
+    back to the locators the agent reported (`StepResult.locator`).
+
+    Returns:
+        {step id: {locator: worked}}
+    """
+    used: dict[str, dict[str, bool]] = {}
+    for action in getattr(result, "actions", None) or []:
+        if action.step_id is None:
+            continue
+        for line in action.code:
+            locator = locator_from_code(line)
+            if locator is not None:
+                step = used.setdefault(action.step_id, {})
+                step[locator] = step.get(locator, False) or action.ok
+    for step in getattr(result, "steps", None) or []:
+        if step.step_id in used:
+            continue
+        reported = [" ".join(str(text).split()) for text in step.locator or []]
+        reported = [text for text in reported if text and not _REF.match(text)]
+        if reported:
+            used[step.step_id] = {locator: step.status == "PASS" for locator in reported}
+    return used
+
+
+def hint_table(texts: dict[str, str], hints: dict[str, list[StoredLocator]]) -> str:
+    """
+    Instruction block listing the hinted locators per step ("" without hints).
+
+    Args:
+        texts: Step texts by step id
+        hints: Locators by intent key (see `LocatorStore.prefetch`)
+    """
+    rows = []
+    for step_id, text in texts.items():
+        found = hints.get(intent_key(text))
+        if found:
+            cell = " ; ".join(locator.locator.replace("|", "\\|") for locator in found)
+            rows.append(f"| {step_id} | {cell} |")
+    return HINTS_HEADER + "\n".join(rows) + "\n" if rows else ""
+
+
+class LocatorStore:
+    """
+    SQLite store of locators per app, page pattern and step intent.
+
+    Attributes:
+        path: Database file
+        max_age_days: Locators unused for this long are evicted
+        max_entries: Locators above this count are evicted, least recently
+            used first (None = no limit)
+    """
+
+    def __init__(self, path: str | Path, max_age_days: float = 30, max_entries: int | None = None):
+        self.path = Path(path)
+        self.max_age_days = max_age_days
+        self.max_entries = max_entries
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """A connection that commits on success and is always closed."""
+        db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000)
+        try:
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def find(self, app: str, intent: str, url: str | None = None, limit: int = DEFAULT_LIMIT) -> list[StoredLocator]:
+        """
+        Locators stored for a step, most reliable first.
+
+        Args:
+            app: Application key
+            intent: Step text (normalized with `intent_key`)
+            url: Current page URL; None returns the step's locators on any page
+            limit: Maximum number of locators
+        """
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT page, locator, successes, failures, last_used FROM locators WHERE app = ? AND intent = ?"
+                " ORDER BY (successes + 1.0) / (successes + failures + 2.0) DESC, last_used DESC",
+                (app, intent_key(intent)),
+            ).fetchall()
+        page = page_pattern(url) if url else None
+        found = [StoredLocator(**row) for row in rows if page is None or fnmatch.fnmatchcase(page, row["page"])]
+        return found[:limit]
+
+    def prefetch(
+        self, app: str, intents: Iterable[str], limit: int = DEFAULT_LIMIT,
+    ) -> dict[str, list[StoredLocator]]:
+        """
+        The most reliable locators of many steps on any page, in one query.
+
+        Returns:
+            {intent key: locators, most reliable first}
+        """
+        keys = sorted({intent_key(intent) for intent in intents})
+        if not keys:
+            return {}
+        with self._connect() as db:
+            rows = db.execute(
+                f"SELECT intent, page, locator, successes, failures, last_used FROM locators"
+                f" WHERE app = ? AND intent IN ({', '.join('?' * len(keys))})"
+                " ORDER BY (successes + 1.0) / (successes + failures + 2.0) DESC, last_used DESC",
+                (app, *keys),
+            ).fetchall()
+        hints: dict[str, list[StoredLocator]] = {}
+        for row in rows:
+            found = hints.setdefault(row["intent"], [])
+            if len(found) < limit and all(known.locator != row["locator"] for known in found):
+                found.append(StoredLocator(**{key: row[key] for key in row.keys() if key != "intent"}))
+        return hints
+
+    def record(self, app: str, intent: str, url: str, locator: str, worked: bool = True, now: float | None = None) -> None:
+        """Count a use of `locator` for a step, adding it if it is new."""
+        now = time.time() if now is None else now
+        with self._connect() as db:
+            self._upsert(db, app, page_pattern(url), intent_key(intent), locator.strip(), worked, now)
+
+    @staticmethod
+    def _upsert(db: sqlite3.Connection, app: str, page: str, intent: str, locator: str, worked: bool, now: float) -> None:
+        success, failure = (1, 0) if worked else (0, 1)
+        db.execute(
+            "INSERT INTO locators (app, page, intent, locator, successes, failures, created_at, last_used)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (app, intent, page, locator) DO UPDATE SET"
+            " successes = successes + excluded.successes, failures = failures + excluded.failures,"
+            " last_used = excluded.last_used",
+            (app, page, intent, locator, success, failure, now, now),
+        )
+
+    def write_back(
+        self,
+        app: str,
+        texts: dict[str, str],
+        used: dict[str, dict[str, bool]],
+        hints: dict[str, list[StoredLocator]],
+        now: float | None = None,
+    ) -> int:
+        """
+        Store what a prefetched run's steps used, in one transaction.
+
+        Locators that were not hinted are added (if they worked, for any
+        page); hinted locators the steps used get their counters updated.
+
+        Args:
+            app: Application key
+            texts: Step texts by step id
+            used: Locators per step id and whether they worked (see `used_locators`)
+            hints: The run's prefetched hints (see `prefetch`)
+
+        Returns:
+            Number of newly discovered locators
+        """
+        now = time.time() if now is None else now
+        added = 0
+        with self._connect() as db:
+            for step_id, locators in used.items():
+                if step_id not in texts:
+                    continue
+                intent = intent_key(texts[step_id])
+                hinted = {known.locator: known.page for known in hints.get(intent, [])}
+                for locator, worked in locators.items():
+                    if locator in hinted:
+                        self._upsert(db, app, hinted[locator], intent, locator, worked, now)
+                    elif worked:
+                        self._upsert(db, app, ANY_PAGE, intent, locator, True, now)
+                        added += 1
+        if added:
+            logger.info(f"Stored {added} newly discovered locators")
+        return added
+
+    def evict(self, now: float | None = None) -> int:
+        """
+        Delete old, unreliable and (above `max_entries`) least recently used locators.
+
+        Returns:
+            Number of locators deleted
+        """
+        now = time.time() if now is None else now
+        with self._connect() as db:
+            removed = db.execute(
+                "DELETE FROM locators WHERE last_used < ? OR failures >= successes + ?",
+                (now - self.max_age_days * DAY_SECONDS, STALE_FAILURES),
+            ).rowcount
+            if self.max_entries is not None:
+                removed += db.execute(
+                    "DELETE FROM locators WHERE rowid IN"
+                    " (SELECT rowid FROM locators ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                ).rowcount
+        if removed:
+            logger.info(f"Evicted {removed} stale locators from {self.path}")
+        return removed
+
+    def stats(self) -> dict[str, Any]:
+        """Locator, app and intent counts and total successes and failures."""
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT COUNT(*) AS locators, COUNT(DISTINCT app) AS apps, COUNT(DISTINCT app || intent) AS intents,"
+                " COALESCE(SUM(successes), 0) AS successes, COALESCE(SUM(failures), 0) AS failures FROM locators"
+            ).fetchone()
+        return dict(row)
+
+    def as_tools(self, app: str) -> list:
+        """Return the `find_locators` and `record_locator` function tools for `app`."""
+        store = self
+
+        @function_tool
+        async def find_locators(intent: str, page_url: str = "") -> str:
+            """
+            Look up locators that worked before for a step, most reliable first.
+
+            Args:
+                intent: The step text (e.g. "Click the Save button")
+                page_url: URL of the current page (empty = any page)
+            """
+            found = await asyncio.to_thread(store.find, app, intent, page_url or None)
+            if not found:
+                return "No stored locators for this step."
+            return "\n".join(f"- {locator.describe()}" for locator in found)
+
+        @function_tool
+        async def record_locator(intent: str, page_url: str, locator: str, worked: bool = True) -> str:
+            """
+            Remember whether a locator worked for a step.
+
+            Args:
+                intent: The step text
+                page_url: URL of the page the locator was used on
+                locator: The locator that was tried
+                worked: True if it worked, False if it failed
+            """
+            await asyncio.to_thread(store.record, app, intent, page_url, locator, worked)
+            return "Locator recorded."
+
+        return [find_locators, record_locator]
+
+
+_stores: dict[Path, LocatorStore] = {}
+
+
+def get_locator_store(path: str | Path, max_age_days: float = 30, max_entries: int | None = None) -> LocatorStore:
+    """The process-wide store for `path`; stale locators are evicted when it is first opened."""
+    key = Path(path).resolve()
+    if key not in _stores:
+        store = LocatorStore(path, max_age_days, max_entries)
+        store.evict()
+        _stores[key] = store
+    return _stores[key]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect or evict the locator memory.")
+    parser.add_argument("--db", help="Database file (default: LOCATOR_DB)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Locator counts and success/failure totals")
+    evict = commands.add_parser("evict", help="Delete stale locators")
+    evict.add_argument("--max-age-days", type=float, help="Override LOCATOR_MAX_AGE_DAYS")
+    evict.add_argument("--max-entries", type=int, help="Override LOCATOR_MAX_ENTRIES")
+    find = commands.add_parser("find", help="Locators stored for a step")
+    find.add_argument("intent", help="Step text")
+    find.add_argument("--app", help="Application key (default: LOCATOR_APP)")
+    find.add_argument("--url", help="Page URL")
+    args = parser.parse_args(argv)
+
+    from playwright_agent.settings import get_settings
+
+    settings = get_settings()
+    path = args.db or settings.locator_db
+    if not path or not Path(path).exists():
+        print("No locator database; set LOCATOR_DB or pass --db", file=sys.stderr)
+        return 1
+    store = LocatorStore(path, settings.locator_max_age_days, settings.locator_max_entries)
+    if args.command == "evict":
+        if args.max_age_days is not None:
+            store.max_age_days = args.max_age_days
+        if args.max_entries is not None:
+            store.max_entries = args.max_entries
+        print({"removed": store.evict()})
+    elif args.command == "find":
+        for locator in store.find(args.app or settings.locator_app, args.intent, args.url, limit=20):
+            print(f"{locator.page}\t{locator.describe()}")
+    else:
+        print(store.stats())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
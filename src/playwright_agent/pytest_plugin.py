@@ -0,0 +1,220 @@
+"""
+Pytest Plugin: Failure-Likelihood-First Ordering
+================================================
+
+Nightly suites of web flows take long, and pytest runs them in file order,
+so a broken login may only surface an hour into the run. This plugin keeps
+a local per-test history of outcomes and durations of the tests that ran a
+flow and can reorder the collected flows so that the ones most likely to
+fail run first.
+
+Enable it from a conftest (the framework's own `tests/conftest.py` does):
+
+    pytest_plugins = ["playwright_agent.pytest_plugin"]
+
+Ordering
+--------
+    pytest --flow-order=fail-first -x     # stop at the first red flow
+
+Or permanently in `pytest.ini`:
+
+    [pytest]
+    flow_order = fail-first
+
+Each test gets a failure-likelihood score:
+
+- **Recent failure rate**: outcomes of the last `FLOW_HISTORY_SIZE` runs,
+  weighted so that recent runs count more (each older run weighs
+  `RECENCY_DECAY` times the one after it)
+- **Code-change recency**: a test whose file (or a flow file it is
+  parametrized with) changed since it last ran gets `CHANGE_BOOST` added
+- **Unknown tests**: tests without history (new flows, and tests that never
+  ran a flow) score `NEW_TEST_SCORE`, below any observed failure
+
+Higher scores run first; among equal scores unknown tests run before known
+ones, then the shortest average duration first, so cheap likely-failures
+come before expensive ones.
+
+Profiling
+---------
+    pytest --flow-profile=sample          # or cprofile
+
+profiles every flow run of the session (sets `PROFILE`, see
+`runtime.profiling`); profiles are written under `PROFILE_DIR`.
+
+History
+-------
+The history lives in pytest's cache (`.pytest_cache`, key
+`playwright_agent/flow_history`), is updated on every run regardless of
+the ordering mode, and is reset by `pytest --cache-clear`. Only tests that
+started a flow (`BaseFlowRunner.run`/`resume`) are recorded.
+
+"""
+
+from __future__ import annotations
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from playwright_agent.history import ran_flow
+from playwright_agent.settings import load_environment
+
+logger = logging.getLogger("playwright_agent.pytest_plugin")
+
+CACHE_KEY = "playwright_agent/flow_history"
+FLOW_HISTORY_SIZE = 20
+RECENCY_DECAY = 0.8
+CHANGE_BOOST = 0.5
+NEW_TEST_SCORE = 0.0
+
+ORDER_MODES = ("default", "fail-first")
+PROFILE_MODES = ("sample", "cprofile")
+
+
+class FlowHistory:
+    """
+    Per-test outcome and duration history.
+
+    Attributes:
+        records: nodeid -> {"outcomes": [bool, ...] (True = failed, oldest first),
+            "durations": [seconds, ...], "last_run": unix timestamp}
+    """
+
+    def __init__(self, records: dict[str, Any] | None = None, size: int = FLOW_HISTORY_SIZE):
+        self.records: dict[str, Any] = dict(records or {})
+        self.size = size
+
+    def record(self, nodeid: str, failed: bool, duration: float, when: float | None = None) -> None:
+        """Append one outcome for `nodeid`, keeping the last `size` runs."""
+        entry = self.records.setdefault(nodeid, {"outcomes": [], "durations": [], "last_run": 0.0})
+        entry["outcomes"] = (entry["outcomes"] + [bool(failed)])[-self.size:]
+        entry["durations"] = (entry["durations"] + [round(duration, 3)])[-self.size:]
+        entry["last_run"] = time.time() if when is None else when
+
+    def failure_rate(self, nodeid: str) -> float | None:
+        """Recency-weighted failure rate in [0, 1], or None without history."""
+        outcomes = self.records.get(nodeid, {}).get("outcomes") or []
+        if not outcomes:
+            return None
+        weights = [RECENCY_DECAY ** age for age in range(len(outcomes))]
+        failed = sum(w for w, f in zip(weights, reversed(outcomes)) if f)
+        return failed / sum(weights)
+
+    def mean_duration(self, nodeid: str) -> float:
+        durations = self.records.get(nodeid, {}).get("durations") or []
+        return sum(durations) / len(durations) if durations else 0.0
+
+    def last_run(self, nodeid: str) -> float:
+        return float(self.records.get(nodeid, {}).get("last_run") or 0.0)
+
+    def score(self, nodeid: str, changed_at: float = 0.0) -> float:
+        """
+        Failure-likelihood score of a test.
+
+        Args:
+            nodeid: Pytest node id
+            changed_at: Latest modification time of the test's source files
+
+        Returns:
+            Higher means more likely to fail
+        """
+        rate = self.failure_rate(nodeid)
+        if rate is None:
+            # Below any observed failure; `order` still runs it before tests that never failed
+            return NEW_TEST_SCORE
+        boost = CHANGE_BOOST if changed_at > self.last_run(nodeid) else 0.0
+        return rate + boost
+
+    def order(self, items: list[Any], changed_at: dict[str, float] | None = None) -> list[Any]:
+        """Sort items (anything with a `nodeid`) most-likely-to-fail first, then unknown, then fastest first."""
+        changed_at = changed_at or {}
+        return sorted(
+            items,
+            key=lambda item: (
+                -self.score(item.nodeid, changed_at.get(item.nodeid, 0.0)),
+                item.nodeid in self.records,
+                self.mean_duration(item.nodeid),
+            ),
+        )
+
+
+def _mtime(path: Any) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def _changed_at(item: Any) -> float:
+    """Latest mtime of the test module and any existing file it is parametrized with."""
+    latest = _mtime(item.path)
+    callspec = getattr(item, "callspec", None)
+    for value in (callspec.params.values() if callspec else []):
+        if isinstance(value, (str, Path)) and len(str(value)) < 260:
+            try:
+                if Path(value).is_file():
+                    latest = max(latest, _mtime(value))
+            except OSError:
+                continue
+    return latest
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    group = parser.getgroup("playwright_agent", "Playwright MCP agent flows")
+    group.addoption(
+        "--flow-order",
+        choices=ORDER_MODES,
+        default=None,
+        help="Order tests by failure likelihood ('fail-first') using the local outcome history",
+    )
+    parser.addini("flow_order", "Default for --flow-order", default="default")
+    group.addoption(
+        "--flow-profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help="Profile every flow run ('sample' or 'cprofile'); profiles go to PROFILE_DIR",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    # Tests read credentials with os.getenv; the package itself loads nothing at import
+    load_environment()
+    profile = config.getoption("--flow-profile", default=None)
+    if profile:
+        os.environ["PROFILE"] = profile
+    cache = getattr(config, "cache", None)
+    records = cache.get(CACHE_KEY, {}) if cache is not None else {}
+    config._flow_history = FlowHistory(records)  # type: ignore[attr-defined]
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(session: pytest.Session, config: pytest.Config, items: list[pytest.Item]) -> None:
+    mode = config.getoption("--flow-order") or config.getini("flow_order")
+    if mode != "fail-first":
+        return
+    history: FlowHistory = config._flow_history  # type: ignore[attr-defined]
+    items[:] = history.order(items, {item.nodeid: _changed_at(item) for item in items})
+    logger.info(f"Ordered {len(items)} tests failure-likelihood first")
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item: pytest.Item, call: pytest.CallInfo):
+    outcome = yield
+    report: pytest.TestReport = outcome.get_result()
+    history: FlowHistory | None = getattr(item.config, "_flow_history", None)
+    if history is None or report.skipped:
+        return
+    if report.when == "call" or (report.when == "setup" and report.failed):
+        if ran_flow(item.nodeid):
+            history.record(item.nodeid, report.failed, report.duration)
+
+
+def pytest_sessionfinish(session: pytest.Session) -> None:
+    cache = getattr(session.config, "cache", None)
+    history: FlowHistory | None = getattr(session.config, "_flow_history", None)
+    if cache is not None and history is not None:
+        cache.set(CACHE_KEY, history.records)
@@ -0,0 +1,216 @@
+"""
+Streaming Reporter
+==================
+
+pytest-html only writes its report when the session ends, and a flow's
+result only exists once the flow completes. For long (nightly) suites this
+reporter writes results as they are produced, with constant memory
+regardless of suite size:
+
+- `results.jsonl`: one JSON event per line, flushed immediately
+  (`run_started`, `step`, `run_finished`); `tail -f` friendly
+- `report.html`: a table with one row per step and one summary row per
+  flow, styled with `reports/assets/style.css`
+- `junit.xml`: one `<testcase>` per flow, for CI dashboards
+
+Nothing is held in memory: each event is appended to the files as it
+happens. The HTML and JUnit files are kept well-formed after every write
+by rewriting only their fixed-size footer (and, for JUnit, the fixed-width
+counters in the header) in place, so they can be opened at any time. The
+files are started fresh by the first run of a process.
+
+Enabling
+--------
+    REPORT_DIR=reports/live
+
+Every `BaseFlowRunner` run then streams into that directory. Steps are
+reported live as they pass (via step checkpoints, which are enabled for
+this), and the final results of all steps when the flow finishes. Under
+pytest-xdist each worker writes its own files (`results-gw0.jsonl`, ...).
+
+"""
+
+from __future__ import annotations
+import html
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any
+from xml.sax.saxutils import quoteattr, escape as xml_escape
+
+logger = logging.getLogger("playwright_agent.reporting")
+
+STYLESHEET = Path("reports/assets/style.css")
+
+_HTML_HEADER = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Flow results</title>
+<link rel="stylesheet" href="assets/style.css">
+</head>
+<body>
+<h1>Flow results</h1>
+<p>Started {started}. Rows are appended as steps finish; reload to update.</p>
+<table id="results-table">
+<thead><tr><th>Time</th><th>Test</th><th>Step</th><th class="col-result">Result</th><th>Details</th></tr></thead>
+<tbody>
+"""
+_HTML_FOOTER = "</tbody>\n</table>\n</body>\n</html>\n"
+
+_COUNTER_WIDTH = 10
+_JUNIT_HEADER = (
+    '<?xml version="1.0" encoding="utf-8"?>\n'
+    '<testsuites><testsuite name="playwright_agent" tests="{tests}" failures="{failures}" errors="{errors}">\n'
+)
+_JUNIT_FOOTER = "</testsuite></testsuites>\n"
+
+_CSS_CLASS = {"PASS": "passed", "FAIL": "failed", "BLOCKED": "skipped", "ERROR": "error", "TIMEOUT": "error"}
+
+
+def _counter(value: int) -> str:
+    return str(value).zfill(_COUNTER_WIDTH)
+
+
+class _FooterFile:
+    """A text file (started fresh) whose constant footer is rewritten after every append."""
+
+    def __init__(self, path: Path, header: str, footer: str):
+        self.path = path
+        self.footer = footer.encode("utf-8")
+        path.write_bytes(header.encode("utf-8") + self.footer)
+
+    def append(self, text: str) -> None:
+        with open(self.path, "r+b") as f:
+            f.seek(-len(self.footer), os.SEEK_END)
+            f.write(text.encode("utf-8") + self.footer)
+            f.truncate()
+
+    def overwrite(self, offset: int, text: str) -> None:
+        with open(self.path, "r+b") as f:
+            f.seek(offset)
+            f.write(text.encode("utf-8"))
+
+
+class StreamingReporter:
+    """
+    Appends flow and step results to JSONL, HTML and JUnit files.
+
+    Attributes:
+        directory: Output directory
+        jsonl_path: JSON-lines event stream
+        html_path: Incrementally written HTML report
+        junit_path: Incrementally written JUnit XML
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        worker = os.environ.get("PYTEST_XDIST_WORKER")
+        suffix = f"-{worker}" if worker else ""
+        self.jsonl_path = self.directory / f"results{suffix}.jsonl"
+        self.html_path = self.directory / f"report{suffix}.html"
+        self.junit_path = self.directory / f"junit{suffix}.xml"
+        self._lock = threading.Lock()
+        # Step ids already reported live, per running flow (bounded by concurrently running flows)
+        self._live: dict[str, set[str]] = {}
+        self._counts = {"tests": 0, "failures": 0, "errors": 0}
+
+        if STYLESHEET.exists() and not (self.directory / "assets" / "style.css").exists():
+            (self.directory / "assets").mkdir(exist_ok=True)
+            shutil.copyfile(STYLESHEET, self.directory / "assets" / "style.css")
+        self.jsonl_path.write_text("", encoding="utf-8")
+        self._html = _FooterFile(self.html_path, _HTML_HEADER.format(started=time.strftime("%Y-%m-%d %H:%M:%S")), _HTML_FOOTER)
+        self._junit = _FooterFile(
+            self.junit_path,
+            _JUNIT_HEADER.format(tests=_counter(0), failures=_counter(0), errors=_counter(0)),
+            _JUNIT_FOOTER,
+        )
+
+    def _event(self, event: str, **fields: Any) -> None:
+        line = json.dumps({"event": event, "time": time.time(), **fields}, default=str)
+        with open(self.jsonl_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def _row(self, test_id: str, step: str, status: str, details: str, summary: bool = False) -> None:
+        css = _CSS_CLASS.get(status, "")
+        cells = [time.strftime("%H:%M:%S"), test_id, step, status, details]
+        tag = "th" if summary else "td"
+        row = "".join(
+            f'<{tag} class="col-result">{html.escape(c)}</{tag}>' if i == 3 else f"<{tag}>{html.escape(c)}</{tag}>"
+            for i, c in enumerate(cells)
+        )
+        self._html.append(f'<tr class="{css}">{row}</tr>\n')
+
+    def run_started(self, run_key: str, test_id: str, trace_name: str) -> None:
+        """Record the start of a flow. `run_key` identifies the run until `run_finished`."""
+        with self._lock:
+            self._live[run_key] = set()
+            self._event("run_started", test_id=test_id, trace_name=trace_name)
+
+    def step(self, run_key: str, test_id: str, step: Any, live: bool = False) -> None:
+        """
+        Record one step result (a `StepResult`, or a `StepCheckpoint` for a
+        step that just passed).
+        """
+        with self._lock:
+            status = getattr(step, "status", "PASS")
+            details = getattr(step, "actual_result", None) or getattr(step, "summary", "") or ""
+            if getattr(step, "exception", None):
+                details += f" ({step.exception})"
+            if live:
+                self._live.setdefault(run_key, set()).add(str(step.step_id))
+            self._event("step", test_id=test_id, step_id=str(step.step_id), status=status, details=details, live=live)
+            self._row(test_id, str(step.step_id), status, details)
+
+    def run_finished(
+        self, run_key: str, test_id: str, result: Any, duration: float, error: BaseException | None = None,
+    ) -> None:
+        """Record the final step results not reported live, then the flow outcome."""
+        live = self._live.pop(run_key, set())
+        for step in getattr(result, "steps", None) or []:
+            if str(step.step_id) not in live or step.status != "PASS":
+                self.step(run_key, test_id, step)
+        with self._lock:
+            if result is None:
+                status = "ERROR"
+            else:
+                status = "TIMEOUT" if getattr(result, "timed_out", False) else str(getattr(result, "status", "UNKNOWN"))
+            message = f"{type(error).__name__}: {error}" if error is not None else (getattr(result, "exception", None) or "")
+            usage = getattr(result, "usage", None)
+            self._event(
+                "run_finished", test_id=test_id, status=status, duration=round(duration, 3), exception=message or None,
+                failed_step_id=getattr(result, "failed_step_id", None),
+                usage=usage.model_dump(exclude={"calls"}) if usage is not None else None,
+            )
+            self._row(test_id, "", status, f"{duration:.1f}s" + (f" - {message}" if message else ""), summary=True)
+            self._testcase(test_id, status, duration, message)
+
+    def _testcase(self, test_id: str, status: str, duration: float, message: str) -> None:
+        classname, _, name = test_id.rpartition("::")
+        case = f"<testcase classname={quoteattr(classname or 'flows')} name={quoteattr(name or test_id)} time=\"{duration:.3f}\">"
+        if status == "FAIL":
+            case += f"<failure message={quoteattr(message[:500])}>{xml_escape(message)}</failure>"
+            self._counts["failures"] += 1
+        elif status != "PASS":
+            case += f"<error message={quoteattr(message[:500])}>{xml_escape(message)}</error>"
+            self._counts["errors"] += 1
+        self._counts["tests"] += 1
+        self._junit.append(case + "</testcase>\n")
+        header = _JUNIT_HEADER.format(**{k: _counter(v) for k, v in self._counts.items()})
+        self._junit.overwrite(0, header)
+
+
+_reporters: dict[Path, StreamingReporter] = {}
+
+
+def get_reporter(directory: str | Path) -> StreamingReporter:
+    """The process-wide reporter for `directory` (all runners share its files)."""
+    key = Path(directory).resolve()
+    if key not in _reporters:
+        _reporters[key] = StreamingReporter(directory)
+    return _reporters[key]
@@ -8,12 +8,16 @@ Classes
 -------
 - `BaseFlowRunner`: Main entry point for pytest tests
 - `AgentRunner`: Internal execution engine (typically not used directly)
+- `RetryPolicy`: Step-level retry configuration (resume from checkpoints)
+- `StepCheckpoint`: Browser state captured after a passed step
+- `RunStore`: Persisted run state for crash recovery (see `BaseFlowRunner.resume`)
 
 Exceptions
 ----------
 - `FlowExecutionError`: Raised when flow execution fails
 - `AgentExecutionError`: Raised when agent execution fails
 - `MCPToolError`: Raised when an MCP tool call fails
+- `RunNotFoundError`: Raised when resuming a run that was never persisted
 
 Typical usage is via BaseFlowRunner:
 
@@ -28,13 +32,52 @@ Typical usage is via BaseFlowRunner:
 
 """
 
-from playwright_agent.runtime.base import BaseFlowRunner, FlowExecutionError
-from playwright_agent.runtime.runner import AgentRunner, AgentExecutionError, MCPToolError
+from __future__ import annotations
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from playwright_agent.runtime.base import BaseFlowRunner, FlowExecutionError
+    from playwright_agent.runtime.runner import AgentRunner, AgentExecutionError, MCPToolError
+    from playwright_agent.runtime.checkpoints import RetryPolicy, StepCheckpoint
+    from playwright_agent.runtime.run_store import RunNotFoundError, RunState, RunStore
+
+# Public name -> module that defines it (imported on first access)
+_LAZY = {
+    "BaseFlowRunner": "playwright_agent.runtime.base",
+    "FlowExecutionError": "playwright_agent.runtime.base",
+    "AgentRunner": "playwright_agent.runtime.runner",
+    "AgentExecutionError": "playwright_agent.runtime.runner",
+    "MCPToolError": "playwright_agent.runtime.runner",
+    "RetryPolicy": "playwright_agent.runtime.checkpoints",
+    "StepCheckpoint": "playwright_agent.runtime.checkpoints",
+    "RunNotFoundError": "playwright_agent.runtime.run_store",
+    "RunState": "playwright_agent.runtime.run_store",
+    "RunStore": "playwright_agent.runtime.run_store",
+}
 
 __all__ = [
     "BaseFlowRunner",
     "FlowExecutionError",
     "AgentRunner",
+    "RetryPolicy",
+    "StepCheckpoint",
+    "RunStore",
+    "RunState",
+    "RunNotFoundError",
     "AgentExecutionError",
     "MCPToolError",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
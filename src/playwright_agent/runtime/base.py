@@ -47,6 +47,30 @@ With custom tools:
     
     result = await runner.run(steps, RunResult, tools=[get_mfa_code])
 
+With step-level retries (resume from the last passed step):
+
+    from playwright_agent import RetryPolicy
+
+    result = await runner.run(steps, RunResult, retry_policy=RetryPolicy(step_retries=2))
+
+With crash recovery (persisted run state):
+
+    result = await runner.run(steps, RunResult, persist=True)
+    # ... after a crash, in a new process:
+    result = await runner.resume(run_id, RunResult)
+
+With a deadline (returns a partial result instead of hanging):
+
+    result = await runner.run(steps, RunResult, timeout=600)
+    if result.timed_out:
+        print(f"Stopped after steps: {[s.step_id for s in result.steps]}")
+
+With a structured flow (deterministic steps run without model turns):
+
+    from playwright_agent.dsl import flow, open_url, type_text, click
+
+    result = await runner.run(flow(open_url(url), type_text("Username", "tomsmith"), click("Login")), RunResult)
+
 With tracing for debugging:
 
     result = await runner.run(
@@ -59,13 +83,59 @@ With tracing for debugging:
 
 from __future__ import annotations
 import asyncio
+import importlib
 import logging
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, TypeVar
+from typing import Any, Callable, TypeVar
+
+from pydantic import ValidationError
 
 from playwright_agent.settings import get_settings, Settings, ConfigurationError
 from playwright_agent.integrations.mcp_servers import MCPServerManager, MCPServerError
+from playwright_agent.integrations.macro_tools import MACRO_INSTRUCTIONS, MacroTools
 from playwright_agent.runtime.runner import AgentRunner, AgentExecutionError, MCPToolError
+from playwright_agent.runtime.checkpoints import (
+    CHECKPOINT_INSTRUCTIONS,
+    CheckpointRecorder,
+    RetryPolicy,
+    StepCheckpoint,
+    build_resume_prompt,
+    carried_steps,
+)
+from playwright_agent.runtime.run_store import JournalHooks, RunJournal, RunStore, resume_input
+from playwright_agent.runtime.recording import ActionRecorder, RecordedAction
+from playwright_agent.runtime.metrics import RunUsage, UsageMeter, prices_for
+from playwright_agent.runtime.spans import SpanRecorder, get_exporter
+from playwright_agent.runtime.browser_recording import BrowserRecording
+from playwright_agent.runtime.run_dirs import current_run_dir, remove_run_dir, run_dir_path, should_remove, use_run_dir
+from playwright_agent.runtime.profiling import FlowProfiler, ProfileMode
+from playwright_agent.history import RunHistory, current_test_id, mark_flow_test
+from playwright_agent.artifacts import get_artifact_store
+from playwright_agent.locators import LOCATOR_INSTRUCTIONS, LocatorStore, get_locator_store, hint_table, used_locators
+from playwright_agent.reporting import StreamingReporter, get_reporter
+from playwright_agent.schemas.lean import LEAN_OUTPUT_INSTRUCTIONS, OutputMode, expand, expand_steps, lean_schema
+from playwright_agent.schemas.results import RunResult, StepResult
+from playwright_agent.dsl.steps import Flow, FlowEngine, FlowOutcome, delegation_prompt
+from playwright_agent.dsl.markdown import FlowDefinitionError, compile_text
+from playwright_agent.runtime.per_step import (
+    PER_STEP_INSTRUCTIONS,
+    REPORT_PROMPT,
+    ExecutionMode,
+    LeanStepBatch,
+    StepBatch,
+    StepUnit,
+    assemble,
+    blocked,
+    build_step_prompt,
+    extra_fields,
+    page_state_text,
+    plan_units,
+    summarize,
+)
 
 logger = logging.getLogger("playwright_agent.base")
 
@@ -80,6 +150,49 @@ class FlowExecutionError(Exception):
         self.cause = cause
 
 
+@dataclass
+class RunContext:
+    """
+    State shared by every agent invocation of one run (built by `BaseFlowRunner._run_flow`).
+
+    Attributes:
+        output_schema: Pydantic model class of the run's result
+        tools: Custom tools of the run
+        mcp_servers: Additional MCP servers of the run
+        trace_name: Name of the run in the trace dashboard
+        policy: Retry policy of the run
+        meter: Model usage of the run (its output mode selects the lean or full agent schema)
+        spans: Spans of the run
+        journal: Journal of a persisted run
+        deadline: Loop time at which the run is cancelled
+        per_step: Steps per agent invocation in "per_step" mode, None in "flow" mode
+        on_checkpoint: Called with every checkpoint of the run
+        run_dir: Output directory of the run (see `runtime.run_dirs`)
+        locators: Locator memory (see `playwright_agent.locators`)
+        hints: Prefetched locator hint table for the instructions
+        macro_tools: Give the agent the composite browser tools (see `integrations.macro_tools`)
+    """
+    output_schema: Any
+    tools: list | None
+    mcp_servers: list | None
+    trace_name: str
+    policy: RetryPolicy
+    meter: UsageMeter
+    spans: SpanRecorder
+    journal: RunJournal | None = None
+    deadline: float | None = None
+    per_step: int | None = None
+    on_checkpoint: Callable[[StepCheckpoint], None] | None = None
+    run_dir: Path | None = None
+    locators: LocatorStore | None = None
+    hints: str = ""
+    macro_tools: bool = False
+
+    @property
+    def lean(self) -> bool:
+        return self.meter.usage.output_mode == "lean"
+
+
 def _load_instructions(path: Path | None) -> str:
     """Load agent instructions from file."""
     if path is None:
@@ -91,6 +204,120 @@ def _load_instructions(path: Path | None) -> str:
     return path.read_text(encoding="utf-8")
 
 
+def _new_recorder(
+    directory: Path, journal: RunJournal | None, on_checkpoint: Callable[[StepCheckpoint], None] | None = None,
+) -> CheckpointRecorder:
+    """Create a checkpoint recorder that also writes through to the run journal (and `on_checkpoint`)."""
+    listeners = [journal.record_checkpoint] if journal is not None else []
+    if on_checkpoint is not None:
+        listeners.append(on_checkpoint)
+    return CheckpointRecorder(directory, listeners=listeners)
+
+
+def _server_label(server: Any) -> str:
+    return "File" if getattr(server, "name", None) == "filesystem" else "Browser"
+
+
+def _run_status(result: Any) -> str:
+    """Status of a finished run for retention decisions: PASS, FAIL, TIMEOUT or ERROR (no result)."""
+    if result is None:
+        return "ERROR"
+    return "TIMEOUT" if getattr(result, "timed_out", False) else str(getattr(result, "status", "UNKNOWN"))
+
+
+def _set_run_id(result: Any, run_id: str) -> None:
+    if isinstance(result, RunResult):
+        result._run_id = run_id
+
+
+def _set_actions(result: Any, actions: list[RecordedAction]) -> None:
+    if isinstance(result, RunResult):
+        result._actions = list(actions)
+
+
+def _step_texts(user_steps: Any) -> dict[str, str]:
+    """Step texts by step id (used to expand lean output), if the steps can be parsed."""
+    if not isinstance(user_steps, (str, Flow)):
+        return {}
+    _, units = plan_units(user_steps)
+    return {unit.id: unit.text for unit in units}
+
+
+def _timed_out_result(
+    output_schema, recorder: CheckpointRecorder | None, proof: str | None, finished: list[Any] | None = None,
+) -> Any:
+    """
+    Build a partial FAIL result for a run that hit its deadline.
+    
+    Steps that were checkpointed before the deadline are reported as PASS,
+    or `finished` step results if the framework tracked them (per-step mode).
+    Custom fields of `output_schema` without a default are set to None.
+    """
+    checkpoints = recorder.checkpoints if recorder is not None else []
+    if finished:
+        steps = list(finished)
+    else:
+        steps = carried_steps(checkpoints, {})
+    last = steps[-1].step_id if steps else None
+    values: dict[str, Any] = {name: None for name, field in output_schema.model_fields.items() if field.is_required()}
+    values.update(
+        status="FAIL",
+        failed_step_id=None,
+        proof_of_pass=proof,
+        steps=steps,
+        exception="Flow deadline expired before the run completed"
+                  + (f" (last passed step: {last})" if last else ""),
+        summary=f"Timed out after {len(steps)} passed step(s)",
+    )
+    result = output_schema.model_construct(**{k: v for k, v in values.items() if k in output_schema.model_fields})
+    if isinstance(result, RunResult):
+        result._timed_out = True
+    return result
+
+
+def _prepend_steps(result: Any, earlier: list[Any]) -> None:
+    """Put step results from before the agent took over in front of the reported ones."""
+    steps = getattr(result, "steps", None)
+    if steps is None or not earlier:
+        return
+    reported = {step.step_id for step in steps}
+    result.steps = [step for step in earlier if step.step_id not in reported] + list(steps)
+
+
+def _direct_result(output_schema, flow: Flow, outcome: FlowOutcome, proof: str | None) -> Any:
+    """
+    The final result of a flow whose steps all ran without the agent.
+    
+    Returns None if `output_schema` has required fields beyond `RunResult`
+    (custom assertions), which only the agent can fill.
+    """
+    if extra_fields(output_schema) or not outcome.complete(flow):
+        return None
+    values = {
+        "status": "PASS",
+        "failed_step_id": None,
+        "proof_of_pass": proof,
+        "steps": outcome.results,
+        "exception": None,
+        "summary": f"All {len(outcome.results)} steps executed directly via Playwright MCP",
+    }
+    return output_schema.model_validate({k: v for k, v in values.items() if k in output_schema.model_fields})
+
+
+def _import_schema(path: str | None) -> Any:
+    """Import an output schema recorded as "module:QualName" (None if not importable)."""
+    if not path or "<locals>" in path:
+        return None
+    module_name, _, qualname = path.partition(":")
+    try:
+        target: Any = importlib.import_module(module_name)
+        for part in qualname.split("."):
+            target = getattr(target, part)
+        return target
+    except (ImportError, AttributeError):
+        return None
+
+
 class BaseFlowRunner:
     """
     Main entry point for running AI-powered web automation flows.
@@ -128,19 +355,24 @@ class BaseFlowRunner:
             result = await flow_runner.run(steps, RunResult)
     """
 
-    def __init__(self, instructions_path: Path | None = None):
+    def __init__(self, instructions_path: Path | None = None, settings: Settings | None = None):
         """
         Initialize the flow runner.
         
         Args:
             instructions_path: Optional path to custom instructions file
+            settings: Settings for this runner only (default: the shared
+                `get_settings()` instance)
             
         Raises:
             ConfigurationError: If required settings are missing
             FileNotFoundError: If instructions file doesn't exist
         """
         try:
-            self.settings: Settings = get_settings()
+            if settings is not None:
+                settings.validate_all()
+                settings.create_directories()
+            self.settings: Settings = settings if settings is not None else get_settings()
             self.server_manager = MCPServerManager(self.settings)
             self.instructions = _load_instructions(instructions_path)
             logger.info("BaseFlowRunner initialized successfully")
@@ -152,11 +384,19 @@ class BaseFlowRunner:
 
     async def run(
         self, 
-        user_steps: str, 
+        user_steps: str | Flow, 
         output_schema, 
         tools: list | None = None, 
         mcp_servers: list | None = None,
         trace_name: str = "web_flow",
+        retry_policy: RetryPolicy | None = None,
+        persist: bool | None = None,
+        run_id: str | None = None,
+        timeout: float | None = None,
+        execution_mode: ExecutionMode | None = None,
+        steps_per_invocation: int = 1,
+        output_mode: OutputMode | None = None,
+        profile: ProfileMode | bool | None = None,
     ) -> Any:
         """
         Execute a web automation flow with natural language steps.
@@ -166,11 +406,46 @@ class BaseFlowRunner:
         executes the provided steps.
         
         Args:
-            user_steps: Natural language test steps describing what to do
+            user_steps: Natural language test steps describing what to do, or
+                a structured `Flow` (see `playwright_agent.dsl`) whose fully
+                specified steps run without model turns
             output_schema: Pydantic model class for structured output (e.g., RunResult)
             tools: Optional list of custom tools (@function_tool decorated functions)
             mcp_servers: Optional list of additional MCP servers
             trace_name: Name for this run in OpenAI trace dashboard (default: "web_flow")
+            retry_policy: Optional step-level retry policy. When retries are
+                enabled the agent records a checkpoint after every passed step
+                and a failed run is resumed from the last one. Defaults to
+                `settings.step_retries` retries.
+            persist: Persist run state incrementally under `settings.runs_dir`
+                so a crashed run can be continued with `resume()`.
+                Defaults to `settings.persist_runs`.
+            run_id: Explicit id for the persisted run (implies `persist=True`)
+            timeout: Deadline for the whole flow in seconds (including retries).
+                When it expires the run stops at its next await point, a final
+                screenshot is attempted, MCP servers are closed within
+                `settings.teardown_timeout_seconds` and a partial FAIL result
+                with `timed_out == True` is returned. Defaults to
+                `settings.flow_timeout_seconds` (no deadline if unset); pass 0
+                to disable the default deadline. Cancellation from outside
+                (e.g. the caller's own `asyncio.timeout`) also closes the MCP
+                servers but is re-raised instead of returning a result.
+            execution_mode: "flow" runs one agent conversation for the whole
+                flow; "per_step" keeps one browser session but runs a short
+                agent invocation per step (see `runtime.per_step`), with
+                `retry_policy` retrying failed steps in place. Defaults to
+                `settings.execution_mode`.
+            steps_per_invocation: Steps per agent invocation in "per_step" mode
+            output_mode: "lean" lets the agent report only the step id, status,
+                a short actual result and (on failure) the exception and
+                expected result, which the framework expands into
+                `output_schema` (see `schemas.lean`). Saves output tokens and
+                model time. Defaults to `settings.output_mode`.
+            profile: "sample" (or True) samples the Python stack of the run,
+                "cprofile" profiles it deterministically; both also monitor
+                event-loop lag and write the profile under
+                `settings.profile_dir` (see `runtime.profiling`). Defaults to
+                `settings.profile` ("off").
             
         Returns:
             Instance of output_schema with test results
@@ -193,28 +468,28 @@ class BaseFlowRunner:
             assert result.status == "PASS"
         """
         logger.info("Starting agent flow execution")
-        browser = None
+        policy = retry_policy or RetryPolicy(step_retries=self.settings.step_retries)
+        journal = None
+        if run_id or (self.settings.persist_runs if persist is None else persist):
+            journal = RunStore(self.settings.runs_dir).create(run_id, trace_name, output_schema)
+        
+        mode = execution_mode or self.settings.execution_mode
+        if profile is None or profile is False:
+            profile = self.settings.profile if profile is None else "off"
+        elif profile is True:
+            profile = "sample"
         
         try:
-            browser = await self.server_manager.get_browser_server()
-            async with browser as browser_ctx:
-                default_mcp_servers = [browser_ctx]
-                default_tools: list = []
-
-                consolidate_mcps = (mcp_servers or []) + default_mcp_servers
-                consolidate_tools = (tools or []) + default_tools
-                
-                logger.debug(f"Using {len(consolidate_mcps)} MCP servers and {len(consolidate_tools)} tools")
-                
-                runner = AgentRunner(
-                    instructions=self.instructions,
-                    output_type=output_schema,
-                    mcp_servers=consolidate_mcps,
-                    settings=self.settings,
-                    tools=consolidate_tools,
-                    trace_name=trace_name,
-                )
-                return await runner.run(user_steps)
+            flow = self._run_flow(
+                user_steps, output_schema, tools, mcp_servers, trace_name, policy, journal,
+                timeout=timeout if timeout is not None else self.settings.flow_timeout_seconds,
+                per_step=steps_per_invocation if mode == "per_step" else None,
+                output_mode=output_mode or self.settings.output_mode,
+            )
+            if profile == "off":
+                return await flow
+            async with FlowProfiler(profile, self.settings.profile_dir, current_test_id(trace_name)):
+                return await flow
                 
         except MCPServerError as e:
             logger.error(f"MCP server error: {e}")
@@ -225,8 +500,10 @@ class BaseFlowRunner:
             raise FlowExecutionError(str(e), cause=e) from e
             
         except asyncio.CancelledError:
+            # Cancelled from outside (not by `timeout`): MCP servers were torn
+            # down on the way out, the caller's cancellation propagates as is.
             logger.warning("Flow execution was cancelled")
-            raise FlowExecutionError("Flow execution was cancelled")
+            raise
             
         except Exception as e:
             logger.error(f"Unexpected error in flow execution: {e}", exc_info=True)
@@ -235,6 +512,739 @@ class BaseFlowRunner:
                 cause=e
             ) from e
 
+    async def resume(
+        self,
+        run_id: str,
+        output_schema=None,
+        tools: list | None = None,
+        mcp_servers: list | None = None,
+        timeout: float | None = None,
+    ) -> Any:
+        """
+        Continue a persisted run from its last persisted point.
+        
+        The conversation so far is replayed to the agent, a fresh browser is
+        started with the storage state of the last checkpoint, and the agent
+        continues where it stopped. A run that already completed returns its
+        stored result without starting a browser.
+        
+        Args:
+            run_id: Id of a run started with `persist=True` (see `RunStore.list`)
+            output_schema: Output schema of the original run. Defaults to the
+                schema recorded with the run if importable, else RunResult.
+            tools: Custom tools of the original run (tools cannot be persisted)
+            mcp_servers: Additional MCP servers of the original run
+            timeout: Deadline for the resumed execution in seconds (see `run`)
+            
+        Returns:
+            Instance of output_schema with the results of all steps
+            
+        Raises:
+            RunNotFoundError: If no state was persisted for `run_id`
+            FlowExecutionError: If the resumed execution fails
+        """
+        store = RunStore(self.settings.runs_dir)
+        journal = store.open(run_id)
+        state = journal.state
+        output_schema = output_schema or _import_schema(state.output_schema) or RunResult
+
+        if state.status == "completed":
+            stored = store.load_result(run_id)
+            if stored is not None:
+                logger.info(f"Run {run_id} already completed; returning stored result")
+                result = output_schema.model_validate_json(stored)
+                _set_run_id(result, run_id)
+                return result
+
+        logger.info(f"Resuming run {run_id} after {len(state.checkpoints)} checkpointed steps")
+        storage_state = store.storage_state(run_id)
+        prompt = resume_input(state, store.load_items(run_id), storage_state)
+        journal.restart()
+        policy = RetryPolicy(step_retries=0)
+
+        try:
+            return await self._run_flow(
+                prompt, output_schema, tools, mcp_servers, state.trace_name, policy, journal,
+                storage_state=storage_state, timeout=timeout if timeout is not None else self.settings.flow_timeout_seconds,
+            )
+        except MCPServerError as e:
+            logger.error(f"MCP server error: {e}")
+            raise FlowExecutionError(f"Failed to start MCP server: {e}", cause=e) from e
+        except AgentExecutionError as e:
+            logger.error(f"Agent execution error: {e}")
+            raise FlowExecutionError(str(e), cause=e) from e
+        except asyncio.CancelledError:
+            # Cancelled from outside (not by `timeout`): MCP servers were torn
+            # down on the way out, the caller's cancellation propagates as is.
+            logger.warning("Flow execution was cancelled")
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error in flow execution: {e}", exc_info=True)
+            raise FlowExecutionError(f"Unexpected error: {type(e).__name__}: {e}", cause=e) from e
+
+    async def _run_flow(
+        self,
+        user_steps: str | list | Flow,
+        output_schema,
+        tools: list | None,
+        mcp_servers: list | None,
+        trace_name: str,
+        policy: RetryPolicy,
+        journal: RunJournal | None,
+        storage_state: str | None = None,
+        timeout: float | None = None,
+        per_step: int | None = None,
+        output_mode: OutputMode = "full",
+    ) -> Any:
+        """
+        Run the flow (with retries if enabled) and record the outcome in the
+        journal, the run history, the streaming report and the span file.
+        Locator hints are prefetched before the run and the locators it used
+        are stored after it (see `playwright_agent.locators`).
+        """
+        deadline = asyncio.get_running_loop().time() + timeout if timeout else None
+        meter = UsageMeter(output_mode, self.settings.azure_openai_deployment)
+        spans = SpanRecorder(trace_name)
+        started, started_at = time.perf_counter(), time.time()
+        test_id, run_key = current_test_id(trace_name), uuid.uuid4().hex
+        mark_flow_test()
+        run_dir = None
+        if self.settings.run_dirs:
+            run_dir = run_dir_path(
+                self.settings.mcp_isolated_dir, test_id, journal.run_id if journal is not None else run_key[:12],
+            )
+        locators = self._locator_store()
+        texts, hints, hinted = await self._prefetch_locators(locators, user_steps)
+        with use_run_dir(run_dir):
+            reporter = self._reporter()
+            recording = None
+            if self.settings.recording != "off":
+                recording = BrowserRecording(
+                    self.settings.recording, self._output_dir(), self.settings.recording_dir, test_id,
+                )
+                recording.start()
+            listeners: list[Callable[[StepCheckpoint], None]] = []
+            if reporter is not None:
+                reporter.run_started(run_key, test_id, trace_name)
+                listeners.append(lambda checkpoint: reporter.step(run_key, test_id, checkpoint, live=True))
+            if self.settings.span_file is not None:
+                listeners.append(lambda checkpoint: spans.step(checkpoint.step_id, checkpoint.summary))
+            on_checkpoint = None
+            if listeners:
+                def on_checkpoint(checkpoint: StepCheckpoint) -> None:
+                    for listener in listeners:
+                        listener(checkpoint)
+            ctx = RunContext(
+                output_schema, tools, mcp_servers, trace_name, policy, meter, spans,
+                journal=journal, deadline=deadline, per_step=per_step, on_checkpoint=on_checkpoint,
+                run_dir=run_dir, locators=locators, hints=hints, macro_tools=self.settings.macro_tools,
+            )
+            try:
+                if policy.step_retries == 0 or per_step is not None:
+                    recorder = None
+                    if journal is not None:
+                        recorder = _new_recorder(journal.directory / "checkpoints", journal, on_checkpoint)
+                    elif deadline is not None or on_checkpoint is not None:
+                        # Checkpoints are what a timed-out run can report as passed steps (and are streamed live)
+                        recorder = _new_recorder(
+                            self.settings.mcp_output_dir / "checkpoints" / uuid.uuid4().hex, None, on_checkpoint,
+                        )
+                    result = await self._execute(ctx, user_steps, recorder=recorder, storage_state=storage_state)
+                else:
+                    result = await self._run_with_retries(ctx, user_steps)
+            except BaseException as e:
+                if journal is not None:
+                    journal.fail(e)
+                    if isinstance(e, AgentExecutionError) and e.partial_result is None:
+                        e.partial_result = journal.state
+                self._finish_recording(recording, spans, None)
+                self._finish_spans(spans, None)
+                self._record_outcome(
+                    test_id, trace_name, None, started_at, time.perf_counter() - started, e, reporter, run_key,
+                )
+                if run_dir is not None and should_remove(self.settings.run_dir_cleanup, "ERROR"):
+                    remove_run_dir(run_dir)
+                raise
+
+            meter.usage.elapsed_seconds = time.perf_counter() - started
+            self._price(meter.usage)
+            logger.info(f"Flow finished: {meter.usage.describe()}")
+            kept = self._finish_recording(recording, spans, result)
+            timings = self._finish_spans(spans, result)
+            if isinstance(result, RunResult):
+                result._usage = meter.usage
+                result._timings = timings
+                result._recording = str(kept) if kept is not None else None
+                result._output_dir = str(run_dir) if run_dir is not None else None
+            if self.settings.artifact_dir is not None:
+                await self._store_artifacts(result, test_id, run_key)
+            await self._store_locators(locators, result, texts, hinted)
+
+            if journal is not None:
+                if getattr(result, "timed_out", False):
+                    journal.fail(TimeoutError(f"Flow timed out after {timeout}s"))
+                else:
+                    journal.complete(result)
+                _set_run_id(result, journal.run_id)
+            self._record_outcome(
+                test_id, trace_name, result, started_at, meter.usage.elapsed_seconds, None, reporter, run_key,
+            )
+            if run_dir is not None and should_remove(self.settings.run_dir_cleanup, _run_status(result)):
+                remove_run_dir(run_dir)
+                if isinstance(result, RunResult):
+                    result._output_dir = None
+            return result
+
+    def _output_dir(self) -> Path:
+        """Output directory of the current run (see `runtime.run_dirs`), or the shared one."""
+        return current_run_dir() or self.settings.mcp_isolated_dir
+
+    def _locator_store(self) -> LocatorStore | None:
+        """The locator memory (see `playwright_agent.locators`), if `locator_db` is set."""
+        if self.settings.locator_db is None:
+            return None
+        return get_locator_store(
+            self.settings.locator_db, self.settings.locator_max_age_days, self.settings.locator_max_entries,
+        )
+
+    def _locator_tools(self, ctx: RunContext) -> list:
+        """The locator memory tools for `locator_app` in the "tools" locator mode."""
+        if ctx.locators is None or self.settings.locator_mode != "tools":
+            return []
+        return ctx.locators.as_tools(self.settings.locator_app)
+
+    def _tool_instructions(self, ctx: RunContext) -> str:
+        """
+        Instructions for the framework's optional tools: the locator memory
+        (its tool rules, or the run's prefetched hint table) and the macro tools.
+        """
+        text = ctx.hints
+        if ctx.locators is not None and self.settings.locator_mode == "tools":
+            text = LOCATOR_INSTRUCTIONS
+        if ctx.macro_tools:
+            text += MACRO_INSTRUCTIONS
+        return text
+
+    async def _prefetch_locators(
+        self, store: LocatorStore | None, user_steps: Any,
+    ) -> tuple[dict[str, str], str, dict[str, list[Any]]]:
+        """
+        Look up the stored locators of the flow's steps in the "prefetch"
+        locator mode.
+
+        Returns:
+            (step texts by step id, hint table for the instructions, hints by intent)
+        """
+        if store is None or self.settings.locator_mode != "prefetch":
+            return {}, "", {}
+        texts = _step_texts(user_steps)
+        try:
+            hints = await asyncio.to_thread(
+                store.prefetch, self.settings.locator_app, texts.values(), self.settings.locator_hints_per_step,
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not load locator hints: {e}")
+            return texts, "", {}
+        if hints:
+            logger.info(f"Prefetched locator hints for {len(hints)} of {len(texts)} steps")
+        return texts, hint_table(texts, hints), hints
+
+    async def _store_locators(
+        self, store: LocatorStore | None, result: Any, texts: dict[str, str], hints: dict[str, list[Any]],
+    ) -> None:
+        """Write the locators the run used back to the locator memory (never fails the run)."""
+        if store is None or not texts:
+            return
+        try:
+            await asyncio.to_thread(store.write_back, self.settings.locator_app, texts, used_locators(result), hints)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not store locators: {e}")
+
+    def _finish_recording(self, recording: BrowserRecording | None, spans: SpanRecorder, result: Any) -> Path | None:
+        """Keep the run's browser recording if it did not pass, discard it otherwise (never fails the run)."""
+        if recording is None:
+            return None
+        status = _run_status(result)
+        with spans.span("browser.recording", **{"recording.mode": recording.mode, "recording.status": status}) as span:
+            try:
+                kept = recording.finish(status)
+            except OSError as e:
+                logger.warning(f"Could not finish the browser recording: {e}")
+                return None
+            span.attributes["recording.bytes"] = recording.size_bytes
+            span.attributes["recording.kept"] = kept is not None
+        return kept
+
+    async def _store_artifacts(self, result: Any, test_id: str, run_key: str) -> None:
+        """Move the run's final screenshot into the artifact store and point `proof_of_pass` at it."""
+        proof = getattr(result, "proof_of_pass", None)
+        if not proof:
+            return
+        source = Path(proof)
+        if not source.is_absolute() and not source.exists():
+            source = self._output_dir() / source.name
+        if not source.is_file():
+            logger.debug(f"Final screenshot {proof} not found; not stored")
+            return
+        status = _run_status(result)
+        try:
+            store = get_artifact_store(
+                self.settings.artifact_dir, self.settings.artifact_retention(), self.settings.artifact_recompress,
+            )
+            stored = await asyncio.to_thread(store.ingest, source, test_id, run_key, status)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Could not store {source} in the artifact store: {e}")
+            return
+        result.proof_of_pass = str(stored)
+
+    def _price(self, usage: RunUsage) -> None:
+        """Estimate the cost of a run from the price table and warn when it exceeds the budget."""
+        try:
+            usage.price(prices_for(self.settings.token_prices, usage.model))
+        except ValidationError as e:
+            logger.warning(f"Invalid TOKEN_PRICES entry, no cost estimate: {e}")
+            return
+        budget = self.settings.cost_budget
+        if budget is not None and usage.estimated_cost is not None and usage.estimated_cost > budget:
+            expensive = ", ".join(
+                f"{step_id} ~{step.estimated_cost:.4f}" for step_id, step in usage.most_expensive_steps()
+            )
+            logger.warning(
+                f"Flow cost ~{usage.estimated_cost:.4f} {usage.currency} exceeds the budget of {budget}"
+                + (f" (most expensive steps: {expensive})" if expensive else "")
+            )
+
+    def _finish_spans(self, spans: SpanRecorder, result: Any) -> Any:
+        """End the run's spans, log the time breakdown and export the spans if configured."""
+        spans.finish(_run_status(result))
+        timings = spans.breakdown()
+        logger.info(f"Time breakdown: {timings.describe()}")
+        if self.settings.span_file is not None:
+            try:
+                get_exporter(self.settings.span_file).export(spans)
+            except OSError as e:
+                logger.warning(f"Could not export spans: {e}")
+        return timings
+
+    def _reporter(self) -> StreamingReporter | None:
+        if self.settings.report_dir is None:
+            return None
+        try:
+            return get_reporter(self.settings.report_dir)
+        except OSError as e:
+            logger.warning(f"Streaming report disabled: {e}")
+            return None
+
+    def _record_outcome(
+        self,
+        test_id: str,
+        trace_name: str,
+        result: Any,
+        started_at: float,
+        duration: float,
+        error: BaseException | None,
+        reporter: StreamingReporter | None,
+        run_key: str,
+    ) -> None:
+        """Write the run to the history database and the streaming report, if configured (never fails the run)."""
+        if self.settings.history_db is not None:
+            try:
+                RunHistory(self.settings.history_db).record(test_id, result, trace_name, started_at, duration, error)
+            except Exception as e:
+                logger.warning(f"Could not record run history: {type(e).__name__}: {e}")
+        if reporter is not None:
+            try:
+                reporter.run_finished(run_key, test_id, result, duration, error)
+            except Exception as e:
+                logger.warning(f"Could not write streaming report: {type(e).__name__}: {e}")
+
+    async def _execute(
+        self,
+        ctx: RunContext,
+        user_steps: str | list | Flow,
+        *,
+        recorder: CheckpointRecorder | None = None,
+        storage_state: str | None = None,
+        actions: ActionRecorder | None = None,
+    ) -> Any:
+        """
+        Start a browser server and run the agent once.
+        
+        A `Flow` first runs its deterministic steps directly on the browser
+        server; the agent is only started for the steps that remain. In
+        "per_step" mode, steps are executed in groups of `ctx.per_step` by
+        separate agent invocations instead (see `_execute_per_step`).
+        
+        If the loop time `ctx.deadline` passes, the run is cancelled at its
+        next await point and a partial, timed-out result is returned instead.
+        The browser server is always closed within the teardown budget.
+        
+        The agent's browser tool calls are recorded into `actions` and
+        attached to the result (`RunResult.actions`); model usage is added
+        to `ctx.meter`, whose output mode selects the lean or full agent
+        schema. MCP startup, model and tool calls are recorded as
+        `ctx.spans`. With `file_server` enabled the run also gets a
+        filesystem server confined to its output directory. The prefetched
+        locator hints are added to the agent's instructions; in the "tools"
+        locator mode the agent gets the locator memory tools instead (see
+        `playwright_agent.locators`). With `ctx.macro_tools` the agent also
+        gets the composite browser tools (see `integrations.macro_tools`).
+        """
+        actions = actions if actions is not None else ActionRecorder()
+        spans, journal, output_schema, lean = ctx.spans, ctx.journal, ctx.output_schema, ctx.lean
+        hooks: list = [actions, ctx.meter, spans]
+        if journal is not None:
+            if isinstance(user_steps, (str, Flow)):
+                journal.begin_attempt(user_steps.to_prompt() if isinstance(user_steps, Flow) else user_steps)
+            hooks.append(JournalHooks(journal))
+        tools = (ctx.tools or []) + self._locator_tools(ctx)
+        mcp_servers = ctx.mcp_servers
+
+        browser = await self.server_manager.get_browser_server(storage_state=storage_state)
+        if ctx.macro_tools:
+            tools = tools + MacroTools(browser, self.settings.popup_buttons).as_tools()
+        files = None
+        scope = asyncio.timeout_at(ctx.deadline)
+        finished: list[Any] = []
+        try:
+            async with scope:
+                with spans.span("mcp.startup", **{"mcp.server": getattr(browser, "name", "playwright")}):
+                    await browser.connect()
+                if self.settings.file_server:
+                    files = await self.server_manager.get_file_server()
+                    with spans.span("mcp.startup", **{"mcp.server": getattr(files, "name", "files")}):
+                        await files.connect()
+                    mcp_servers = (mcp_servers or []) + [files]
+                if recorder is not None:
+                    recorder.bind(browser)
+                if ctx.per_step is not None:
+                    result = await self._execute_per_step(
+                        ctx, browser, user_steps,
+                        tools=tools, mcp_servers=mcp_servers, recorder=recorder, finished=finished, hooks=hooks,
+                    )
+                    _set_actions(result, actions.actions)
+                    return result
+                done: list[Any] = []
+                if isinstance(user_steps, Flow):
+                    engine = FlowEngine(
+                        browser, self._output_dir(),
+                        on_step_passed=recorder.capture if recorder is not None else None,
+                    )
+                    outcome = await engine.execute(user_steps)
+                    if outcome.complete(user_steps):
+                        proof = outcome.proof or await self._final_screenshot(browser, "success")
+                        direct = _direct_result(output_schema, user_steps, outcome, proof)
+                        if direct is not None:
+                            logger.info("Flow completed without model turns")
+                            return direct
+                    done = outcome.results
+                    user_steps = delegation_prompt(user_steps, outcome)
+
+                default_mcp_servers = [browser]
+                default_tools: list = []
+                instructions = self.instructions
+                instructions += self._tool_instructions(ctx)
+
+                if recorder is not None:
+                    default_tools.append(recorder.as_tool())
+                    instructions += CHECKPOINT_INSTRUCTIONS
+                if lean:
+                    instructions += LEAN_OUTPUT_INSTRUCTIONS
+
+                consolidate_mcps = (mcp_servers or []) + default_mcp_servers
+                consolidate_tools = (tools or []) + default_tools
+                
+                logger.debug(f"Using {len(consolidate_mcps)} MCP servers and {len(consolidate_tools)} tools")
+                
+                runner = AgentRunner(
+                    instructions=instructions,
+                    output_type=lean_schema(output_schema) if lean else output_schema,
+                    mcp_servers=consolidate_mcps,
+                    settings=self.settings,
+                    tools=consolidate_tools,
+                    trace_name=ctx.trace_name,
+                    hooks=hooks,
+                )
+                result = await runner.run(user_steps)
+                if lean:
+                    result = expand(result, output_schema, _step_texts(user_steps))
+                _prepend_steps(result, done)
+                _set_actions(result, actions.actions)
+                return result
+
+        except TimeoutError:
+            if not scope.expired():
+                raise
+            logger.warning("Flow deadline expired; capturing final state and tearing down")
+            proof = await self._final_screenshot(browser)
+            result = _timed_out_result(output_schema, recorder, proof, finished)
+            _set_actions(result, actions.actions)
+            return result
+
+        finally:
+            if files is not None:
+                await self._teardown(files)
+            await self._teardown(browser)
+
+    async def _execute_per_step(
+        self,
+        ctx: RunContext,
+        browser: Any,
+        user_steps: str | list | Flow,
+        *,
+        tools: list,
+        mcp_servers: list | None,
+        recorder: CheckpointRecorder | None,
+        finished: list[Any],
+        hooks: list,
+    ) -> Any:
+        """
+        Execute a flow step by step on an open browser, one short agent
+        invocation per group of `ctx.per_step` steps, and assemble the final
+        result. Failed steps are retried in place `ctx.policy.step_retries`
+        times.
+        
+        `finished` collects the step results as they complete, so a
+        timed-out run can still report them.
+        """
+        group_size, step_retries, lean = ctx.per_step or 1, ctx.policy.step_retries, ctx.lean
+        if not isinstance(user_steps, (str, Flow)):
+            raise AgentExecutionError("Per-step execution needs flow steps, not a conversation to resume")
+        context, units = plan_units(user_steps)
+        if not units:
+            raise AgentExecutionError("No steps found for per-step execution")
+        engine = FlowEngine(browser, self._output_dir()) if isinstance(user_steps, Flow) else None
+        instructions = self.instructions + PER_STEP_INSTRUCTIONS + (LEAN_OUTPUT_INSTRUCTIONS if lean else "")
+        instructions += self._tool_instructions(ctx)
+        actions = next(hook for hook in hooks if isinstance(hook, ActionRecorder))
+        notes: list[str] = []
+        logger.info(f"Executing {len(units)} steps in per-step mode (group size {group_size})")
+
+        def previous() -> str:
+            return f"Step {finished[-1].step_id}: {finished[-1].description}" if finished else "FIRST STEP"
+
+        async def passed(results: list[Any]) -> None:
+            finished.extend(results)
+            if recorder is not None:
+                for step in results:
+                    await recorder.capture(step.step_id, step.actual_result)
+
+        index = 0
+        failed = False
+        while index < len(units) and not failed:
+            unit = units[index]
+            if engine is not None and unit.step is not None and unit.step.deterministic:
+                outcome = await engine.execute(Flow(steps=[unit.step]))
+                if outcome.results:
+                    outcome.results[0].previous_step = previous()
+                    await passed(outcome.results)
+                    index += 1
+                    continue
+
+            group = [unit]
+            for candidate in units[index + 1:index + group_size]:
+                if engine is not None and candidate.step is not None and candidate.step.deterministic:
+                    break
+                group.append(candidate)
+
+            results, retry_reason = [], None
+            for attempt in range(step_retries + 1):
+                actions.step_id = ctx.meter.step_id = group[0].id
+                try:
+                    batch = await self._invoke_steps(
+                        ctx, browser, instructions, context, group,
+                        notes=notes, finished=finished, tools=tools, mcp_servers=mcp_servers,
+                        retry_reason=retry_reason, hooks=hooks,
+                    )
+                except AgentExecutionError as e:
+                    if attempt >= step_retries:
+                        raise
+                    retry_reason = str(e)
+                    logger.warning(f"Step {group[0].id} errored; retry {attempt + 1}/{step_retries}: {e}")
+                    continue
+                reported = {step.step_id: step for step in batch.steps}
+                results = [reported.get(u.id) or self._unreported(u) for u in group]
+                first_bad = next((i for i, r in enumerate(results) if r.status != "PASS"), len(results))
+                if first_bad == len(results):
+                    if batch.notes:
+                        notes.append(batch.notes)
+                    break
+                retry_reason = results[first_bad].exception or results[first_bad].actual_result
+                if attempt < step_retries:
+                    # Keep the steps before the failure; only it and the rest of the group are retried
+                    await passed(results[:first_bad])
+                    index += first_bad
+                    group, results = group[first_bad:], results[first_bad:]
+                    logger.warning(f"Step {group[0].id} failed; retry {attempt + 1}/{step_retries} in place")
+            if engine is not None:
+                engine.invalidate()
+
+            first_bad = next((i for i, r in enumerate(results) if r.status != "PASS"), len(results))
+            await passed(results[:first_bad])
+            failed = first_bad < len(results)
+            if failed:
+                # Anything the agent did after the failed step does not count
+                finished.append(results[first_bad])
+                index += first_bad + 1
+            else:
+                index += len(group)
+
+        if failed:
+            for unit in units[index:]:
+                finished.append(blocked(unit, previous()))
+
+        all_passed = all(step.status == "PASS" for step in finished)
+        proof = await self._final_screenshot(browser, "success" if all_passed else "failure")
+        report = None
+        if extra_fields(ctx.output_schema):
+            page = page_state_text(await browser.call_tool("browser_snapshot", {}))
+            runner = AgentRunner(
+                instructions=self.instructions,
+                output_type=ctx.output_schema,
+                mcp_servers=(mcp_servers or []) + [browser],
+                settings=self.settings,
+                tools=tools,
+                trace_name=f"{ctx.trace_name} [report]",
+                hooks=[hook for hook in hooks if not isinstance(hook, ActionRecorder)],
+            )
+            report = await runner.run(REPORT_PROMPT.format(prior=summarize(finished, notes), page=page))
+        return assemble(ctx.output_schema, list(finished), proof, report)
+
+    async def _invoke_steps(
+        self,
+        ctx: RunContext,
+        browser: Any,
+        instructions: str,
+        context: str,
+        group: list[StepUnit],
+        *,
+        notes: list[str],
+        finished: list[Any],
+        tools: list,
+        mcp_servers: list | None,
+        retry_reason: str | None,
+        hooks: list,
+    ) -> StepBatch:
+        """Run one short agent invocation for a group of steps."""
+        page = page_state_text(await browser.call_tool("browser_snapshot", {}))
+        prompt = build_step_prompt(context, group, summarize(finished, notes), page, retry_reason)
+        runner = AgentRunner(
+            instructions=instructions,
+            output_type=LeanStepBatch if ctx.lean else StepBatch,
+            mcp_servers=(mcp_servers or []) + [browser],
+            settings=self.settings,
+            tools=tools,
+            trace_name=f"{ctx.trace_name} [step {group[0].id}]",
+            hooks=hooks,
+        )
+        batch = await runner.run(prompt)
+        if ctx.lean:
+            texts = {unit.id: unit.text for unit in group}
+            batch = StepBatch(steps=expand_steps(batch.steps, texts), notes=batch.notes)
+        return batch
+
+    @staticmethod
+    def _unreported(unit: StepUnit) -> Any:
+        return StepResult(
+            step_id=unit.id,
+            description=unit.text,
+            previous_step="",
+            expected_result=unit.text,
+            actual_result="The agent did not report this step",
+            status="FAIL",
+            exception="Step result missing from the agent output",
+            locator=[],
+            next_step="Re-run the step",
+        )
+
+    async def _final_screenshot(self, browser: Any, prefix: str = "timeout") -> str | None:
+        """Take a last full-page screenshot, bounded by half the teardown budget."""
+        filename = f"{prefix}_{time.strftime('%Y%m%d-%H%M%S')}.png"
+        try:
+            async with asyncio.timeout(self.settings.teardown_timeout_seconds / 2):
+                result = await browser.call_tool("browser_take_screenshot", {"filename": filename, "fullPage": True})
+            return str(self._output_dir() / filename) if not getattr(result, "isError", False) else None
+        except Exception as e:
+            logger.warning(f"Could not take final screenshot after timeout: {type(e).__name__}: {e}")
+            return None
+
+    async def _teardown(self, browser: Any) -> None:
+        """Close a run's MCP server (the browser, or its file server) within the teardown budget."""
+        try:
+            async with asyncio.timeout(self.settings.teardown_timeout_seconds):
+                await browser.cleanup()
+        except TimeoutError:
+            logger.error(
+                f"{_server_label(browser)} MCP server did not shut down within {self.settings.teardown_timeout_seconds}s"
+            )
+        except Exception as e:
+            logger.warning(f"Error while closing {_server_label(browser).lower()} MCP server: {type(e).__name__}: {e}")
+
+    async def _run_with_retries(self, ctx: RunContext, user_steps: str | Flow) -> Any:
+        """
+        Run the flow, resuming from the last checkpoint after each failure
+        (up to `ctx.policy.step_retries` times).
+        
+        A run counts as failed when the agent reports FAIL or raises an
+        AgentExecutionError. Steps that passed in earlier attempts are
+        carried over into the final result.
+        """
+        policy, journal = ctx.policy, ctx.journal
+        if journal is not None:
+            checkpoint_dir = journal.directory / "checkpoints"
+        else:
+            checkpoint_dir = self.settings.mcp_output_dir / "checkpoints" / uuid.uuid4().hex
+        checkpoints: list[StepCheckpoint] = []
+        passed_steps: dict[str, Any] = {}
+        prompt = user_steps
+        storage_state: str | None = None
+        attempt = 0
+
+        recorded: list[RecordedAction] = []
+        while True:
+            resumed_from = list(checkpoints)
+            recorder = _new_recorder(checkpoint_dir, journal, ctx.on_checkpoint)
+            actions = ActionRecorder()
+            result, error = None, None
+            try:
+                result = await self._execute(
+                    ctx, prompt, recorder=recorder, storage_state=storage_state, actions=actions,
+                )
+            except AgentExecutionError as e:
+                error = e
+            checkpoints.extend(recorder.checkpoints)
+            # Actions of steps carried over from earlier attempts come first
+            carried_ids = {c.step_id for c in resumed_from}
+            recorded = [a for a in recorded if a.step_id in carried_ids] + actions.actions
+            _set_actions(result, recorded)
+
+            if getattr(result, "steps", None) is not None:
+                if resumed_from:
+                    _prepend_steps(result, carried_steps(resumed_from, passed_steps))
+                passed_steps.update({step.step_id: step for step in result.steps if step.status == "PASS"})
+
+            finished = result is not None and (
+                getattr(result, "status", None) == "PASS" or getattr(result, "timed_out", False)
+            )
+            if finished or attempt >= policy.step_retries:
+                if error is not None:
+                    raise error
+                return result
+
+            attempt += 1
+            if policy.resume_from_checkpoint and checkpoints:
+                last = checkpoints[-1]
+                logger.warning(
+                    f"Flow failed; retry {attempt}/{policy.step_retries} resuming after step {last.step_id}"
+                )
+                original = user_steps.to_prompt() if isinstance(user_steps, Flow) else user_steps
+                prompt = build_resume_prompt(original, checkpoints)
+                storage_state = last.storage_state_path
+            else:
+                logger.warning(f"Flow failed; retry {attempt}/{policy.step_retries} from the first step")
+                checkpoints, passed_steps, recorded = [], {}, []
+                prompt, storage_state = user_steps, None
+
     async def run_from_file(
         self, 
         file_path: str, 
@@ -242,6 +1252,9 @@ class BaseFlowRunner:
         tools: list | None = None, 
         mcp_servers: list | None = None,
         trace_name: str = "web_flow",
+        variables: dict[str, Any] | None = None,
+        direct_steps: bool = False,
+        **run_options: Any,
     ) -> Any:
         """
         Execute a web automation flow from a markdown file.
@@ -249,30 +1262,52 @@ class BaseFlowRunner:
         Reads test steps from a file and executes them. Useful for
         data-driven testing with steps stored in separate files.
         
+        Markdown files with a steps table are compiled (and cached by content
+        hash, see `playwright_agent.dsl.markdown`): placeholders are filled
+        from `variables` and checked before any browser is started, and the
+        agent receives a compact, normalized step list. Other files are sent
+        as they are.
+        
         Args:
             file_path: Path to file containing test steps (e.g., .md file)
             output_schema: Pydantic model class for structured output
             tools: Optional list of custom tools
             mcp_servers: Optional list of additional MCP servers
             trace_name: Name for this run in OpenAI trace dashboard
+            variables: Values for `{placeholder}`s in the file
+            direct_steps: Run steps that compile to deterministic actions
+                directly on the browser, without model turns (see
+                `playwright_agent.dsl`)
+            **run_options: Further options passed to `run` (retry_policy,
+                persist, run_id, timeout)
             
         Returns:
             Instance of output_schema with test results
             
         Raises:
             FileNotFoundError: If steps file doesn't exist
+            FlowDefinitionError: If a placeholder has no value in `variables`
             FlowExecutionError: If the flow execution fails
             
         Example:
             result = await runner.run_from_file(
-                "tests/flows/login.md",
+                "tests/data/flows/ICJ.md",
                 RunResult,
-                trace_name="test_login"
+                variables={"url": url, "username": username, "password": password},
+                trace_name="test_icj"
             )
         """
         steps_path = Path(file_path)
         if not steps_path.exists():
             raise FileNotFoundError(f"Steps file not found: {file_path}")
             
-        steps = steps_path.read_text(encoding="utf-8")
-        return await self.run(steps, output_schema, tools, mcp_servers, trace_name)
\ No newline at end of file
+        text = steps_path.read_text(encoding="utf-8")
+        try:
+            compiled = compile_text(text)
+        except FlowDefinitionError as e:
+            logger.debug(f"{file_path} is not a markdown steps table ({e}); sending it as is")
+            steps: str | Flow = text.format_map(variables) if variables else text
+        else:
+            rendered = compiled.render(variables or {})
+            steps = rendered.to_flow() if direct_steps else rendered.to_prompt()
+        return await self.run(steps, output_schema, tools, mcp_servers, trace_name, **run_options)
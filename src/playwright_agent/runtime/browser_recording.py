@@ -0,0 +1,119 @@
+"""
+Retain-on-Failure Browser Recording
+===================================
+
+A Playwright trace (DOM snapshots, network, console, screenshots per
+action) is the fastest way to debug a failed agent run, but recording one
+for every run costs disk I/O and time on the passing majority. With
+recording enabled the browser server records every run, and the framework
+keeps the recording only when the run did not pass:
+
+    RECORDING=trace          # or trace+video
+    RECORDING_DIR=reports/recordings
+
+Modes
+-----
+- `off` (default): nothing is recorded
+- `trace`: the browser server is started with `--save-trace`
+- `trace+video`: additionally `--save-video=<VIDEO_SIZE>` (default
+  800x600)
+
+Playwright MCP writes recordings below `traces/` in its output directory,
+which is the run's own directory (see `runtime.run_dirs`). After the run,
+the files written there during the run are moved to
+`RECORDING_DIR/<test>-<time>/` when the run's status is FAIL, TIMEOUT or
+ERROR, and deleted otherwise. The kept directory is exposed as
+`RunResult.recording`; open a trace with `npx playwright show-trace`.
+
+Cost
+----
+Every run logs the recording's size and the time spent keeping or
+discarding it, and records it as a `browser.recording` span (see
+`runtime.spans`), so the modes can be compared with `SPAN_FILE` or the
+benchmarks' `--compare`.
+
+"""
+
+from __future__ import annotations
+import logging
+import re
+import shutil
+import time
+from pathlib import Path
+from typing import Literal
+
+logger = logging.getLogger("playwright_agent.browser_recording")
+
+RecordingMode = Literal["off", "trace", "trace+video"]
+
+KEEP_STATUSES = ("FAIL", "TIMEOUT", "ERROR")
+TRACES_SUBDIR = "traces"
+
+
+def browser_args(mode: RecordingMode, video_size: str) -> list[str]:
+    """Playwright MCP command-line options for a recording mode."""
+    if mode == "off":
+        return []
+    args = ["--save-trace"]
+    if mode == "trace+video":
+        args.append(f"--save-video={video_size}")
+    return args
+
+
+class BrowserRecording:
+    """
+    The browser recording of one run.
+
+    Attributes:
+        mode: Recording mode
+        source: Directory the browser server records into
+        destination: Directory failed runs' recordings are moved to
+        size_bytes: Size of the run's recording (set by `finish`)
+    """
+
+    def __init__(self, mode: RecordingMode, output_dir: str | Path, keep_dir: str | Path, name: str):
+        self.mode = mode
+        self.source = Path(output_dir) / TRACES_SUBDIR
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")[:80] or "flow"
+        self.destination = Path(keep_dir) / f"{safe}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.size_bytes = 0
+        self._before: dict[Path, float] = {}
+        self._started = 0.0
+
+    def start(self) -> None:
+        """Remember what the recording directory held before the run."""
+        self._started = time.time()
+        if self.source.is_dir():
+            self._before = {path: path.stat().st_mtime for path in self.source.rglob("*") if path.is_file()}
+
+    def _files(self) -> list[Path]:
+        """Files written to the recording directory since `start`."""
+        if not self.source.is_dir():
+            return []
+        return [
+            path for path in self.source.rglob("*")
+            if path.is_file() and self._before.get(path, -1.0) < path.stat().st_mtime
+        ]
+
+    def finish(self, status: str) -> Path | None:
+        """
+        Keep the run's recording if `status` is a failure, delete it otherwise.
+
+        Returns:
+            Directory of the kept recording, or None
+        """
+        files = self._files()
+        self.size_bytes = sum(path.stat().st_size for path in files)
+        if not files:
+            return None
+        if status not in KEEP_STATUSES:
+            for path in files:
+                path.unlink(missing_ok=True)
+            logger.debug(f"Discarded {len(files)} recording files ({self.size_bytes} bytes) of a {status} run")
+            return None
+        for path in files:
+            target = self.destination / path.relative_to(self.source)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(path, target)
+        logger.info(f"Kept browser recording of the {status} run in {self.destination} ({self.size_bytes} bytes)")
+        return self.destination
@@ -0,0 +1,260 @@
+"""
+Step Checkpoints and Retry Policy
+=================================
+
+This module lets `BaseFlowRunner` resume a flaky flow from the last step
+that passed instead of re-running every step (including the login).
+
+How It Works
+------------
+1. The agent gets a `record_checkpoint` tool and is asked to call it after
+   every step it has verified as PASS.
+2. Each call captures a lightweight `StepCheckpoint`: the current URL, the
+   browser storage state (cookies + localStorage, written in Playwright's
+   storage-state format) and the agent's one-line summary of the step.
+3. If the run fails and the `RetryPolicy` allows it, a fresh browser is
+   started with the saved storage state and the agent is told to open the
+   checkpoint URL and continue with the remaining steps only.
+
+Usage
+-----
+    from playwright_agent import BaseFlowRunner, RunResult, RetryPolicy
+
+    runner = BaseFlowRunner()
+    result = await runner.run(
+        steps,
+        RunResult,
+        retry_policy=RetryPolicy(step_retries=2),
+    )
+
+Limitations
+-----------
+Storage state is read from the page with `browser_evaluate`, so HttpOnly
+cookies are not captured. Apps that keep their session only in HttpOnly
+cookies will resume logged out and the agent will have to log in again.
+
+"""
+
+from __future__ import annotations
+import json
+import logging
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+from pydantic import BaseModel, Field
+
+from playwright_agent.integrations.playwright_mcp import evaluate
+from playwright_agent.schemas.results import StepResult
+
+# OpenAI Agents SDK decorator for creating tools
+from agents import function_tool  # type: ignore[import-not-found]
+
+logger = logging.getLogger("playwright_agent.checkpoints")
+
+# Reads everything the checkpoint needs from the page in a single tool call
+_STORAGE_SNAPSHOT_JS = (
+    "() => ({"
+    " url: location.href,"
+    " origin: location.origin,"
+    " cookies: document.cookie,"
+    " localStorage: Object.fromEntries(Object.entries(localStorage))"
+    " })"
+)
+
+CHECKPOINT_INSTRUCTIONS = """
+**Checkpoints**
+- After each step you have verified as PASS, call `record_checkpoint` with the step id
+  and a one-line summary of what was done, before moving on to the next step.
+- Do not record checkpoints for failed or blocked steps.
+"""
+
+
+class RetryPolicy(BaseModel):
+    """
+    Step-level retry configuration for `BaseFlowRunner.run`.
+
+    Attributes:
+        step_retries: How many times a failed run may be resumed before the
+            flow is reported as FAIL (0 disables retries)
+        resume_from_checkpoint: Resume from the last passed step; if False,
+            every retry re-runs the whole flow
+    """
+    step_retries: int = Field(0, ge=0, description="Number of resume attempts after a failure")
+    resume_from_checkpoint: bool = Field(True, description="Resume from the last good checkpoint")
+
+
+class StepCheckpoint(BaseModel):
+    """
+    Browser state captured right after a step passed.
+
+    Attributes:
+        step_id: Identifier of the step that passed
+        summary: Agent's one-line summary of the step
+        url: Page URL at the time of the checkpoint
+        storage_state_path: Playwright storage-state JSON file, if captured
+        created_at: Unix timestamp of the capture
+    """
+    step_id: str
+    summary: str
+    url: str | None = None
+    storage_state_path: str | None = None
+    created_at: float = Field(default_factory=time.time)
+
+
+def _storage_state(snapshot: dict[str, Any]) -> dict[str, Any]:
+    """Convert a page storage snapshot into Playwright's storage-state format."""
+    url = snapshot.get("url") or ""
+    parsed = urlparse(url)
+    cookies = []
+    for pair in (snapshot.get("cookies") or "").split(";"):
+        name, sep, value = pair.strip().partition("=")
+        if not sep or not name:
+            continue
+        cookies.append({
+            "name": name,
+            "value": value,
+            "domain": parsed.hostname or "",
+            "path": "/",
+            "expires": -1,
+            "httpOnly": False,
+            "secure": parsed.scheme == "https",
+            "sameSite": "Lax",
+        })
+    local_storage = [
+        {"name": key, "value": str(value)}
+        for key, value in (snapshot.get("localStorage") or {}).items()
+    ]
+    origins = []
+    if snapshot.get("origin") and snapshot.get("origin") != "null":
+        origins.append({"origin": snapshot["origin"], "localStorage": local_storage})
+    return {"cookies": cookies, "origins": origins}
+
+
+class CheckpointRecorder:
+    """
+    Collects `StepCheckpoint`s during a run via the `record_checkpoint` tool.
+
+    The recorder is created before the browser starts (so its tool can be
+    handed to the agent) and bound to the connected browser server once it
+    is available.
+
+    Attributes:
+        directory: Where storage-state files are written
+        checkpoints: Checkpoints recorded so far, in order
+        listeners: Callables invoked with every new checkpoint
+    """
+
+    def __init__(self, directory: Path, listeners: list[Callable[[StepCheckpoint], None]] | None = None):
+        self.directory = Path(directory)
+        self.checkpoints: list[StepCheckpoint] = []
+        self.listeners = list(listeners or [])
+        self._browser: Any = None
+
+    @property
+    def last(self) -> StepCheckpoint | None:
+        """The most recent checkpoint, if any."""
+        return self.checkpoints[-1] if self.checkpoints else None
+
+    def bind(self, browser: Any) -> None:
+        """Attach the connected Playwright MCP server used to read page state."""
+        self._browser = browser
+
+    async def capture(self, step_id: str, summary: str) -> StepCheckpoint:
+        """
+        Capture the current page state as a checkpoint for `step_id`.
+
+        Capturing never fails the step: if the page state cannot be read the
+        checkpoint is still recorded, just without URL/storage state.
+        """
+        checkpoint = StepCheckpoint(step_id=str(step_id), summary=summary)
+        if self._browser is not None:
+            try:
+                snapshot = await evaluate(self._browser, _STORAGE_SNAPSHOT_JS)
+                if isinstance(snapshot, dict):
+                    checkpoint.url = snapshot.get("url")
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    path = self.directory / f"step_{_safe(step_id)}_{uuid.uuid4().hex[:8]}.json"
+                    path.write_text(json.dumps(_storage_state(snapshot)), encoding="utf-8")
+                    checkpoint.storage_state_path = str(path)
+            except Exception as e:
+                logger.warning(f"Could not capture browser state for step {step_id}: {e}")
+        self.checkpoints.append(checkpoint)
+        for listener in self.listeners:
+            listener(checkpoint)
+        logger.info(f"Checkpoint recorded after step {step_id}")
+        return checkpoint
+
+    def as_tool(self):
+        """Return the `record_checkpoint` function tool bound to this recorder."""
+        recorder = self
+
+        @function_tool
+        async def record_checkpoint(step_id: str, summary: str) -> str:
+            """
+            Record a checkpoint after a step has been verified as PASS.
+
+            Args:
+                step_id: Identifier of the step that just passed
+                summary: One-line summary of what was done in the step
+            """
+            await recorder.capture(step_id, summary)
+            return f"Checkpoint recorded for step {step_id}"
+
+        return record_checkpoint
+
+
+def _safe(value: str) -> str:
+    return "".join(c if c.isalnum() else "_" for c in str(value))[:40]
+
+
+def build_resume_prompt(user_steps: str, checkpoints: list[StepCheckpoint]) -> str:
+    """
+    Build the prompt for resuming a flow after its last good checkpoint.
+
+    Args:
+        user_steps: The original flow steps
+        checkpoints: Checkpoints recorded so far (all attempts), in order
+
+    Returns:
+        Prompt telling the agent which steps already passed and where to resume
+    """
+    last = checkpoints[-1]
+    done = "\n".join(f"- Step {c.step_id}: {c.summary}" for c in checkpoints)
+    location = f"Open {last.url} first; the browser session state has been restored.\n" if last.url else ""
+    return (
+        "RESUMING A PREVIOUS RUN FROM A CHECKPOINT.\n"
+        f"These steps already PASSED and must NOT be repeated:\n{done}\n\n"
+        f"{location}"
+        f"Continue with the step right after step {last.step_id} and execute only the remaining steps. "
+        "Report only the remaining steps in `steps`.\n\n"
+        f"Original steps:\n{user_steps.strip()}"
+    )
+
+
+def carried_steps(checkpoints: list[StepCheckpoint], previous: dict[str, Any]) -> list[Any]:
+    """
+    Step results to carry over into a resumed run, one per checkpoint.
+
+    Uses the step result reported by an earlier attempt when there is one,
+    otherwise synthesizes a PASS `StepResult` from the checkpoint summary.
+    """
+    steps = []
+    for checkpoint in checkpoints:
+        step = previous.get(checkpoint.step_id)
+        if step is None:
+            step = StepResult(
+                step_id=checkpoint.step_id,
+                description=checkpoint.summary,
+                previous_step="Reported from step checkpoint",
+                expected_result=checkpoint.summary,
+                actual_result=checkpoint.summary,
+                status="PASS",
+                exception=None,
+                locator=[],
+                next_step="Passed and checkpointed; no further details were reported",
+            )
+        steps.append(step)
+    return steps
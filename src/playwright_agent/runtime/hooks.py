@@ -0,0 +1,82 @@
+"""
+Run Lifecycle Hooks
+===================
+
+The OpenAI Agents SDK accepts a single `RunHooks` object per run. The
+framework attaches several independent observers (run journaling, and any
+future recorders), so `CompositeRunHooks` fans every lifecycle callback
+out to a list of hooks in order.
+
+Usage
+-----
+    hooks = CompositeRunHooks([JournalHooks(journal), MyHooks()])
+    await Runner.run(agent, input=prompt, hooks=hooks)
+
+"""
+
+from __future__ import annotations
+import json
+from typing import Any
+
+# OpenAI Agents SDK lifecycle hooks
+from agents import RunHooks  # type: ignore[import-not-found]
+
+
+def tool_output_text(result: Any) -> str:
+    """
+    Flatten a tool result (as seen by `on_tool_end`) into text.
+
+    MCP tools return either a string, a `{"type": "text", "text": ...}`
+    item or a list of such items (images are skipped).
+    """
+    if isinstance(result, str):
+        return result
+    items = result if isinstance(result, list) else [result]
+    texts = []
+    for item in items:
+        if isinstance(item, dict):
+            if item.get("type", "text") == "text" and "text" in item:
+                texts.append(str(item["text"]))
+        elif getattr(item, "text", None) is not None:
+            texts.append(str(item.text))
+    if texts:
+        return "\n".join(texts)
+    try:
+        return json.dumps(result, default=str)
+    except (TypeError, ValueError):
+        return str(result)
+
+
+class CompositeRunHooks(RunHooks):
+    """Dispatch every run lifecycle callback to each hook in `hooks`, in order."""
+
+    def __init__(self, hooks: list[RunHooks]):
+        self.hooks = list(hooks)
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        for hook in self.hooks:
+            await hook.on_llm_start(context, agent, system_prompt, input_items)
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        for hook in self.hooks:
+            await hook.on_llm_end(context, agent, response)
+
+    async def on_agent_start(self, context, agent) -> None:
+        for hook in self.hooks:
+            await hook.on_agent_start(context, agent)
+
+    async def on_agent_end(self, context, agent, output) -> None:
+        for hook in self.hooks:
+            await hook.on_agent_end(context, agent, output)
+
+    async def on_handoff(self, context, from_agent, to_agent) -> None:
+        for hook in self.hooks:
+            await hook.on_handoff(context, from_agent, to_agent)
+
+    async def on_tool_start(self, context, agent, tool) -> None:
+        for hook in self.hooks:
+            await hook.on_tool_start(context, agent, tool)
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        for hook in self.hooks:
+            await hook.on_tool_end(context, agent, tool, result)
@@ -0,0 +1,298 @@
+"""
+Run Usage Metrics
+=================
+
+Model usage and latency of a flow run, collected with run hooks:
+
+- `requests`, `input_tokens`, `output_tokens`, `cached_tokens`,
+  `reasoning_tokens`: summed over every model call of the run (all agent
+  invocations and retries)
+- `turns`, `tool_calls`: model turns and tool calls of the run
+- `calls`: one record per model call (tokens, latency, step)
+- `steps`: the same counts per flow step
+- `model_seconds`: time spent waiting for model responses
+- `elapsed_seconds`: wall-clock time of the whole run
+
+The totals are attached to the result (`RunResult.usage`) and logged once
+per flow.
+
+Steps are attributed like recorded actions (see `runtime.recording`): the
+model and tool calls since the previous `record_checkpoint` call belong to
+the step it checkpoints; in per-step mode the current step group is known
+up front. Calls after the last checkpoint stay unattributed.
+
+Estimated Cost
+--------------
+With a price table (`TOKEN_PRICES`, JSON, prices per million tokens keyed
+by deployment name, `default` as fallback) each run gets an
+`estimated_cost`, in total and per step:
+
+    TOKEN_PRICES={"gpt-4.1": {"input": 2.0, "cached_input": 0.5, "output": 8.0}}
+    COST_BUDGET=0.25
+
+Cached input tokens are priced at `cached_input` (default: `input`);
+reasoning tokens are part of the output tokens. A run whose estimate
+exceeds `COST_BUDGET` logs a warning; the run itself is not stopped.
+
+Comparing Output Modes
+----------------------
+Output tokens are the slowest thing the model produces, so the lean output
+schema (see `schemas.lean`) mainly saves model time. To measure the saving
+for a flow, run it in both modes:
+
+    from playwright_agent.runtime.metrics import compare_output_modes
+
+    report = await compare_output_modes(runner, steps, RunResult)
+    print(report["saved_seconds"], report["saved_output_tokens"])
+
+"""
+
+from __future__ import annotations
+import logging
+import time
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from playwright_agent.runtime.recording import CHECKPOINT_TOOL, _arguments
+
+# OpenAI Agents SDK lifecycle hooks
+from agents import RunHooks  # type: ignore[import-not-found]
+
+logger = logging.getLogger("playwright_agent.metrics")
+
+
+TOKENS_PER_PRICE_UNIT = 1_000_000
+
+
+class TokenPrices(BaseModel):
+    """
+    Prices of one model, per million tokens.
+
+    Attributes:
+        input: Uncached input tokens
+        cached_input: Cached input tokens (None = same as `input`)
+        output: Output tokens (reasoning tokens included)
+        currency: Currency of the prices
+    """
+    input: float
+    output: float
+    cached_input: float | None = None
+    currency: str = "USD"
+
+    def cost(self, input_tokens: int, cached_tokens: int, output_tokens: int) -> float:
+        cached_price = self.input if self.cached_input is None else self.cached_input
+        return (
+            (input_tokens - cached_tokens) * self.input + cached_tokens * cached_price + output_tokens * self.output
+        ) / TOKENS_PER_PRICE_UNIT
+
+
+def prices_for(table: dict[str, Any], model: str | None) -> TokenPrices | None:
+    """The prices of `model` in a price table (falling back to its `default` entry), or None."""
+    entry = table.get(model) if model else None
+    if entry is None:
+        entry = table.get("default")
+    return TokenPrices.model_validate(entry) if entry is not None else None
+
+
+class ModelCall(BaseModel):
+    """
+    Usage of one model call.
+
+    Attributes:
+        step_id: Flow step the call belongs to (None until attributed)
+        input_tokens: Input tokens, cached ones included
+        cached_tokens: Input tokens served from the prompt cache
+        output_tokens: Output tokens, reasoning ones included
+        reasoning_tokens: Reasoning tokens
+        seconds: Time until the response was complete
+    """
+    step_id: str | None = None
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    reasoning_tokens: int = 0
+    seconds: float = 0.0
+
+
+class StepUsage(BaseModel):
+    """Model usage of one flow step (see `RunUsage` for the fields)."""
+    turns: int = 0
+    tool_calls: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    reasoning_tokens: int = 0
+    model_seconds: float = 0.0
+    estimated_cost: float | None = None
+
+
+class RunUsage(BaseModel):
+    """
+    Model usage and timing of one flow run.
+
+    Attributes:
+        requests: Number of model requests (as counted by the SDK)
+        turns: Number of model turns
+        tool_calls: Number of tool calls
+        input_tokens: Input tokens over all model calls, cached ones included
+        cached_tokens: Input tokens served from the prompt cache
+        output_tokens: Output tokens over all model calls, reasoning ones included
+        reasoning_tokens: Reasoning tokens over all model calls
+        model_seconds: Time spent waiting for model responses
+        elapsed_seconds: Wall-clock duration of the run
+        output_mode: Output schema mode the run used ("full" or "lean")
+        model: Model (deployment) the run used
+        calls: Usage of each model call, in order
+        steps: Usage per flow step id
+        estimated_cost: Cost estimate from the price table (None = no prices)
+        currency: Currency of the estimates
+    """
+    requests: int = 0
+    turns: int = 0
+    tool_calls: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    reasoning_tokens: int = 0
+    model_seconds: float = 0.0
+    elapsed_seconds: float = 0.0
+    output_mode: str = "full"
+    model: str | None = None
+    calls: list[ModelCall] = Field(default_factory=list)
+    steps: dict[str, StepUsage] = Field(default_factory=dict)
+    estimated_cost: float | None = None
+    currency: str | None = None
+
+    def price(self, prices: TokenPrices | None) -> None:
+        """Set the cost estimates of the run and of its steps."""
+        if prices is None:
+            return
+        self.currency = prices.currency
+        self.estimated_cost = prices.cost(self.input_tokens, self.cached_tokens, self.output_tokens)
+        for step in self.steps.values():
+            step.estimated_cost = prices.cost(step.input_tokens, step.cached_tokens, step.output_tokens)
+
+    def most_expensive_steps(self, limit: int = 3) -> list[tuple[str, StepUsage]]:
+        """Steps by estimated cost (or by tokens without prices), most expensive first."""
+        return sorted(
+            self.steps.items(),
+            key=lambda item: (item[1].estimated_cost or 0.0, item[1].input_tokens + item[1].output_tokens),
+            reverse=True,
+        )[:limit]
+
+    def describe(self) -> str:
+        cost = f", ~{self.estimated_cost:.4f} {self.currency}" if self.estimated_cost is not None else ""
+        return (
+            f"{self.turns} model calls, {self.tool_calls} tool calls, {self.input_tokens} input "
+            f"({self.cached_tokens} cached) / {self.output_tokens} output ({self.reasoning_tokens} reasoning) tokens, "
+            f"{self.model_seconds:.1f}s model time, {self.elapsed_seconds:.1f}s total ({self.output_mode} output){cost}"
+        )
+
+
+def _details(usage: Any, field: str, name: str) -> int:
+    return getattr(getattr(usage, field, None), name, 0) or 0
+
+
+class UsageMeter(RunHooks):
+    """
+    Run hooks that add up model usage, tool calls and model latency into
+    `usage`, per model call and per step.
+
+    Attributes:
+        step_id: Step the following calls belong to when it is known up
+            front (per-step mode); otherwise checkpoints attribute them
+    """
+
+    def __init__(self, output_mode: str = "full", model: str | None = None):
+        self.usage = RunUsage(output_mode=output_mode, model=model)
+        self.step_id: str | None = None
+        self._started: float | None = None
+        self._pending_tools = 0
+
+    def _step(self, step_id: str) -> StepUsage:
+        return self.usage.steps.setdefault(step_id, StepUsage())
+
+    def _attribute(self, call: ModelCall) -> None:
+        step = self._step(call.step_id)
+        step.turns += 1
+        step.input_tokens += call.input_tokens
+        step.cached_tokens += call.cached_tokens
+        step.output_tokens += call.output_tokens
+        step.reasoning_tokens += call.reasoning_tokens
+        step.model_seconds += call.seconds
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        self._started = time.perf_counter()
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        call = ModelCall(step_id=self.step_id)
+        if self._started is not None:
+            call.seconds = time.perf_counter() - self._started
+            self._started = None
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            call.input_tokens = getattr(usage, "input_tokens", 0) or 0
+            call.output_tokens = getattr(usage, "output_tokens", 0) or 0
+            call.cached_tokens = _details(usage, "input_tokens_details", "cached_tokens")
+            call.reasoning_tokens = _details(usage, "output_tokens_details", "reasoning_tokens")
+            self.usage.requests += getattr(usage, "requests", 0) or 1
+        self.usage.turns += 1
+        self.usage.model_seconds += call.seconds
+        self.usage.input_tokens += call.input_tokens
+        self.usage.output_tokens += call.output_tokens
+        self.usage.cached_tokens += call.cached_tokens
+        self.usage.reasoning_tokens += call.reasoning_tokens
+        self.usage.calls.append(call)
+        if call.step_id is not None:
+            self._attribute(call)
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        self.usage.tool_calls += 1
+        name = getattr(context, "tool_name", None) or getattr(tool, "name", "")
+        if self.step_id is not None:
+            self._step(self.step_id).tool_calls += 1
+            return
+        if name != CHECKPOINT_TOOL:
+            self._pending_tools += 1
+            return
+        step_id = str(_arguments(getattr(context, "tool_arguments", None)).get("step_id", "")) or None
+        if step_id is None:
+            return
+        for call in self.usage.calls:
+            if call.step_id is None:
+                call.step_id = step_id
+                self._attribute(call)
+        self._step(step_id).tool_calls += self._pending_tools + 1
+        self._pending_tools = 0
+
+
+async def compare_output_modes(runner: Any, user_steps: Any, output_schema, **run_options: Any) -> dict[str, Any]:
+    """
+    Run a flow once with the full and once with the lean output schema.
+
+    Args:
+        runner: A `BaseFlowRunner`
+        user_steps: Flow steps (see `BaseFlowRunner.run`)
+        output_schema: Output schema for both runs
+        **run_options: Further options for `run`
+
+    Returns:
+        {"full": RunUsage, "lean": RunUsage, "saved_seconds": float,
+         "saved_model_seconds": float, "saved_output_tokens": int}
+    """
+    full = await runner.run(user_steps, output_schema, output_mode="full", **run_options)
+    lean = await runner.run(user_steps, output_schema, output_mode="lean", **run_options)
+    full_usage, lean_usage = full.usage, lean.usage
+    report = {
+        "full": full_usage,
+        "lean": lean_usage,
+        "saved_seconds": full_usage.elapsed_seconds - lean_usage.elapsed_seconds,
+        "saved_model_seconds": full_usage.model_seconds - lean_usage.model_seconds,
+        "saved_output_tokens": full_usage.output_tokens - lean_usage.output_tokens,
+    }
+    logger.info(
+        f"Lean output saved {report['saved_output_tokens']} output tokens and "
+        f"{report['saved_model_seconds']:.1f}s model time ({report['saved_seconds']:.1f}s total)"
+    )
+    return report
@@ -0,0 +1,227 @@
+"""
+Per-Step Execution Mode
+=======================
+
+In the default ("flow") mode one agent conversation executes the whole
+flow, so the model call for step 15 re-reads the instructions, every tool
+call and every page snapshot of steps 1-14: input tokens grow
+quadratically with the flow length.
+
+In "per_step" mode the browser MCP session stays open for the whole flow,
+but every step (or small group of steps) is a separate, short agent
+invocation that only receives:
+
+- the step text (plus the flow's title and notes),
+- a compact summary of the steps before it (one line each), and
+- the current page state (URL + ARIA snapshot), read directly from the
+  browser without a model turn.
+
+The `StepResult`s of all invocations are assembled into the final result
+by the framework, so input tokens per flow grow linearly.
+
+Usage
+-----
+    result = await runner.run(steps, RunResult, execution_mode="per_step")
+    result = await runner.run(steps, RunResult, execution_mode="per_step", steps_per_invocation=3)
+
+Notes
+-----
+- Steps are taken from a markdown steps table, a structured `Flow` or, for
+  plain text, one step per non-empty line.
+- Deterministic `Flow` steps still run without a model call.
+- With a `RetryPolicy`, a failed step is retried in place (a fresh
+  invocation on the same browser), up to `step_retries` times. Steps of
+  its group that passed before it are kept, not re-run.
+- Execution stops at the first failed step; later steps are BLOCKED.
+
+"""
+
+from __future__ import annotations
+import logging
+import re
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+from playwright_agent.dsl.markdown import FlowDefinitionError, compile_text
+from playwright_agent.dsl.steps import Flow, Step
+from playwright_agent.integrations.playwright_mcp import section, tool_text
+from playwright_agent.schemas.lean import LeanStepResult
+from playwright_agent.schemas.results import RunResult, StepResult
+
+logger = logging.getLogger("playwright_agent.per_step")
+
+ExecutionMode = Literal["flow", "per_step"]
+
+# Page snapshots beyond this size are cut (the agent can still call browser_snapshot)
+MAX_PAGE_STATE_CHARS = 12_000
+
+_NUMBERED = re.compile(r"^\s*(?:step\s*)?(\d+[a-z]?)\s*[.):-]\s+(.*)$", re.IGNORECASE)
+
+PER_STEP_INSTRUCTIONS = """
+**Per-step execution**
+- You execute ONLY the step(s) given below, as part of a longer flow. The browser is already
+  in the state left by the previous steps; do not repeat them and do not navigate away unless
+  the step says so.
+- Ignore the instructions about a final screenshot and closing the browser: the framework does both.
+- Report exactly one entry in `steps` per given step, with the given step ids.
+- Put anything later steps need to know (e.g. a created record number) in `notes`, in one line.
+"""
+
+STEP_PROMPT = """\
+{context}Previous steps:
+{prior}
+
+Current page state:
+{page}
+
+Execute now:
+{steps}
+"""
+
+
+class StepUnit(BaseModel):
+    """
+    A step as executed in per-step mode.
+
+    Attributes:
+        id: Step id reported in `StepResult.step_id`
+        text: Step text sent to the agent
+        step: Structured DSL step, if the flow was a `Flow`
+    """
+    id: str
+    text: str
+    step: Step | None = None
+
+
+class StepBatch(BaseModel):
+    """Output of one per-step agent invocation."""
+    steps: list[StepResult] = Field(description="One result per executed step, with the given step ids")
+    notes: str | None = Field(
+        description="One line of facts later steps need (e.g. created record numbers), or null"
+    )
+
+
+class LeanStepBatch(StepBatch):
+    """`StepBatch` with lean step results (see `schemas.lean`)."""
+    steps: list[LeanStepResult] = Field(description="One result per executed step, with the given step ids")
+
+
+def plan_units(user_steps: str | Flow) -> tuple[str, list[StepUnit]]:
+    """
+    Split a flow into steps.
+
+    Returns:
+        (context shared by all invocations, steps in order)
+    """
+    if isinstance(user_steps, Flow):
+        context = f"Test: {user_steps.name}\n" if user_steps.name else ""
+        return context, [StepUnit(id=s.id, text=s.describe(), step=s) for s in user_steps.steps]
+    try:
+        compiled = compile_text(user_steps)
+    except FlowDefinitionError:
+        compiled = None
+    if compiled is not None and compiled.steps:
+        context = (f"Test: {compiled.title}\n" if compiled.title else "") + "".join(
+            f"Note: {note}\n" for note in compiled.notes
+        )
+        units = []
+        for row in compiled.steps:
+            text = row.action + (f" | Data: {row.data}" if row.data else "") + (f" | Expected: {row.expected}" if row.expected else "")
+            units.append(StepUnit(id=row.id, text=text))
+        return context, units
+    units = []
+    for line in user_steps.strip().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        match = _NUMBERED.match(line)
+        step_id, text = (match.group(1), match.group(2)) if match else (str(len(units) + 1), line)
+        units.append(StepUnit(id=step_id, text=text))
+    return "", units
+
+
+def page_state_text(result: Any) -> str:
+    """Compact page state (URL, title, snapshot) from a `browser_snapshot` result."""
+    text = tool_text(result)
+    state = section(text, "Page state") or text
+    if len(state) > MAX_PAGE_STATE_CHARS:
+        state = state[:MAX_PAGE_STATE_CHARS] + "\n... (snapshot truncated; call browser_snapshot for the rest)"
+    return state
+
+
+def summarize(results: list[StepResult], notes: list[str]) -> str:
+    """One line per finished step, plus the notes reported so far."""
+    lines = [f"- Step {r.step_id} [{r.status}]: {r.actual_result}" for r in results] or ["(none - this is the first step)"]
+    lines.extend(f"- Note: {note}" for note in notes)
+    return "\n".join(lines)
+
+
+def build_step_prompt(context: str, units: list[StepUnit], prior: str, page: str, retry_reason: str | None = None) -> str:
+    steps = "\n".join(f"{unit.id}. {unit.text}" for unit in units)
+    prompt = STEP_PROMPT.format(context=f"{context}\n" if context else "", prior=prior, page=page, steps=steps)
+    if retry_reason:
+        prompt += f"\nThe previous attempt at this step failed ({retry_reason}). Re-check the page and try again.\n"
+    return prompt
+
+
+def blocked(unit: StepUnit, previous: str) -> StepResult:
+    return StepResult(
+        step_id=unit.id,
+        description=unit.text,
+        previous_step=previous,
+        expected_result=unit.text,
+        actual_result="Not executed",
+        status="BLOCKED",
+        exception=None,
+        locator=[],
+        next_step="Blocked because a previous step failed",
+    )
+
+
+def extra_fields(output_schema) -> list[str]:
+    """Required fields of `output_schema` that `RunResult` does not have (custom assertions)."""
+    return [
+        name for name, field in output_schema.model_fields.items()
+        if field.is_required() and name not in RunResult.model_fields
+    ]
+
+
+def assemble(output_schema, results: list[StepResult], proof: str | None, report: Any = None) -> Any:
+    """
+    Build the final result from per-step results.
+
+    Args:
+        output_schema: Requested output schema
+        results: Step results in order
+        proof: Final screenshot path
+        report: Agent-produced instance of `output_schema` holding custom
+            assertion fields (only needed if the schema has any)
+    """
+    failed = next((r for r in results if r.status != "PASS"), None)
+    values = {
+        "status": "FAIL" if failed else "PASS",
+        "failed_step_id": failed.step_id if failed else None,
+        "proof_of_pass": proof,
+        "steps": results,
+        "exception": (failed.exception or failed.actual_result) if failed else None,
+        "summary": (
+            f"Step {failed.step_id} failed after {sum(r.status == 'PASS' for r in results)} passed step(s)"
+            if failed else f"All {len(results)} steps passed (per-step execution)"
+        ),
+    }
+    if report is not None:
+        overrides = {key: values[key] for key in ("status", "failed_step_id", "proof_of_pass", "steps")}
+        return output_schema.model_validate({**report.model_dump(), **overrides})
+    return output_schema.model_validate({k: v for k, v in values.items() if k in output_schema.model_fields})
+
+
+REPORT_PROMPT = """\
+All steps of the flow have been executed; their results are final:
+{prior}
+
+Current page state:
+{page}
+
+Fill in the report. For the custom fields, inspect the page if needed. Do not execute any steps again.
+"""
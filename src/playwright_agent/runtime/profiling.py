@@ -0,0 +1,226 @@
+"""
+Run Profiling
+=============
+
+Profiles the Python side of a flow: pydantic validation of large outputs,
+JSON handling of big snapshots, prompt building, or anything else that
+stalls the event loop while the model and the browser are idle.
+
+    result = await runner.run(steps, RunResult, profile="sample")
+
+Or for a whole pytest session: `pytest --flow-profile=sample` (or
+`PROFILE=sample`).
+
+Modes
+-----
+- `sample`: a background thread samples the event-loop thread's Python
+  stack every `SAMPLE_INTERVAL_SECONDS` (low overhead, statistical)
+- `cprofile`: deterministic `cProfile` of the event-loop thread, plus the
+  sampler for the flame graph (higher overhead, exact call counts)
+
+Both modes also run an event-loop lag monitor: a task that sleeps for
+`LAG_INTERVAL_SECONDS` and measures how late it wakes up. Lag is time in
+which the loop could not serve anything else (MCP responses, model
+streams, other flows).
+
+Output
+------
+One directory per run under `PROFILE_DIR` (default `reports/profiles`):
+
+- `stacks.collapsed`: collapsed stacks (`frame;frame;frame count`), for
+  `flamegraph.pl` or speedscope
+- `profile.pstats` (`cprofile` mode): load with `pstats` or snakeviz
+- `summary.json`: duration, sample count, the functions with the most
+  samples, and the loop lag statistics
+
+When profiling is off nothing is started; the only cost is one check.
+Concurrent flows on the same event loop share its thread, so their
+samples mix; profile one flow at a time for clean results.
+
+"""
+
+from __future__ import annotations
+import asyncio
+import cProfile
+import json
+import logging
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Literal
+
+logger = logging.getLogger("playwright_agent.profiling")
+
+ProfileMode = Literal["off", "sample", "cprofile"]
+
+SAMPLE_INTERVAL_SECONDS = 0.005
+LAG_INTERVAL_SECONDS = 0.05
+STALL_SECONDS = 0.1
+MAX_STACK_DEPTH = 128
+TOP_FUNCTIONS = 25
+
+
+def _frame_name(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """Samples one thread's Python stack from a background thread."""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL_SECONDS):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="flow-profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names: list[str] = []
+            while frame is not None and len(names) < MAX_STACK_DEPTH:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[";".join(reversed(names))] += 1
+                self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format, one `root;...;leaf count` per line."""
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+    def top_functions(self, limit: int = TOP_FUNCTIONS) -> list[dict[str, Any]]:
+        """Functions by samples where they were on top of the stack (self) and anywhere in it (total)."""
+        own: Counter[str] = Counter()
+        total: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += count
+            for name in set(frames):
+                total[name] += count
+        return [
+            {"function": name, "self_samples": own[name], "total_samples": total[name]}
+            for name, _ in own.most_common(limit)
+        ]
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a periodic task."""
+
+    def __init__(self, interval: float = LAG_INTERVAL_SECONDS, stall: float = STALL_SECONDS):
+        self.interval = interval
+        self.stall = stall
+        self.lags: list[float] = []
+        self._task: asyncio.Task | None = None
+        self._due: float | None = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._due = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(loop.time() - self._due, 0.0))
+
+    async def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run(), name="loop-lag-monitor")
+        await asyncio.sleep(0)  # arm the first wake-up before the profiled code runs
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        # A wake-up that is overdue but has not run yet (the loop was blocked until now) still counts
+        now = asyncio.get_running_loop().time()
+        if self._due is not None and now > self._due and not self._task.done():
+            self.lags.append(now - self._due)
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def stats(self) -> dict[str, Any]:
+        if not self.lags:
+            return {"samples": 0}
+        ordered = sorted(self.lags)
+        return {
+            "samples": len(ordered),
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p99_ms": round(ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))] * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3),
+            "stalls": sum(1 for lag in ordered if lag >= self.stall),
+            "stall_threshold_ms": self.stall * 1000,
+        }
+
+
+class FlowProfiler:
+    """
+    Profiles one run (`async with FlowProfiler(...)`) and writes its files.
+
+    Attributes:
+        mode: "sample" or "cprofile"
+        directory: Output directory of this run
+    """
+
+    def __init__(self, mode: ProfileMode, directory: str | Path, name: str):
+        self.mode = mode
+        safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")[:80] or "flow"
+        self.directory = Path(directory) / f"{safe}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self._sampler: StackSampler | None = None
+        self._lag = LoopLagMonitor()
+        self._profile: cProfile.Profile | None = None
+        self._started = 0.0
+
+    async def __aenter__(self) -> FlowProfiler:
+        self._started = time.perf_counter()
+        self._sampler = StackSampler(threading.get_ident())
+        self._sampler.start()
+        await self._lag.start()
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+            try:
+                self._profile.enable()
+            except ValueError as e:
+                # Only one profiler per thread (e.g. another flow is already being profiled)
+                logger.warning(f"cProfile not started ({e}); sampling only")
+                self._profile = None
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        if self._profile is not None:
+            self._profile.disable()
+        await self._lag.stop()
+        self._sampler.stop()
+        try:
+            self._write(time.perf_counter() - self._started)
+        except OSError as e:
+            logger.warning(f"Could not write profile: {e}")
+
+    def _write(self, duration: float) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        (self.directory / "stacks.collapsed").write_text(self._sampler.collapsed(), encoding="utf-8")
+        if self._profile is not None:
+            self._profile.dump_stats(self.directory / "profile.pstats")
+        summary = {
+            "mode": self.mode,
+            "duration_seconds": round(duration, 3),
+            "samples": self._sampler.samples,
+            "sample_interval_ms": self._sampler.interval * 1000,
+            "loop_lag": self._lag.stats(),
+            "top_functions": self._sampler.top_functions(),
+        }
+        (self.directory / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        lag = summary["loop_lag"]
+        logger.info(
+            f"Profile written to {self.directory} ({self._sampler.samples} samples, "
+            f"max loop lag {lag.get('max_ms', 0)}ms, {lag.get('stalls', 0)} stalls)"
+        )
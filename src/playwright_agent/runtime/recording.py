@@ -0,0 +1,130 @@
+"""
+Browser Action Recording
+========================
+
+Every Playwright MCP tool response carries a `### Ran Playwright code`
+section with the exact Playwright call the server executed (e.g.
+`await page.getByRole('button', { name: 'Login' }).click();`). This module
+records those calls during a run, in order, and attributes them to flow
+steps, so a passing run can be exported as a plain Playwright test (see
+`playwright_agent.export`).
+
+Macro tools (see `integrations.macro_tools`) report the code of all their
+actions in the same format and are recorded as one action each.
+
+Step attribution uses the `record_checkpoint` tool: all actions recorded
+since the previous checkpoint belong to the step being checkpointed. In
+per-step mode every agent invocation is for a known step, so the runner
+sets `ActionRecorder.step_id` instead.
+
+Usage
+-----
+    recorder = ActionRecorder()
+    runner = AgentRunner(..., hooks=[recorder])
+    result = await runner.run(steps)
+    for action in recorder.actions:
+        print(action.step_id, action.tool, action.code)
+
+Actions of a persisted run can be rebuilt from its conversation items:
+
+    actions = actions_from_items(RunStore(settings.runs_dir).load_items(run_id))
+
+"""
+
+from __future__ import annotations
+import json
+import logging
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+from playwright_agent.integrations.macro_tools import MACRO_TOOLS
+from playwright_agent.integrations.playwright_mcp import ran_code, section
+from playwright_agent.runtime.hooks import tool_output_text
+
+# OpenAI Agents SDK lifecycle hooks
+from agents import RunHooks  # type: ignore[import-not-found]
+
+logger = logging.getLogger("playwright_agent.recording")
+
+CHECKPOINT_TOOL = "record_checkpoint"
+
+
+class RecordedAction(BaseModel):
+    """
+    One browser tool call of a run.
+
+    Attributes:
+        tool: MCP tool name (e.g. "browser_click")
+        arguments: Tool arguments as sent by the agent
+        code: Playwright code the MCP server ran for the call
+        ok: False if the tool reported an error
+        step_id: Flow step the call belongs to (None until attributed)
+    """
+    tool: str
+    arguments: dict[str, Any] = Field(default_factory=dict)
+    code: list[str] = Field(default_factory=list)
+    ok: bool = True
+    step_id: str | None = None
+
+
+def _arguments(raw: Any) -> dict[str, Any]:
+    if isinstance(raw, dict):
+        return raw
+    try:
+        value = json.loads(raw or "{}")
+    except (TypeError, ValueError):
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def _failed(text: str) -> bool:
+    result = section(text, "Result")
+    return result is not None and result.lower().startswith("error")
+
+
+class ActionLog:
+    """Ordered browser actions with checkpoint-based step attribution."""
+
+    def __init__(self):
+        self.actions: list[RecordedAction] = []
+        self.step_id: str | None = None
+
+    def add(self, tool: str, arguments: dict[str, Any], output: str) -> None:
+        """Record one tool call from its name, arguments and output text."""
+        if tool == CHECKPOINT_TOOL:
+            step_id = str(arguments.get("step_id", "")) or None
+            for action in self.actions:
+                if action.step_id is None:
+                    action.step_id = step_id
+            return
+        if not tool.startswith("browser_") and tool not in MACRO_TOOLS:
+            return
+        self.actions.append(RecordedAction(
+            tool=tool, arguments=arguments, code=ran_code(output), ok=not _failed(output), step_id=self.step_id,
+        ))
+
+
+class ActionRecorder(ActionLog, RunHooks):
+    """Run hooks that record the browser tool calls of the agent."""
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        name = getattr(context, "tool_name", None) or getattr(tool, "name", "")
+        self.add(name, _arguments(getattr(context, "tool_arguments", None)), tool_output_text(result))
+
+
+def actions_from_items(items: list[Any]) -> list[RecordedAction]:
+    """Rebuild the recorded actions of a run from its conversation items (see `RunStore.load_items`)."""
+    calls: dict[str, dict[str, Any]] = {}
+    log = ActionLog()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        if item.get("type") == "function_call":
+            calls[item.get("call_id", "")] = item
+        elif item.get("type") == "function_call_output":
+            call = calls.pop(item.get("call_id", ""), None)
+            if call is not None:
+                output = item.get("output")
+                log.add(call.get("name", ""), _arguments(call.get("arguments")), output if isinstance(output, str) else tool_output_text(output))
+    return log.actions
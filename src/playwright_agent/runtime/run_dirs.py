@@ -0,0 +1,92 @@
+"""
+Per-Run Output Directories
+==========================
+
+The browser server writes screenshots, traces and downloads into its
+output directory. When every run shared `mcp_isolated_dir`, concurrent
+flows overwrote each other's files and the agent saw files of other runs.
+Each run now gets its own directory below it:
+
+    .isolated/runs/<test name>-<run id>/
+
+The directory is named by the test (pytest node id or trace name) and the
+run id (the persisted run id, or a fresh one), exposed as
+`RunResult.output_dir`, and used as `--output-dir` of the browser server,
+as the root of the filesystem server (`MCPServerManager.get_file_server`,
+or `FILE_SERVER=true` to give every run one) and as the screenshot
+directory of structured flows.
+
+The current run's directory is kept in a context variable, so concurrent
+flows on one event loop (each in its own task) never see each other's.
+
+Cleanup
+-------
+`RUN_DIR_CLEANUP` removes a run's directory after the run with a single
+directory removal:
+
+- `never` (default): keep every run's files
+- `passed`: remove the directories of passed runs (set `ARTIFACT_DIR` to
+  keep their final screenshot, see `playwright_agent.artifacts`)
+- `always`: remove every run's directory (failed runs keep their browser
+  recording, see `runtime.browser_recording`)
+
+Set `RUN_DIRS=false` to go back to the shared directory.
+
+"""
+
+from __future__ import annotations
+import contextlib
+import logging
+import re
+import shutil
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Iterator, Literal
+
+logger = logging.getLogger("playwright_agent.run_dirs")
+
+RunDirCleanup = Literal["never", "passed", "always"]
+
+RUNS_SUBDIR = "runs"
+MAX_NAME_LENGTH = 80
+
+_current: ContextVar[Path | None] = ContextVar("playwright_agent_run_dir", default=None)
+
+
+def current_run_dir() -> Path | None:
+    """Output directory of the run executing in this context, if any."""
+    return _current.get()
+
+
+def run_dir_path(root: str | Path, test_id: str, run_id: str) -> Path:
+    """Directory of a run below `root`, named by test and run id."""
+    safe = re.sub(r"[^A-Za-z0-9_.-]+", "_", test_id).strip("_")[:MAX_NAME_LENGTH] or "flow"
+    return Path(root) / RUNS_SUBDIR / f"{safe}-{run_id}"
+
+
+@contextlib.contextmanager
+def use_run_dir(path: Path | None) -> Iterator[Path | None]:
+    """Create `path` and make it the current run directory for the enclosed block (None = shared directory)."""
+    if path is None:
+        yield None
+        return
+    path.mkdir(parents=True, exist_ok=True)
+    token = _current.set(path)
+    try:
+        yield path
+    finally:
+        _current.reset(token)
+
+
+def should_remove(cleanup: RunDirCleanup, status: str) -> bool:
+    return cleanup == "always" or (cleanup == "passed" and status == "PASS")
+
+
+def remove_run_dir(path: Path) -> None:
+    """Remove a run's directory (errors are logged, never raised)."""
+    try:
+        shutil.rmtree(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"Could not remove run directory {path}: {e}")
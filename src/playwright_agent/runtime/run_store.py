@@ -0,0 +1,303 @@
+"""
+Durable Run State for Crash Recovery
+====================================
+
+This module persists the state of a running flow to a local run directory
+as it progresses, so a flow interrupted by a crashed pytest process or a
+dead CI agent can be resumed instead of started over.
+
+Run Directory Layout
+--------------------
+```
+<runs_dir>/<run_id>/
+    state.json          # RunState: status, prompt, checkpoints, artifacts (atomically rewritten)
+    items.jsonl         # Conversation items, appended after every model call / tool call
+    steps.jsonl         # Per-step results (one line per checkpoint), appended
+    storage_state.json  # Browser storage state from the latest checkpoint
+    result.json         # Final structured output, once the run completed
+```
+
+Usage
+-----
+Enable persistence per run (or for every run with `PERSIST_RUNS=true`):
+
+    result = await runner.run(steps, RunResult, persist=True)
+    print(result.run_id)
+
+Resume a run that never finished:
+
+    from playwright_agent.runtime.run_store import RunStore
+
+    for state in RunStore(settings.runs_dir).list(status="running"):
+        result = await runner.resume(state.run_id, RunResult)
+
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import re
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+from playwright_agent.runtime.checkpoints import StepCheckpoint
+from playwright_agent.runtime.hooks import tool_output_text
+
+# OpenAI Agents SDK lifecycle hooks
+from agents import RunHooks  # type: ignore[import-not-found]
+
+logger = logging.getLogger("playwright_agent.run_store")
+
+RunStatus = Literal["running", "completed", "failed"]
+
+_SCREENSHOT_PATH = re.compile(r"[\w./\\:-]+\.(?:png|jpe?g)", re.IGNORECASE)
+
+RESUME_NOTE = (
+    "THE PREVIOUS RUN WAS INTERRUPTED. The browser has been restarted{session}.\n"
+    "{location}"
+    "Continue the test from where the conversation above left off. Do not repeat steps that already "
+    "passed, and report ALL steps (including the ones that passed before the interruption) in the final output."
+)
+
+
+class RunNotFoundError(KeyError):
+    """Raised when a run id has no persisted state."""
+
+    def __init__(self, run_id: str):
+        super().__init__(f"No persisted state for run '{run_id}'")
+        self.run_id = run_id
+
+
+class RunState(BaseModel):
+    """
+    Persisted metadata of a single flow run.
+
+    Attributes:
+        run_id: Unique run identifier (directory name)
+        status: running, completed or failed
+        trace_name: Trace name the run was started with
+        prompt: Prompt of the current attempt
+        output_schema: Import path of the output schema ("module:QualName")
+        attempt: Attempt counter (increments on step-level retries)
+        checkpoints: Checkpoints recorded so far
+        artifacts: Artifact paths (screenshots) reported by the browser
+        error: Error message if the run failed
+    """
+    run_id: str
+    status: RunStatus = "running"
+    trace_name: str = "web_flow"
+    prompt: str = ""
+    output_schema: str | None = None
+    attempt: int = 0
+    checkpoints: list[StepCheckpoint] = Field(default_factory=list)
+    artifacts: list[str] = Field(default_factory=list)
+    error: str | None = None
+    created_at: float = Field(default_factory=time.time)
+    updated_at: float = Field(default_factory=time.time)
+
+    @property
+    def last_checkpoint(self) -> StepCheckpoint | None:
+        return self.checkpoints[-1] if self.checkpoints else None
+
+
+def _schema_path(output_schema: Any) -> str | None:
+    module = getattr(output_schema, "__module__", None)
+    qualname = getattr(output_schema, "__qualname__", None)
+    return f"{module}:{qualname}" if module and qualname else None
+
+
+class RunJournal:
+    """
+    Incremental writer for one run directory.
+
+    Every method writes through to disk immediately, so whatever was
+    recorded before a crash can be read back by `RunStore`.
+    """
+
+    def __init__(self, directory: Path, state: RunState):
+        self.directory = directory
+        self.state = state
+
+    @property
+    def run_id(self) -> str:
+        return self.state.run_id
+
+    def _save(self) -> None:
+        self.state.updated_at = time.time()
+        tmp = self.directory / "state.json.tmp"
+        tmp.write_text(self.state.model_dump_json(indent=2), encoding="utf-8")
+        os.replace(tmp, self.directory / "state.json")
+
+    def _append(self, name: str, records: list[dict[str, Any]]) -> None:
+        with open(self.directory / name, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+
+    def begin_attempt(self, prompt: str) -> None:
+        """Start a new agent conversation (first run or a step-level retry)."""
+        if self.state.prompt:
+            self.state.attempt += 1
+        self.state.prompt = prompt
+        self._save()
+
+    def append_items(self, items: list[Any]) -> None:
+        """Append conversation items of the current attempt."""
+        self._append("items.jsonl", [{"attempt": self.state.attempt, "item": item} for item in items])
+
+    def record_checkpoint(self, checkpoint: StepCheckpoint) -> None:
+        """Persist a per-step result and the latest browser storage state."""
+        if checkpoint.storage_state_path and Path(checkpoint.storage_state_path).exists():
+            shutil.copyfile(checkpoint.storage_state_path, self.directory / "storage_state.json")
+        self.state.checkpoints.append(checkpoint)
+        self._append("steps.jsonl", [checkpoint.model_dump()])
+        self._save()
+
+    def add_artifacts(self, paths: list[str]) -> None:
+        new = [p for p in paths if p not in self.state.artifacts]
+        if new:
+            self.state.artifacts.extend(new)
+            self._save()
+
+    def restart(self) -> None:
+        """Mark a failed or interrupted run running again (it is being resumed)."""
+        self.state.status, self.state.error = "running", None
+        self._save()
+
+    def complete(self, result: Any) -> None:
+        """Mark the run completed and store its final output."""
+        dump = result.model_dump_json(indent=2) if isinstance(result, BaseModel) else json.dumps(result, default=str)
+        (self.directory / "result.json").write_text(dump, encoding="utf-8")
+        self.state.status = "completed"
+        self._save()
+
+    def fail(self, error: BaseException) -> None:
+        """Mark the run failed (it can still be resumed)."""
+        self.state.status = "failed"
+        self.state.error = f"{type(error).__name__}: {error}"
+        self._save()
+
+
+class JournalHooks(RunHooks):
+    """Run hooks that stream conversation items and artifacts into a `RunJournal`."""
+
+    def __init__(self, journal: RunJournal):
+        self.journal = journal
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        self.journal.append_items(response.to_input_items())
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        text = tool_output_text(result)
+        call_id = getattr(context, "tool_call_id", None)
+        if call_id:
+            self.journal.append_items([{"type": "function_call_output", "call_id": call_id, "output": text}])
+        if getattr(tool, "name", "") == "browser_take_screenshot":
+            self.journal.add_artifacts(_SCREENSHOT_PATH.findall(text))
+
+
+class RunStore:
+    """
+    Local store of run directories.
+
+    Attributes:
+        root: Directory containing one sub-directory per run
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def create(self, run_id: str | None = None, trace_name: str = "web_flow", output_schema: Any = None) -> RunJournal:
+        """Create the directory for a new run and return its journal."""
+        run_id = run_id or f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        directory = self.root / run_id
+        directory.mkdir(parents=True, exist_ok=True)
+        journal = RunJournal(directory, RunState(
+            run_id=run_id, trace_name=trace_name, output_schema=_schema_path(output_schema),
+        ))
+        journal._save()
+        logger.info(f"Persisting run state to {directory}")
+        return journal
+
+    def open(self, run_id: str) -> RunJournal:
+        """Open the journal of an existing run (to continue writing to it)."""
+        path = self.root / run_id / "state.json"
+        if not path.exists():
+            raise RunNotFoundError(run_id)
+        return RunJournal(path.parent, RunState.model_validate_json(path.read_text(encoding="utf-8")))
+
+    def load(self, run_id: str) -> RunState:
+        return self.open(run_id).state
+
+    def list(self, status: RunStatus | None = None) -> list[RunState]:
+        """All persisted runs, oldest first, optionally filtered by status."""
+        states = []
+        for path in sorted(self.root.glob("*/state.json")):
+            try:
+                state = RunState.model_validate_json(path.read_text(encoding="utf-8"))
+            except ValueError:
+                logger.warning(f"Skipping unreadable run state: {path}")
+                continue
+            if status is None or state.status == status:
+                states.append(state)
+        return sorted(states, key=lambda s: s.created_at)
+
+    def load_items(self, run_id: str) -> list[Any]:
+        """Conversation items of the latest attempt of a run."""
+        state = self.load(run_id)
+        path = self.root / run_id / "items.jsonl"
+        if not path.exists():
+            return []
+        items = []
+        for line in path.read_text(encoding="utf-8").splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # torn write from the crash; everything after it is unusable
+            if record.get("attempt") == state.attempt:
+                items.append(record["item"])
+        return items
+
+    def load_result(self, run_id: str) -> str | None:
+        path = self.root / run_id / "result.json"
+        return path.read_text(encoding="utf-8") if path.exists() else None
+
+    def storage_state(self, run_id: str) -> str | None:
+        path = self.root / run_id / "storage_state.json"
+        return str(path) if path.exists() else None
+
+
+def resume_input(state: RunState, items: list[Any], storage_state: str | None) -> list[Any]:
+    """
+    Build the model input that continues an interrupted conversation.
+
+    Reasoning items and tool calls whose output was never recorded are
+    dropped: the former may reference server-side state, the latter would
+    be rejected by the Responses API and have to be redone anyway.
+    """
+    answered = {
+        item.get("call_id") for item in items
+        if isinstance(item, dict) and item.get("type") == "function_call_output"
+    }
+    kept = []
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        kind = item.get("type")
+        if kind == "reasoning":
+            continue
+        if kind == "function_call" and item.get("call_id") not in answered:
+            continue
+        kept.append(item)
+
+    last = state.last_checkpoint
+    note = RESUME_NOTE.format(
+        session=" with the saved session state" if storage_state else "",
+        location=f"Open {last.url} first (last passed step: {last.step_id}).\n" if last and last.url else "",
+    )
+    return [{"role": "user", "content": state.prompt}] + kept + [{"role": "user", "content": note}]
@@ -26,7 +26,9 @@ BaseFlowRunner
 Tracing
 -------
 All agent executions are wrapped in a trace context for observability.
-The trace_name parameter controls how runs appear in the OpenAI dashboard:
+Where traces go is set by `TRACING` ("remote", "file" or "off", see
+`runtime.tracing`). The trace_name parameter controls how runs appear in
+the OpenAI dashboard:
 
     # Default trace name
     runner.run(prompt)  # trace: "web_flow"
@@ -51,6 +53,9 @@ from agents.model_settings import ModelSettings  # type: ignore[import-not-found
 from agents.exceptions import AgentsException  # type: ignore[import-not-found]
 from playwright_agent.integrations.azure_openai import make_async_client
 from playwright_agent.settings import Settings
+from playwright_agent.runtime.hooks import CompositeRunHooks
+from playwright_agent.runtime.schema_cache import output_schema_for
+from playwright_agent.runtime.tracing import configure_tracing
 from openai.types.shared import Reasoning
 
 logger = logging.getLogger("playwright_agent.runner")
@@ -94,6 +99,7 @@ class AgentRunner:
         mcp_servers: List of MCP servers (Playwright, filesystem, etc.)
         tools: List of custom tools (functions decorated with @function_tool)
         trace_name: Identifier for this run in the OpenAI trace dashboard
+        hooks: Run lifecycle hooks (e.g. run journaling), combined into one
     
     Example (internal usage):
         runner = AgentRunner(
@@ -107,20 +113,31 @@ class AgentRunner:
         result = await runner.run("Open google.com and search for Playwright")
     """
 
-    def __init__(self, instructions: str, output_type, mcp_servers: list, settings: Settings, tools: list, trace_name: str):
+    def __init__(
+        self,
+        instructions: str,
+        output_type,
+        mcp_servers: list,
+        settings: Settings,
+        tools: list,
+        trace_name: str,
+        hooks: list | None = None,
+    ):
         self.settings = settings
         self.instructions = instructions
         self.output_type = output_type
         self.mcp_servers = mcp_servers
         self.tools = tools
         self.trace_name = trace_name
+        self.hooks = hooks or []
 
-    async def run(self, prompt: str) -> T:
+    async def run(self, prompt: str | list[Any]) -> T:
         """
         Execute the agent flow with the given prompt.
         
         Args:
-            prompt: The user prompt/steps to execute
+            prompt: The user prompt/steps to execute, or a list of input
+                items to continue an earlier conversation
             
         Returns:
             The typed result from the agent
@@ -130,36 +147,39 @@ class AgentRunner:
             MCPToolError: If an MCP tool call fails
         """
         logger.info("Starting agent execution")
-        logger.debug(f"Prompt: {prompt[:200]}...")
+        logger.debug(f"Prompt: {str(prompt)[:200]}...")
+        configure_tracing(self.settings.tracing, self.settings.trace_dir)
         
         try:
-            async with make_async_client(self.settings) as client:
-                agent = Agent(
-                    name="mcp_playwright_test_agent",
-                    instructions=self.instructions,
-                    model=OpenAIResponsesModel(
-                        openai_client=client,
-                        model=self.settings.azure_openai_deployment,
-                    ),
-                    tools=self.tools,
-                    mcp_servers=self.mcp_servers,
-                    output_type=self.output_type,
-                    model_settings=ModelSettings(
-                        parallel_tool_calls=True, 
-                        reasoning=Reasoning(effort="medium")
-                    )
+            # Shared per settings and event loop; not closed here
+            client = make_async_client(self.settings)
+            agent = Agent(
+                name="mcp_playwright_test_agent",
+                instructions=self.instructions,
+                model=OpenAIResponsesModel(
+                    openai_client=client,
+                    model=self.settings.azure_openai_deployment,
+                ),
+                tools=self.tools,
+                mcp_servers=self.mcp_servers,
+                output_type=output_schema_for(self.output_type),
+                model_settings=ModelSettings(
+                    parallel_tool_calls=True, 
+                    reasoning=Reasoning(effort="medium")
                 )
-                
-                with trace(self.trace_name):
-                    result = await Runner.run(
-                        agent, 
-                        input=prompt.strip(), 
-                        max_turns=self.settings.max_turns
-                    )
-
-                logger.info("Agent execution completed successfully")
-                return result.final_output
-                
+            )
+            
+            with trace(self.trace_name):
+                result = await Runner.run(
+                    agent, 
+                    input=prompt.strip() if isinstance(prompt, str) else prompt, 
+                    max_turns=self.settings.max_turns,
+                    hooks=CompositeRunHooks(self.hooks) if self.hooks else None,
+                )
+
+            logger.info("Agent execution completed successfully")
+            return result.final_output
+            
         except AgentsException as e:
             error_msg = str(e)
             logger.error(f"Agent execution failed: {error_msg}")
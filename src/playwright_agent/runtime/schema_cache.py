@@ -0,0 +1,176 @@
+"""
+Output Schema Cache
+===================
+
+For every model turn the OpenAI Agents SDK turns the agent's `output_type`
+into an `AgentOutputSchema`: a pydantic `TypeAdapter` (validator), the
+JSON schema and its strict-mode conversion. Tests that define their
+`CustomAssertions(RunResult)` inside the test function create a new class
+(with the same shape) on every run, so that work is repeated on every
+turn of every run.
+
+This module caches the generated schema and validator per *structural
+fingerprint* of the model (class name, field names, types, descriptions,
+defaults, validators and nested models), so structurally identical classes
+share one entry. The agent receives a `CachedOutputSchema` that validates
+with the shared validator and re-validates the data as the class the test
+asked for, so that class's own validators always run.
+
+Usage
+-----
+Used automatically by `AgentRunner`. Statistics:
+
+    from playwright_agent.runtime.schema_cache import cache_info
+
+    print(cache_info())   # {"hits": 41, "misses": 3, "size": 3}
+
+"""
+
+from __future__ import annotations
+import dataclasses
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, get_args, get_origin
+
+from pydantic import BaseModel, ValidationError
+
+# OpenAI Agents SDK output schema types
+from agents import AgentOutputSchema, AgentOutputSchemaBase, ModelBehaviorError  # type: ignore[import-not-found]
+
+logger = logging.getLogger("playwright_agent.schema_cache")
+
+CACHE_SIZE = 128
+
+
+def _describe(annotation: Any, seen: set[int]) -> Any:
+    """A JSON-able structural description of a type annotation."""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return _structure(annotation, seen)
+    origin = get_origin(annotation)
+    if origin is not None:
+        return [repr(origin), [_describe(arg, seen) for arg in get_args(annotation)]]
+    if isinstance(annotation, type):
+        return f"{annotation.__module__}.{annotation.__qualname__}"
+    return repr(annotation)
+
+
+def _validators(model: type[BaseModel]) -> list[Any]:
+    """Names, bound functions and settings of the model's validators and serializers."""
+    described = []
+    infos = model.__pydantic_decorators__
+    for kind in sorted(field.name for field in dataclasses.fields(infos)):
+        for name, decorator in sorted(getattr(infos, kind).items()):
+            function = getattr(decorator.func, "__func__", decorator.func)
+            qualname = f"{getattr(function, '__module__', '')}.{getattr(function, '__qualname__', repr(function))}"
+            described.append([kind, name, qualname, repr(decorator.info)])
+    return described
+
+
+def _structure(model: type[BaseModel], seen: set[int]) -> Any:
+    if id(model) in seen:
+        return ["recursive", model.__name__]
+    seen = seen | {id(model)}
+    fields = []
+    for name, field in model.model_fields.items():
+        fields.append([
+            name,
+            _describe(field.annotation, seen),
+            field.description,
+            field.alias,
+            field.is_required(),
+            None if field.is_required() else repr(field.get_default(call_default_factory=False)),
+            repr(field.metadata),
+        ])
+    config = repr(sorted(model.model_config.items(), key=lambda kv: kv[0]))
+    return [model.__name__, model.__doc__, config, fields, _validators(model)]
+
+
+def fingerprint(model: type[BaseModel]) -> str:
+    """SHA-256 of the structure of `model` (equal for structurally identical classes)."""
+    text = json.dumps(_structure(model, set()), default=repr, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _rebind(value: Any, target: Any) -> Any:
+    """
+    Re-type validated data as `target` (a structurally identical model, or a
+    list of them), validating it with `target` so its own validators run.
+    """
+    if isinstance(target, type) and issubclass(target, BaseModel) and isinstance(value, BaseModel):
+        if type(value) is target:
+            return value
+        return target.model_validate(value.model_dump(exclude_unset=True, by_alias=True))
+    if get_origin(target) is list and isinstance(value, list):
+        (item_type,) = get_args(target) or (Any,)
+        return [_rebind(item, item_type) for item in value]
+    return value
+
+
+class CachedOutputSchema(AgentOutputSchemaBase):
+    """
+    Output schema for `output_type` backed by a shared `AgentOutputSchema`
+    of a structurally identical class.
+    """
+
+    def __init__(self, output_type: type[BaseModel], shared: AgentOutputSchema):
+        self.output_type = output_type
+        self.shared = shared
+
+    def is_plain_text(self) -> bool:
+        return self.shared.is_plain_text()
+
+    def name(self) -> str:
+        return self.shared.name()
+
+    def json_schema(self) -> dict[str, Any]:
+        return self.shared.json_schema()
+
+    def is_strict_json_schema(self) -> bool:
+        return self.shared.is_strict_json_schema()
+
+    def validate_json(self, json_str: str) -> Any:
+        value = self.shared.validate_json(json_str)
+        try:
+            return _rebind(value, self.output_type)
+        except ValidationError as e:
+            # Reported like the shared validator's own failures
+            raise ModelBehaviorError(f"Invalid JSON when parsing model output: {e}") from e
+
+
+_cache: OrderedDict[str, AgentOutputSchema] = OrderedDict()
+_stats = {"hits": 0, "misses": 0}
+
+
+def output_schema_for(output_type: Any) -> Any:
+    """
+    The cached output schema for `output_type`.
+
+    Non-model output types (e.g. `str`) are returned unchanged.
+    """
+    if not (isinstance(output_type, type) and issubclass(output_type, BaseModel)):
+        return output_type
+    key = fingerprint(output_type)
+    shared = _cache.get(key)
+    if shared is not None:
+        _cache.move_to_end(key)
+        _stats["hits"] += 1
+    else:
+        _stats["misses"] += 1
+        shared = AgentOutputSchema(output_type)
+        _cache[key] = shared
+        if len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+        logger.debug(f"Built output schema for {output_type.__name__} ({key[:12]})")
+    return CachedOutputSchema(output_type, shared)
+
+
+def cache_info() -> dict[str, int]:
+    """Cache statistics: hits, misses and current size."""
+    return {**_stats, "size": len(_cache)}
+
+
+def clear_cache() -> None:
+    _cache.clear()
+    _stats.update(hits=0, misses=0)
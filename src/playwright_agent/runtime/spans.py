@@ -0,0 +1,313 @@
+"""
+Timing Spans
+============
+
+Where does the time of a slow flow go: model latency, Playwright actions,
+MCP server startup, or the framework itself? `SpanRecorder` records one
+span per
+
+- flow run (`flow`, the root span)
+- MCP server startup (`mcp.startup`)
+- model call (`model.call`, with request and token counts)
+- tool call (`tool.call`, with server, tool, argument and result sizes)
+- logical step (`step`, from the previous step boundary to the step's
+  checkpoint; needs step checkpoints, which span export enables)
+
+Every run gets a breakdown (`RunResult.timings`, logged once per flow):
+time spent in MCP startup, model calls and tool calls (overlapping calls
+counted once), and the remaining framework time.
+
+Exporting
+---------
+    SPAN_FILE=reports/spans.jsonl
+
+appends each run's spans to that file as one OTLP/JSON
+`ExportTraceServiceRequest` per line (the format of the OpenTelemetry
+collector's file exporter), fully offline. The file can be loaded with
+the collector's `otlpjsonfile` receiver or read directly:
+
+    import json
+    for line in open("reports/spans.jsonl"):
+        for span in json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]:
+            print(span["name"], int(span["endTimeUnixNano"]) - int(span["startTimeUnixNano"]))
+
+Under pytest-xdist each worker writes its own file (`spans-gw0.jsonl`).
+
+"""
+
+from __future__ import annotations
+import contextlib
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+from pydantic import BaseModel, Field
+
+# OpenAI Agents SDK lifecycle hooks
+from agents import RunHooks  # type: ignore[import-not-found]
+
+from playwright_agent.runtime.hooks import tool_output_text
+
+logger = logging.getLogger("playwright_agent.spans")
+
+SERVICE_NAME = "playwright_agent"
+
+AttributeValue = str | int | float | bool
+
+
+class Span(BaseModel):
+    """
+    One timed operation.
+
+    Attributes:
+        name: Operation name (`flow`, `mcp.startup`, `model.call`, `tool.call`, `step`)
+        span_id: 16 hex digits
+        parent_id: Span id of the parent span (None for the root)
+        start_ns: Unix start time in nanoseconds
+        end_ns: Unix end time in nanoseconds (None while running)
+        attributes: Details of the operation
+    """
+    name: str
+    span_id: str = Field(default_factory=lambda: secrets.token_hex(8))
+    parent_id: str | None = None
+    start_ns: int = Field(default_factory=time.time_ns)
+    end_ns: int | None = None
+    attributes: dict[str, AttributeValue] = Field(default_factory=dict)
+
+    @property
+    def seconds(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+
+class SpanBreakdown(BaseModel):
+    """
+    Where the time of one run went.
+
+    Attributes:
+        total_seconds: Wall-clock duration of the run
+        mcp_startup_seconds: Starting MCP servers
+        model_seconds: Waiting for model responses
+        tool_seconds: Running tool calls (parallel calls counted once)
+        tool_seconds_by_server: Tool time per MCP server ("function" for function tools)
+        step_seconds: Duration per checkpointed step
+        framework_seconds: Everything else (prompt building, validation, screenshots, teardown)
+    """
+    total_seconds: float = 0.0
+    mcp_startup_seconds: float = 0.0
+    model_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    tool_seconds_by_server: dict[str, float] = Field(default_factory=dict)
+    step_seconds: dict[str, float] = Field(default_factory=dict)
+    framework_seconds: float = 0.0
+
+    def describe(self) -> str:
+        return (
+            f"{self.total_seconds:.1f}s total: {self.model_seconds:.1f}s model, {self.tool_seconds:.1f}s tools, "
+            f"{self.mcp_startup_seconds:.1f}s MCP startup, {self.framework_seconds:.1f}s framework"
+        )
+
+
+def _busy_seconds(spans: list[Span]) -> float:
+    """Time covered by at least one of `spans` (overlaps counted once)."""
+    total, end = 0, None
+    for span in sorted(spans, key=lambda s: s.start_ns):
+        span_end = span.end_ns or span.start_ns
+        if end is None or span.start_ns > end:
+            total += span_end - span.start_ns
+            end = span_end
+        elif span_end > end:
+            total += span_end - end
+            end = span_end
+    return total / 1e9
+
+
+class SpanRecorder(RunHooks):
+    """
+    Run hooks that record model and tool spans under one root span per run.
+
+    Also used directly for spans the hooks cannot see (`span()` for MCP
+    startup, `step()` for step checkpoints).
+
+    Attributes:
+        trace_id: 32 hex digits, shared by all spans of the run
+        root: The `flow` span
+        spans: All spans, in start order
+    """
+
+    def __init__(self, trace_name: str):
+        self.trace_id = secrets.token_hex(16)
+        self.root = Span(name="flow", attributes={"flow.trace_name": trace_name})
+        self.spans: list[Span] = [self.root]
+        self._model: Span | None = None
+        self._tools: dict[Any, Span] = {}
+        self._step_started = self.root.start_ns
+
+    def _start(self, name: str, **attributes: AttributeValue) -> Span:
+        span = Span(name=name, parent_id=self.root.span_id, attributes=attributes)
+        self.spans.append(span)
+        return span
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes: AttributeValue) -> Iterator[Span]:
+        """Record the enclosed block as a span (marked with `error` if it raises)."""
+        span = self._start(name, **attributes)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes["error"] = type(e).__name__
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+
+    def step(self, step_id: str, summary: str = "", status: str = "PASS") -> Span:
+        """Close the span of a step that just finished (it started at the previous step boundary)."""
+        span = self._start("step", **{"step.id": step_id, "step.status": status, "step.summary": summary[:200]})
+        span.start_ns, span.end_ns = self._step_started, time.time_ns()
+        self._step_started = span.end_ns
+        return span
+
+    async def on_llm_start(self, context, agent, system_prompt, input_items) -> None:
+        model = getattr(getattr(agent, "model", None), "model", None) or getattr(agent, "model", None)
+        self._model = self._start("model.call", **({"model.name": str(model)} if model else {}))
+
+    async def on_llm_end(self, context, agent, response) -> None:
+        span, self._model = self._model, None
+        if span is None:
+            return
+        span.end_ns = time.time_ns()
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            span.attributes["model.requests"] = getattr(usage, "requests", 0) or 1
+            span.attributes["model.input_tokens"] = getattr(usage, "input_tokens", 0) or 0
+            span.attributes["model.output_tokens"] = getattr(usage, "output_tokens", 0) or 0
+
+    @staticmethod
+    def _tool_key(context, tool) -> Any:
+        return getattr(context, "tool_call_id", None) or id(tool)
+
+    async def on_tool_start(self, context, agent, tool) -> None:
+        origin = getattr(tool, "_tool_origin", None)
+        server = getattr(origin, "mcp_server_name", None) or "function"
+        arguments = getattr(context, "tool_arguments", None) or ""
+        self._tools[self._tool_key(context, tool)] = self._start(
+            "tool.call", **{
+                "tool.name": getattr(tool, "name", str(tool)),
+                "tool.server": server,
+                "tool.arguments_bytes": len(str(arguments).encode("utf-8")),
+            },
+        )
+
+    async def on_tool_end(self, context, agent, tool, result) -> None:
+        span = self._tools.pop(self._tool_key(context, tool), None)
+        if span is None:
+            return
+        span.end_ns = time.time_ns()
+        span.attributes["tool.result_bytes"] = len(tool_output_text(result).encode("utf-8"))
+
+    def finish(self, status: str) -> None:
+        """End the root span (and any span left open by a cancelled call)."""
+        now = time.time_ns()
+        for span in self.spans:
+            if span.end_ns is None:
+                span.end_ns = now
+        self.root.attributes["flow.status"] = status
+
+    def breakdown(self) -> SpanBreakdown:
+        """Per-category totals of the run."""
+        by_name: dict[str, list[Span]] = {}
+        for span in self.spans:
+            by_name.setdefault(span.name, []).append(span)
+        tools = by_name.get("tool.call", [])
+        servers: dict[str, list[Span]] = {}
+        for span in tools:
+            servers.setdefault(str(span.attributes.get("tool.server")), []).append(span)
+        steps: dict[str, float] = {}
+        for span in by_name.get("step", []):
+            step_id = str(span.attributes["step.id"])
+            steps[step_id] = round(steps.get(step_id, 0.0) + span.seconds, 3)
+        accounted = _busy_seconds(by_name.get("mcp.startup", []) + by_name.get("model.call", []) + tools)
+        return SpanBreakdown(
+            total_seconds=round(self.root.seconds, 3),
+            mcp_startup_seconds=round(_busy_seconds(by_name.get("mcp.startup", [])), 3),
+            model_seconds=round(_busy_seconds(by_name.get("model.call", [])), 3),
+            tool_seconds=round(_busy_seconds(tools), 3),
+            tool_seconds_by_server={server: round(_busy_seconds(s), 3) for server, s in servers.items()},
+            step_seconds=steps,
+            framework_seconds=round(max(self.root.seconds - accounted, 0.0), 3),
+        )
+
+    def to_otlp(self) -> dict[str, Any]:
+        """The spans as an OTLP/JSON `ExportTraceServiceRequest`."""
+        return {"resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{
+                "scope": {"name": "playwright_agent.spans"},
+                "spans": [_otlp_span(self.trace_id, span) for span in self.spans],
+            }],
+        }]}
+
+
+def _attribute(key: str, value: AttributeValue) -> dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _otlp_span(trace_id: str, span: Span) -> dict[str, Any]:
+    data: dict[str, Any] = {
+        "traceId": trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,  # SPAN_KIND_INTERNAL
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns or span.start_ns),
+        "attributes": [_attribute(key, value) for key, value in span.attributes.items()],
+    }
+    if span.parent_id:
+        data["parentSpanId"] = span.parent_id
+    if "error" in span.attributes:
+        data["status"] = {"code": 2, "message": str(span.attributes["error"])}  # STATUS_CODE_ERROR
+    return data
+
+
+class SpanFileExporter:
+    """
+    Appends each run's spans to a JSON-lines file (one OTLP request per line).
+
+    Attributes:
+        path: Span file (per-worker suffix under pytest-xdist)
+    """
+
+    def __init__(self, path: str | Path):
+        path = Path(path)
+        worker = os.environ.get("PYTEST_XDIST_WORKER")
+        self.path = path.with_name(f"{path.stem}-{worker}{path.suffix}") if worker else path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, recorder: SpanRecorder) -> None:
+        line = json.dumps(recorder.to_otlp(), separators=(",", ":"))
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+_exporters: dict[Path, SpanFileExporter] = {}
+
+
+def get_exporter(path: str | Path) -> SpanFileExporter:
+    """The process-wide exporter for `path`."""
+    key = Path(path).resolve()
+    if key not in _exporters:
+        _exporters[key] = SpanFileExporter(path)
+    return _exporters[key]
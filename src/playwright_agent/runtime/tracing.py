@@ -0,0 +1,135 @@
+"""
+Tracing Backend
+===============
+
+Every agent run is wrapped in `trace(trace_name)`. By default the OpenAI
+Agents SDK ships that trace data to the OpenAI backend, which is
+background network work per run and fails noisily on machines without
+egress. The backend is configurable:
+
+- `remote`: the OpenAI trace backend (the SDK's default exporter)
+- `file`: local JSON lines, one trace or span per line, rotated by size
+- `off`: no tracing at all
+
+    TRACING=file
+    TRACE_DIR=reports/traces
+
+Both `file` and `remote` export through the SDK's `BatchTraceProcessor`:
+finished spans go into a bounded in-memory queue (spans are dropped with a
+warning when it is full) and a background thread writes them in batches,
+so tracing never blocks the flow. The queue is flushed when the process
+exits.
+
+Trace files are `traces.jsonl` (per-worker `traces-gw0.jsonl` under
+pytest-xdist), rotated to `traces.1.jsonl` ... `traces.5.jsonl` when they
+reach 10 MB. Each line is the SDK's export format of a trace
+(`"object": "trace"`) or span (`"object": "trace.span"`), the same
+payload the remote backend receives.
+
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Literal
+
+# OpenAI Agents SDK tracing
+from agents import set_trace_processors, set_tracing_disabled  # type: ignore[import-not-found]
+from agents.tracing.processor_interface import TracingExporter  # type: ignore[import-not-found]
+from agents.tracing.processors import BatchTraceProcessor, default_exporter  # type: ignore[import-not-found]
+
+logger = logging.getLogger("playwright_agent.tracing")
+
+TracingBackend = Literal["off", "file", "remote"]
+
+QUEUE_SIZE = 2048
+BATCH_SIZE = 256
+FLUSH_INTERVAL_SECONDS = 2.0
+MAX_FILE_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+
+
+class RotatingJsonlExporter(TracingExporter):
+    """
+    Writes traces and spans as JSON lines, rotating the file by size.
+
+    Attributes:
+        path: Current trace file
+        max_bytes: Size at which the file is rotated
+        backup_count: Number of rotated files kept
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = MAX_FILE_BYTES, backup_count: int = BACKUP_COUNT):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        worker = os.environ.get("PYTEST_XDIST_WORKER")
+        self.path = directory / (f"traces-{worker}.jsonl" if worker else "traces.jsonl")
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._lock = threading.Lock()
+
+    def _backup(self, index: int) -> Path:
+        return self.path.with_name(f"{self.path.stem}.{index}{self.path.suffix}")
+
+    def _rotate(self) -> None:
+        self._backup(self.backup_count).unlink(missing_ok=True)
+        for index in range(self.backup_count - 1, 0, -1):
+            if self._backup(index).exists():
+                self._backup(index).replace(self._backup(index + 1))
+        self.path.replace(self._backup(1))
+
+    def export(self, items: list[Any]) -> None:
+        lines = []
+        for item in items:
+            data = item.export()
+            if data:
+                lines.append(json.dumps(data, default=str, separators=(",", ":")) + "\n")
+        if not lines:
+            return
+        text = "".join(lines)
+        with self._lock:
+            try:
+                if self.path.exists() and self.path.stat().st_size + len(text) > self.max_bytes:
+                    self._rotate()
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(text)
+            except OSError as e:
+                logger.warning(f"Could not write traces to {self.path}: {e}")
+
+
+_configured: tuple[str, str] | None = None
+_processor: BatchTraceProcessor | None = None
+_lock = threading.Lock()
+
+
+def configure_tracing(backend: TracingBackend, trace_dir: str | Path = "reports/traces") -> None:
+    """
+    Select the tracing backend for this process (repeated calls with the
+    same arguments are no-ops).
+    """
+    global _configured, _processor
+    key = (backend, str(trace_dir))
+    if _configured == key:
+        return
+    with _lock:
+        if _configured == key:
+            return
+        previous, _processor = _processor, None
+        if backend == "off":
+            set_tracing_disabled(True)
+        else:
+            exporter = RotatingJsonlExporter(trace_dir) if backend == "file" else default_exporter()
+            _processor = BatchTraceProcessor(
+                exporter, max_queue_size=QUEUE_SIZE, max_batch_size=BATCH_SIZE, schedule_delay=FLUSH_INTERVAL_SECONDS,
+            )
+            set_trace_processors([_processor])
+            set_tracing_disabled(False)
+        if previous is not None:
+            # Write out what the replaced backend still holds
+            previous.shutdown(timeout=FLUSH_INTERVAL_SECONDS)
+        _configured = key
+        target = f" ({Path(trace_dir) / 'traces.jsonl'})" if backend == "file" else ""
+        logger.debug(f"Tracing backend: {backend}{target}")
@@ -0,0 +1,126 @@
+"""
+Lean Output Schema
+==================
+
+`StepResult` asks the model for five free-text fields per step
+(`description`, `previous_step`, `expected_result`, `actual_result`,
+`next_step`). On a 20-step flow that is thousands of generated tokens, and
+output tokens are the slowest part of a model call.
+
+In lean output mode the agent fills a reduced schema instead: per step only
+the id, the status, a short actual result and, for failed steps only, the
+exception and the expected result. The framework expands the lean output
+back into the requested schema, so tests keep receiving (and asserting
+on) a normal `RunResult` or subclass:
+
+- `description` is the step text when known, else the actual result
+- `previous_step` refers to the step before it ("FIRST STEP" for the first)
+- `expected_result` of a passed step equals its actual result
+- `next_step` and `locator` are not reported
+
+Usage
+-----
+    result = await runner.run(steps, RunResult, output_mode="lean")
+
+Or for every run: `OUTPUT_MODE=lean`.
+
+"""
+
+from __future__ import annotations
+from functools import lru_cache
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field, create_model
+
+from playwright_agent.schemas.results import StepResult
+
+OutputMode = Literal["full", "lean"]
+
+LEAN_OUTPUT_INSTRUCTIONS = """
+**Lean output**
+- Keep the structured output short: `actual_result` is one short sentence per step.
+- Fill `expected_result` and `exception` only for FAIL steps (null otherwise).
+- `summary` and `exception` of the run are one sentence each.
+"""
+
+NOT_REPORTED = "Not reported (lean output)"
+# Lean schemas kept alive at once; classes defined per test would otherwise pile up
+LEAN_CACHE_SIZE = 128
+
+
+class LeanStepResult(BaseModel):
+    """
+    Reduced per-step result generated by the agent in lean output mode.
+
+    Attributes:
+        step_id: Identifier of the step
+        status: PASS, FAIL or BLOCKED
+        actual_result: What happened, in one short sentence
+        exception: Error details (FAIL only)
+        expected_result: What should have happened (FAIL only)
+    """
+    step_id: str = Field(description="Identifier of the step")
+    status: Literal["PASS", "FAIL", "BLOCKED"] = Field(
+        description="PASS if the step did what it should, FAIL if not, BLOCKED if not executed because a previous step failed"
+    )
+    actual_result: str = Field(description="What actually happened, in one short sentence")
+    exception: str | None = Field(None, description="FAIL only: error details; null otherwise")
+    expected_result: str | None = Field(None, description="FAIL only: what should have happened; null otherwise")
+
+
+@lru_cache(maxsize=LEAN_CACHE_SIZE)
+def lean_schema(output_schema: type[BaseModel]) -> type[BaseModel]:
+    """
+    The lean variant of `output_schema`: the same model with `steps` as
+    `LeanStepResult`s. Custom fields of the schema are kept as they are.
+
+    Memoized per class for the `LEAN_CACHE_SIZE` most recently used schemas.
+    """
+    if "steps" not in output_schema.model_fields:
+        return output_schema
+    return create_model(
+        f"Lean{output_schema.__name__}",
+        __base__=output_schema,
+        __doc__=output_schema.__doc__,
+        steps=(list[LeanStepResult], Field(description="Results of all steps in execution order")),
+    )
+
+
+def expand_steps(steps: list[Any], descriptions: dict[str, str] | None = None) -> list[StepResult]:
+    """Turn `LeanStepResult`s into `StepResult`s (full results are passed through)."""
+    descriptions = descriptions or {}
+    expanded: list[StepResult] = []
+    for step in steps:
+        if isinstance(step, StepResult):
+            expanded.append(step)
+            continue
+        previous = f"Step {expanded[-1].step_id}: {expanded[-1].description}" if expanded else "FIRST STEP"
+        expanded.append(StepResult(
+            step_id=step.step_id,
+            description=descriptions.get(step.step_id) or step.actual_result,
+            previous_step=previous,
+            expected_result=step.expected_result or (step.actual_result if step.status == "PASS" else NOT_REPORTED),
+            actual_result=step.actual_result,
+            status=step.status,
+            exception=step.exception,
+            locator=[],
+            next_step=NOT_REPORTED,
+        ))
+    return expanded
+
+
+def expand(result: Any, output_schema: type[BaseModel], descriptions: dict[str, str] | None = None) -> Any:
+    """
+    Convert a lean agent output into an instance of `output_schema`.
+
+    Args:
+        result: Instance of `lean_schema(output_schema)` (other values are returned as they are)
+        output_schema: The schema the caller asked for
+        descriptions: Step texts by step id, used as step descriptions
+    """
+    if type(result) is output_schema or "steps" not in getattr(type(result), "model_fields", {}):
+        return result
+    # Unset fields keep their defaults (re-validating a default like `proof_of_pass=None` would fail)
+    values = {name: getattr(result, name) for name in result.model_fields_set if name != "steps"}
+    values["steps"] = expand_steps(result.steps, descriptions)
+    return output_schema.model_validate(values)
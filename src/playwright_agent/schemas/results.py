@@ -44,8 +44,8 @@ You can extend RunResult with custom fields for domain-specific checks:
 """
 
 from __future__ import annotations
-from typing import Literal
-from pydantic import BaseModel, Field
+from typing import Any, Literal
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class StepResult(BaseModel):
@@ -101,6 +101,8 @@ class RunResult(BaseModel):
         steps: List of StepResult objects in execution order
         exception: Summary explanation of pass/fail reason
         summary: High-level summary of the entire test run
+        run_id: Persisted run identifier (set by the framework, see `resume`)
+        timed_out: True if the run hit its deadline (partial result)
     
     Example:
         result = await runner.run(steps, RunResult)
@@ -132,3 +134,46 @@ class RunResult(BaseModel):
         description="Concise tester-style summary of the entire run"
     )   
 
+    # Framework-populated run metadata (not part of the agent's output schema)
+    _run_id: str | None = PrivateAttr(default=None)
+    _timed_out: bool = PrivateAttr(default=False)
+    _actions: list[Any] = PrivateAttr(default_factory=list)
+    _usage: Any = PrivateAttr(default=None)
+    _timings: Any = PrivateAttr(default=None)
+    _recording: str | None = PrivateAttr(default=None)
+    _output_dir: str | None = PrivateAttr(default=None)
+
+    @property
+    def run_id(self) -> str | None:
+        """Identifier of the persisted run state, if the run was persisted."""
+        return self._run_id
+
+    @property
+    def timed_out(self) -> bool:
+        """True if the run hit its deadline and this is a partial result."""
+        return self._timed_out
+
+    @property
+    def actions(self) -> list[Any]:
+        """Browser tool calls recorded during the run (see `runtime.recording` and `playwright_agent.export`)."""
+        return self._actions
+
+    @property
+    def usage(self) -> Any:
+        """Model usage and latency of the run (`runtime.metrics.RunUsage`), if measured."""
+        return self._usage
+
+    @property
+    def timings(self) -> Any:
+        """Where the run's time went (`runtime.spans.SpanBreakdown`), if measured."""
+        return self._timings
+
+    @property
+    def recording(self) -> str | None:
+        """Directory of the kept browser trace/video of a failed run (see `runtime.browser_recording`)."""
+        return self._recording
+
+    @property
+    def output_dir(self) -> str | None:
+        """The run's own output directory (see `runtime.run_dirs`), unless shared or cleaned up."""
+        return self._output_dir
@@ -22,6 +22,40 @@ Optional variables:
 - TIMEOUT_SECONDS: Action timeout in ms (default: 5000)
 - MAX_TURNS: Maximum agent conversation turns (default: 1000)
 - MCP_CLIENT_TIMEOUT_SECONDS: MCP tool timeout (default: 120)
+- STEP_RETRIES: Resume attempts from the last passed step (default: 0)
+- PERSIST_RUNS: Persist run state for crash recovery (default: false)
+- RUNS_DIR: Directory for persisted run state (default: ".runs")
+- FLOW_TIMEOUT_SECONDS: Deadline for a whole flow (default: none)
+- TEARDOWN_TIMEOUT_SECONDS: Budget for final screenshot + MCP shutdown (default: 15)
+- EXECUTION_MODE: "flow" (one agent conversation) or "per_step" (default: flow)
+- OUTPUT_MODE: "full" or "lean" agent output schema (default: full)
+- HISTORY_DB: SQLite file that records every run's results (default: none)
+- REPORT_DIR: Directory for the streaming JSONL/HTML/JUnit report (default: none)
+- SPAN_FILE: OTLP/JSON file every run's spans are appended to (default: none)
+- TRACING: "off", "file" (TRACE_DIR) or "remote" agent traces (default: remote)
+- TRACE_DIR: Directory for file traces (default: "reports/traces")
+- PROFILE: "off", "sample" or "cprofile" run profiling (default: off)
+- PROFILE_DIR: Directory for run profiles (default: "reports/profiles")
+- TOKEN_PRICES: JSON price table per model for cost estimates (default: none)
+- COST_BUDGET: Warn when a run's estimated cost exceeds it (default: none)
+- ARTIFACT_DIR: Content-addressed store for final screenshots (default: none)
+- ARTIFACT_MAX_AGE_DAYS / ARTIFACT_FAILURE_MAX_AGE_DAYS: Retention of passed/failed
+  runs' artifacts (default: 14 / 90)
+- ARTIFACT_MAX_BYTES: Size cap of the artifact store (default: none)
+- ARTIFACT_RECOMPRESS: Recompress stored PNGs losslessly (default: true)
+- RECORDING: "off", "trace" or "trace+video" browser recording (default: off)
+- RECORDING_DIR: Directory for recordings of failed runs (default: "reports/recordings")
+- VIDEO_SIZE: Size of recorded videos (default: "800x600")
+- RUN_DIRS: Give every run its own output directory (default: true)
+- RUN_DIR_CLEANUP: Remove run directories "never", "passed" or "always" (default: never)
+- FILE_SERVER: Filesystem MCP server confined to the run directory (default: false)
+- LOCATOR_DB: SQLite locator memory shared by all runs (default: none)
+- LOCATOR_APP: Application the stored locators belong to (default: "default")
+- LOCATOR_MODE: "prefetch" hints or agent "tools" (default: prefetch)
+- LOCATOR_HINTS_PER_STEP: Prefetched locators per step (default: 2)
+- LOCATOR_MAX_AGE_DAYS / LOCATOR_MAX_ENTRIES: Locator memory eviction (default: 30 / none)
+- MACRO_TOOLS: Composite fill_form/click_and_wait/dismiss_popups tools (default: false)
+- POPUP_BUTTONS: JSON list of buttons that dismiss known popups
 
 Usage
 -----
@@ -33,32 +67,71 @@ Usage
     except ConfigurationError as e:
         print(f"Configuration error: {e}")
 
+Importing this module has no side effects. The first `get_settings()`
+call loads the `.env` file into the process environment
+(`load_environment`) and sets up default logging (`configure_logging`);
+applications that configure logging themselves should do so first.
+
+Caching
+-------
+`get_settings()` parses, validates and prepares (output directories) the
+settings once per process and returns the same instance afterwards, so
+runners, tools and concurrent flows share it. Treat it as read-only.
+After changing the environment or `.env`, call `reload()`:
+
+    from playwright_agent import settings
+    settings.reload()                      # re-reads .env and the environment
+
+A runner can also use its own instance, e.g. in tests:
+
+    runner = BaseFlowRunner(settings=Settings(max_turns=20))
+
 """
 
 from __future__ import annotations
 import logging
-import os
+import sys
+import threading
+from typing import Any, Literal
 from pathlib import Path
-from pydantic import field_validator
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from dotenv import load_dotenv
-
-# Load environment variables from .env file (override existing)
-load_dotenv(override=True)
 
-# Configure logging - reduce noise from external libraries
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
 logger = logging.getLogger("playwright_agent")
 
-# Silence noisy loggers
-logging.getLogger("httpx").setLevel(logging.WARNING)
-logging.getLogger("httpcore").setLevel(logging.WARNING)
-logging.getLogger("openai").setLevel(logging.WARNING)
-logging.getLogger("anyio").setLevel(logging.WARNING)
-logging.getLogger("mcp").setLevel(logging.WARNING)
+# Noisy library loggers, quietened by `configure_logging`
+QUIET_LOGGERS = ("httpx", "httpcore", "openai", "anyio", "mcp")
+
+_environment_loaded = False
+_logging_configured = False
+_settings: Settings | None = None
+_settings_lock = threading.Lock()
+
+
+def load_environment(force: bool = False) -> None:
+    """Load the `.env` file into the process environment (once unless `force`, overriding existing variables)."""
+    global _environment_loaded
+    if _environment_loaded and not force:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv(override=True)
+    _environment_loaded = True
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Configure the framework's default logging (once): INFO to stderr and
+    quieter HTTP/MCP library loggers. Does nothing to a root logger that
+    already has handlers.
+    """
+    global _logging_configured
+    if _logging_configured:
+        return
+    logging.basicConfig(level=level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+    _logging_configured = True
 
 
 class ConfigurationError(Exception):
@@ -99,32 +172,102 @@ class Settings(BaseSettings):
         timeout_seconds: Default action timeout in milliseconds
         default_step_timeout_seconds: Step-level timeout for retries
         max_turns: Maximum conversation turns for the AI agent
+        step_retries: Default number of checkpoint resume attempts per flow
+        persist_runs: Persist run state to `runs_dir` for every run
+        runs_dir: Directory for persisted run state (crash recovery)
+        flow_timeout_seconds: Default per-flow deadline (None = no deadline)
+        teardown_timeout_seconds: Budget for closing MCP servers after a run
+        execution_mode: Default execution mode ("flow" or "per_step")
+        output_mode: Default agent output schema mode ("full" or "lean")
+        history_db: SQLite run-history database (None = not recorded)
+        report_dir: Streaming report directory (None = no streaming report)
+        span_file: OTLP/JSON span file (None = spans are not exported)
+        tracing: Agent trace backend ("remote", "file" or "off")
+        trace_dir: Directory of the "file" trace backend
+        profile: Default run profiling mode ("off", "sample" or "cprofile")
+        profile_dir: Directory for run profiles
+        token_prices: Price table per deployment, per million tokens (see `runtime.metrics`)
+        cost_budget: Estimated cost per run above which a warning is logged
+        artifact_dir: Content-addressed artifact store (None = screenshots stay where they are)
+        artifact_max_age_days: Artifacts unused for this long are deleted
+        artifact_failure_max_age_days: Same for artifacts of failed runs
+        artifact_max_bytes: Size limit of the artifact store (None = no limit)
+        artifact_recompress: Losslessly recompress stored PNGs in the background
+        recording: Browser recording mode ("off", "trace" or "trace+video"), kept for failed runs only
+        recording_dir: Directory for the kept recordings of failed runs
+        video_size: Video size of the "trace+video" recording mode
+        run_dirs: Give every run its own output directory below `mcp_isolated_dir`
+        run_dir_cleanup: Remove run directories after the run ("never", "passed" or "always")
+        file_server: Give every run a filesystem MCP server confined to its output directory
+        locator_db: SQLite locator memory exposed to the agent as tools (None = disabled)
+        locator_app: Application key of stored locators
+        locator_mode: "prefetch" puts stored hints into the instructions and stores new locators after the run; "tools" gives the agent lookup/record tools
+        locator_hints_per_step: Maximum prefetched locators per step
+        locator_max_age_days: Locators unused for this long are evicted
+        locator_max_entries: Locators above this count are evicted, least recently used first (None = no limit)
+        macro_tools: Give the agent composite tools (fill a form, click and wait, dismiss popups)
+        popup_buttons: Button names `dismiss_popups` clicks to close known dialogs
         mcp_client_timeout_seconds: Timeout for MCP tool calls
     """
     
     # Azure OpenAI Configuration
-    azure_openai_deployment: str | None = os.getenv("AZURE_OPENAI_DEPLOYMENT")
-    azure_openai_endpoint: str | None = os.getenv("AZURE_OPENAI_ENDPOINT")
-    azure_openai_api_key: str | None = os.getenv("AZURE_OPENAI_API_KEY")
+    azure_openai_deployment: str | None = None
+    azure_openai_endpoint: str | None = None
+    azure_openai_api_key: str | None = None
     azure_openai_api_version: str = "2025-04-01-preview"
 
     # D365 MFA Key
-    mfa_key: str | None = os.getenv("D365_MFA_KEY")  # Optional, for TOTP generation
+    mfa_key: str | None = Field(default=None, validation_alias="D365_MFA_KEY")  # Optional, for TOTP generation
 
     # MCP / Playwright
     mcp_isolated_dir: Path = Path(".isolated")
     mcp_output_dir: Path = Path(".mcp-output")
-    viewport: str = os.getenv("VIEWPORT", "1600,900")
-    timeout_seconds: int = int(os.getenv("TIMEOUT_SECONDS", "5000"))
+    viewport: str = "1600,900"
+    timeout_seconds: int = 5000
 
     # Agent behavior
-    default_step_timeout_seconds: int = int(os.getenv("DEFAULT_STEP_TIMEOUT_SECONDS", "30"))
-    max_turns: int = int(os.getenv("MAX_TURNS", "1000"))
+    default_step_timeout_seconds: int = 30
+    max_turns: int = 1000
+    step_retries: int = 0
+    persist_runs: bool = False
+    runs_dir: Path = Path(".runs")
+    flow_timeout_seconds: float | None = None
+    teardown_timeout_seconds: float = 15
+    execution_mode: Literal["flow", "per_step"] = "flow"
+    output_mode: Literal["full", "lean"] = "full"
+    history_db: Path | None = None
+    report_dir: Path | None = None
+    span_file: Path | None = None
+    tracing: Literal["off", "file", "remote"] = "remote"
+    trace_dir: Path = Path("reports/traces")
+    profile: Literal["off", "sample", "cprofile"] = "off"
+    profile_dir: Path = Path("reports/profiles")
+    token_prices: dict[str, dict[str, Any]] = {}
+    cost_budget: float | None = None
+    artifact_dir: Path | None = None
+    artifact_max_age_days: float = 14
+    artifact_failure_max_age_days: float = 90
+    artifact_max_bytes: int | None = None
+    artifact_recompress: bool = True
+    recording: Literal["off", "trace", "trace+video"] = "off"
+    recording_dir: Path = Path("reports/recordings")
+    video_size: str = "800x600"
+    run_dirs: bool = True
+    run_dir_cleanup: Literal["never", "passed", "always"] = "never"
+    file_server: bool = False
+    locator_db: Path | None = None
+    locator_app: str = "default"
+    locator_mode: Literal["prefetch", "tools"] = "prefetch"
+    locator_hints_per_step: int = 2
+    locator_max_age_days: float = 30
+    locator_max_entries: int | None = None
+    macro_tools: bool = False
+    popup_buttons: list[str] = ["Close", "Dismiss", "Not now", "No thanks", "Got it", "Skip", "Accept all"]
     
     # MCP timeout settings
-    mcp_client_timeout_seconds: int = int(os.getenv("MCP_CLIENT_TIMEOUT_SECONDS", "120"))
+    mcp_client_timeout_seconds: int = 120
 
-    model_config = SettingsConfigDict(env_file=".env", env_prefix="", extra="ignore")
+    model_config = SettingsConfigDict(env_file=".env", env_prefix="", extra="ignore", populate_by_name=True)
 
     @field_validator("azure_openai_deployment", "azure_openai_endpoint", "azure_openai_api_key")
     @classmethod
@@ -135,6 +278,21 @@ class Settings(BaseSettings):
             )
         return v
 
+    def artifact_retention(self) -> Any:
+        """The artifact store's retention policy (`artifacts.RetentionPolicy`)."""
+        from playwright_agent.artifacts import RetentionPolicy
+
+        return RetentionPolicy(
+            max_age_days=self.artifact_max_age_days,
+            failure_max_age_days=self.artifact_failure_max_age_days,
+            max_bytes=self.artifact_max_bytes,
+        )
+
+    def create_directories(self) -> None:
+        """Create the MCP data and output directories."""
+        self.mcp_isolated_dir.mkdir(parents=True, exist_ok=True)
+        self.mcp_output_dir.mkdir(parents=True, exist_ok=True)
+
     def validate_all(self) -> None:
         """Validate all required settings are present."""
         missing = []
@@ -152,13 +310,13 @@ class Settings(BaseSettings):
             )
 
 
-def get_settings() -> Settings:
-    """Get validated settings instance."""
+def _load_settings() -> Settings:
+    """Parse and validate the settings and create their output directories."""
+    configure_logging()
     try:
         s = Settings()
         s.validate_all()
-        s.mcp_isolated_dir.mkdir(parents=True, exist_ok=True)
-        s.mcp_output_dir.mkdir(parents=True, exist_ok=True)
+        s.create_directories()
         logger.debug("Settings loaded successfully")
         return s
     except ConfigurationError as e:
@@ -166,4 +324,29 @@ def get_settings() -> Settings:
         raise
     except Exception as e:
         logger.error(f"Failed to load settings: {e}")
-        raise ConfigurationError(f"Failed to initialize settings: {e}") from e
\ No newline at end of file
+        raise ConfigurationError(f"Failed to initialize settings: {e}") from e
+
+
+def get_settings() -> Settings:
+    """Get the validated settings instance (loaded on first use, then shared)."""
+    global _settings
+    if _settings is not None:
+        return _settings
+    with _settings_lock:
+        if _settings is None:
+            load_environment()
+            _settings = _load_settings()
+        return _settings
+
+
+def reload() -> Settings:
+    """Re-read `.env` and the environment and replace the shared settings instance."""
+    global _settings
+    with _settings_lock:
+        load_environment(force=True)
+        _settings = _load_settings()
+        # Cached Azure OpenAI clients were built from the replaced settings (the module is only loaded by runs)
+        azure = sys.modules.get("playwright_agent.integrations.azure_openai")
+        if azure is not None:
+            azure.reset_clients()
+        return _settings
@@ -12,6 +12,11 @@ Fixtures
 - `flow_runner`: Session-scoped BaseFlowRunner instance (reused across tests)
 - `trace_name`: Current test function name for OpenAI tracing
 
+Plugins
+-------
+- `playwright_agent.pytest_plugin`: records per-test outcomes/durations and
+  adds `--flow-order=fail-first` (see the plugin module for details)
+
 Usage
 -----
 Fixtures are automatically available in async test functions:
@@ -36,7 +41,13 @@ from __future__ import annotations
 import platform
 import asyncio
 import pytest
-from playwright_agent.runtime.base import BaseFlowRunner
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from playwright_agent.runtime.base import BaseFlowRunner
+
+# Failure-likelihood-first ordering (--flow-order=fail-first) and outcome history
+pytest_plugins = ["playwright_agent.pytest_plugin"]
 
 # Apply asyncio marker to all tests by default
 pytestmark = pytest.mark.asyncio
@@ -70,6 +81,8 @@ def flow_runner() -> BaseFlowRunner:
                 RunResult
             )
     """
+    from playwright_agent.runtime.base import BaseFlowRunner
+
     return BaseFlowRunner()
 
 
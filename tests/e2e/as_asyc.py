@@ -3,12 +3,8 @@ import pathlib
 import pytest
 import asyncio
 from playwright_agent.schemas.results import RunResult
-from playwright_agent.runtime.base import BaseFlowRunner
 from pydantic import Field
 
-# Initialize the runner
-runner = BaseFlowRunner()
-
 # Use pytest-asyncio marker for all tests in this module
 pytestmark = pytest.mark.asyncio
 
@@ -18,15 +14,15 @@ pytestmark = pytest.mark.asyncio
     "tests/data/flows/google_search.md",
     "tests/data/flows/demo_login.md",
 ])
-async def test_generic_web_flows(steps_path: str):
+async def test_generic_web_flows(flow_runner, steps_path: str):
     steps = pathlib.Path(steps_path).read_text(encoding="utf-8")
-    result = await runner.run(steps, RunResult)
+    result = await flow_runner.run(steps, RunResult)
     print(result)
     assert result.status == "PASS", f"Failed: {result.exception} at {result.failed_step_id}"
     assert result.proof_of_pass, "Missing proof_of_pass (screenshot path)"
 
 @pytest.mark.BVT
-async def test_create_lead_with_mcp():
+async def test_create_lead_with_mcp(flow_runner):
     import os
     from dotenv import load_dotenv
     load_dotenv(override=True)
@@ -69,14 +65,14 @@ async def test_create_lead_with_mcp():
                                                              description="Whether the New Opportunity was created and Opportunity Page loaded successfully")
         is_step_18_successful: bool = Field(..., description="Whether Step 18 was successful")
 
-    result = await runner.run(user_step, CustomAssertions)
+    result = await flow_runner.run(user_step, CustomAssertions)
     print(result)
     assert result.status == "PASS", f"Test failed with exception: {result.exception} at step {result.failed_step_id}"
     assert result.is_opportunity_page_created_and_loaded, "Opportunity page was not created and loaded successfully"
     assert result.is_step_18_successful, "Step 19 was not successful"
 
 @pytest.mark.BVT
-async def test_create_lead_with_mcp1():
+async def test_create_lead_with_mcp1(flow_runner):
     import os
     from dotenv import load_dotenv
     load_dotenv(override=True)
@@ -123,7 +119,7 @@ async def test_create_lead_with_mcp1():
                                                              description="Success conditions : Whether the New Opportunity was created and Opportunity Page loaded successfully")
         is_step_18_successful: bool = Field(..., description="Success conditions : Whether Step 18 was successful")
 
-    result = await runner.run(user_step, CustomAssertions)
+    result = await flow_runner.run(user_step, CustomAssertions)
     print(result)
     assert result.status == "PASS", f"Test failed with exception: {result.exception} at step {result.failed_step_id}"
     assert result.is_opportunity_page_created_and_loaded, "Opportunity page was not created and loaded successfully"
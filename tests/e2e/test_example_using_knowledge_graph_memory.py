@@ -3,6 +3,7 @@ import pathlib
 import pytest
 from playwright_agent.schemas.results import RunResult
 from playwright_agent.runtime.base import BaseFlowRunner
+from playwright_agent.settings import get_settings
 from pydantic import Field
 from agents.tool import function_tool
 import os
@@ -22,7 +23,11 @@ def get_totp() -> str:
 
 @pytest.fixture
 def flow_runner():
-    return BaseFlowRunner()
+    # Locator hints live in the in-process locator memory (see playwright_agent.locators)
+    settings = get_settings().model_copy(
+        update={"locator_db": pathlib.Path(".locators/leads_opportunities.sqlite3"), "locator_app": "d365"}
+    )
+    return BaseFlowRunner(settings=settings)
 
 
 @pytest.mark.asyncio
@@ -45,18 +50,13 @@ async def test_create_lead_and_qualify_opportunity(flow_runner, steps_path: str)
     steps_template = pathlib.Path(steps_path).read_text(encoding="utf-8")
     steps = steps_template.format(url=url, username=username, password=password, lead_name=lead_name, FIRST_NAME=FIRST_NAME, LAST_NAME=LAST_NAME)
 
-    knowledge_graph_steps_path = pathlib.Path("tests/data/prompts/knowledge_graph_instruction.md")
-    knowledge_graph_instructions = knowledge_graph_steps_path.read_text(encoding="utf-8")
-    steps = knowledge_graph_instructions + "\n" + steps
-
     class CustomRunResult(RunResult):
         login_successful: bool = Field(description="True if user reached Dynamics main page after login")
         lead_saved: bool = Field(description="True if lead was actually saved in CRM")
         duplicate_dialog_shown: bool = Field(description="True if duplicate account/contact dialog appeared")
         opportunity_page_loaded: bool = Field(description="True if opportunity page was displayed after qualify")
 
-    async with await flow_runner.server_manager.get_knowledge_graph_based_memory(kg_path='Leads_opportunities.json') as kg_server:
-        result = await flow_runner.run(steps, CustomRunResult, tools=[get_totp], mcp_servers=[kg_server])
+    result = await flow_runner.run(steps, CustomRunResult, tools=[get_totp])
 
     print(result)
     assert result.status == "PASS", f"Failed: {result.exception} at {result.failed_step_id}"
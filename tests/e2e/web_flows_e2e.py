@@ -10,14 +10,13 @@ For production tests, see:
 - test_default_assertions.py
 - test_example_using_tools.py
 
-Note: All tests use the async-only API with @pytest.mark.asyncio and await runner.run()
+Note: All tests use the async-only API with @pytest.mark.asyncio and await flow_runner.run()
 """
 
 from __future__ import annotations
 import pathlib
 import pytest
 from playwright_agent.schemas.results import RunResult
-from playwright_agent.runtime.base import BaseFlowRunner
 from pydantic import Field
 from agents.tool import function_tool
 from playwright_agent.settings import get_settings
@@ -37,24 +36,22 @@ def get_totp() -> str:
     return pyotp.TOTP(mfa_key).now()
 
 
-runner = BaseFlowRunner()
-
 
 @pytest.mark.e2e
 @pytest.mark.parametrize("steps_path", [
     "tests/data/flows/google_search.md",
     "tests/data/flows/demo_login.md",
 ])
-async def test_generic_web_flows(steps_path: str):
+async def test_generic_web_flows(flow_runner, steps_path: str):
     steps = pathlib.Path(steps_path).read_text(encoding="utf-8")
-    result = await runner.run(steps, RunResult)
+    result = await flow_runner.run(steps, RunResult)
     print(result)
     assert result.status == "PASS", f"Failed: {result.exception} at {result.failed_step_id}"
     assert result.proof_of_pass, "Missing proof_of_pass (screenshot path)"
 
 
 @pytest.mark.BVT
-async def test_create_lead_basic():
+async def test_create_lead_basic(flow_runner):
     """Basic lead creation test for Dynamics 365."""
     import os
     from dotenv import load_dotenv
@@ -100,7 +97,7 @@ async def test_create_lead_basic():
         opp_id_created: str = Field(...,
                                     description="The Opportunity ID created if Test is Passed, else set value to 'TEST FAILED'")
 
-    result = await runner.run(user_step, CustomAssertions)
+    result = await flow_runner.run(user_step, CustomAssertions)
 
     print(result)
     assert result.status == "PASS", f"Test failed with exception: {result.exception} at step {result.failed_step_id}"
@@ -109,7 +106,7 @@ async def test_create_lead_basic():
 
 
 @pytest.mark.BVT
-async def test_create_lead_with_tools():
+async def test_create_lead_with_tools(flow_runner):
     """Lead creation test with MFA tools for Dynamics 365."""
     import os
     from dotenv import load_dotenv
@@ -163,7 +160,7 @@ async def test_create_lead_with_tools():
         is_lead_converted_to_opportunity: bool = Field(...,
                                                        description="Success conditions: Whether the Lead was converted to Opportunity successfully. FAIL IF NOT CONVERTED")
 
-    result = await runner.run(user_step, CustomAssertions, tools=[get_totp])
+    result = await flow_runner.run(user_step, CustomAssertions, tools=[get_totp])
 
     print(result)
     assert result.status == "PASS", f"Test failed with exception: {result.exception} at step {result.failed_step_id}"
@@ -0,0 +1,148 @@
+"""
+Fixtures for unit tests.
+
+Unit tests never talk to Azure OpenAI or start a browser; they only need
+settings that validate and a throwaway working directory for the
+framework's output folders.
+
+Runner tests replace the browser and the agent:
+
+    async def respond(agent, prompt):
+        meter = agent.hook(UsageMeter)
+        ...
+        return RunResult(status="PASS", steps=[], exception=None, summary=None)
+
+    agents = agent_runner(respond)   # patched in as `base.AgentRunner`
+    result = await make_flow_runner().run("1. Open the app", RunResult)
+    assert agents.instances[0].kwargs["output_type"] is RunResult
+
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
+
+import pytest
+from agents.tool_context import ToolContext  # type: ignore[import-not-found]
+
+from playwright_agent import settings
+from playwright_agent.runtime import base
+from playwright_agent.runtime.base import BaseFlowRunner
+from playwright_agent.schemas.results import RunResult
+
+
+@pytest.fixture
+def settings_env(monkeypatch, tmp_path):
+    """Point required settings at dummy values and run inside `tmp_path` (with fresh shared settings)."""
+    monkeypatch.setattr(settings, "_settings", None)
+    monkeypatch.setenv("AZURE_OPENAI_DEPLOYMENT", "unit-test")
+    monkeypatch.setenv("AZURE_OPENAI_ENDPOINT", "http://127.0.0.1:9")
+    monkeypatch.setenv("AZURE_OPENAI_API_KEY", "unit-test")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+class FakeBrowser:
+    """Stands in for the Playwright MCP server: answers every tool call with `text`."""
+
+    name = "playwright"
+
+    def __init__(self):
+        self.text = ""
+        self.connect_delay = 0.0
+        self.connected = False
+        self.closed = False
+        self.tool_calls: list[str] = []
+
+    async def connect(self):
+        await asyncio.sleep(self.connect_delay)
+        self.connected = True
+
+    async def cleanup(self):
+        self.closed = True
+
+    async def call_tool(self, name, arguments):
+        self.tool_calls.append(name)
+        return SimpleNamespace(content=[SimpleNamespace(text=self.text)] if self.text else [], isError=False)
+
+
+class FakeManager:
+    """Stands in for `MCPServerManager`: hands out `browser` for every run."""
+
+    def __init__(self, browser: Any):
+        self.browser = browser
+
+    async def get_browser_server(self, storage_state=None):
+        return self.browser
+
+
+class StubAgentRunner:
+    """
+    Stands in for `AgentRunner`: keeps its arguments and answers `run` with
+    `respond(agent, prompt)` (a passing, empty `RunResult` by default).
+    """
+
+    instances: list[StubAgentRunner] = []
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        type(self).instances.append(self)
+
+    def hook(self, kind: type) -> Any:
+        """The run hook of type `kind` the runner was given."""
+        return next(hook for hook in self.kwargs["hooks"] if isinstance(hook, kind))
+
+    @property
+    def tools(self) -> dict[str, Any]:
+        return {tool.name: tool for tool in self.kwargs.get("tools") or []}
+
+    async def call_tool(self, name: str, **arguments) -> Any:
+        """Invoke one of the runner's function tools like the model would."""
+        raw = json.dumps(arguments)
+        context = ToolContext(None, tool_name=name, tool_call_id=name, tool_arguments=raw)
+        return await self.tools[name].on_invoke_tool(context, raw)
+
+    async def respond(self, prompt: str) -> Any:
+        return RunResult(status="PASS", steps=[], exception=None, summary=None)
+
+    async def run(self, prompt):
+        return await self.respond(prompt)
+
+
+@pytest.fixture
+def fake_browser():
+    return FakeBrowser()
+
+
+@pytest.fixture
+def fake_manager(fake_browser):
+    return FakeManager(fake_browser)
+
+
+@pytest.fixture
+def agent_runner(monkeypatch):
+    """Factory: patch in a `StubAgentRunner` answering with `respond` and return its class."""
+
+    def make(respond: Callable[[StubAgentRunner, str], Awaitable[Any]] | None = None) -> type[StubAgentRunner]:
+        namespace: dict[str, Any] = {"instances": []}
+        if respond is not None:
+            namespace["respond"] = respond
+        stub = type("AgentRunner", (StubAgentRunner,), namespace)
+        monkeypatch.setattr(base, "AgentRunner", stub)
+        return stub
+
+    return make
+
+
+@pytest.fixture
+def make_flow_runner(settings_env, fake_manager):
+    """Factory: a `BaseFlowRunner` (built from the current environment) on `fake_manager`."""
+
+    def make() -> BaseFlowRunner:
+        runner = BaseFlowRunner()
+        runner.server_manager = fake_manager
+        return runner
+
+    return make
@@ -0,0 +1,97 @@
+from __future__ import annotations
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from playwright_agent.artifacts import DAY_SECONDS, ArtifactStore, RetentionPolicy, _chunks, recompress_png
+from playwright_agent.runtime.run_dirs import current_run_dir
+from playwright_agent.schemas.results import RunResult
+
+
+def png(width: int = 64, height: int = 64, shade: int = 0) -> bytes:
+    """An RGB PNG stored without compression, as a stand-in for a screenshot."""
+    rows = b"".join(b"\x00" + bytes([shade, x % 256, 128]) * width for x in range(height))
+
+    def chunk(kind: bytes, body: bytes) -> bytes:
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows, 0)) + chunk(b"IEND", b"")
+
+
+def test_identical_screenshots_are_stored_once_and_recompressed_losslessly(tmp_path):
+    store = ArtifactStore(tmp_path / "store")
+    first, second = tmp_path / "success_1.png", tmp_path / "success_2.png"
+    first.write_bytes(png())
+    second.write_bytes(png())
+
+    path = store.ingest(first, "test_login", "run-1", "PASS")
+    assert store.ingest(second, "test_login", "run-2", "PASS") == path
+    store.wait()
+
+    assert not first.exists() and not second.exists()
+    stats = store.stats()
+    assert (stats["objects"], stats["refs"]) == (1, 2) and stats["stored_bytes"] < len(png())
+    assert stats["saved_bytes"] > len(png())
+    stored = path.read_bytes()
+    assert recompress_png(stored) is None
+    image = b"".join(body for kind, body in _chunks(stored) if kind == b"IDAT")
+    assert zlib.decompress(image) == zlib.decompress(b"".join(body for kind, body in _chunks(png()) if kind == b"IDAT"))
+
+
+def test_retention_keeps_failures_longer_and_enforces_the_size_limit(tmp_path):
+    store = ArtifactStore(tmp_path / "store", RetentionPolicy(max_age_days=7, failure_max_age_days=30), recompress=False)
+    paths = {}
+    for shade, status in enumerate(("PASS", "FAIL", "PASS")):
+        source = tmp_path / f"shot_{shade}.png"
+        source.write_bytes(png(shade=shade))
+        paths[shade] = store.ingest(source, status=status)
+    now = time.time()
+    with store._connect() as db:
+        db.execute("UPDATE objects SET last_used = ? WHERE path IN (?, ?)", (now - 10 * DAY_SECONDS, str(paths[0]), str(paths[1])))
+
+    assert store.prune(now)["removed"] == 1
+    assert not paths[0].exists() and paths[1].exists() and paths[2].exists()
+
+    store.policy = RetentionPolicy(max_bytes=len(png()) + 1)
+    assert store.prune(now)["removed"] == 1
+    assert paths[1].exists() and not paths[2].exists()
+    assert store.stats()["refs"] == 1
+
+
+def test_prune_waits_for_a_concurrent_ingest_and_keeps_what_it_refreshed(tmp_path):
+    store = ArtifactStore(tmp_path / "store", RetentionPolicy(max_age_days=7), recompress=False)
+    source = tmp_path / "shot.png"
+    source.write_bytes(png())
+    path = store.ingest(source, status="PASS")
+    now = time.time()
+    with store._connect() as db:
+        db.execute("UPDATE objects SET last_used = ?", (now - 10 * DAY_SECONDS,))
+
+    with ThreadPoolExecutor(1) as pool:
+        with store._connect(immediate=True) as db:  # an ingest of the same content, mid-transaction
+            pruning = pool.submit(store.prune, now)
+            time.sleep(0.2)
+            db.execute("UPDATE objects SET last_used = ?", (now,))
+        assert pruning.result()["removed"] == 0
+    assert path.exists()
+
+
+async def take_screenshot(agent, prompt):
+    (current_run_dir() / "success_20250101-000000.png").write_bytes(png())
+    return RunResult(status="PASS", steps=[], exception=None, summary=None, proof_of_pass="success_20250101-000000.png")
+
+
+@pytest.mark.asyncio
+async def test_run_moves_the_final_screenshot_into_the_store(settings_env, monkeypatch, agent_runner, make_flow_runner):
+    monkeypatch.setenv("ARTIFACT_DIR", str(settings_env / "artifacts"))
+    agent_runner(take_screenshot)
+    result = await make_flow_runner().run("1. Open the app", RunResult)
+
+    stored = result.proof_of_pass
+    assert stored.startswith(str(settings_env / "artifacts" / "objects")) and os.path.isfile(stored)
+    assert not list((settings_env / ".isolated").rglob("success_20250101-000000.png"))
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import pytest
+
+from benchmarks.fake_llm import DEFAULT_SCRIPT, FakeLLMServer
+from benchmarks.run import _environment, _flow_runner, compare, measure_concurrency, measure_per_turn
+
+
+@pytest.mark.asyncio
+async def test_benchmark_flows_run_offline_against_the_fakes(settings_env, monkeypatch):
+    with FakeLLMServer(DEFAULT_SCRIPT) as llm:
+        for name in ("AZURE_OPENAI_ENDPOINT", "TRACING"):
+            monkeypatch.setenv(name, "")  # restored after the test
+        _environment(llm.endpoint)
+        runner = _flow_runner(snapshot_bytes=2000, action_ms=0)
+        per_turn = await measure_per_turn(runner, repeat=1)
+        level = await measure_concurrency(runner, flows=2)
+
+    assert per_turn["turns_per_flow"] == len(DEFAULT_SCRIPT["turns"]) and per_turn["turn_ms"] > 0
+    assert level["flows"] == 2 and level["flows_per_second"] > 0 and llm.requests == 3 * len(DEFAULT_SCRIPT["turns"])
+
+
+def test_reports_are_compared_metric_by_metric():
+    baseline = {"cold_start": {"import_seconds": 2.0}, "concurrency": [{"flows": 4, "flows_per_second": 3.0}]}
+    current = {"cold_start": {"import_seconds": 0.5}, "concurrency": [{"flows": 4, "flows_per_second": 6.0}]}
+    assert compare(baseline, current) == [
+        {"metric": "cold_start.import_seconds", "baseline": 2.0, "current": 0.5, "change": -0.75},
+        {"metric": "concurrency[4].flows_per_second", "baseline": 3.0, "current": 6.0, "change": 1.0},
+    ]
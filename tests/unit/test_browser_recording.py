@@ -0,0 +1,46 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from playwright_agent.integrations.mcp_servers import MCPServerManager
+from playwright_agent.runtime.base import BaseFlowRunner
+from playwright_agent.runtime.run_dirs import current_run_dir
+from playwright_agent.schemas.results import RunResult
+
+
+def write_trace(status):
+    """Writes trace files like the browser server does and reports `status`."""
+
+    async def respond(agent, prompt):
+        traces = current_run_dir() / "traces"
+        (traces / "resources").mkdir(parents=True, exist_ok=True)
+        (traces / "trace-1.trace").write_text("{}\n" * 100)
+        (traces / "resources" / "page.html").write_text("<html></html>")
+        return RunResult(status=status, steps=[], exception=None, summary=None)
+
+    return respond
+
+
+@pytest.mark.asyncio
+async def test_browser_server_records_trace_and_video_when_enabled(settings_env, monkeypatch):
+    monkeypatch.setenv("RECORDING", "trace+video")
+    server = await MCPServerManager(BaseFlowRunner().settings).get_browser_server()
+    assert "--save-trace" in server.params.args and "--save-video=800x600" in server.params.args
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status", ["PASS", "FAIL"])
+async def test_recording_is_kept_only_for_failed_runs(settings_env, monkeypatch, agent_runner, make_flow_runner, status):
+    monkeypatch.setenv("RECORDING", "trace")
+    agent_runner(write_trace(status))
+    result = await make_flow_runner().run("1. Open the app", RunResult)
+
+    assert not list((settings_env / ".isolated").rglob("trace-1.trace"))
+    if status == "PASS":
+        assert result.recording is None and not (settings_env / "reports" / "recordings").exists()
+    else:
+        kept = settings_env / "reports" / "recordings"
+        [directory] = kept.iterdir()
+        assert Path(result.recording).resolve() == directory
+        assert (directory / "trace-1.trace").is_file() and (directory / "resources" / "page.html").is_file()
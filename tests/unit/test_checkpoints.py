@@ -0,0 +1,87 @@
+from __future__ import annotations
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from playwright_agent.runtime.checkpoints import (
+    CheckpointRecorder,
+    StepCheckpoint,
+    build_resume_prompt,
+    carried_steps,
+)
+
+
+class FakeBrowser:
+    """Answers `browser_evaluate` like Playwright MCP does."""
+
+    def __init__(self, value):
+        self.value = value
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        text = f"### Result\n{json.dumps(self.value)}\n\n### Ran Playwright code\n```js\n```"
+        return SimpleNamespace(content=[SimpleNamespace(text=text)], isError=False)
+
+
+@pytest.mark.asyncio
+async def test_capture_writes_playwright_storage_state(tmp_path):
+    browser = FakeBrowser({
+        "url": "https://crm.example.com/main.aspx",
+        "origin": "https://crm.example.com",
+        "cookies": "session=abc; theme=dark",
+        "localStorage": {"token": "t1"},
+    })
+    recorder = CheckpointRecorder(tmp_path)
+    recorder.bind(browser)
+
+    checkpoint = await recorder.capture("4", "Opened Leads view")
+
+    assert checkpoint.url == "https://crm.example.com/main.aspx"
+    state = json.loads(open(checkpoint.storage_state_path).read())
+    assert [c["name"] for c in state["cookies"]] == ["session", "theme"]
+    assert state["cookies"][0]["domain"] == "crm.example.com"
+    assert state["origins"] == [{"origin": "https://crm.example.com", "localStorage": [{"name": "token", "value": "t1"}]}]
+    assert recorder.last is checkpoint
+
+
+@pytest.mark.asyncio
+async def test_capture_survives_unreadable_page(tmp_path):
+    class BrokenBrowser:
+        async def call_tool(self, name, arguments):
+            raise RuntimeError("page closed")
+
+    recorder = CheckpointRecorder(tmp_path)
+    recorder.bind(BrokenBrowser())
+
+    checkpoint = await recorder.capture("2", "Logged in")
+
+    assert checkpoint.url is None
+    assert checkpoint.storage_state_path is None
+    assert recorder.checkpoints == [checkpoint]
+
+
+def test_resume_prompt_lists_passed_steps_and_url():
+    checkpoints = [
+        StepCheckpoint(step_id="1", summary="Logged in", url="https://app/home"),
+        StepCheckpoint(step_id="2", summary="Opened Leads", url="https://app/leads"),
+    ]
+
+    prompt = build_resume_prompt("1. Login\n2. Open Leads\n3. New Lead", checkpoints)
+
+    assert "- Step 1: Logged in" in prompt
+    assert "Open https://app/leads first" in prompt
+    assert "right after step 2" in prompt
+    assert prompt.endswith("3. New Lead")
+
+
+def test_carried_steps_prefers_reported_results():
+    reported = SimpleNamespace(step_id="1", status="PASS")
+    checkpoints = [StepCheckpoint(step_id="1", summary="a"), StepCheckpoint(step_id="2", summary="b")]
+
+    steps = carried_steps(checkpoints, {"1": reported})
+
+    assert steps[0] is reported
+    assert steps[1].step_id == "2"
+    assert steps[1].status == "PASS"
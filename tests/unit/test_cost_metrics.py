@@ -0,0 +1,64 @@
+from __future__ import annotations
+import json
+import logging
+from types import SimpleNamespace
+
+import pytest
+from agents.tool_context import ToolContext  # type: ignore[import-not-found]
+
+from playwright_agent.runtime.metrics import TokenPrices, UsageMeter, prices_for
+from playwright_agent.schemas.results import RunResult
+
+PRICES = {"unit-test": {"input": 2.0, "cached_input": 0.5, "output": 8.0}, "default": {"input": 1.0, "output": 1.0}}
+
+
+def response(input_tokens: int, cached: int, output_tokens: int, reasoning: int):
+    return SimpleNamespace(usage=SimpleNamespace(
+        requests=1, input_tokens=input_tokens, output_tokens=output_tokens,
+        input_tokens_details=SimpleNamespace(cached_tokens=cached),
+        output_tokens_details=SimpleNamespace(reasoning_tokens=reasoning),
+    ))
+
+
+async def call_tool(meter: UsageMeter, name: str, arguments: dict) -> None:
+    context = ToolContext(None, tool_name=name, tool_call_id="call", tool_arguments=json.dumps(arguments))
+    await meter.on_tool_end(context, None, SimpleNamespace(name=name), "ok")
+
+
+def test_prices_fall_back_to_default_and_price_cached_tokens_separately():
+    prices = prices_for(PRICES, "unit-test")
+    assert prices == TokenPrices(input=2.0, cached_input=0.5, output=8.0)
+    assert prices.cost(1_000_000, 400_000, 100_000) == pytest.approx(1.2 + 0.2 + 0.8)
+    assert prices_for(PRICES, "other").input == 1.0 and prices_for({}, "unit-test") is None
+
+
+async def two_checkpointed_steps(agent, prompt):
+    meter = agent.hook(UsageMeter)
+    for step_id, tokens in (("1", 1000), ("2", 20_000)):
+        await meter.on_llm_start(None, None, None, None)
+        await meter.on_llm_end(None, None, response(tokens, tokens // 2, 100, 40))
+        await call_tool(meter, "browser_click", {"ref": "e1"})
+        await call_tool(meter, "record_checkpoint", {"step_id": step_id, "status": "PASS"})
+    await meter.on_llm_end(None, None, response(500, 0, 50, 0))
+    return RunResult(status="PASS", steps=[], exception=None, summary=None)
+
+
+@pytest.mark.asyncio
+async def test_run_result_carries_per_step_usage_and_cost_and_warns_over_budget(monkeypatch, caplog, agent_runner, make_flow_runner):
+    monkeypatch.setenv("TOKEN_PRICES", json.dumps(PRICES))
+    monkeypatch.setenv("COST_BUDGET", "0.01")
+    agent_runner(two_checkpointed_steps)
+    runner = make_flow_runner()
+
+    with caplog.at_level(logging.WARNING, logger="playwright_agent"):
+        result = await runner.run("1. Open the app\n2. Search", RunResult)
+
+    usage = result.usage
+    assert (usage.turns, usage.tool_calls, usage.input_tokens, usage.cached_tokens) == (3, 4, 21_500, 10_500)
+    assert (usage.output_tokens, usage.reasoning_tokens, usage.model) == (250, 80, "unit-test")
+    assert [call.step_id for call in usage.calls] == ["1", "2", None]
+    assert (usage.steps["2"].turns, usage.steps["2"].tool_calls, usage.steps["2"].input_tokens) == (1, 2, 20_000)
+    assert usage.steps["2"].estimated_cost == pytest.approx((10_000 * 2.0 + 10_000 * 0.5 + 100 * 8.0) / 1e6)
+    assert usage.estimated_cost == pytest.approx((11_000 * 2.0 + 10_500 * 0.5 + 250 * 8.0) / 1e6)
+    assert usage.currency == "USD" and [step_id for step_id, _ in usage.most_expensive_steps()] == ["2", "1"]
+    assert "exceeds the budget" in caplog.text
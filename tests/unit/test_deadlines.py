@@ -0,0 +1,86 @@
+from __future__ import annotations
+import asyncio
+
+import pytest
+from pydantic import Field
+
+from playwright_agent.runtime import base
+from playwright_agent.schemas.results import RunResult
+
+
+async def never_answer(agent, prompt):
+    """A model call that never returns."""
+    await asyncio.sleep(30)
+
+
+@pytest.fixture
+def runner(agent_runner, make_flow_runner):
+    agent_runner(never_answer)
+    runner = make_flow_runner()
+    runner.settings.teardown_timeout_seconds = 2
+    return runner
+
+
+@pytest.mark.asyncio
+async def test_deadline_returns_partial_result_and_closes_browser(runner):
+    class CustomResult(RunResult):
+        lead_saved: bool = Field(description="True if lead was saved")
+
+    result = await runner.run("1. Login\n2. Create lead", CustomResult, timeout=0.2)
+
+    browser = runner.server_manager.browser
+    assert result.timed_out
+    assert result.status == "FAIL"
+    assert result.lead_saved is None
+    assert result.proof_of_pass.endswith(".png")
+    assert browser.tool_calls == ["browser_take_screenshot"]
+    assert browser.closed
+
+
+@pytest.mark.asyncio
+async def test_partial_result_reports_checkpointed_steps(runner):
+    recorder = base._new_recorder(runner.settings.mcp_output_dir, None)
+    await recorder.capture("1", "Logged in")
+
+    result = base._timed_out_result(RunResult, recorder, proof=None)
+
+    assert [step.step_id for step in result.steps] == ["1"]
+    assert "last passed step: 1" in result.exception
+
+
+@pytest.mark.asyncio
+async def test_browser_is_closed_when_agent_fails(runner, agent_runner):
+    async def fail(agent, prompt):
+        raise base.AgentExecutionError("model unavailable")
+
+    agent_runner(fail)
+
+    with pytest.raises(base.FlowExecutionError):
+        await runner.run("1. Login", RunResult)
+    assert runner.server_manager.browser.closed
+
+
+@pytest.mark.asyncio
+async def test_outside_cancellation_closes_browser_and_propagates(runner):
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.2):
+            await runner.run("1. Login", RunResult)
+
+    assert runner.server_manager.browser.closed
+
+
+@pytest.mark.asyncio
+async def test_explicit_zero_timeout_disables_the_default_deadline(runner, monkeypatch):
+    seen = []
+
+    async def fake_run_flow(*args, timeout=None, **kwargs):
+        seen.append(timeout)
+        return RunResult(status="PASS", steps=[], exception=None, summary="ok")
+
+    runner.settings.flow_timeout_seconds = 5
+    monkeypatch.setattr(runner, "_run_flow", fake_run_flow)
+
+    await runner.run("1. Login", RunResult, timeout=0)
+    await runner.run("1. Login", RunResult)
+
+    assert seen == [0, 5]
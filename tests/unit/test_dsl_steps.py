@@ -0,0 +1,103 @@
+from __future__ import annotations
+from types import SimpleNamespace
+
+import pytest
+
+from playwright_agent.dsl import Flow, click, compile_instruction, flow, open_url, type_text, wait_for
+from playwright_agent.dsl.steps import FlowEngine, delegation_prompt
+
+PAGE = """### Page state
+- Page URL: https://the-internet.herokuapp.com/login
+- Page Snapshot:
+```yaml
+- textbox "Username" [ref=e3]
+- textbox "Password" [ref=e4]
+- button "Login" [cursor=pointer] [ref=e5]
+- link "Login" [ref=e6]
+```"""
+
+
+def _result(text, error=False):
+    return SimpleNamespace(content=[SimpleNamespace(text=text)], isError=error)
+
+
+class FakeBrowser:
+    def __init__(self, failing=()):
+        self.calls = []
+        self.failing = set(failing)
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        if name in self.failing:
+            return _result("### Result\nError: Timeout 5000ms exceeded", error=True)
+        if name in ("browser_navigate", "browser_snapshot", "browser_click"):
+            return _result("### Ran Playwright code\n```js\nawait page.goto('x');\n```\n\n" + PAGE)
+        return _result("### Result\nok")
+
+
+def test_compile_instruction_recognizes_literal_steps():
+    steps = [compile_instruction(line) for line in (
+        "Open `https://the-internet.herokuapp.com/login`",
+        "Wait for the login form to appear",
+        "Enter `tomsmith` in the **Username** field",
+        "Click the **Login** button",
+        "Wait for message *“You logged into a secure area!”*",
+        "Verify the dashboard shows the right account",
+    )]
+    assert [s.action for s in steps] == ["open", "settle", "type", "click", "wait_for", "instruct"]
+    assert (steps[2].selector.name, steps[2].text) == ("Username", "tomsmith")
+    assert (steps[3].selector.name, steps[3].selector.role) == ("Login", "button")
+    assert steps[4].text == "You logged into a secure area!"
+
+
+def test_flow_from_json_assigns_ids():
+    parsed = Flow.from_json('[{"action": "open", "url": "https://x"}, {"action": "press", "key": "Enter", "id": "2a"}]')
+    assert [s.id for s in parsed.steps] == ["1", "2a"]
+
+
+@pytest.mark.asyncio
+async def test_engine_runs_deterministic_steps_without_agent():
+    browser = FakeBrowser()
+    outcome = await FlowEngine(browser).execute(flow(
+        open_url("https://the-internet.herokuapp.com/login"),
+        type_text("Username", "tomsmith"),
+        click("Login", role="button"),
+        wait_for("You logged into a secure area!"),
+    ))
+    assert outcome.next_index == 4 and outcome.reason is None
+    assert [r.status for r in outcome.results] == ["PASS"] * 4
+    assert ("browser_click", {"element": "button Login", "ref": "e5"}) in browser.calls
+
+
+@pytest.mark.asyncio
+async def test_engine_hands_over_ambiguous_and_failed_steps():
+    login = flow(open_url("https://x"), click("Login"), wait_for("Welcome"))
+    outcome = await FlowEngine(FakeBrowser()).execute(login)
+    assert outcome.next_index == 1 and "ambiguous" in outcome.reason   # button and link "Login"
+    prompt = delegation_prompt(login, outcome)
+    assert "2. Click \"Login\"" in prompt and "textbox \"Username\"" in prompt
+
+    outcome = await FlowEngine(FakeBrowser(failing={"browser_wait_for"})).execute(
+        flow(open_url("https://x"), click("Login", role="button"), wait_for("Welcome"))
+    )
+    assert outcome.next_index == 2 and "Timeout" in outcome.reason
+
+
+@pytest.mark.asyncio
+async def test_unmet_expectation_is_handed_to_the_agent_instead_of_passing():
+    login = flow(
+        open_url("https://the-internet.herokuapp.com/login"),
+        click("Login", role="button", expected='"You logged into a secure area!" is shown'),
+    )
+    assert login.steps[1].expected_text == "You logged into a secure area!" and login.steps[1].deterministic
+    assert not click("Login", expected="The user is logged in").deterministic
+
+    browser = FakeBrowser(failing={"browser_wait_for"})
+    outcome = await FlowEngine(browser).execute(login)
+
+    assert [r.step_id for r in outcome.results] == ["1"] and outcome.next_index == 1
+    assert "expected result was not met" in outcome.reason and "without repeating the action" in outcome.reason
+    assert browser.calls[-1] == ("browser_wait_for", {"text": "You logged into a secure area!"})
+
+    outcome = await FlowEngine(FakeBrowser()).execute(login)
+    assert outcome.complete(login) and outcome.results[1].actual_result.endswith('text "You logged into a secure area!" is visible')
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import pytest
+
+from playwright_agent.export import ScriptExportError, export_script, to_python
+from playwright_agent.runtime.recording import ActionLog, actions_from_items
+from playwright_agent.schemas.results import RunResult, StepResult
+
+
+def ran(code: str) -> str:
+    return f"### Ran Playwright code\n```js\n{code}\n```\n\n### Page state\n- Page URL: https://example.test/"
+
+
+def step(step_id: str, description: str, locator: list[str] | None = None) -> StepResult:
+    return StepResult(
+        step_id=step_id, description=description, previous_step="", expected_result="", actual_result="",
+        status="PASS", exception=None, locator=locator or [], next_step="",
+    )
+
+
+def passing_result(actions) -> RunResult:
+    result = RunResult(
+        status="PASS", proof_of_pass="done.png", exception=None, summary=None,
+        steps=[
+            step("1", "Open the login page", ["await page.goto('https://example.test/login');"]),
+            step("2", "Log in as tomsmith", ["textbox 'Username'"]),
+        ],
+    )
+    result._actions = actions
+    return result
+
+
+def test_actions_are_attributed_to_the_checkpointed_step():
+    log = ActionLog()
+    log.add("browser_snapshot", {}, "### Page state\n- Page URL: https://example.test/login")
+    log.add("browser_type", {"element": "Username"}, ran("await page.getByRole('textbox', { name: 'Username' }).fill('tomsmith');"))
+    log.add("browser_click", {"element": "Login"}, "### Result\nError: element is not visible")
+    log.add("browser_click", {"element": "Login"}, ran("await page.getByRole('button', { name: 'Login' }).click();"))
+    log.add("record_checkpoint", {"step_id": "2", "summary": "Logged in"}, "Checkpoint recorded for step 2")
+    log.add("get_mfa_code", {}, "123456")
+
+    assert [(a.tool, a.ok, a.step_id) for a in log.actions] == [
+        ("browser_snapshot", True, "2"), ("browser_type", True, "2"), ("browser_click", False, "2"), ("browser_click", True, "2"),
+    ]
+
+    items = [
+        {"type": "function_call", "call_id": "c1", "name": "browser_click", "arguments": '{"element": "Login"}'},
+        {"type": "function_call_output", "call_id": "c1", "output": ran("await page.getByRole('button', { name: 'Login' }).click();")},
+    ]
+    assert actions_from_items(items)[0].code == ["await page.getByRole('button', { name: 'Login' }).click();"]
+
+
+def test_passing_run_exports_as_python_and_typescript():
+    log = ActionLog()
+    log.add("browser_type", {}, ran("await page.getByRole('textbox', { name: 'Username' }).fill('tomsmith');"))
+    log.add("browser_click", {}, "### Result\nError: timeout")
+    log.add("browser_click", {}, ran("await page.getByRole('button', { name: 'Login' }).click();"))
+    log.add("record_checkpoint", {"step_id": "2"}, "")
+    log.add("browser_take_screenshot", {}, ran("await page.screenshot({ path: '/tmp/x.png' });"))
+    result = passing_result(log.actions)
+
+    python = export_script(result, name="Login flow")
+    assert python == (
+        "from playwright.sync_api import Page, expect\n\n\n"
+        "def test_login_flow(page: Page) -> None:\n"
+        "    # Step 1: Open the login page\n"
+        '    page.goto("https://example.test/login")\n'
+        "    # Step 2: Log in as tomsmith\n"
+        '    page.get_by_role("textbox", name="Username").fill("tomsmith")\n'
+        '    page.get_by_role("button", name="Login").click()\n'
+    )
+    compile(python, "test_login_flow.py", "exec")
+
+    typescript = export_script(result, name="login", language="typescript")
+    assert "test(\"login\", async ({ page }) => {\n  // Step 1: Open the login page\n  await page.goto(" in typescript
+    assert "screenshot" not in typescript
+
+
+def test_translation_and_refusals():
+    assert to_python("await page.getByText('Saved').first().waitFor({ state: 'visible' });") == (
+        'page.get_by_text("Saved").first.wait_for(state="visible")', False
+    )
+    assert to_python("await expect(page).toHaveURL(/secure/i);") == (
+        'expect(page).to_have_url(re.compile(r"secure", re.IGNORECASE))', True
+    )
+    assert to_python("await new Promise(f => setTimeout(f, 2 * 1000));")[0] == "page.wait_for_timeout(2000)"
+    assert to_python("const handle = await page.evaluateHandle(() => window);")[0] == (
+        "pytest.fail('not translated: const handle = await page.evaluateHandle(() => window);')"
+    )
+    untranslated = passing_result([]).model_copy(deep=True)
+    untranslated.steps[1].locator = ["await page.evaluate(() => localStorage.clear());"]
+    python = export_script(untranslated, name="login")
+    assert python.startswith("import pytest\n") and "    pytest.fail('not translated: await page.evaluate(" in python
+    compile(python, "test_login.py", "exec")
+
+    with pytest.raises(ScriptExportError, match="Only passing runs"):
+        export_script(passing_result([]).model_copy(update={"status": "FAIL"}))
+    with pytest.raises(ScriptExportError, match="no Playwright code"):
+        export_script(RunResult(status="PASS", steps=[step("1", "Look around")], exception=None, summary=None))
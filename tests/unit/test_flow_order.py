@@ -0,0 +1,65 @@
+"""Unit tests for failure-likelihood-first ordering (pytest plugin)."""
+
+from __future__ import annotations
+from types import SimpleNamespace
+
+import pytest
+
+from playwright_agent.history import mark_flow_test
+from playwright_agent.pytest_plugin import FLOW_HISTORY_SIZE, FlowHistory, pytest_runtest_makereport
+
+
+def _items(*nodeids):
+    return [SimpleNamespace(nodeid=n) for n in nodeids]
+
+
+def test_recent_failures_run_first_and_ties_break_by_duration():
+    history = FlowHistory()
+    for failed in (True, False, False, False):   # failed long ago
+        history.record("old_failure", failed, 5.0, when=100)
+    for failed in (False, False, False, True):   # failed last night
+        history.record("recent_failure", failed, 50.0, when=100)
+    history.record("green_slow", False, 60.0, when=100)
+    history.record("green_fast", False, 1.0, when=100)
+
+    order = [i.nodeid for i in history.order(_items("green_slow", "old_failure", "green_fast", "recent_failure"))]
+
+    assert order == ["recent_failure", "old_failure", "green_fast", "green_slow"]
+
+
+def test_changed_tests_are_boosted_and_unknown_tests_run_after_observed_failures():
+    history = FlowHistory()
+    history.record("stable", False, 1.0, when=100)
+    history.record("edited", False, 1.0, when=100)
+    for failed in [True] + [False] * (FLOW_HISTORY_SIZE - 1):   # one failure, long ago
+        history.record("rarely_failing", failed, 1.0, when=100)
+
+    order = history.order(
+        _items("stable", "brand_new", "rarely_failing", "edited"), changed_at={"stable": 50, "edited": 200},
+    )
+
+    assert [i.nodeid for i in order] == ["edited", "rarely_failing", "brand_new", "stable"]
+
+
+def test_only_tests_that_ran_a_flow_are_recorded(monkeypatch):
+    history = FlowHistory()
+    item = SimpleNamespace(config=SimpleNamespace(_flow_history=history))
+    for nodeid, runs_flow in (("test_e2e.py::test_login", True), ("test_unit.py::test_parse", False)):
+        monkeypatch.setenv("PYTEST_CURRENT_TEST", f"{nodeid} (call)")
+        if runs_flow:
+            mark_flow_test()
+        item.nodeid = nodeid
+        hook = pytest_runtest_makereport(item, None)
+        next(hook)
+        with pytest.raises(StopIteration):
+            hook.send(SimpleNamespace(get_result=lambda: SimpleNamespace(skipped=False, when="call", failed=True, duration=2.0)))
+
+    assert list(history.records) == ["test_e2e.py::test_login"]
+
+
+def test_history_is_bounded():
+    history = FlowHistory()
+    for _ in range(FLOW_HISTORY_SIZE + 5):
+        history.record("t", True, 1.0)
+    assert len(history.records["t"]["outcomes"]) == FLOW_HISTORY_SIZE
+    assert history.failure_rate("t") == 1.0
@@ -0,0 +1,75 @@
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+
+from playwright_agent.history import RunHistory, main
+from playwright_agent.schemas.results import RunResult, StepResult
+
+
+def result(failed_step: str | None = None) -> RunResult:
+    steps = [
+        StepResult(
+            step_id=step_id, description=f"step {step_id}", previous_step="", expected_result="", actual_result="",
+            status="FAIL" if step_id == failed_step else "PASS",
+            exception="Timeout waiting for Login" if step_id == failed_step else None, locator=[], next_step="",
+        )
+        for step_id in ("1", "2", "3")
+    ]
+    return RunResult(
+        status="FAIL" if failed_step else "PASS", failed_step_id=failed_step, steps=steps, exception=None, summary=None,
+    )
+
+
+def test_history_answers_flakiness_step_and_duration_questions(tmp_path, capsys):
+    history = RunHistory(tmp_path / "history" / "runs.sqlite3")
+    outcomes = {"test_login": [None, "2", None, "2", None], "test_search": ["3", "3", "3"], "test_stable": [None, None]}
+    started = 1_700_000_000.0
+    for test_id, failures in outcomes.items():
+        for failed in failures:
+            started += 60
+            history.record(test_id, result(failed), "flow", started_at=started, duration=30 + started % 7)
+    history.record("test_crash", None, "flow", error=RuntimeError("browser died"))
+
+    flaky = {row["test_id"]: row for row in history.flaky_tests(last=200)}
+    assert list(flaky)[0] == "test_login"
+    assert (flaky["test_login"]["flips"], flaky["test_login"]["fail_rate"]) == (4, 0.4)
+    assert (flaky["test_search"]["flips"], flaky["test_search"]["fail_rate"]) == (0, 1.0)
+    assert "test_crash" not in flaky  # a single run says nothing about flakiness
+
+    steps = history.failing_steps(last=200)
+    assert [(s["test_id"], s["step_id"], s["failures"]) for s in steps] == [("test_search", "3", 3), ("test_login", "2", 2)]
+    assert steps[0]["last_exception"] == "Timeout waiting for Login"
+    # The five most recent runs: test_crash, test_stable twice, the last two of test_search
+    assert [(s["test_id"], s["failures"]) for s in history.failing_steps(last=5)] == [("test_search", 2)]
+
+    trend = history.durations("test_login")
+    assert [row["status"] for row in trend] == ["PASS", "FAIL", "PASS", "FAIL", "PASS"]
+
+    assert main(["--db", str(history.path), "steps", "--test", "test_login"]) == 0
+    assert "test_login" in capsys.readouterr().out
+
+
+def test_concurrent_writers_share_one_database(tmp_path):
+    path = tmp_path / "runs.sqlite3"
+    RunHistory(path)
+
+    def write(worker: int) -> None:
+        history = RunHistory(path)
+        for _ in range(10):
+            history.record(f"test_{worker}", result(), "flow")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(write, range(4)))
+
+    assert sum(row["runs"] for row in RunHistory(path).flaky_tests(min_runs=1)) == 40
+
+
+def test_last_exception_is_the_one_of_the_latest_failure(tmp_path):
+    history = RunHistory(tmp_path / "runs.sqlite3")
+    for started_at, message in ((1000.0, "Zeta: old error"), (2000.0, "Alpha: newest error")):
+        failed = result("2")
+        failed.steps[1].exception = message
+        history.record("test_login", failed, "flow", started_at=started_at)
+    history.record("test_login", result(), "flow", started_at=3000.0)
+
+    [step] = history.failing_steps()
+    assert (step["failures"], step["last_exception"]) == (2, "Alpha: newest error")
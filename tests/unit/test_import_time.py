@@ -0,0 +1,39 @@
+from __future__ import annotations
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import playwright_agent
+
+SRC = Path(__file__).resolve().parents[2] / "src"
+
+PROBE = """
+import json, logging, os, sys
+before = dict(os.environ)
+import playwright_agent, playwright_agent.settings, playwright_agent.schemas.results
+print(json.dumps({
+    "heavy": [name for name in ("agents", "openai", "mcp", "playwright_agent.runtime.base") if name in sys.modules],
+    "root_handlers": len(logging.getLogger().handlers),
+    "environ_changed": dict(os.environ) != before,
+}))
+"""
+
+
+def test_package_import_is_lazy_and_side_effect_free(tmp_path):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=tmp_path, env={"PYTHONPATH": str(SRC), "PATH": ""},
+        capture_output=True, text=True, check=True,
+    ).stdout
+    probe = json.loads(output)
+
+    assert probe["heavy"] == []
+    assert probe["root_handlers"] == 0 and not probe["environ_changed"]
+
+
+def test_lazy_names_resolve_to_their_defining_modules():
+    from playwright_agent.runtime.base import BaseFlowRunner
+    from playwright_agent.schemas.results import RunResult
+
+    assert playwright_agent.BaseFlowRunner is BaseFlowRunner and playwright_agent.RunResult is RunResult
+    assert set(playwright_agent.__all__) <= set(dir(playwright_agent))
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from types import SimpleNamespace
+
+import pytest
+from pydantic import Field, create_model
+
+from playwright_agent.runtime.metrics import UsageMeter
+from playwright_agent.schemas.lean import LEAN_CACHE_SIZE, LeanStepResult, expand, lean_schema
+from playwright_agent.schemas.results import RunResult
+
+STEPS = "1. Open https://example.test/login\n2. Click the Login button\n3. Verify the dashboard is shown"
+
+
+class LoginResult(RunResult):
+    logged_in: bool = Field(description="True if the user is logged in")
+
+
+def lean_output(schema, failing: str | None = None):
+    return lean_schema(schema).model_validate({
+        "status": "FAIL" if failing else "PASS", "exception": None, "summary": "short", "logged_in": True,
+        "steps": [
+            {"step_id": step_id, "status": "FAIL" if step_id == failing else "PASS", "actual_result": f"did {step_id}",
+             "exception": "boom" if step_id == failing else None, "expected_result": "it works" if step_id == failing else None}
+            for step_id in ("1", "2", "3")
+        ],
+    })
+
+
+def test_lean_schema_keeps_custom_fields_and_expands_to_the_requested_schema():
+    lean = lean_schema(LoginResult)
+    assert lean is lean_schema(LoginResult)
+    assert lean.model_fields["steps"].annotation == list[LeanStepResult] and "logged_in" in lean.model_fields
+    assert len(lean.model_json_schema()["$defs"]["LeanStepResult"]["properties"]) < len(RunResult.model_json_schema()["$defs"]["StepResult"]["properties"])
+
+    result = expand(lean_output(LoginResult, failing="2"), LoginResult, {"1": "Open the login page"})
+    assert type(result) is LoginResult and result.logged_in is True
+    first, second = result.steps[:2]
+    assert (first.description, first.previous_step, first.expected_result) == ("Open the login page", "FIRST STEP", "did 1")
+    assert (second.previous_step, second.expected_result, second.exception) == ("Step 1: Open the login page", "it works", "boom")
+
+
+@pytest.mark.asyncio
+async def test_runner_uses_the_lean_schema_and_reports_usage(agent_runner, make_flow_runner):
+    async def respond(agent, prompt):
+        meter = agent.hook(UsageMeter)
+        usage = SimpleNamespace(requests=1, input_tokens=1000, output_tokens=120)
+        await meter.on_llm_start(None, None, None, None)
+        await meter.on_llm_end(None, None, SimpleNamespace(usage=usage))
+        return lean_output(LoginResult)
+
+    agents = agent_runner(respond)
+    result = await make_flow_runner().run(STEPS, LoginResult, output_mode="lean")
+
+    [agent] = agents.instances
+    assert agent.kwargs["output_type"] is lean_schema(LoginResult) and "**Lean output**" in agent.kwargs["instructions"]
+    assert type(result) is LoginResult and result.steps[2].description == "Verify the dashboard is shown"
+    assert (result.usage.output_mode, result.usage.output_tokens, result.usage.requests) == ("lean", 120, 1)
+    assert result.usage.elapsed_seconds >= result.usage.model_seconds >= 0
+
+
+def test_lean_schema_cache_is_bounded():
+    lean_schema.cache_clear()
+    for n in range(LEAN_CACHE_SIZE + 10):
+        lean_schema(create_model(f"Result{n}", __base__=RunResult))
+
+    assert lean_schema.cache_info().currsize == LEAN_CACHE_SIZE
@@ -0,0 +1,111 @@
+from __future__ import annotations
+import time
+
+import pytest
+
+from playwright_agent.locators import DAY_SECONDS, LocatorStore, intent_key, page_pattern
+from playwright_agent.runtime.recording import CHECKPOINT_TOOL, ActionRecorder
+from playwright_agent.schemas.results import RunResult, StepResult
+
+LEAD = "https://org.crm.dynamics.com/main.aspx?appid=4c1f&pagetype=entityrecord&etn=lead&id={}"
+
+
+def test_locators_are_shared_across_records_and_ranked_by_reliability(tmp_path):
+    store = LocatorStore(tmp_path / "locators.sqlite3")
+    first = LEAD.format("7d3b2a10-1e2f-4a5b-8c9d-0e1f2a3b4c5d")
+    other = LEAD.format("11111111-2222-3333-4444-555555555555")
+    assert page_pattern(first) == page_pattern(other)
+    assert intent_key("3.  Click the  Save button.") == "click the save button"
+
+    store.record("d365", "Click the Save button", first, "getByRole('button', { name: 'Save' })")
+    store.record("d365", "Click the Save button", first, "#save", worked=False)
+    store.record("d365", "Click the Save button", first, "#save")
+    store.record("d365", "2. Click the save button", other, "getByRole('button', { name: 'Save' })")
+
+    found = store.find("d365", "click the Save button", other)
+    assert [(f.locator, f.successes, f.failures) for f in found] == [
+        ("getByRole('button', { name: 'Save' })", 2, 0), ("#save", 1, 1),
+    ]
+    assert store.find("d365", "Click the Save button", "https://org.crm.dynamics.com/main.aspx?etn=contact") == []
+    assert store.find("zoho", "Click the Save button") == []
+    assert store.stats()["locators"] == 2
+
+
+def test_eviction_drops_old_unreliable_and_least_recently_used_locators(tmp_path):
+    store = LocatorStore(tmp_path / "locators.sqlite3", max_age_days=7, max_entries=2)
+    now = time.time()
+    store.record("app", "open menu", "app.test/home", "#old", now=now - 8 * DAY_SECONDS)
+    for _ in range(3):
+        store.record("app", "open menu", "app.test/home", "#broken", worked=False, now=now)
+    for age, locator in enumerate(("#newest", "#newer", "#new")):
+        store.record("app", "open menu", "app.test/home", locator, now=now - age)
+
+    assert store.evict(now) == 3
+    assert [f.locator for f in store.find("app", "open menu", limit=10)] == ["#newest", "#newer"]
+
+
+@pytest.mark.asyncio
+async def test_runs_get_locator_tools_backed_by_the_shared_database(
+    settings_env, monkeypatch, agent_runner, make_flow_runner,
+):
+    monkeypatch.setenv("LOCATOR_DB", str(settings_env / "locators.sqlite3"))
+    monkeypatch.setenv("LOCATOR_APP", "d365")
+    monkeypatch.setenv("LOCATOR_MODE", "tools")
+    seen = {}
+
+    async def respond(agent, prompt):
+        seen["before"] = await agent.call_tool("find_locators", intent="Click Save", page_url="app.test/lead/42")
+        await agent.call_tool("record_locator", intent="Click Save", page_url="app.test/lead/42", locator="#save")
+        seen["after"] = await agent.call_tool("find_locators", intent="click save", page_url="app.test/lead/43")
+        return RunResult(status="PASS", steps=[], exception=None, summary=None)
+
+    agents = agent_runner(respond)
+    await make_flow_runner().run("1. Click Save", RunResult)
+
+    assert "find_locators" in agents.instances[0].kwargs["instructions"] and seen["before"] == "No stored locators for this step."
+    assert seen["after"] == "- #save (worked 1x, failed 0x)"
+    [row] = LocatorStore(settings_env / "locators.sqlite3").find("d365", "Click Save", "app.test/lead/7")
+    assert row.page == "app.test/lead/*"
+
+
+def clicked(code: str) -> str:
+    return f"### Ran Playwright code\n```js\n{code}\n```\n### Page state\n- Page URL: https://app.test/lead\n"
+
+
+def step(step_id: str, locator: list[str]) -> StepResult:
+    return StepResult(
+        step_id=step_id, description="", previous_step="", expected_result="", actual_result="Done",
+        status="PASS", exception=None, locator=locator, next_step="",
+    )
+
+
+@pytest.mark.asyncio
+async def test_prefetched_hints_replace_lookup_turns_and_new_locators_are_stored(
+    settings_env, monkeypatch, agent_runner, make_flow_runner,
+):
+    database = settings_env / "locators.sqlite3"
+    monkeypatch.setenv("LOCATOR_DB", str(database))
+    LocatorStore(database).record("default", "Click Save", "app.test/lead/1", "locator('#save')")
+
+    async def respond(agent, prompt):
+        actions = agent.hook(ActionRecorder)
+        actions.add("browser_click", {}, clicked("await page.getByText('Leads').click();"))
+        actions.add(CHECKPOINT_TOOL, {"step_id": "1"}, "")
+        actions.add("browser_click", {}, clicked("await page.locator('#save').click();"))
+        actions.add(CHECKPOINT_TOOL, {"step_id": "2"}, "")
+        steps = [step("1", []), step("2", []), step("3", ["getByLabel('Topic')", "ref=e12"])]
+        return RunResult(status="PASS", steps=steps, exception=None, summary=None)
+
+    agents = agent_runner(respond)
+    await make_flow_runner().run("1. Open Leads\n2. Click Save\n3. Enter the topic", RunResult)
+
+    [agent] = agents.instances
+    assert "| 2 | locator('#save') |" in agent.kwargs["instructions"] and "| 1 |" not in agent.kwargs["instructions"]
+    assert not {"find_locators", "record_locator"} & set(agent.tools)
+    store = LocatorStore(database)
+    hints = store.prefetch("default", ["Open Leads", "Click Save", "Enter the topic"])
+    assert {intent: [(h.locator, h.successes) for h in found] for intent, found in hints.items()} == {
+        "open leads": [("getByText('Leads')", 1)],
+        "click save": [("locator('#save')", 2)],
+        "enter the topic": [("getByLabel('Topic')", 1)],
+    }
@@ -0,0 +1,114 @@
+from __future__ import annotations
+from types import SimpleNamespace
+
+import pytest
+
+from playwright_agent.integrations.macro_tools import FormField, MacroTools, dialog_buttons
+from playwright_agent.runtime.recording import ActionRecorder
+from playwright_agent.schemas.results import RunResult
+
+LEAD_FORM = """### Page state
+- Page URL: https://org.crm.dynamics.com/main.aspx?etn=lead
+- Page Snapshot:
+```yaml
+- textbox "Topic" [ref=e3]
+- textbox "First Name" [ref=e4]
+- textbox "Last Name" [ref=e5]
+- checkbox "Do not email" [ref=e6]
+- button "Save" [ref=e7]
+- button "Close" [ref=e8]
+```"""
+
+POPUPS = """### Page state
+- Page Snapshot:
+```yaml
+- button "Close" [ref=e1]
+- dialog "Stay signed in?" [ref=e2]:
+  - paragraph: Do this to reduce the number of times you are asked to sign in.
+  - button "No" [ref=e3]
+  - button "Close" [ref=e4]
+  - button "Not now" [ref=e5]
+- alertdialog [ref=e6]:
+  - button "Got it" [ref=e7]
+- button "Not now" [ref=e9]
+```"""
+
+
+def _result(text, error=False):
+    return SimpleNamespace(content=[SimpleNamespace(text=text)], isError=error)
+
+
+def _code(*lines):
+    return "### Ran Playwright code\n```js\n" + "\n".join(lines) + "\n```\n\n"
+
+
+class ScriptedBrowser:
+    """Answers snapshots with `pages` (one per snapshot, the last one repeats) and echoes the actions' code."""
+
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.calls = []
+
+    async def call_tool(self, name, arguments):
+        self.calls.append((name, arguments))
+        if name == "browser_snapshot":
+            return _result(self.pages.pop(0) if len(self.pages) > 1 else self.pages[0])
+        if name == "browser_fill_form":
+            return _result(_code(*(f"await page.getByRole('{f['type']}', {{ name: '{f['name']}' }}).fill('{f['value']}');"
+                                   for f in arguments["fields"])))
+        if name == "browser_click":
+            element = arguments["element"].split(" ", 1)[1]
+            return _result(_code(f"await page.getByRole('button', {{ name: '{element}' }}).click();") + self.pages[0])
+        if name == "browser_wait_for":
+            return _result(_code(f"await page.getByText('{arguments['text']}').first().waitFor();"))
+        return _result("### Result\nok")
+
+
+@pytest.mark.asyncio
+async def test_fill_form_fills_all_fields_in_one_browser_call_and_submits():
+    browser = ScriptedBrowser([LEAD_FORM])
+    fields = [FormField(name="Topic", value="Lessons Tracker"), FormField(name="first name", value="Prank"),
+              FormField(name="Last Name", value="Tiwari"), FormField(name="Do not email", value="true")]
+
+    text = await MacroTools(browser).fill_form(fields, submit="Save")
+
+    assert [name for name, _ in browser.calls] == ["browser_snapshot", "browser_fill_form", "browser_snapshot", "browser_click"]
+    assert browser.calls[1][1]["fields"][3] == {"name": "Do not email", "type": "checkbox", "ref": "e6", "value": "true"}
+    assert text.startswith("### Result\nFilled 4 fields: Topic, First Name, Last Name, Do not email; Clicked button \"Save\"")
+    assert "getByRole('button', { name: 'Save' }).click();" in text and "Page Snapshot" not in text
+
+
+@pytest.mark.asyncio
+async def test_unknown_fields_fail_without_touching_the_page():
+    browser = ScriptedBrowser([LEAD_FORM])
+    text = await MacroTools(browser).fill_form([FormField(name="Topic", value="x"), FormField(name="Email", value="y")])
+    assert text.startswith('### Result\nError: Selector "Email" matched no element')
+    assert "browser_fill_form" not in [name for name, _ in browser.calls]
+
+
+def test_only_buttons_inside_dialogs_count_as_popups():
+    buttons = dialog_buttons(POPUPS, ["Close", "Not now", "Got it"])
+    assert [(b.name, b.ref) for b in buttons] == [("Close", "e4"), ("Got it", "e7")]
+
+
+@pytest.mark.asyncio
+async def test_macros_are_tools_of_the_run_and_recorded_as_actions(
+    monkeypatch, fake_browser, agent_runner, make_flow_runner,
+):
+    monkeypatch.setenv("MACRO_TOOLS", "true")
+    fake_browser.call_tool = ScriptedBrowser([POPUPS, LEAD_FORM]).call_tool
+    seen = {}
+
+    async def respond(agent, prompt):
+        for name, arguments in (("dismiss_popups", {}), ("click_and_wait", {"element": "Save", "text": "Saved"})):
+            seen[name] = await agent.call_tool(name, **arguments)
+            agent.hook(ActionRecorder).add(name, arguments, seen[name])
+        return RunResult(status="PASS", steps=[], exception=None, summary=None)
+
+    agents = agent_runner(respond)
+    result = await make_flow_runner().run("1. Save the lead", RunResult)
+
+    assert "fill_form" in agents.instances[0].kwargs["instructions"]
+    assert seen["dismiss_popups"].startswith("### Result\nDismissed 2 popups (Close, Got it)")
+    assert seen["click_and_wait"].startswith('### Result\nClicked button "Save"; Text "Saved" is visible')
+    assert [(a.tool, len(a.code)) for a in result.actions] == [("dismiss_popups", 2), ("click_and_wait", 2)]
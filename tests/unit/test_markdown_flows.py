@@ -0,0 +1,68 @@
+from __future__ import annotations
+from pathlib import Path
+
+import pytest
+
+from playwright_agent.dsl import markdown
+from playwright_agent.dsl.markdown import FlowDefinitionError, compile_file, compile_text
+from playwright_agent.runtime.base import BaseFlowRunner
+from playwright_agent.schemas.results import RunResult
+
+FLOWS = Path(__file__).resolve().parents[1] / "data" / "flows"
+
+
+def test_parses_table_rows_and_placeholders():
+    compiled = compile_file(FLOWS / "ICJ.md")
+    assert compiled.placeholders == ["password", "url", "username"]
+    assert [s.id for s in compiled.steps] == [str(i) for i in range(1, 15)]
+    assert compiled.steps[3].action == "Click on Search"      # row without trailing cells
+    assert compiled.steps[6].data is None                     # "N/A"
+
+    prompt = compiled.render(url="https://d365", username="u", password="p").to_prompt()
+    assert "1. Launch the application | Data: `https://d365` | Expected: Application should launch successfully" in prompt
+    assert "|---" not in prompt
+
+
+def test_literal_braces_and_br_tags():
+    compiled = compile_file(FLOWS / "business_process_flow.md")
+    assert "OpportunityName" in compiled.placeholders
+    step = compiled.render({name: "X" for name in compiled.placeholders}).steps[0]
+    assert step.data.startswith('**Payload (JSON)**:; {"name": "`X`"')
+
+
+def test_missing_placeholders_are_reported():
+    with pytest.raises(FlowDefinitionError) as excinfo:
+        compile_file(FLOWS / "ICJ.md").render(url="https://d365")
+    assert excinfo.value.missing == ["password", "username"]
+
+
+def test_compiled_flows_are_cached_by_content():
+    markdown.clear_cache()
+    text = (FLOWS / "demo_login.md").read_text(encoding="utf-8")
+    first = compile_text(text)
+    first.steps[0].action = "changed by the caller"
+    first.notes.append("changed by the caller")
+    second = compile_text(text)
+    assert second is not first and second.model_dump() == compile_file(FLOWS / "demo_login.md").model_dump()
+    assert second.steps[0].action != "changed by the caller" and "changed by the caller" not in second.notes
+    compile_text(text + "\n")
+    assert markdown.cache_info() == {"hits": 2, "misses": 2, "size": 2}
+
+
+def test_demo_login_compiles_to_browser_actions_whose_prose_expectations_go_to_the_agent():
+    flow = compile_file(FLOWS / "demo_login.md").render().to_flow()
+    assert [step.action for step in flow.steps] == ["open", "settle", "type", "type", "click", "wait_for"]
+    assert not any(step.deterministic for step in flow.steps)   # "Username is accepted" needs judgement
+    assert all(step.model_copy(update={"expected": None}).deterministic for step in flow.steps)
+
+
+@pytest.mark.asyncio
+async def test_run_from_file_validates_before_browser_start(settings_env):
+    class NoBrowser:
+        async def get_browser_server(self, storage_state=None):
+            raise AssertionError("browser must not be started")
+
+    runner = BaseFlowRunner()
+    runner.server_manager = NoBrowser()
+    with pytest.raises(FlowDefinitionError, match="password, username"):
+        await runner.run_from_file(FLOWS / "ICJ.md", RunResult, variables={"url": "https://d365"})
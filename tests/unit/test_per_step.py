@@ -0,0 +1,147 @@
+from __future__ import annotations
+import re
+from types import SimpleNamespace
+
+import pytest
+from pydantic import Field
+
+from playwright_agent import FlowExecutionError
+from playwright_agent.runtime import base
+from playwright_agent.runtime.per_step import StepBatch, plan_units
+from playwright_agent.runtime.run_store import JournalHooks, RunStore
+from playwright_agent.schemas.results import RunResult, StepResult
+
+STEPS = """
+1. Open https://the-internet.herokuapp.com/login
+2. Type "tomsmith" into the Username field
+3. Click the Login button
+4. Verify the secure area is shown
+"""
+
+
+PAGE = "### Page state\n- Page URL: https://the-internet.herokuapp.com/secure\n- Page Snapshot:\n```yaml\n- heading \"Secure Area\" [ref=e2]\n```"
+
+
+@pytest.fixture
+def model(agent_runner):
+    """Answers every invocation by passing the requested steps (unless told to fail them)."""
+    model = SimpleNamespace(prompts=[], fail={})
+
+    async def respond(agent, prompt):
+        model.prompts.append(prompt)
+        output_type = agent.kwargs["output_type"]
+        if output_type is not StepBatch:
+            return output_type.model_validate({
+                "status": "PASS", "steps": [], "exception": None, "summary": None,
+                "logged_in": True,
+            })
+        ids = re.findall(r"^(\d+)\. ", prompt.split("Execute now:")[1], re.MULTILINE)
+        steps = []
+        for step_id in ids:
+            failing = model.fail.get(step_id, 0) > 0
+            if failing:
+                model.fail[step_id] -= 1
+            steps.append(StepResult(
+                step_id=step_id, description="d", previous_step="p", expected_result="e",
+                actual_result=f"did {step_id}", status="FAIL" if failing else "PASS",
+                exception="boom" if failing else None, locator=[], next_step="n",
+            ))
+        return StepBatch(steps=steps, notes=None)
+
+    agent_runner(respond)
+    return model
+
+
+@pytest.fixture
+def runner(model, make_flow_runner, fake_browser):
+    fake_browser.text = PAGE
+    return make_flow_runner()
+
+
+def test_plan_units_from_numbered_lines_and_tables():
+    _, units = plan_units(STEPS)
+    assert [(u.id, u.text[:4]) for u in units] == [("1", "Open"), ("2", "Type"), ("3", "Clic"), ("4", "Veri")]
+
+    context, units = plan_units("## Test: Login\n| Step | Action | Expected |\n|---|---|---|\n| 1 | Open app | App opens |\n")
+    assert context == "Test: Login\n" and units[0].text == "Open app | Expected: App opens"
+
+
+@pytest.mark.asyncio
+async def test_each_step_gets_a_short_invocation_and_results_are_assembled(runner, model):
+    result = await runner.run(STEPS, RunResult, execution_mode="per_step")
+
+    assert result.status == "PASS"
+    assert [s.step_id for s in result.steps] == ["1", "2", "3", "4"]
+    assert len(model.prompts) == 4
+    last = model.prompts[-1]
+    assert "- Step 3 [PASS]: did 3" in last and "Open https://" not in last   # summary, not history
+    assert "Secure Area" in last                                              # current page state
+
+
+@pytest.mark.asyncio
+async def test_failed_step_is_retried_in_place_then_blocks_the_rest(runner, model):
+    from playwright_agent import RetryPolicy
+
+    model.fail = {"2": 1}
+    result = await runner.run(STEPS, RunResult, execution_mode="per_step", retry_policy=RetryPolicy(step_retries=1))
+    assert result.status == "PASS" and "previous attempt at this step failed (boom)" in model.prompts[2]
+
+    model.fail = {"3": 5}
+    result = await runner.run(STEPS, RunResult, execution_mode="per_step", steps_per_invocation=2)
+    assert result.status == "FAIL" and result.failed_step_id == "3"
+    assert [s.status for s in result.steps] == ["PASS", "PASS", "FAIL", "BLOCKED"]
+
+
+@pytest.mark.asyncio
+async def test_retry_of_a_group_starts_at_its_failed_step(runner, model):
+    from playwright_agent import RetryPolicy
+
+    model.fail = {"2": 1}
+    result = await runner.run(
+        STEPS, RunResult, execution_mode="per_step", steps_per_invocation=2, retry_policy=RetryPolicy(step_retries=1),
+    )
+
+    assert result.status == "PASS" and [s.step_id for s in result.steps] == ["1", "2", "3", "4"]
+    executed = [re.findall(r"^(\d+)\. ", prompt.split("Execute now:")[1], re.MULTILINE) for prompt in model.prompts]
+    assert executed == [["1", "2"], ["2"], ["3", "4"]]   # step 1 is not re-prompted
+@pytest.mark.asyncio
+async def test_custom_fields_come_from_a_final_report_invocation(runner):
+    class LoginResult(RunResult):
+        logged_in: bool = Field(description="True if the user is logged in")
+
+    result = await runner.run(STEPS, LoginResult, execution_mode="per_step")
+    assert result.logged_in is True and len(result.steps) == 4
+
+
+@pytest.mark.asyncio
+async def test_persisted_per_step_run_journals_every_invocation_and_resumes(agent_runner, make_flow_runner, fake_browser):
+    fake_browser.text = PAGE
+    resumed = []
+
+    async def respond(agent, prompt):
+        if agent.kwargs["output_type"] is not StepBatch:
+            resumed.append(prompt)
+            assert [state.run_id for state in RunStore(runner.settings.runs_dir).list(status="running")] == ["per-step"]
+            return RunResult(status="PASS", steps=[], exception=None, summary="resumed")
+        [step_id] = re.findall(r"^(\d+)\. ", prompt.split("Execute now:")[1], re.MULTILINE)
+        if step_id == "3":
+            raise base.AgentExecutionError("model unavailable")
+        item = {"role": "assistant", "content": f"did {step_id}"}
+        await agent.hook(JournalHooks).on_llm_end(None, None, SimpleNamespace(to_input_items=lambda: [item]))
+        return StepBatch(steps=[StepResult(
+            step_id=step_id, description="d", previous_step="p", expected_result="e",
+            actual_result=f"did {step_id}", status="PASS", exception=None, locator=[], next_step="n",
+        )], notes=None)
+
+    agent_runner(respond)
+    runner = make_flow_runner()
+    with pytest.raises(FlowExecutionError):
+        await runner.run(STEPS, RunResult, execution_mode="per_step", run_id="per-step")
+
+    store = RunStore(runner.settings.runs_dir)
+    assert [c.step_id for c in store.load("per-step").checkpoints] == ["1", "2"]
+    assert [item["content"] for item in store.load_items("per-step")] == ["did 1", "did 2"]
+
+    result = await runner.resume("per-step")
+    assert result.summary == "resumed" and store.load("per-step").status == "completed"
+    assert [item["content"] for item in resumed[0][1:3]] == ["did 1", "did 2"]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+import json
+import pstats
+import time
+
+import pytest
+
+from playwright_agent.schemas.results import RunResult
+
+
+def validate_huge_output() -> None:
+    """Stands in for CPU-heavy work on the event loop."""
+    deadline = time.perf_counter() + 0.25
+    while time.perf_counter() < deadline:
+        pass
+
+
+async def block_the_loop(agent, prompt):
+    validate_huge_output()
+    return RunResult(status="PASS", steps=[], exception=None, summary=None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", ["sample", "cprofile"])
+async def test_profiled_run_writes_stacks_summary_and_loop_lag(settings_env, agent_runner, make_flow_runner, mode):
+    agent_runner(block_the_loop)
+    runner = make_flow_runner()
+
+    result = await runner.run("1. Open the app", RunResult, profile=mode)
+
+    assert result.status == "PASS"
+    [directory] = (settings_env / "reports" / "profiles").iterdir()
+    assert "validate_huge_output" in (directory / "stacks.collapsed").read_text()
+    summary = json.loads((directory / "summary.json").read_text())
+    assert summary["mode"] == mode and summary["samples"] > 10
+    assert summary["loop_lag"]["max_ms"] >= 100 and summary["loop_lag"]["stalls"] >= 1
+    assert any("validate_huge_output" in entry["function"] for entry in summary["top_functions"])
+    if mode == "cprofile":
+        stats = pstats.Stats(str(directory / "profile.pstats"))
+        assert any(name == "validate_huge_output" for _, _, name in stats.stats)
+    else:
+        assert not (directory / "profile.pstats").exists()
+
+
+@pytest.mark.asyncio
+async def test_profiling_is_off_by_default(settings_env, agent_runner, make_flow_runner):
+    agent_runner(block_the_loop)
+    runner = make_flow_runner()
+    await runner.run("1. Open the app", RunResult)
+    assert not (settings_env / "reports" / "profiles").exists()
@@ -0,0 +1,67 @@
+from __future__ import annotations
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from playwright_agent.runtime import base
+from playwright_agent.runtime.base import BaseFlowRunner
+from playwright_agent.schemas.results import RunResult
+
+
+class OutputDirManager:
+    """Builds the real browser arguments, without starting a browser."""
+
+    def __init__(self, manager, browser):
+        self.manager = manager
+        self.browser = browser
+        self.output_dirs = []
+
+    async def get_browser_server(self, storage_state=None):
+        server = await self.manager.get_browser_server(storage_state)
+        [output_dir] = [arg.split("=", 1)[1] for arg in server.params.args if arg.startswith("--output-dir=")]
+        self.output_dirs.append(output_dir)
+        return self.browser
+
+
+async def write_download(agent, prompt):
+    directory = base.current_run_dir()
+    await asyncio.sleep(0.01)  # let the other flow run in between
+    (directory / "download.csv").write_text(prompt)
+    return RunResult(status="FAIL" if "fail" in prompt else "PASS", steps=[], exception=None, summary=None)
+
+
+@pytest.fixture
+def runner(settings_env, fake_browser, agent_runner):
+    agent_runner(write_download)
+    runner = BaseFlowRunner()
+    runner.server_manager = OutputDirManager(runner.server_manager, fake_browser)
+    return runner
+
+
+@pytest.mark.asyncio
+async def test_concurrent_flows_get_their_own_output_directories(runner):
+
+    first, second = await asyncio.gather(
+        runner.run("1. Export the leads", RunResult),
+        runner.run("1. Export the contacts", RunResult),
+    )
+
+    assert first.output_dir != second.output_dir and sorted(runner.server_manager.output_dirs) == sorted(
+        [first.output_dir, second.output_dir]
+    )
+    for result, text in ((first, "leads"), (second, "contacts")):
+        directory = Path(result.output_dir)
+        assert directory.parent == Path(".isolated") / "runs"
+        assert text in (directory / "download.csv").read_text()
+
+
+@pytest.mark.asyncio
+async def test_passed_runs_directories_are_removed_with_passed_cleanup(runner):
+    runner.settings.run_dir_cleanup = "passed"
+
+    passed = await runner.run("1. Open the app", RunResult)
+    failed = await runner.run("1. Open the app and fail", RunResult)
+
+    assert passed.output_dir is None and not Path(runner.server_manager.output_dirs[0]).exists()
+    assert Path(failed.output_dir, "download.csv").is_file()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import json
+
+import pytest
+
+from playwright_agent.runtime.checkpoints import StepCheckpoint
+from playwright_agent.runtime.run_store import RunNotFoundError, RunStore, resume_input
+from playwright_agent.schemas.results import RunResult
+
+
+def test_journal_persists_incrementally(tmp_path):
+    store = RunStore(tmp_path)
+    journal = store.create("run-1", trace_name="test_login", output_schema=RunResult)
+    journal.begin_attempt("1. Login\n2. Open Leads")
+    journal.append_items([{"type": "function_call", "call_id": "c1", "name": "browser_navigate", "arguments": "{}"}])
+    journal.append_items([{"type": "function_call_output", "call_id": "c1", "output": "ok"}])
+    storage = tmp_path / "state.tmp.json"
+    storage.write_text('{"cookies": [], "origins": []}')
+    journal.record_checkpoint(StepCheckpoint(step_id="1", summary="Logged in", storage_state_path=str(storage)))
+
+    state = store.load("run-1")
+    assert state.status == "running"
+    assert state.output_schema == "playwright_agent.schemas.results:RunResult"
+    assert [c.step_id for c in state.checkpoints] == ["1"]
+    assert len(store.load_items("run-1")) == 2
+    assert store.storage_state("run-1") is not None
+    assert [s.run_id for s in store.list(status="running")] == ["run-1"]
+
+
+def test_items_of_earlier_attempts_and_torn_lines_are_ignored(tmp_path):
+    store = RunStore(tmp_path)
+    journal = store.create("run-2")
+    journal.begin_attempt("first prompt")
+    journal.append_items([{"role": "user", "content": "old"}])
+    journal.begin_attempt("resume prompt")
+    journal.append_items([{"role": "user", "content": "new"}])
+    with open(tmp_path / "run-2" / "items.jsonl", "a") as f:
+        f.write('{"attempt": 1, "item": {"ro')  # process died mid-write
+
+    assert store.load_items("run-2") == [{"role": "user", "content": "new"}]
+
+
+def test_complete_stores_result(tmp_path):
+    store = RunStore(tmp_path)
+    journal = store.create("run-3")
+    result = RunResult(status="PASS", proof_of_pass="a.png", steps=[], exception=None, summary="ok")
+    journal.complete(result)
+
+    assert store.load("run-3").status == "completed"
+    assert RunResult.model_validate_json(store.load_result("run-3")).summary == "ok"
+
+
+def test_unknown_run_raises(tmp_path):
+    with pytest.raises(RunNotFoundError):
+        RunStore(tmp_path).open("missing")
+
+
+def test_resume_input_drops_unanswered_calls_and_reasoning(tmp_path):
+    journal = RunStore(tmp_path).create("run-4")
+    journal.begin_attempt("do the steps")
+    journal.state.checkpoints.append(StepCheckpoint(step_id="3", summary="Saved", url="https://app/lead"))
+    items = [
+        {"type": "reasoning", "id": "rs_1", "summary": []},
+        {"type": "function_call", "call_id": "c1", "name": "browser_click", "arguments": "{}"},
+        {"type": "function_call_output", "call_id": "c1", "output": "clicked"},
+        {"type": "function_call", "call_id": "c2", "name": "browser_type", "arguments": "{}"},
+    ]
+
+    prompt = resume_input(journal.state, items, storage_state="storage.json")
+
+    assert prompt[0] == {"role": "user", "content": "do the steps"}
+    assert [i.get("call_id") for i in prompt[1:-1]] == ["c1", "c1"]
+    assert "Open https://app/lead first" in prompt[-1]["content"]
+    assert "saved session state" in json.dumps(prompt[-1])
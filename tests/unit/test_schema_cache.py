@@ -0,0 +1,88 @@
+from __future__ import annotations
+import json
+
+import pytest
+from agents import ModelBehaviorError  # type: ignore[import-not-found]
+from pydantic import Field, field_validator
+
+from playwright_agent.runtime import schema_cache
+from playwright_agent.runtime.schema_cache import cache_info, fingerprint, output_schema_for
+from playwright_agent.schemas.lean import lean_schema
+from playwright_agent.schemas.results import RunResult
+
+OUTPUT = {
+    "status": "PASS", "failed_step_id": None, "exception": None, "summary": "Logged in", "logged_in": True,
+    "proof_of_pass": "proof.png",
+    "steps": [{
+        "step_id": "1", "description": "Log in", "previous_step": "FIRST STEP", "expected_result": "Dashboard shown",
+        "actual_result": "Dashboard shown", "status": "PASS", "exception": None, "locator": [], "next_step": "None",
+    }],
+}
+
+
+def define_result(description: str = "True if the user is logged in"):
+    """A result model defined inside a test, as custom assertion classes usually are."""
+    class LoginResult(RunResult):
+        logged_in: bool = Field(description=description)
+    return LoginResult
+
+
+def test_structurally_identical_models_share_one_schema_and_validator(monkeypatch):
+    monkeypatch.setattr(schema_cache, "_cache", type(schema_cache._cache)())
+    monkeypatch.setattr(schema_cache, "_stats", {"hits": 0, "misses": 0})
+    first, second, other = define_result(), define_result(), define_result("Whether the login worked")
+    assert first is not second and fingerprint(first) == fingerprint(second) != fingerprint(other)
+
+    schemas = [output_schema_for(model) for model in (first, second, other)]
+    assert cache_info() == {"hits": 1, "misses": 2, "size": 2}
+    assert schemas[0].shared is schemas[1].shared is not schemas[2].shared
+    assert schemas[1].json_schema() == schemas[0].json_schema() and schemas[1].is_strict_json_schema()
+    assert output_schema_for(str) is str
+
+    value = schemas[1].validate_json(json.dumps(OUTPUT))
+    assert type(value) is second and value.logged_in is True and value.steps[0].actual_result == "Dashboard shown"
+    assert "proof_of_pass" in value.model_fields_set
+
+
+def test_lean_variants_of_redefined_models_hit_the_cache(monkeypatch):
+    monkeypatch.setattr(schema_cache, "_cache", type(schema_cache._cache)())
+    monkeypatch.setattr(schema_cache, "_stats", {"hits": 0, "misses": 0})
+    lean = [lean_schema(define_result()) for _ in range(3)]
+    schemas = [output_schema_for(model) for model in lean]
+    assert cache_info() == {"hits": 2, "misses": 1, "size": 1}
+
+    lean_output = {**OUTPUT, "steps": [{"step_id": "1", "status": "PASS", "actual_result": "ok", "exception": None, "expected_result": None}]}
+    value = schemas[2].validate_json(json.dumps(lean_output))
+    assert type(value) is lean[2] and value.steps[0].status == "PASS"
+
+
+def test_models_that_differ_only_by_a_validator_do_not_share_an_entry(monkeypatch):
+    monkeypatch.setattr(schema_cache, "_cache", type(schema_cache._cache)())
+
+    def define_count(checked: bool):
+        class CountResult(RunResult):
+            n: int = Field(description="Number of leads")
+
+        if not checked:
+            return CountResult
+
+        class CountResult(RunResult):  # noqa: F811 - same shape, plus a validator
+            n: int = Field(description="Number of leads")
+
+            @field_validator("n")
+            @classmethod
+            def non_negative(cls, value: int) -> int:
+                if value < 0:
+                    raise ValueError("n must not be negative")
+                return value
+        return CountResult
+
+    loose, strict = define_count(False), define_count(True)
+    assert fingerprint(loose) != fingerprint(strict)
+    output = json.dumps({**OUTPUT, "n": -5})
+    assert output_schema_for(loose).validate_json(output).n == -5
+    with pytest.raises(ModelBehaviorError):
+        output_schema_for(strict).validate_json(output)
+    # Even if a twin without the validator filled the entry, the target's validators run
+    with pytest.raises(ModelBehaviorError, match="must not be negative"):
+        schema_cache.CachedOutputSchema(strict, output_schema_for(loose).shared).validate_json(output)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from playwright_agent import settings
+from playwright_agent.integrations.azure_openai import client_config, make_async_client
+from playwright_agent.runtime.base import BaseFlowRunner
+from playwright_agent.settings import Settings, get_settings
+
+
+def test_settings_are_loaded_once_and_replaced_by_reload(settings_env, monkeypatch):
+    calls = []
+    original = Settings.validate_all
+    monkeypatch.setattr(Settings, "validate_all", lambda self: calls.append(self) or original(self))
+
+    first = get_settings()
+    assert get_settings() is first and BaseFlowRunner().settings is first and len(calls) == 1
+    assert (settings_env / ".isolated").is_dir()
+
+    monkeypatch.setenv("MAX_TURNS", "7")
+    assert get_settings().max_turns == first.max_turns
+    reloaded = settings.reload()
+    assert reloaded is not first and reloaded.max_turns == 7 and get_settings() is reloaded
+
+
+def test_runner_settings_override_leaves_the_shared_instance_alone(settings_env):
+    shared = get_settings()
+    own = Settings(max_turns=3, mcp_output_dir=Path("own-output"))
+    runner = BaseFlowRunner(settings=own)
+
+    assert runner.settings is own and runner.server_manager.settings is own
+    assert (settings_env / "own-output").is_dir() and get_settings() is shared and shared.max_turns != 3
+
+
+@pytest.mark.asyncio
+async def test_azure_client_is_shared_per_settings_and_dropped_by_reload(settings_env):
+    shared = get_settings()
+    client = make_async_client()
+
+    assert client_config() == client_config(shared) and str(client.base_url).startswith(shared.azure_openai_endpoint)
+    assert client.api_key == shared.azure_openai_api_key
+    assert make_async_client(shared) is client and make_async_client(Settings()) is not client
+    assert make_async_client(settings.reload()) is not client
+
+    async def on_another_loop():
+        return make_async_client()
+
+    current = make_async_client()
+    assert await asyncio.to_thread(asyncio.run, on_another_loop()) is not current
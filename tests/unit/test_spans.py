@@ -0,0 +1,91 @@
+from __future__ import annotations
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from playwright_agent.runtime.spans import SpanRecorder
+from playwright_agent.schemas.results import RunResult, StepResult
+
+
+def mcp_tool(name: str, server: str = "playwright"):
+    return SimpleNamespace(name=name, _tool_origin=SimpleNamespace(mcp_server_name=server))
+
+
+def tool_context(call_id: str, arguments: str = "{}"):
+    return SimpleNamespace(tool_call_id=call_id, tool_arguments=arguments)
+
+
+def otlp_spans(line: str) -> list[dict]:
+    return json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+
+
+@pytest.mark.asyncio
+async def test_model_and_parallel_tool_calls_are_recorded_and_broken_down():
+    spans = SpanRecorder("login")
+    agent = SimpleNamespace(model=SimpleNamespace(model="gpt-test"))
+    await spans.on_llm_start(None, agent, None, None)
+    await asyncio.sleep(0.02)
+    await spans.on_llm_end(None, agent, SimpleNamespace(usage=SimpleNamespace(requests=1, input_tokens=900, output_tokens=50)))
+    click, snapshot = mcp_tool("browser_click"), mcp_tool("browser_snapshot")
+    await spans.on_tool_start(tool_context("a", '{"ref": "e12"}'), agent, click)
+    await spans.on_tool_start(tool_context("b"), agent, snapshot)
+    await asyncio.sleep(0.02)
+    await spans.on_tool_end(tool_context("b"), agent, snapshot, "- button 'Login' [ref=e12]")
+    await spans.on_tool_end(tool_context("a"), agent, click, [{"type": "text", "text": "clicked"}])
+    spans.step("1", "Logged in")
+    spans.finish("PASS")
+
+    timings = spans.breakdown()
+    tool_spans = [span for span in spans.spans if span.name == "tool.call"]
+    assert timings.model_seconds >= 0.02 and 0.02 <= timings.tool_seconds < sum(s.seconds for s in tool_spans)  # overlap counted once
+    assert set(timings.tool_seconds_by_server) == {"playwright"} and timings.step_seconds["1"] >= timings.model_seconds
+    assert timings.total_seconds >= timings.model_seconds + timings.tool_seconds
+
+    exported = otlp_spans(json.dumps(spans.to_otlp()))
+    assert [s["name"] for s in exported] == ["flow", "model.call", "tool.call", "tool.call", "step"]
+    assert {s["traceId"] for s in exported} == {spans.trace_id}
+    assert all(s["parentSpanId"] == exported[0]["spanId"] for s in exported[1:])
+    model = {a["key"]: a["value"] for a in exported[1]["attributes"]}
+    assert model["model.name"] == {"stringValue": "gpt-test"} and model["model.output_tokens"] == {"intValue": "50"}
+    click_attributes = {a["key"]: a["value"] for a in exported[2]["attributes"]}
+    assert click_attributes["tool.arguments_bytes"] == {"intValue": "14"} and click_attributes["tool.result_bytes"] == {"intValue": "7"}
+
+
+@pytest.mark.asyncio
+async def test_runs_export_spans_and_report_a_time_breakdown(
+    settings_env, monkeypatch, fake_browser, fake_manager, agent_runner, make_flow_runner,
+):
+    monkeypatch.setenv("SPAN_FILE", str(settings_env / "spans.jsonl"))
+    monkeypatch.setenv("FILE_SERVER", "true")
+    fake_browser.connect_delay = 0.01
+    files = SimpleNamespace(name="files", connect=lambda: asyncio.sleep(0.01), cleanup=lambda: asyncio.sleep(0))
+
+    async def get_file_server():
+        return files
+
+    fake_manager.get_file_server = get_file_server
+
+    async def respond(agent, prompt):
+        spans = agent.hook(SpanRecorder)
+        await spans.on_llm_start(None, None, None, None)
+        await spans.on_llm_end(None, None, SimpleNamespace(usage=None))
+        await agent.call_tool("record_checkpoint", step_id="1", summary="Opened")
+        step = StepResult(
+            step_id="1", description="Open", previous_step="FIRST STEP", expected_result="Open",
+            actual_result="Opened", status="PASS", exception=None, locator=[], next_step="",
+        )
+        return RunResult(status="PASS", steps=[step], exception=None, summary=None)
+
+    agent_runner(respond)
+    result = await make_flow_runner().run("1. Open the app", RunResult, trace_name="open")
+
+    assert result.timings.mcp_startup_seconds >= 0.02 and "1" in result.timings.step_seconds
+    [line] = (settings_env / "spans.jsonl").read_text().splitlines()
+    names = [s["name"] for s in otlp_spans(line)]
+    assert names[:4] == ["flow", "mcp.startup", "mcp.startup", "model.call"] and "step" in names
+    servers = [{a["key"]: a["value"] for a in span["attributes"]}["mcp.server"] for span in otlp_spans(line)[1:3]]
+    assert servers == [{"stringValue": "playwright"}, {"stringValue": "files"}]
+    root = {a["key"]: a["value"] for a in otlp_spans(line)[0]["attributes"]}
+    assert root["flow.status"] == {"stringValue": "PASS"} and root["flow.trace_name"] == {"stringValue": "open"}
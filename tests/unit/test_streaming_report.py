@@ -0,0 +1,61 @@
+from __future__ import annotations
+import json
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from playwright_agent.reporting import StreamingReporter
+from playwright_agent.runtime.checkpoints import StepCheckpoint
+from playwright_agent.schemas.results import RunResult, StepResult
+
+
+def step(step_id: str, status: str = "PASS") -> StepResult:
+    return StepResult(
+        step_id=step_id, description="", previous_step="", expected_result="", actual_result=f"did {step_id}",
+        status=status, exception="Login button not found" if status == "FAIL" else None, locator=[], next_step="",
+    )
+
+
+def events(reporter: StreamingReporter) -> list[dict]:
+    return [json.loads(line) for line in reporter.jsonl_path.read_text().splitlines()]
+
+
+def test_steps_are_streamed_and_files_stay_well_formed(tmp_path):
+    reporter = StreamingReporter(tmp_path / "live")
+    reporter.run_started("run-1", "tests/test_login.py::test_login", "login")
+    reporter.step("run-1", "tests/test_login.py::test_login", StepCheckpoint(step_id="1", summary="Opened login"), live=True)
+
+    # Visible before the flow finishes
+    assert [e["event"] for e in events(reporter)] == ["run_started", "step"]
+    assert "Opened login" in reporter.html_path.read_text() and reporter.html_path.read_text().endswith("</html>\n")
+
+    result = RunResult(status="FAIL", failed_step_id="2", steps=[step("1"), step("2", "FAIL")], exception="Login failed", summary=None)
+    reporter.run_finished("run-1", "tests/test_login.py::test_login", result, 12.5)
+    reporter.run_started("run-2", "tests/test_search.py::test_search", "search")
+    reporter.run_finished("run-2", "tests/test_search.py::test_search", None, 1.0, RuntimeError("browser died"))
+
+    assert [(e["event"], e.get("step_id")) for e in events(reporter)] == [
+        ("run_started", None), ("step", "1"), ("step", "2"), ("run_finished", None),
+        ("run_started", None), ("run_finished", None),
+    ]
+    suite = ET.parse(reporter.junit_path).getroot().find("testsuite")
+    assert (int(suite.get("tests")), int(suite.get("failures")), int(suite.get("errors"))) == (2, 1, 1)
+    assert [case.get("name") for case in suite] == ["test_login", "test_search"]
+    assert suite[0].find("failure").get("message") == "Login failed"
+    assert reporter._live == {}
+
+
+@pytest.mark.asyncio
+async def test_runner_streams_every_run_into_report_dir(settings_env, monkeypatch, agent_runner, make_flow_runner):
+    monkeypatch.setenv("REPORT_DIR", str(settings_env / "live"))
+
+    async def respond(agent, prompt):
+        return RunResult(status="PASS", steps=[step("1"), step("2")], exception=None, summary=None)
+
+    agents = agent_runner(respond)
+    await make_flow_runner().run("1. Open the app\n2. Log in", RunResult, trace_name="login")
+
+    assert "record_checkpoint" in agents.instances[0].tools  # steps are reported live as they pass
+    lines = (settings_env / "live" / "results.jsonl").read_text().splitlines()
+    assert [json.loads(line)["event"] for line in lines][-1] == "run_finished"
+    assert "test_runner_streams_every_run_into_report_dir" in (settings_env / "live" / "junit.xml").read_text()
@@ -0,0 +1,53 @@
+from __future__ import annotations
+import json
+from types import SimpleNamespace
+
+import pytest
+from agents import custom_span, set_trace_processors, set_tracing_disabled, trace  # type: ignore[import-not-found]
+from agents.tracing.processors import default_processor  # type: ignore[import-not-found]
+
+from playwright_agent.runtime import tracing
+from playwright_agent.runtime.tracing import RotatingJsonlExporter, configure_tracing
+
+
+@pytest.fixture
+def restore_tracing(monkeypatch):
+    monkeypatch.setattr(tracing, "_configured", None)
+    monkeypatch.setattr(tracing, "_processor", None)
+    yield
+    set_trace_processors([default_processor()])
+    set_tracing_disabled(False)
+
+
+def item(n: int):
+    return SimpleNamespace(export=lambda: {"object": "trace.span", "id": f"span_{n:04d}", "data": "x" * 40})
+
+
+def test_trace_file_is_rotated_by_size(tmp_path):
+    exporter = RotatingJsonlExporter(tmp_path, max_bytes=300, backup_count=2)
+    for batch in range(6):
+        exporter.export([item(batch * 3 + i) for i in range(3)])
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["traces.1.jsonl", "traces.2.jsonl", "traces.jsonl"]
+    assert all(p.stat().st_size <= 300 for p in tmp_path.iterdir())
+    newest = [json.loads(line)["id"] for line in exporter.path.read_text().splitlines()]
+    assert newest[-1] == "span_0017"
+
+
+def test_file_backend_writes_traces_in_the_background_and_off_records_nothing(tmp_path, restore_tracing):
+    configure_tracing("file", tmp_path)
+    processor = tracing._processor
+    with trace("login"):
+        with custom_span("step 1"):
+            pass
+    processor.force_flush()
+
+    records = [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+    assert [r["object"] for r in records] == ["trace", "trace.span"] and records[0]["workflow_name"] == "login"
+
+    configure_tracing("off", tmp_path)
+    assert tracing._processor is None
+    with trace("ignored"):
+        with custom_span("step 1"):
+            pass
+    assert len((tmp_path / "traces.jsonl").read_text().splitlines()) == 2